@@ -0,0 +1,111 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the time of the processEvents thread when a faulty peer floods 1000
+# notifications, each with a state vector of 2000 entries, while a normal peer
+# sends 20 small notifications. Compare no admission control, a rate limit of
+# 10 notifications per second with a burst of 20 for each source (by incoming
+# face ID), and decode limits of 500 entries. Also count how many of the
+# normal peer's notifications were merged.
+
+import time
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.lp.lp_packet import LpPacket
+from pyndn.lp.incoming_face_id import IncomingFaceId
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+
+HMAC_KEY = Blob(bytearray(range(32)))
+N_FLOOD_NOTIFICATIONS = 1000
+N_FLOOD_MEMBERS = 2000
+N_NORMAL_NOTIFICATIONS = 20
+
+class NullFace(object):
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+    def callLater(self, delayMilliseconds, callback):
+        pass
+
+def makeNotification(stateVector, faceId):
+    interest = Interest(Name("/ndn/broadcast/bench").append(
+      StateVectorSync2018.encodeStateVector(
+        stateVector, sorted(stateVector.keys()))))
+    interest.setInterestLifetimeMilliseconds(5000.0)
+    KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+    received = Interest()
+    received.wireDecode(interest.wireEncode())
+    field = IncomingFaceId()
+    field.setFaceId(faceId)
+    lpPacket = LpPacket()
+    lpPacket.addHeaderField(field)
+    received.setLpPacket(lpPacket)
+    return received
+
+def makeInterests():
+    interests = []
+    for i in range(N_FLOOD_NOTIFICATIONS):
+        # Each flood notification has new sequence numbers.
+        interests.append(makeNotification(dict(
+          ("/ndn/edu/ucla/flood/member" + str(j), i)
+          for j in range(N_FLOOD_MEMBERS)), 1))
+        if i % (N_FLOOD_NOTIFICATIONS // N_NORMAL_NOTIFICATIONS) == 0:
+            interests.append(makeNotification(
+              { "/ndn/edu/ucla/normal": len(interests) }, 2))
+    return interests
+
+def run(interests, configure):
+    sync = StateVectorSync2018(
+      lambda syncStates: None, None, Name("/ndn/edu/ucla/local"),
+      Name("/ndn/broadcast/bench"), NullFace(), None, None, HMAC_KEY, 5000.0,
+      None)
+    configure(sync)
+    nNormalMerged = [0]
+    def onReceivedSyncState(syncStates):
+        nNormalMerged[0] += sum(1 for syncState in syncStates
+          if syncState.getDataPrefix() == "/ndn/edu/ucla/normal")
+    sync._onReceivedSyncState = onReceivedSyncState
+
+    startTime = time.time()
+    for interest in interests:
+        sync._onInterest(None, interest, None, 0, None)
+    elapsed = time.time() - startTime
+    return elapsed, nNormalMerged[0], sync.getAdmissionCounters()
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    interests = makeInterests()
+    print("%24s %10s %14s %10s %10s" % ("", "total (ms)", "normal merged",
+      "shed", "limited"))
+    for label, configure in [
+        ("no admission control", lambda sync: None),
+        ("10/s for each source",
+         lambda sync: sync.setAdmissionControl(10.0, 20, 0, 0)),
+        ("decode limit 500",
+         lambda sync: sync.setDecodeLimits(500, 200))]:
+        elapsed, nNormalMerged, counters = run(interests, configure)
+        print("%24s %10.0f %14d %10d %10d" % (label, elapsed * 1000,
+          nNormalMerged, counters['shedBySource'], counters['limitedVectors']))
+
+main()
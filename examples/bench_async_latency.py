@@ -0,0 +1,133 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the time from the arrival of a notification interest to the
+# application receiving the new sync state, for the processEvents and
+# time.sleep(0.01) polling loop of test_svs.py and for AsyncStateVectorSync
+# on an asyncio loop. A sender thread delivers the notifications at random
+# times. Also show the CPU time used by each, which includes the idle polling.
+
+import asyncio
+import random
+import threading
+import time
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import AsyncStateVectorSync
+from local_face import LocalNetwork
+from local_face import AsyncLocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+BROADCAST_PREFIX = Name("/ndn/broadcast/bench")
+N_NOTIFICATIONS = 200
+
+def makeNotifications():
+    notifications = []
+    for sequenceNo in range(N_NOTIFICATIONS):
+        interest = Interest(Name(BROADCAST_PREFIX).append(
+          StateVectorSync2018.encodeStateVector(
+            { "/sender": sequenceNo }, ["/sender"])))
+        interest.setInterestLifetimeMilliseconds(5000.0)
+        KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+        notifications.append(interest)
+    return notifications
+
+def startSender(network, notifications, sendTimes):
+    """
+    Start a thread which injects each notification after a random delay and
+    sets sendTimes[sequenceNo] to the time.
+    """
+    def send():
+        rand = random.Random(0)
+        for sequenceNo, interest in enumerate(notifications):
+            time.sleep(rand.uniform(0.002, 0.02))
+            sendTimes[sequenceNo] = time.perf_counter()
+            network.injectInterest(interest)
+
+    thread = threading.Thread(target = send)
+    thread.start()
+    return thread
+
+def onSyncStates(syncStates, receiveTimes):
+    now = time.perf_counter()
+    for syncState in syncStates:
+        receiveTimes[syncState.getSequenceNo()] = now
+
+def runPolling(notifications):
+    sendTimes = {}
+    receiveTimes = {}
+    network = LocalNetwork()
+    StateVectorSync2018(
+      lambda syncStates: onSyncStates(syncStates, receiveTimes), lambda: None,
+      Name("/receiver"), BROADCAST_PREFIX, LocalFace(network), None, None,
+      HMAC_KEY, 5000.0, None)
+    network.processEvents()
+
+    startCpuTime = time.process_time()
+    thread = startSender(network, notifications, sendTimes)
+    while len(receiveTimes) < len(notifications):
+        network.processEvents()
+        # We need to sleep for a few milliseconds so we don't use 100% of the CPU.
+        time.sleep(0.01)
+    thread.join()
+    return sendTimes, receiveTimes, time.process_time() - startCpuTime
+
+def runAsync(notifications):
+    sendTimes = {}
+    receiveTimes = {}
+    loop = asyncio.new_event_loop()
+    network = AsyncLocalNetwork(loop)
+    sync = AsyncStateVectorSync(
+      Name("/receiver"), BROADCAST_PREFIX, LocalFace(network), None, None,
+      HMAC_KEY, 5000.0, loop = loop)
+
+    async def receive():
+        await sync.waitForInitialized()
+        stream = sync.updates()
+        thread = startSender(network, notifications, sendTimes)
+        async for syncStates in stream:
+            onSyncStates(syncStates, receiveTimes)
+            if len(receiveTimes) >= len(notifications):
+                break
+        thread.join()
+
+    startCpuTime = time.process_time()
+    loop.run_until_complete(receive())
+    cpuTime = time.process_time() - startCpuTime
+    sync.shutdown()
+    loop.close()
+    return sendTimes, receiveTimes, cpuTime
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    notifications = makeNotifications()
+    print("%8s %10s %10s %10s %10s" % (
+      "loop", "mean (ms)", "p50 (ms)", "p99 (ms)", "CPU (s)"))
+    for name, run in [("polling", runPolling), ("asyncio", runAsync)]:
+        sendTimes, receiveTimes, cpuTime = run(notifications)
+        latencies = sorted((receiveTimes[sequenceNo] - sendTimes[sequenceNo]) *
+          1000 for sequenceNo in sendTimes)
+        print("%8s %10.2f %10.2f %10.2f %10.2f" % (name,
+          sum(latencies) / len(latencies), latencies[len(latencies) // 2],
+          latencies[int(len(latencies) * 0.99)], cpuTime))
+
+main()
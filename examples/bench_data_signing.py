@@ -0,0 +1,132 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the rate of answering data interests when 20 consumers fetch each
+# new publication, with RSA signing. Compare signing the packet for each
+# interest, as the chat example did, with a PublicationStore which signs each
+# packet once in publish(), and with background signing on a thread pool.
+# Also measure the mean time of the publish call.
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pyndn import Name
+from pyndn import Interest
+from pyndn import Data
+from pyndn.security import KeyChain
+from pyndn.security import SigningInfo
+from pyndn.util import Blob
+from svs.sync import SequenceFetcher
+from svs.sync import PublicationStore
+
+N_PUBLICATIONS = 200
+N_CONSUMERS = 20
+
+class NullFace(object):
+    def __init__(self):
+        self.nData = 0
+
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def putData(self, data):
+        self.nData += 1
+
+    def callLater(self, delayMilliseconds, callback):
+        pass
+
+class NullSync(object):
+    def __init__(self):
+        self._sequenceNo = -1
+
+    def getApplicationDataPrefix(self):
+        return "/producer"
+
+    def getSequenceNo(self):
+        return self._sequenceNo
+
+    def publishNextSequenceNo(self):
+        self._sequenceNo += 1
+
+class SignEachInterest(object):
+    """
+    SignEachInterest makes and signs the packet for each interest, like the
+    chat example before PublicationStore.
+    """
+    def __init__(self, keyChain):
+        self._keyChain = keyChain
+        self._sync = NullSync()
+        self._contents = {}
+
+    def publish(self, content):
+        self._sync.publishNextSequenceNo()
+        self._contents[self._sync.getSequenceNo()] = content
+
+    def _onInterest(self, prefix, interest, face, interestFilterId, filter):
+        sequenceNo = int(interest.getName().get(-1).toEscapedString())
+        data = Data(interest.getName())
+        data.setContent(self._contents[sequenceNo])
+        self._keyChain.sign(data, SigningInfo())
+        face.putData(data)
+
+def run(store, interests, face):
+    publishTime = 0.0
+    startTime = time.time()
+    for sequenceNo in range(N_PUBLICATIONS):
+        publishStartTime = time.time()
+        store.publish(Blob(bytearray(100)))
+        publishTime += time.time() - publishStartTime
+        for interest in interests[sequenceNo]:
+            store._onInterest(None, interest, face, 0, None)
+    if isinstance(store, PublicationStore):
+        # Wait for the last packets to be signed and answer their interests.
+        store.setSigningExecutor(None)
+    elapsed = time.time() - startTime
+    assert(face.nData == N_PUBLICATIONS * N_CONSUMERS)
+    return elapsed, publishTime / N_PUBLICATIONS
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    keyChain = KeyChain("pib-memory:", "tpm-memory:")
+    keyChain.createIdentityV2(Name("/producer"))
+    interests = [
+      [Interest(SequenceFetcher.makeDefaultDataName("/producer", sequenceNo))
+       for i in range(N_CONSUMERS)]
+      for sequenceNo in range(N_PUBLICATIONS)]
+
+    print("%22s %12s %12s %12s" % ("", "total (ms)", "interests/s",
+      "publish (ms)"))
+    for label, nThreads in [("sign each interest", -1), ("sign once", 0),
+                            ("sign once, 4 threads", 4)]:
+        face = NullFace()
+        executor = None
+        if nThreads < 0:
+            store = SignEachInterest(keyChain)
+        else:
+            store = PublicationStore(
+              NullSync(), face, keyChain, SigningInfo(), N_PUBLICATIONS)
+            if nThreads > 0:
+                executor = ThreadPoolExecutor(nThreads)
+                store.setSigningExecutor(executor)
+        elapsed, publishTime = run(store, interests, face)
+        if executor != None:
+            executor.shutdown()
+        print("%22s %12.1f %12.0f %12.3f" % (label, elapsed * 1000,
+          N_PUBLICATIONS * N_CONSUMERS / elapsed, publishTime * 1000))
+
+main()
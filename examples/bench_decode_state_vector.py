@@ -0,0 +1,88 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Compare decoding a received state vector with TlvDecoder and a Blob for each
+# member ID (the previous decodeStateVector) with iterateStateVector, with and
+# without a table of known member IDs. This reports the time per decode and the
+# peak memory allocated while decoding.
+
+import time
+import tracemalloc
+from pyndn.util import Blob
+from pyndn.encoding.tlv.tlv_decoder import TlvDecoder
+from svs.sync import StateVectorSync2018
+
+def blobDecode(input):
+    stateVector = {}
+    decoder = TlvDecoder(input.buf())
+    endOffset = decoder.readNestedTlvsStart(StateVectorSync2018.TLV_StateVector)
+    while decoder.getOffset() < endOffset:
+        entryEndOffset = decoder.readNestedTlvsStart(
+          StateVectorSync2018.TLV_StateVectorEntry)
+        memberIdBlob = Blob(decoder.readBlobTlv(
+          StateVectorSync2018.TLV_StateVector_MemberId), False)
+        stateVector[str(memberIdBlob)] = decoder.readNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_SequenceNumber)
+        decoder.finishNestedTlvs(entryEndOffset)
+    decoder.finishNestedTlvs(endOffset)
+    return stateVector
+
+def consume(input, memberIds):
+    # Process each entry while decoding, as the merge does.
+    for memberId, sequenceNo in StateVectorSync2018.iterateStateVector(
+          input, memberIds):
+        pass
+
+def measure(decode, nDecodes):
+    tracemalloc.start()
+    decode()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    startTime = time.time()
+    for i in range(nDecodes):
+        decode()
+    return (time.time() - startTime) / nDecodes, peak
+
+def main():
+    nMembers = 5000
+    stateVector = {}
+    for i in range(nMembers):
+        stateVector["/ndn/edu/ucla/remap/user" + str(i) + "/ndnchat/0K4wChff2v"] = (
+          1000 + i)
+    # A received name component value is a view of a mutable buffer.
+    encoding = Blob(bytearray(StateVectorSync2018.encodeStateVector(
+      stateVector, sorted(stateVector.keys())).toBytes()), False)
+    memberIds = dict((Blob(memberId).toBytes(), memberId)
+                     for memberId in stateVector)
+
+    nDecodes = 20
+    print("Decode a vector of %d members (%d bytes)" % (nMembers, len(encoding)))
+    print("%-34s %10s %12s" % ("", "ms/decode", "peak KiB"))
+    for label, decode in [
+        ("TlvDecoder and Blob", lambda: blobDecode(encoding)),
+        ("decodeStateVector", lambda: StateVectorSync2018.decodeStateVector(
+          encoding)),
+        ("decodeStateVector, known members",
+          lambda: StateVectorSync2018.decodeStateVector(encoding, memberIds)),
+        ("iterateStateVector, known members",
+          lambda: consume(encoding, memberIds))]:
+        decodeTime, peak = measure(decode, nDecodes)
+        print("%-34s %10.2f %12.1f" % (label, decodeTime * 1000, peak / 1024.0))
+
+main()
@@ -0,0 +1,80 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the bytes on the wire of the notification interests sent by one
+# member of a large group, with full state vectors and with delta
+# notifications. Between publishes, the member merges an update from another
+# member.
+
+import random
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+class CountingFace(object):
+    """
+    A stand-in Face which counts the bytes of outgoing interests.
+    """
+    def __init__(self):
+        self.nSentInterests = 0
+        self.nSentBytes = 0
+
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        self.nSentInterests += 1
+        self.nSentBytes += interest.wireEncode().size()
+
+def countBytes(nMembers, nPublishes, span, fullVectorPeriod):
+    face = CountingFace()
+    sync = StateVectorSync2018(
+      lambda syncStates: None, None,
+      Name("/ndn/edu/ucla/remap/local/ndnchat/0K4wChff2v/123"),
+      Name("/ndn/broadcast/ChronoChat-0.3/ndnchat1"), face, None, None,
+      HMAC_KEY, 5000.0, None)
+    memberIds = ["/ndn/edu/ucla/remap/user" + str(i) + "/ndnchat/0K4wChff2v/123"
+                 for i in range(nMembers - 1)]
+    sync._mergeStateVector(dict((memberId, 0) for memberId in memberIds))
+    sync.setDeltaNotifications(span, fullVectorPeriod)
+
+    random.seed(0)
+    for i in range(nPublishes):
+        memberId = random.choice(memberIds)
+        sync._mergeStateVector(
+          { memberId: sync.getProducerSequenceNo(memberId) + 1 }, True)
+        sync.publishNextSequenceNo()
+    return face.nSentBytes
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    nPublishes = 100
+    print("%8s %14s %14s %14s %8s" % ("members", "full (bytes)",
+      "delta (bytes)", "delta+full/50", "ratio"))
+    for nMembers in [100, 1000, 10000]:
+        fullBytes = countBytes(nMembers, nPublishes, 0, 0)
+        deltaBytes = countBytes(nMembers, nPublishes, 4, 0)
+        periodicBytes = countBytes(nMembers, nPublishes, 4, 50)
+        print("%8d %14d %14d %14d %8.4f" % (nMembers, fullBytes, deltaBytes,
+          periodicBytes, float(periodicBytes) / fullBytes))
+
+main()
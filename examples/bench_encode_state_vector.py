@@ -0,0 +1,69 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Compare the encode cost per publish of StateVectorSync2018.encodeStateVector,
+# which encodes every entry, with StateVectorEncodingCache, which only
+# re-encodes the entry of the publishing member.
+
+import time
+from svs.sync import StateVectorSync2018
+from svs.sync import StateVectorEncodingCache
+
+def makeStateVector(nMembers):
+    stateVector = {}
+    for i in range(nMembers):
+        stateVector["/ndn/edu/ucla/remap/user" + str(i) + "/ndnchat/0K4wChff2v"] = i
+    return stateVector, sorted(stateVector.keys())
+
+def timeFullEncode(stateVector, keys, nPublishes):
+    memberId = keys[len(keys) // 2]
+    startTime = time.time()
+    for i in range(nPublishes):
+        stateVector[memberId] += 1
+        StateVectorSync2018.encodeStateVector(stateVector, keys)
+    return (time.time() - startTime) / nPublishes
+
+def timeCachedEncode(stateVector, keys, nPublishes):
+    cache = StateVectorEncodingCache(
+      StateVectorSync2018.encodeStateVectorEntry,
+      StateVectorSync2018.TLV_StateVector)
+    for memberId in keys:
+        cache.invalidate(memberId)
+    # The first encode fills the cache.
+    cache.encode(stateVector, keys)
+
+    memberId = keys[len(keys) // 2]
+    startTime = time.time()
+    for i in range(nPublishes):
+        stateVector[memberId] += 1
+        cache.invalidate(memberId)
+        cache.encode(stateVector, keys)
+    return (time.time() - startTime) / nPublishes
+
+def main():
+    print("%8s %16s %16s %8s" % ("members", "full (us/pub)", "cached (us/pub)",
+      "speedup"))
+    for nMembers in [10, 100, 1000, 5000, 10000]:
+        stateVector, keys = makeStateVector(nMembers)
+        nPublishes = max(10, 100000 // nMembers)
+        fullTime = timeFullEncode(stateVector, keys, nPublishes)
+        cachedTime = timeCachedEncode(stateVector, keys, nPublishes * 10)
+        print("%8d %16.1f %16.1f %7.0fx" % (nMembers, fullTime * 1e6,
+          cachedTime * 1e6, fullTime / cachedTime))
+
+main()
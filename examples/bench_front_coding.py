@@ -0,0 +1,78 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Compare the size and the encode and decode times of the TLV_StateVector with
+# the TLV_FrontCodedStateVector for sets of member IDs like NDN application
+# prefixes: users under a few sites, each with an application name, a random
+# session ID and a session number.
+
+import random
+import string
+import time
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+
+SITES = ["/ndn/edu/ucla/remap", "/ndn/edu/ucla/cs", "/ndn/edu/arizona",
+         "/ndn/edu/wustl", "/ndn/org/caida", "/ndn/fr/lip6", "/ndn/cn/tongji"]
+
+def makeMemberIds(rand, nMembers):
+    memberIds = set()
+    while len(memberIds) < nMembers:
+        session = "".join(rand.choice(string.ascii_letters + string.digits)
+                          for i in range(10))
+        memberIds.add("%s/user%d/ndnchat/%s/%d" % (rand.choice(SITES),
+          rand.randint(0, nMembers), session, rand.randint(0, 999)))
+    return sorted(memberIds)
+
+def measure(function, nCalls):
+    startTime = time.time()
+    for i in range(nCalls):
+        function()
+    return (time.time() - startTime) / nCalls
+
+def main():
+    rand = random.Random(0)
+    print("%8s %10s %12s %12s %12s %12s %12s" % ("members", "bytes",
+      "front-coded", "encode (ms)", "front-coded", "decode (ms)", "front-coded"))
+    for nMembers in [10, 100, 1000, 10000]:
+        memberIds = makeMemberIds(rand, nMembers)
+        stateVector = dict((memberId, rand.randint(0, 100000))
+                           for memberId in memberIds)
+
+        # A received name component value is a view of a mutable buffer.
+        encoding = Blob(bytearray(StateVectorSync2018.encodeStateVector(
+          stateVector, memberIds).toBytes()), False)
+        frontCodedEncoding = Blob(bytearray(
+          StateVectorSync2018.encodeFrontCodedStateVector(
+            stateVector, memberIds).toBytes()), False)
+        assert(dict(StateVectorSync2018.iterateFrontCodedStateVector(
+          frontCodedEncoding)) == stateVector)
+
+        nCalls = max(1, 20000 // nMembers)
+        print("%8d %10d %12d %12.3f %12.3f %12.3f %12.3f" % (
+          nMembers, encoding.size(), frontCodedEncoding.size(),
+          measure(lambda: StateVectorSync2018.encodeStateVector(
+            stateVector, memberIds), nCalls) * 1000,
+          measure(lambda: StateVectorSync2018.encodeFrontCodedStateVector(
+            stateVector, memberIds), nCalls) * 1000,
+          measure(lambda: StateVectorSync2018.decodeStateVector(encoding),
+            nCalls) * 1000,
+          measure(lambda: dict(StateVectorSync2018.iterateFrontCodedStateVector(
+            frontCodedEncoding)), nCalls) * 1000))
+
+main()
@@ -0,0 +1,109 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Soak test of member expiry over a simulated week of member churn. A new chat
+# session with a new member ID joins every 5 minutes, publishes every 5 minutes
+# for 10 to 120 minutes and leaves. A lagging peer sends the state vector that
+# it had 90 minutes earlier every 10 minutes. For each simulated day, print the
+# number of members in the state vector, the size of the notification interest
+# and the memory allocated by the process (from tracemalloc), without member
+# expiry and with an expiry of one hour and tombstones for two hours. The time
+# is virtual, from a LocalNetwork.
+
+import random
+import tracemalloc
+from collections import deque
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+MINUTE = 60000.0
+N_DAYS = 7
+SESSION_INTERVAL_MINUTES = 5
+PUBLISH_INTERVAL_MINUTES = 5
+LAG_MINUTES = 90
+
+def getNotificationSize(sync):
+    return sum(interest.wireEncode().size()
+               for interest in sync._makeNotificationInterests())
+
+def run(expiryMilliseconds):
+    randomGenerator = random.Random(0)
+    network = LocalNetwork()
+    sync = StateVectorSync2018(
+      lambda syncStates: None, lambda: None, Name("/ndn/edu/ucla/observer"),
+      Name("/ndn/broadcast/soak"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+    network.processEvents()
+    if expiryMilliseconds > 0:
+        sync.setMemberExpiry(expiryMilliseconds, 2 * expiryMilliseconds)
+
+    # Each item is [memberId, sequenceNo, endMinute].
+    sessions = []
+    nSessions = 0
+    # The state vectors of the lagging peer, one for each 10 minutes.
+    laggingStateVectors = deque()
+    results = []
+    for minute in range(N_DAYS * 24 * 60):
+        if minute % SESSION_INTERVAL_MINUTES == 0:
+            sessions.append(
+              ["/ndn/edu/ucla/user" + str(nSessions % 50) + "/session" +
+               str(nSessions), -1, minute + randomGenerator.randint(10, 120)])
+            nSessions += 1
+        if minute % PUBLISH_INTERVAL_MINUTES == 0:
+            sync.publishNextSequenceNo()
+            for session in sessions:
+                session[1] += 1
+                sync._mergeStateVector({ session[0]: session[1] })
+            sessions = [session for session in sessions if session[2] > minute]
+        if minute % 10 == 0:
+            laggingStateVectors.append(dict(
+              (memberId, sync.getProducerSequenceNo(memberId))
+              for memberId in sync.getProducerPrefixes()))
+            if len(laggingStateVectors) > LAG_MINUTES // 10:
+                sync._mergeStateVector(laggingStateVectors.popleft())
+        network.advance(MINUTE)
+
+        if (minute + 1) % (24 * 60) == 0:
+            results.append((len(sync.getProducerPrefixes()),
+              getNotificationSize(sync), tracemalloc.get_traced_memory()[0]))
+
+    return results, sync.getMemberExpiryCounters()
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    print("%4s %14s %14s %14s %14s %14s %14s" % ("day", "members",
+      "expiry members", "bytes", "expiry bytes", "memory KB", "expiry KB"))
+    tracemalloc.start()
+    results, _ = run(0.0)
+    tracemalloc.stop()
+    tracemalloc.start()
+    expiryResults, counters = run(60 * MINUTE)
+    tracemalloc.stop()
+    for day in range(N_DAYS):
+        print("%4d %14d %14d %14d %14d %14.0f %14.0f" % (day + 1,
+          results[day][0], expiryResults[day][0], results[day][1],
+          expiryResults[day][1], results[day][2] / 1024.0,
+          expiryResults[day][2] / 1024.0))
+    print(counters)
+
+main()
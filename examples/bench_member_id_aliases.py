@@ -0,0 +1,72 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Compare the size and the encode and decode times of the TLV_StateVector with
+# the TLV_AliasedStateVector where the receiver already knows the aliases.
+
+import time
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+
+def measure(function, nCalls):
+    startTime = time.time()
+    for i in range(nCalls):
+        function()
+    return (time.time() - startTime) / nCalls
+
+def decodeAliased(encoding, aliases):
+    (senderId, entries) = StateVectorSync2018.decodeAliasedStateVector(encoding)
+    return dict((aliases[alias], sequenceNo)
+                for alias, memberId, sequenceNo in entries)
+
+def main():
+    senderId = "/ndn/edu/ucla/remap/local/ndnchat/0K4wChff2v/123"
+    print("%8s %10s %10s %12s %12s %12s %12s" % ("members", "bytes",
+      "aliased", "encode (ms)", "aliased", "decode (ms)", "aliased"))
+    for nMembers in [10, 100, 1000, 10000]:
+        stateVector = {}
+        for i in range(nMembers):
+            stateVector["/ndn/edu/ucla/remap/user" + str(i) +
+                        "/ndnchat/0K4wChff2v/123"] = 1000 + i
+        memberIds = sorted(stateVector.keys())
+        aliasedEntries = [(alias, None, stateVector[memberId])
+                          for alias, memberId in enumerate(memberIds)]
+        aliases = dict(enumerate(memberIds))
+
+        # A received name component value is a view of a mutable buffer.
+        encoding = Blob(bytearray(StateVectorSync2018.encodeStateVector(
+          stateVector, memberIds).toBytes()), False)
+        aliasedEncoding = Blob(bytearray(
+          StateVectorSync2018.encodeAliasedStateVector(
+            senderId, aliasedEntries).toBytes()), False)
+        assert(decodeAliased(aliasedEncoding, aliases) ==
+               StateVectorSync2018.decodeStateVector(encoding))
+
+        nCalls = max(1, 20000 // nMembers)
+        print("%8d %10d %10d %12.3f %12.3f %12.3f %12.3f" % (
+          nMembers, encoding.size(), aliasedEncoding.size(),
+          measure(lambda: StateVectorSync2018.encodeStateVector(
+            stateVector, memberIds), nCalls) * 1000,
+          measure(lambda: StateVectorSync2018.encodeAliasedStateVector(
+            senderId, aliasedEntries), nCalls) * 1000,
+          measure(lambda: StateVectorSync2018.decodeStateVector(encoding),
+            nCalls) * 1000,
+          measure(lambda: decodeAliased(aliasedEncoding, aliases),
+            nCalls) * 1000))
+
+main()
@@ -0,0 +1,95 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure how merging a received state vector scales with the group size, for
+# a cold join (every member is new) and for steady-state updates (every member
+# is known and has a new sequence number). The "list" columns emulate the
+# previous sorted list with a linear membership check and bisect.insort.
+
+import bisect
+import random
+import time
+from pyndn import Name
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+
+class NullFace(object):
+    """
+    A stand-in Face which ignores registration and outgoing interests.
+    """
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+def makeSync():
+    return StateVectorSync2018(
+      None, None, Name("/local/member"), Name("/ndn/broadcast/bench"),
+      NullFace(), None, None, Blob(bytearray(32)), 5000.0, None)
+
+def makeReceivedStateVector(nMembers):
+    memberIds = ["/ndn/edu/ucla/remap/user" + str(i) + "/ndnchat/0K4wChff2v"
+                 for i in range(nMembers)]
+    # Receive in random order so that new members are not already sorted.
+    random.shuffle(memberIds)
+    return dict((memberId, 1) for memberId in memberIds)
+
+def timeIndexMerge(receivedStateVector):
+    sync = makeSync()
+    startTime = time.time()
+    sync._mergeStateVector(receivedStateVector)
+    sync.getProducerPrefixes()
+    coldTime = time.time() - startTime
+
+    for memberId in receivedStateVector:
+        receivedStateVector[memberId] += 1
+    startTime = time.time()
+    sync._mergeStateVector(receivedStateVector)
+    sync.getProducerPrefixes()
+    steadyTime = time.time() - startTime
+
+    return coldTime, steadyTime
+
+def timeListMerge(receivedStateVector):
+    stateVector = {}
+    sortedKeys = []
+
+    startTime = time.time()
+    for memberId, sequenceNo in receivedStateVector.items():
+        if not memberId in sortedKeys:
+            bisect.insort(sortedKeys, memberId)
+        stateVector[memberId] = sequenceNo
+    return time.time() - startTime
+
+def main():
+    print("%8s %14s %15s %17s" % ("members", "list cold (ms)", "index cold (ms)",
+      "index steady (ms)"))
+    for nMembers in [100, 1000, 10000, 100000]:
+        receivedStateVector = makeReceivedStateVector(nMembers)
+        if nMembers <= 10000:
+            listTime = "%14.1f" % (timeListMerge(receivedStateVector) * 1000)
+        else:
+            # The linear membership check makes this take many minutes.
+            listTime = "%14s" % "-"
+        coldTime, steadyTime = timeIndexMerge(receivedStateVector)
+        print("%8d %s %15.1f %17.1f" % (nMembers, listTime, coldTime * 1000,
+          steadyTime * 1000))
+
+main()
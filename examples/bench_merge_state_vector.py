@@ -0,0 +1,117 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Compare the previous two-pass merge with the single-pass merge of
+# StateVectorSync2018 on state vectors of 10k entries. The "encoded" column
+# starts from the received encoding, as _onInterest does: the previous code
+# decodes a dictionary and merges it, and the new code checks for an identical
+# encoding and then merges while decoding.
+
+import time
+from pyndn import Name
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+
+class NullFace(object):
+    """
+    A stand-in Face which ignores registration and outgoing interests.
+    """
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+def makeSync(stateVector):
+    sync = StateVectorSync2018(
+      None, None, Name("/local/member"), Name("/ndn/broadcast/bench"),
+      NullFace(), None, None, Blob(bytearray(32)), 5000.0, None)
+    for k, v in stateVector.items():
+        sync._setSequenceNumber(k, v)
+    # A running instance has encoded its state vector to broadcast it.
+    sync._makeNotificationInterest()
+    return sync
+
+def previousMerge(sync, receivedStateVector):
+    needToReply = False
+    result = []
+    if sync._stateVector == receivedStateVector:
+        return (result, needToReply)
+    for k, v in receivedStateVector.items():
+        if sync._stateVector.get(k) == None or sync._stateVector.get(k) < v:
+            result.append(StateVectorSync2018.SyncState(k,v))
+            sync._setSequenceNumber(k, v)
+    for k, v in sync._stateVector.items():
+        if receivedStateVector.get(k) == None or receivedStateVector.get(k) < v:
+            needToReply = True
+            break
+    return (result, needToReply)
+
+def previousReceive(sync, encoding):
+    return previousMerge(sync, StateVectorSync2018.decodeStateVector(encoding))
+
+def newReceive(sync, encoding):
+    if sync._isCurrentStateVector(encoding):
+        return ([], False)
+    return sync._mergeStateVector(StateVectorSync2018.iterateStateVector(
+      encoding, sync._memberIds))
+
+def timeMerge(merge, localStateVector, received, nRepeats):
+    total = 0.0
+    for i in range(nRepeats):
+        # Each merge changes the local state, so start from a new copy.
+        sync = makeSync(localStateVector)
+        startTime = time.time()
+        merge(sync, received)
+        total += time.time() - startTime
+    return total / nRepeats
+
+def main():
+    nMembers = 10000
+    localStateVector = {}
+    for i in range(nMembers):
+        localStateVector["/ndn/edu/ucla/remap/user" + str(i) + "/ndnchat"] = 100
+    memberIds = sorted(localStateVector.keys())
+
+    cases = []
+    cases.append(("identical", dict(localStateVector)))
+    received = dict(localStateVector)
+    received[memberIds[0]] += 1
+    cases.append(("one newer entry", received))
+    cases.append(("all newer entries",
+      dict((k, v + 1) for k, v in localStateVector.items())))
+    received = dict(localStateVector)
+    del received[memberIds[-1]]
+    cases.append(("one missing entry", received))
+
+    nRepeats = 5
+    print("Merge into a state vector of %d entries (ms)" % nMembers)
+    print("%-18s %10s %10s %14s %14s" % ("received", "previous", "new",
+      "previous enc.", "new enc."))
+    for label, received in cases:
+        encoding = StateVectorSync2018.encodeStateVector(
+          received, sorted(received.keys()))
+        print("%-18s %10.2f %10.2f %14.2f %14.2f" % (label,
+          timeMerge(previousMerge, localStateVector, received, nRepeats) * 1000,
+          timeMerge(lambda sync, received: sync._mergeStateVector(received),
+            localStateVector, received, nRepeats) * 1000,
+          timeMerge(previousReceive, localStateVector, encoding, nRepeats) * 1000,
+          timeMerge(newReceive, localStateVector, encoding, nRepeats) * 1000))
+
+main()
@@ -0,0 +1,117 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the overhead of metrics on the processEvents thread: receiving 500
+# notifications with state vectors of 1, 100 and 1000 entries, and 2000
+# publishes, with metrics off and on. Each time is the best of 3 runs. Also
+# measure encoding the registry in the Prometheus text format.
+
+import time
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import MetricsRegistry
+
+HMAC_KEY = Blob(bytearray(range(32)))
+N_NOTIFICATIONS = 500
+N_RUNS = 3
+N_PUBLISHES = 2000
+
+class NullFace(object):
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        # Encode as a Face does to send it.
+        interest.wireEncode()
+
+    def callLater(self, delayMilliseconds, callback):
+        pass
+
+def makeSync():
+    return StateVectorSync2018(
+      lambda syncStates: None, None, Name("/ndn/edu/ucla/local"),
+      Name("/ndn/broadcast/bench"), NullFace(), None, None, HMAC_KEY, 5000.0,
+      None)
+
+def makeNotification(stateVector):
+    interest = Interest(Name("/ndn/broadcast/bench").append(
+      StateVectorSync2018.encodeStateVector(
+        stateVector, sorted(stateVector.keys()))))
+    interest.setInterestLifetimeMilliseconds(5000.0)
+    KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+    received = Interest()
+    received.wireDecode(interest.wireEncode())
+    return received
+
+def makeInterests(nMembers):
+    # Each notification has new sequence numbers.
+    return [makeNotification(dict(
+              ("/ndn/edu/ucla/member" + str(j), i) for j in range(nMembers)))
+            for i in range(N_NOTIFICATIONS)]
+
+def timeReceive(interests, registry):
+    elapsed = []
+    for run in range(N_RUNS):
+        sync = makeSync()
+        sync.setMetrics(registry)
+        startTime = time.time()
+        for interest in interests:
+            sync._onInterest(None, interest, None, 0, None)
+        elapsed.append(time.time() - startTime)
+    return min(elapsed)
+
+def timePublish(registry):
+    elapsed = []
+    for run in range(N_RUNS):
+        sync = makeSync()
+        sync.setMetrics(registry)
+        startTime = time.time()
+        for i in range(N_PUBLISHES):
+            sync.publishNextSequenceNo()
+        elapsed.append(time.time() - startTime)
+    return min(elapsed)
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    print("%24s %12s %12s %10s" % ("", "off (ms)", "on (ms)", "overhead"))
+    for nMembers in [1, 100, 1000]:
+        interests = makeInterests(nMembers)
+        off = timeReceive(interests, None)
+        on = timeReceive(interests, MetricsRegistry())
+        print("%24s %12.0f %12.0f %9.1f%%" % (
+          "receive " + str(nMembers) + " entries", off * 1000, on * 1000,
+          (on - off) / off * 100))
+    off = timePublish(None)
+    on = timePublish(MetricsRegistry())
+    print("%24s %12.0f %12.0f %9.1f%%" % (
+      "publish", off * 1000, on * 1000, (on - off) / off * 100))
+
+    registry = MetricsRegistry()
+    for i in range(10):
+        makeSync().setMetrics(registry, { "group": str(i) })
+    startTime = time.time()
+    for i in range(100):
+        registry.encodePrometheusText()
+    print("Encode 10 sync objects in Prometheus text: %.3f ms" %
+          ((time.time() - startTime) * 1000 / 100))
+
+main()
@@ -0,0 +1,91 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the time to process received notification interests when each
+# notification is delivered several times (for example by several forwarders),
+# with and without the recently-seen notification cache.
+
+import time
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+
+HMAC_KEY = Blob(bytearray(range(32)))
+BROADCAST_PREFIX = Name("/ndn/broadcast/bench")
+
+class NullFace(object):
+    """
+    A stand-in Face which ignores registration and outgoing interests.
+    """
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+def makeNotifications(nMembers, nNotifications):
+    stateVector = {}
+    for i in range(nMembers):
+        stateVector["/ndn/edu/ucla/remap/user" + str(i) + "/ndnchat"] = 0
+    memberIds = sorted(stateVector.keys())
+
+    notifications = []
+    for i in range(nNotifications):
+        stateVector[memberIds[i % nMembers]] += 1
+        interest = Interest(Name(BROADCAST_PREFIX).append(
+          StateVectorSync2018.encodeStateVector(stateVector, memberIds)))
+        interest.setInterestLifetimeMilliseconds(5000.0)
+        KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+        # Decode from the wire, as for a received interest.
+        received = Interest()
+        received.wireDecode(interest.wireEncode())
+        notifications.append(received)
+    return notifications
+
+def timeReceive(notifications, nDeliveries, maxCacheEntries):
+    sync = StateVectorSync2018(
+      lambda syncStates: None, None, Name("/local/member"), BROADCAST_PREFIX,
+      NullFace(), None, None, HMAC_KEY, 5000.0, None)
+    sync.setNotificationCache(maxCacheEntries, 5000.0)
+
+    startTime = time.time()
+    for interest in notifications:
+        for i in range(nDeliveries):
+            sync._onInterest(BROADCAST_PREFIX, interest, None, 0, None)
+    return time.time() - startTime, sync.getNotificationCacheCounters()
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    nNotifications = 300
+    print("%8s %10s %14s %14s %8s %8s" % ("members", "deliveries",
+      "no cache (ms)", "cache (ms)", "hits", "misses"))
+    for nMembers in [10, 100, 1000]:
+        notifications = makeNotifications(nMembers, nNotifications)
+        # Warm up.
+        timeReceive(notifications, 1, 0)
+        for nDeliveries in [1, 3]:
+            noCacheTime, _ = timeReceive(notifications, nDeliveries, 0)
+            cacheTime, counters = timeReceive(notifications, nDeliveries, 1000)
+            print("%8d %10d %14.1f %14.1f %8d %8d" % (nMembers, nDeliveries,
+              noCacheTime * 1000, cacheTime * 1000, counters['hits'],
+              counters['misses']))
+
+main()
@@ -0,0 +1,106 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the received notifications per second which are verified, decoded and
+# merged, inline on the processEvents thread and with the inbound pipeline on
+# thread and process pools with different numbers of workers.
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+
+HMAC_KEY = Blob(bytearray(range(32)))
+BROADCAST_PREFIX = Name("/ndn/broadcast/bench")
+
+class NullFace(object):
+    """
+    A stand-in Face which ignores registration, outgoing interests and timers.
+    """
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+    def callLater(self, delayMilliseconds, callback):
+        pass
+
+def makeNotifications(nMembers, nNotifications):
+    stateVector = {}
+    for i in range(nMembers):
+        stateVector["/ndn/edu/ucla/remap/user" + str(i) + "/ndnchat"] = 0
+    memberIds = sorted(stateVector.keys())
+
+    notifications = []
+    for i in range(nNotifications):
+        stateVector[memberIds[i % nMembers]] += 1
+        interest = Interest(Name(BROADCAST_PREFIX).append(
+          StateVectorSync2018.encodeStateVector(stateVector, memberIds)))
+        interest.setInterestLifetimeMilliseconds(5000.0)
+        KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+        # Decode from the wire, as for a received interest.
+        received = Interest()
+        received.wireDecode(interest.wireEncode())
+        notifications.append(received)
+    return notifications
+
+def timeReceive(notifications, executor):
+    """
+    Return the notifications per second. The NullFace does not fire timers, so
+    with a pipeline, each notification after the queue is full waits for the
+    oldest, and disabling the pipeline at the end waits for the rest.
+    """
+    sync = StateVectorSync2018(
+      lambda syncStates: None, None, Name("/local/member"), BROADCAST_PREFIX,
+      NullFace(), None, None, HMAC_KEY, 5000.0, None)
+    sync.setInboundPipeline(executor)
+
+    startTime = time.time()
+    for interest in notifications:
+        sync._onInterest(BROADCAST_PREFIX, interest, None, 0, None)
+    sync.setInboundPipeline(None)
+    return len(notifications) / (time.time() - startTime)
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    nNotifications = 1000
+    print("%8s %8s %8s %14s" % ("members", "mode", "workers", "notifications/s"))
+    for nMembers in [10, 100, 1000]:
+        notifications = makeNotifications(nMembers, nNotifications)
+        # Warm up.
+        timeReceive(notifications, None)
+        print("%8d %8s %8s %14.0f" % (
+          nMembers, "inline", "-", timeReceive(notifications, None)))
+        for makeExecutor, mode in [(ThreadPoolExecutor, "threads"),
+                                   (ProcessPoolExecutor, "processes")]:
+            for nWorkers in [1, 2, 4]:
+                executor = makeExecutor(nWorkers)
+                # Start the workers.
+                list(executor.map(abs, range(nWorkers * 4)))
+                print("%8d %8s %8d %14.0f" % (
+                  nMembers, mode, nWorkers, timeReceive(notifications, executor)))
+                executor.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Replay a capture from NotificationRecorder as fast as possible and print the
+# throughput and the size of the final state vector. If no capture file is
+# given, make one where 100 members each publish 50 times at 20 notifications
+# per second in total, and also print the time to record it and its size per
+# interest compared to the wire encoding. Usage:
+# python bench_notification_replay.py [capture file]
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import NotificationRecorder
+from svs.sync import NotificationReplayer
+
+HMAC_KEY = Blob(bytearray(range(32)))
+N_MEMBERS = 100
+N_PUBLISHES = 50
+INTERVAL_MILLISECONDS = 50.0
+
+class NullFace(object):
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+    def callLater(self, delayMilliseconds, callback):
+        pass
+
+def makeSync():
+    return StateVectorSync2018(
+      lambda syncStates: None, None, Name("/ndn/edu/ucla/replay"),
+      Name("/ndn/broadcast/bench"), NullFace(), None, None, HMAC_KEY, 5000.0,
+      None)
+
+def makeCapture(path):
+    # Each notification is from the member which publishes, with its view of
+    # the growing state vector.
+    interests = []
+    stateVector = {}
+    for i in range(N_PUBLISHES):
+        for j in range(N_MEMBERS):
+            memberId = "/ndn/edu/ucla/member" + str(j)
+            stateVector[memberId] = i
+            interest = Interest(Name("/ndn/broadcast/bench").append(
+              StateVectorSync2018.encodeStateVector(
+                stateVector, sorted(stateVector.keys()))))
+            interest.setInterestLifetimeMilliseconds(5000.0)
+            KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+            interests.append(interest)
+
+    startTime = time.time()
+    recorder = NotificationRecorder(path)
+    for i in range(len(interests)):
+        recorder.record(
+          interests[i], 1500000000000.0 + i * INTERVAL_MILLISECONDS)
+    recorder.close()
+    elapsed = time.time() - startTime
+    wireSize = sum(interest.wireEncode().size() for interest in interests)
+    print("Record %d interests: %.1f us each" %
+      (len(interests), elapsed * 1e6 / len(interests)))
+    print("File %d bytes, %.1f bytes per interest over the wire encoding" %
+      (os.path.getsize(path),
+       (os.path.getsize(path) - wireSize) / float(len(interests))))
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    directory = None
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    else:
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "bench.capture")
+        makeCapture(path)
+
+    try:
+        replay(path)
+    finally:
+        if directory != None:
+            shutil.rmtree(directory)
+
+def replay(path):
+    startTime = time.time()
+    replayer = NotificationReplayer(path)
+    print("Read and decode %d interests: %.0f ms, capture time %.1f s" %
+      (replayer.getInterestCount(), (time.time() - startTime) * 1000,
+       replayer.getCaptureMilliseconds() / 1000.0))
+    result = replayer.replay(makeSync())
+    print("Replay as fast as possible: %.0f ms, %.0f interests/s, %.1f MB/s" %
+      (result['seconds'] * 1000, result['interestsPerSecond'],
+       result['bytes'] / result['seconds'] / 1e6))
+    print("Final state vector: %d members" % len(result['stateVector']))
+
+main()
@@ -0,0 +1,107 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the time of receiving 2000 notifications with state vectors of 10
+# entries and of 2000 publishes, with the phase profiler off and on. Each time
+# is the best of 5 runs. Then print the per-phase percentiles from the
+# profiler.
+
+import time
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import PhaseProfiler
+
+HMAC_KEY = Blob(bytearray(range(32)))
+N_NOTIFICATIONS = 2000
+N_MEMBERS = 10
+N_PUBLISHES = 2000
+N_RUNS = 5
+
+class NullFace(object):
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        # Encode as a Face does to send it.
+        interest.wireEncode()
+
+    def callLater(self, delayMilliseconds, callback):
+        pass
+
+def makeSync():
+    return StateVectorSync2018(
+      lambda syncStates: None, None, Name("/ndn/edu/ucla/local"),
+      Name("/ndn/broadcast/bench"), NullFace(), None, None, HMAC_KEY, 5000.0,
+      None)
+
+def makeInterests():
+    interests = []
+    for i in range(N_NOTIFICATIONS):
+        # Each notification has new sequence numbers.
+        stateVector = dict(
+          ("/ndn/edu/ucla/member" + str(j), i) for j in range(N_MEMBERS))
+        interest = Interest(Name("/ndn/broadcast/bench").append(
+          StateVectorSync2018.encodeStateVector(
+            stateVector, sorted(stateVector.keys()))))
+        interest.setInterestLifetimeMilliseconds(5000.0)
+        KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+        received = Interest()
+        received.wireDecode(interest.wireEncode())
+        interests.append(received)
+    return interests
+
+def run(interests, profiler):
+    receiveTimes = []
+    publishTimes = []
+    for i in range(N_RUNS):
+        sync = makeSync()
+        sync.setProfiler(profiler)
+        startTime = time.time()
+        for interest in interests:
+            sync._onInterest(None, interest, None, 0, None)
+        receiveTimes.append(time.time() - startTime)
+
+        startTime = time.time()
+        for i in range(N_PUBLISHES):
+            sync.publishNextSequenceNo()
+        publishTimes.append(time.time() - startTime)
+    return min(receiveTimes), min(publishTimes)
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    interests = makeInterests()
+    profiler = PhaseProfiler()
+    print("%14s %14s %14s" % ("", "receive (ms)", "publish (ms)"))
+    for label, runProfiler in [("profiler off", None),
+                               ("profiler on", profiler)]:
+        receiveTime, publishTime = run(interests, runProfiler)
+        print("%14s %14.0f %14.0f" % (label, receiveTime * 1000,
+          publishTime * 1000))
+
+    print("")
+    print("%52s %8s %8s %8s %8s" % ("phase", "count", "p50 (us)", "p90 (us)",
+      "p99 (us)"))
+    for path, summary in profiler.getSummary().items():
+        print("%52s %8d %8.1f %8.1f %8.1f" % (path, summary['count'],
+          summary['p50'] * 1e6, summary['p90'] * 1e6, summary['p99'] * 1e6))
+
+main()
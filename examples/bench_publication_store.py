@@ -0,0 +1,120 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the rate of answering data interests from a PublicationStore,
+# compared with the list of the chat example which is scanned backwards for
+# the sequence number, for stores of 100 to 10000 packets. The interests are
+# for random stored sequence numbers. Also measure adding 10000 packets to a
+# full store, compared with appending to the list and trimming it with pop(0).
+
+import random
+import time
+from pyndn import Interest
+from pyndn import Data
+from pyndn.util import Blob
+from svs.sync import SequenceFetcher
+from svs.sync import PublicationStore
+
+N_INTERESTS = 20000
+N_ADDS = 10000
+
+class NullFace(object):
+    def __init__(self):
+        self.nData = 0
+
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def putData(self, data):
+        self.nData += 1
+
+class NullSync(object):
+    def getApplicationDataPrefix(self):
+        return "/producer"
+
+class ListStore(object):
+    """
+    ListStore keeps the packets like the message cache of the chat example.
+    """
+    def __init__(self, maxCount):
+        self._maxCount = maxCount
+        self._packets = []
+
+    def add(self, sequenceNo, data):
+        self._packets.append((sequenceNo, data))
+        while len(self._packets) > self._maxCount:
+            self._packets.pop(0)
+
+    def _onInterest(self, prefix, interest, face, interestFilterId, filter):
+        sequenceNo = int(interest.getName().get(-1).toEscapedString())
+        for i in range(len(self._packets) - 1, -1, -1):
+            if self._packets[i][0] == sequenceNo:
+                face.putData(self._packets[i][1])
+                break
+
+def makeData(sequenceNo):
+    data = Data(SequenceFetcher.makeDefaultDataName("/producer", sequenceNo))
+    data.setContent(Blob(bytearray(100)))
+    return data
+
+def fill(store, nItems):
+    for sequenceNo in range(nItems):
+        store.add(sequenceNo, makeData(sequenceNo))
+
+def timeInterests(store, interests):
+    face = NullFace()
+    startTime = time.time()
+    for interest in interests:
+        store._onInterest(None, interest, face, 0, None)
+    elapsed = time.time() - startTime
+    assert(face.nData == len(interests))
+    return len(interests) / elapsed
+
+def timeAdds(store, packets, firstSequenceNo):
+    startTime = time.time()
+    for i in range(len(packets)):
+        store.add(firstSequenceNo + i, packets[i])
+    return time.time() - startTime
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    randomGenerator = random.Random(0)
+    print("%8s %18s %18s %14s %14s" % ("packets", "store interests/s",
+      "list interests/s", "store adds ms", "list adds ms"))
+    for nItems in [100, 1000, 10000]:
+        interests = [
+          Interest(SequenceFetcher.makeDefaultDataName(
+            "/producer", randomGenerator.randrange(nItems)))
+          for i in range(N_INTERESTS)]
+        packets = [makeData(nItems + i) for i in range(N_ADDS)]
+        for data in packets:
+            data.wireEncode()
+
+        store = PublicationStore(NullSync(), NullFace(), None, None, nItems)
+        fill(store, nItems)
+        storeRate = timeInterests(store, interests)
+        storeAddTime = timeAdds(store, packets, nItems)
+        listStore = ListStore(nItems)
+        fill(listStore, nItems)
+        listRate = timeInterests(listStore, interests)
+        listAddTime = timeAdds(listStore, packets, nItems)
+        print("%8d %18.0f %18.0f %14.1f %14.1f" % (nItems, storeRate,
+          listRate, storeAddTime * 1000, listAddTime * 1000))
+
+main()
@@ -0,0 +1,84 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the time for a SequenceFetcher to catch up a backlog of 10000
+# publications from one member over a LocalNetwork where the producer answers
+# after a 20 ms delay. Compare one interest at a time with the AIMD window,
+# and the AIMD window when the producer drops 1% of interests. The virtual
+# time is the time to catch up on the simulated link, and the CPU time is the
+# time to run the simulation, including the producer.
+
+import random
+import time
+from pyndn import Name
+from pyndn import Interest
+from pyndn import Data
+from pyndn.util import Blob
+from svs.sync import SequenceFetcher
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+N_PUBLICATIONS = 10000
+DELAY_MILLISECONDS = 20.0
+
+class Producer(object):
+    def __init__(self, network, dataPrefix, lossRate):
+        self._face = LocalFace(network)
+        self._random = random.Random(0)
+        self._lossRate = lossRate
+        self._content = Blob(bytearray(100))
+        self._face.registerPrefix(Name(dataPrefix), self._onInterest, None)
+
+    def _onInterest(self, prefix, interest, face, interestFilterId, filter):
+        if self._random.random() < self._lossRate:
+            return
+        data = Data(interest.getName())
+        data.setContent(self._content)
+        self._face.callLater(
+          DELAY_MILLISECONDS, lambda: self._face.putData(data))
+
+def catchUp(initialWindow, maxWindow, lossRate):
+    network = LocalNetwork()
+    Producer(network, "/producer", lossRate)
+    delivered = []
+    fetcher = SequenceFetcher(
+      LocalFace(network),
+      lambda dataPrefix, sequenceNo, data: delivered.append(sequenceNo),
+      None, 200.0, 3, initialWindow, maxWindow)
+    startTime = time.time()
+    fetcher.fetch("/producer", N_PUBLICATIONS - 1)
+    while len(delivered) < N_PUBLICATIONS:
+        network.advance(DELAY_MILLISECONDS)
+    cpuTime = time.time() - startTime
+    assert(delivered == list(range(N_PUBLICATIONS)))
+    return network.getNowMilliseconds(), cpuTime, fetcher.getCounters()
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    print("%16s %14s %14s %12s %10s" % ("", "virtual (s)", "items/s",
+      "CPU (ms)", "retries"))
+    for label, initialWindow, maxWindow, lossRate in [
+          ("window 1", 1, 1, 0.0), ("AIMD", 4, 64, 0.0),
+          ("AIMD 1% loss", 4, 64, 0.01)]:
+        virtualTime, cpuTime, counters = catchUp(
+          initialWindow, maxWindow, lossRate)
+        print("%16s %14.1f %14.0f %12.1f %10d" % (label, virtualTime / 1000.0,
+          N_PUBLICATIONS / (virtualTime / 1000.0), cpuTime * 1000,
+          counters['retransmissions']))
+
+main()
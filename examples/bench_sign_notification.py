@@ -0,0 +1,89 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the signed notification interests per second, signing each with
+# KeyChain.signWithHmacWithSha256 as before, and with _makeNotificationInterest
+# when the state vector changed for each notification and when it did not
+# change (for example repeated replies to outdated state vectors).
+
+import time
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+
+HMAC_KEY = Blob(bytearray(range(32)))
+BROADCAST_PREFIX = Name("/ndn/broadcast/bench")
+
+class NullFace(object):
+    """
+    A stand-in Face which ignores registration and outgoing interests.
+    """
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+def makeSync(nMembers):
+    sync = StateVectorSync2018(
+      lambda syncStates: None, None, Name("/local/member"), BROADCAST_PREFIX,
+      NullFace(), None, None, HMAC_KEY, 5000.0, None)
+    stateVector = {}
+    for i in range(nMembers - 1):
+        stateVector["/ndn/edu/ucla/remap/user" + str(i) + "/ndnchat"] = i
+    sync._mergeStateVector(stateVector)
+    sync.publishNextSequenceNo()
+    return sync
+
+def signWithKeyChain(sync):
+    interest = Interest(BROADCAST_PREFIX)
+    interest.setInterestLifetimeMilliseconds(5000.0)
+    interest.getName().append(sync._encodingCache.encode(
+      sync._stateVector, sync._memberIndex.getSortedMembers()))
+    KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+    return interest
+
+def changeStateVector(sync):
+    sync._setSequenceNumber("/local/member", sync._sequenceNo)
+    sync._sequenceNo += 1
+
+def timeSign(sync, makeInterest, changeStateVector, nNotifications):
+    startTime = time.time()
+    for i in range(nNotifications):
+        if changeStateVector != None:
+            changeStateVector(sync)
+        makeInterest(sync)
+    return nNotifications / (time.time() - startTime)
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    nNotifications = 5000
+    print("%8s %14s %14s %14s" % (
+      "members", "KeyChain/s", "changed/s", "unchanged/s"))
+    for nMembers in [10, 100, 1000]:
+        sync = makeSync(nMembers)
+        makeInterest = StateVectorSync2018._makeNotificationInterest
+        print("%8d %14.0f %14.0f %14.0f" % (nMembers,
+          timeSign(sync, signWithKeyChain, changeStateVector, nNotifications),
+          timeSign(sync, makeInterest, changeStateVector, nNotifications),
+          timeSign(sync, makeInterest, None, nNotifications)))
+
+main()
@@ -0,0 +1,92 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the time for a reader to poll the member IDs and check if the state
+# vector changed, with getProducerPrefixes() which copies the list and with
+# getSnapshot() which compares the version. Also measure the added time for
+# the engine to make a snapshot after each merge.
+
+import time
+from pyndn import Name
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+class NullFace(object):
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+def makeSync(nMembers, enableSnapshots):
+    sync = StateVectorSync2018(
+      lambda syncStates: None, None, Name("/local/member"),
+      Name("/ndn/broadcast/bench"), NullFace(), None, None, HMAC_KEY, 5000.0, None)
+    sync._mergeStateVector(dict(
+      ("/ndn/edu/ucla/remap/user" + str(i) + "/ndnchat", 0)
+      for i in range(nMembers)))
+    sync.setSnapshots(enableSnapshots)
+    return sync
+
+def timeCopyReads(sync, nReads):
+    startTime = time.time()
+    previous = None
+    for i in range(nReads):
+        # Without a version, a reader compares the contents to see a change.
+        prefixes = sync.getProducerPrefixes()
+        if prefixes != previous:
+            previous = prefixes
+    return time.time() - startTime
+
+def timeSnapshotReads(sync, nReads):
+    startTime = time.time()
+    version = -1
+    for i in range(nReads):
+        snapshot = sync.getSnapshot()
+        if snapshot.getVersion() != version:
+            version = snapshot.getVersion()
+            prefixes = snapshot.getProducerPrefixes()
+    return time.time() - startTime
+
+def timeMerges(sync, nMerges):
+    memberIds = sync.getProducerPrefixes()
+    startTime = time.time()
+    for i in range(nMerges):
+        sync._mergeStateVector({ memberIds[i % len(memberIds)]: i + 1 })
+    return time.time() - startTime
+
+def main():
+    nReads = 10000
+    nMerges = 1000
+    print("%8s %16s %16s %16s %16s" % ("members", "copy reads (ms)",
+      "snapshot (ms)", "merges (ms)", "+snapshot (ms)"))
+    for nMembers in [100, 1000, 10000]:
+        sync = makeSync(nMembers, False)
+        copyTime = timeCopyReads(sync, nReads)
+        mergeTime = timeMerges(sync, nMerges)
+        sync = makeSync(nMembers, True)
+        snapshotTime = timeSnapshotReads(sync, nReads)
+        snapshotMergeTime = timeMerges(sync, nMerges)
+        print("%8d %16.1f %16.1f %16.1f %16.1f" % (nMembers,
+          copyTime * 1000, snapshotTime * 1000, mergeTime * 1000,
+          snapshotMergeTime * 1000))
+
+main()
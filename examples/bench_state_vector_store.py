@@ -0,0 +1,125 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the time to recover the state vector after a restart by making a
+# StateVectorSync2018 with a StateVectorStore which has a snapshot and a log
+# of 1000 records, compared with decoding and merging the whole state vector
+# as received from the group. Neither includes encoding the first
+# notification, which is the same for both. Also measure the added time of the
+# store for merges of one entry, with fsync batching and with an fsync for each
+# record.
+
+import os
+import shutil
+import tempfile
+import time
+from pyndn import Name
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import StateVectorStore
+
+HMAC_KEY = Blob(bytearray(range(32)))
+N_LOG_RECORDS = 1000
+
+class NullFace(object):
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+    def callLater(self, delayMilliseconds, callback):
+        pass
+
+def makeSync(store = None):
+    return StateVectorSync2018(
+      lambda syncStates: None, None, Name("/local/member"),
+      Name("/ndn/broadcast/bench"), NullFace(), None, None, HMAC_KEY, 5000.0,
+      None, -1, None, store)
+
+def makeStateVector(nMembers):
+    return dict(("/ndn/edu/ucla/remap/user" + str(i) + "/ndnchat", i % 300)
+                for i in range(nMembers))
+
+def writeStore(directory, stateVector):
+    store = StateVectorStore(directory)
+    store.load()
+    store.writeSnapshot(stateVector, sorted(stateVector))
+    memberIds = sorted(stateVector)
+    for i in range(N_LOG_RECORDS):
+        store.append(memberIds[i % len(memberIds)], 1000 + i)
+    store.close()
+
+def timeRecovery(directory):
+    startTime = time.time()
+    store = StateVectorStore(directory)
+    makeSync(store)
+    elapsed = time.time() - startTime
+    store.close()
+    return elapsed
+
+def timeResync(stateVector):
+    encoding = StateVectorSync2018.encodeStateVector(
+      stateVector, sorted(stateVector))
+    startTime = time.time()
+    sync = makeSync()
+    sync._mergeStateVector(StateVectorSync2018.iterateStateVector(encoding))
+    return time.time() - startTime
+
+def timeMerges(directory, nMerges, maxUnsyncedRecords):
+    store = None
+    if maxUnsyncedRecords > 0:
+        store = StateVectorStore(
+          directory, maxUnsyncedRecords = maxUnsyncedRecords)
+    sync = makeSync(store)
+    startTime = time.time()
+    for i in range(nMerges):
+        sync._mergeStateVector({ "/member" + str(i % 100): i })
+    elapsed = time.time() - startTime
+    if store != None:
+        store.close()
+    return elapsed
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        print("%8s %16s %16s" % ("members", "store (ms)", "resync (ms)"))
+        for nMembers in [1000, 10000, 100000]:
+            stateVector = makeStateVector(nMembers)
+            writeStore(directory, stateVector)
+            recoveryTime = timeRecovery(directory)
+            resyncTime = timeResync(stateVector)
+            print("%8d %16.1f %16.1f" % (nMembers,
+              recoveryTime * 1000, resyncTime * 1000))
+            os.remove(os.path.join(directory, "state-vector.snapshot"))
+            os.remove(os.path.join(directory, "state-vector.log"))
+
+        nMerges = 2000
+        print("")
+        print("%d merges of one entry" % nMerges)
+        for label, maxUnsyncedRecords in [
+              ("no store", 0), ("batched fsync", 1000), ("fsync each", 1)]:
+            print("%16s %10.1f ms" % (label,
+              timeMerges(directory, nMerges, maxUnsyncedRecords) * 1000))
+            for fileName in os.listdir(directory):
+                os.remove(os.path.join(directory, fileName))
+    finally:
+        shutil.rmtree(directory)
+
+main()
@@ -0,0 +1,135 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# Measure the memory per group, the time to dispatch received notifications
+# and the time to schedule a timer in each group, as the number of groups in
+# one process grows, for one StateVectorSync2018 per group registered on the
+# face and for groups in a SyncGroupManager. The face uses the interest
+# filter table and delayed call table of pyndn's Face.
+
+import random
+import time
+import tracemalloc
+from pyndn import Name
+from pyndn import Interest
+from pyndn import InterestFilter
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from pyndn.impl.interest_filter_table import InterestFilterTable
+from pyndn.impl.delayed_call_table import DelayedCallTable
+from svs.sync import StateVectorSync2018
+from svs.sync import SyncGroupManager
+
+HMAC_KEY = Blob(bytearray(range(32)))
+PARENT_PREFIX = Name("/ndn/broadcast/rooms")
+
+class TableFace(object):
+    """
+    A stand-in Face which dispatches received interests and keeps timers like
+    pyndn's Face, without a connection.
+    """
+    def __init__(self):
+        self._filterTable = InterestFilterTable()
+        self._delayedCallTable = DelayedCallTable()
+        self._nEntries = 0
+
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        self._nEntries += 1
+        self._filterTable.setInterestFilter(
+          self._nEntries, InterestFilter(prefix), onInterest, self)
+        return self._nEntries
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+    def callLater(self, delayMilliseconds, callback):
+        self._delayedCallTable.callLater(delayMilliseconds, callback)
+
+    def receiveInterest(self, interest):
+        matchedFilters = []
+        self._filterTable.getMatchedFilters(interest, matchedFilters)
+        for entry in matchedFilters:
+            entry.getOnInterest()(
+              entry.getFilter().getPrefix(), interest, self,
+              entry.getInterestFilterId(), entry.getFilter())
+
+def makeGroups(nGroups, useManager):
+    face = TableFace()
+    manager = SyncGroupManager(face, PARENT_PREFIX) if useManager else None
+    groups = []
+    for i in range(nGroups):
+        if useManager:
+            groups.append(manager.addGroup(
+              "room" + str(i), lambda states: None, lambda: None,
+              Name("/gateway/room" + str(i)), HMAC_KEY, 5000.0, None))
+        else:
+            groups.append(StateVectorSync2018(
+              lambda states: None, lambda: None,
+              Name("/gateway/room" + str(i)),
+              Name(PARENT_PREFIX).append("room" + str(i)), face, None, None,
+              HMAC_KEY, 5000.0, None))
+    return face, groups
+
+def makeNotifications(nGroups, nNotifications):
+    rand = random.Random(0)
+    notifications = []
+    for i in range(nNotifications):
+        interest = Interest(Name(PARENT_PREFIX).append(
+          "room" + str(rand.randrange(nGroups))).append(
+            StateVectorSync2018.encodeStateVector(
+              { "/member": i }, ["/member"])))
+        interest.setInterestLifetimeMilliseconds(5000.0)
+        KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+        notifications.append(interest)
+    return notifications
+
+def measure(nGroups, useManager, notifications):
+    tracemalloc.start()
+    startMemory = tracemalloc.get_traced_memory()[0]
+    face, groups = makeGroups(nGroups, useManager)
+    memoryPerGroup = (tracemalloc.get_traced_memory()[0] - startMemory) / nGroups
+    tracemalloc.stop()
+
+    startTime = time.time()
+    for interest in notifications:
+        face.receiveInterest(interest)
+    dispatchTime = (time.time() - startTime) / len(notifications)
+
+    # Each group schedules a publish coalescing timer.
+    startTime = time.time()
+    for group in groups:
+        group.setPublishCoalescing(random.uniform(50.0, 150.0))
+        group.publishNextSequenceNo()
+    timerTime = (time.time() - startTime) / nGroups
+    return memoryPerGroup, dispatchTime, timerTime
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    print("%7s %9s %12s %16s %16s" % ("groups", "manager", "bytes/group",
+      "dispatch (us)", "publish (us)"))
+    for nGroups in [100, 1000, 5000]:
+        notifications = makeNotifications(nGroups, 1000)
+        for useManager in [False, True]:
+            memoryPerGroup, dispatchTime, timerTime = measure(
+              nGroups, useManager, notifications)
+            print("%7d %9s %12.0f %16.1f %16.1f" % (nGroups,
+              "yes" if useManager else "no", memoryPerGroup,
+              dispatchTime * 1e6, timerTime * 1e6))
+
+main()
@@ -0,0 +1,224 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+# LocalNetwork and LocalFace are an in-process stand-in for a forwarder and the
+# Face of each application, for the tests and benchmarks in this directory.
+# Time is virtual: timers and interest timeouts only fire when the test calls
+# LocalNetwork.advance().
+
+import heapq
+import time
+from collections import deque
+from pyndn import Name
+from pyndn import Interest
+
+class LocalNetwork(object):
+    """
+    A LocalNetwork delivers the interests and data packets of its LocalFace
+    objects to each other, like a broadcast link.
+
+    :param int maxPacketSize: (optional) If not None, drop an interest or data
+      packet whose wire encoding is larger than this many bytes.
+    """
+    def __init__(self, maxPacketSize = None):
+        self._maxPacketSize = maxPacketSize
+        self._faces = []
+        # Each item is a function to call to deliver a packet.
+        self._deliveries = deque()
+        # A heap of (time, timerNo, callback).
+        self._timers = []
+        self._nTimers = 0
+        self._now = 0.0
+        self.nSentInterests = 0
+        self.nSentData = 0
+        self.nDroppedPackets = 0
+        self.nSentBytes = 0
+
+    def getNowMilliseconds(self):
+        return self._now
+
+    def processEvents(self):
+        """
+        Deliver packets until there are no more, not including timers.
+
+        :return: The number of packets delivered.
+        :rtype: int
+        """
+        nDelivered = 0
+        while len(self._deliveries) > 0:
+            self._deliveries.popleft()()
+            nDelivered += 1
+        return nDelivered
+
+    def advance(self, milliseconds):
+        """
+        Deliver packets and fire timers while advancing the virtual time by
+        milliseconds.
+        """
+        endTime = self._now + milliseconds
+        self.processEvents()
+        while len(self._timers) > 0 and self._timers[0][0] <= endTime:
+            timerTime, _, callback = heapq.heappop(self._timers)
+            self._now = max(self._now, timerTime)
+            callback()
+            self.processEvents()
+        self._now = endTime
+
+    def injectInterest(self, interest):
+        """
+        Deliver the interest to every face, as if it came from a face which is
+        not on this network. This can be called from another thread.
+        """
+        faces = self._faces[:]
+        self._deliver(lambda: [face._receiveInterest(interest) for face in faces])
+
+    def _deliver(self, deliver):
+        self._deliveries.append(deliver)
+
+    def _callLater(self, delayMilliseconds, callback):
+        self._nTimers += 1
+        heapq.heappush(
+          self._timers, (self._now + delayMilliseconds, self._nTimers, callback))
+
+    def _isTooLarge(self, packet):
+        size = packet.wireEncode().size()
+        self.nSentBytes += size
+        if self._maxPacketSize != None and size > self._maxPacketSize:
+            self.nDroppedPackets += 1
+            return True
+        return False
+
+    def _sendInterest(self, fromFace, interest):
+        self.nSentInterests += 1
+        if self._isTooLarge(interest):
+            return
+        for face in self._faces:
+            if face is not fromFace:
+                self._deliver(lambda face=face: face._receiveInterest(interest))
+
+    def _sendData(self, fromFace, data):
+        self.nSentData += 1
+        if self._isTooLarge(data):
+            return
+        for face in self._faces:
+            if face is not fromFace:
+                self._deliver(lambda face=face: face._receiveData(data))
+
+class AsyncLocalNetwork(LocalNetwork):
+    """
+    An AsyncLocalNetwork is a LocalNetwork which is driven by an asyncio loop,
+    like a ThreadsafeFace with an async transport: each delivery schedules
+    processEvents on the loop, and timers use loop.call_later in real time.
+    The application does not call processEvents or advance.
+
+    :param loop: The asyncio event loop.
+    :param int maxPacketSize: (optional) As for LocalNetwork.
+    """
+    def __init__(self, loop, maxPacketSize = None):
+        super(AsyncLocalNetwork, self).__init__(maxPacketSize)
+        self._loop = loop
+        self._isProcessEventsScheduled = False
+
+    def getNowMilliseconds(self):
+        return time.time() * 1000.0
+
+    def _deliver(self, deliver):
+        self._deliveries.append(deliver)
+        if not self._isProcessEventsScheduled:
+            self._isProcessEventsScheduled = True
+            self._loop.call_soon_threadsafe(self._onProcessEvents)
+
+    def _onProcessEvents(self):
+        # Clear the flag first so that a delivery during processEvents from
+        # another thread schedules it again.
+        self._isProcessEventsScheduled = False
+        self.processEvents()
+
+    def _callLater(self, delayMilliseconds, callback):
+        self._loop.call_later(delayMilliseconds / 1000.0, callback)
+
+class LocalFace(object):
+    """
+    A LocalFace has the methods of Face which are used by StateVectorSync2018
+    and the applications in this directory.
+
+    :param LocalNetwork network: The network to send and receive packets.
+    """
+    def __init__(self, network):
+        self._network = network
+        network._faces.append(self)
+        # Each item is (prefix, onInterest, registeredPrefixId).
+        self._filters = []
+        # Each item is [interest, onData, onTimeout, isPending].
+        self._pendingInterests = []
+        self._nRegisteredPrefixes = 0
+
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        self._nRegisteredPrefixes += 1
+        registeredPrefixId = self._nRegisteredPrefixes
+        prefix = Name(prefix)
+        self._filters.append((prefix, onInterest, registeredPrefixId))
+        if onRegisterSuccess != None:
+            self._network._deliver(
+              lambda: onRegisterSuccess(prefix, registeredPrefixId))
+        return registeredPrefixId
+
+    def removeRegisteredPrefix(self, registeredPrefixId):
+        self._filters = [
+          entry for entry in self._filters if entry[2] != registeredPrefixId]
+
+    def expressInterest(self, interest, onData, onTimeout = None,
+          onNetworkNack = None):
+        interest = Interest(interest)
+        entry = [interest, onData, onTimeout, True]
+        self._pendingInterests.append(entry)
+        self._network._callLater(
+          interest.getInterestLifetimeMilliseconds(),
+          lambda: self._onInterestTimeout(entry))
+        self._network._sendInterest(self, interest)
+
+    def putData(self, data):
+        self._network._sendData(self, data)
+
+    def callLater(self, delayMilliseconds, callback):
+        self._network._callLater(delayMilliseconds, callback)
+
+    def processEvents(self):
+        self._network.processEvents()
+
+    def _receiveInterest(self, interest):
+        for prefix, onInterest, _ in self._filters:
+            if prefix.match(interest.getName()):
+                onInterest(prefix, interest, self, 0, None)
+
+    def _receiveData(self, data):
+        for entry in self._pendingInterests:
+            if entry[3] and entry[0].matchesData(data):
+                entry[3] = False
+                entry[1](entry[0], data)
+        self._pendingInterests = [
+          entry for entry in self._pendingInterests if entry[3]]
+
+    def _onInterestTimeout(self, entry):
+        if not entry[3]:
+            return
+        entry[3] = False
+        self._pendingInterests.remove(entry)
+        if entry[2] != None:
+            entry[2](entry[0])
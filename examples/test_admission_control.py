@@ -0,0 +1,197 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.lp.lp_packet import LpPacket
+from pyndn.lp.incoming_face_id import IncomingFaceId
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import StateVectorLimitError
+from svs.sync import AdmissionControl
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberPrefix):
+    return StateVectorSync2018(
+      lambda states: None, lambda: None, Name(memberPrefix),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+
+def makeNotification(stateVector, faceId = None, markers = []):
+    interest = Interest(Name("/ndn/broadcast/test").append(
+      StateVectorSync2018.encodeStateVector(
+        stateVector, sorted(stateVector.keys()))))
+    for marker in markers:
+        interest.getName().append(marker)
+    interest.setInterestLifetimeMilliseconds(5000.0)
+    KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+    # Decode from the wire, as for a received interest.
+    received = Interest()
+    received.wireDecode(interest.wireEncode())
+    if faceId != None:
+        field = IncomingFaceId()
+        field.setFaceId(faceId)
+        lpPacket = LpPacket()
+        lpPacket.addHeaderField(field)
+        received.setLpPacket(lpPacket)
+    return received
+
+def receive(sync, interests):
+    for interest in interests:
+        sync._onInterest(None, interest, None, 0, None)
+
+def expectLimitError(decode):
+    try:
+        decode()
+        assert(False)
+    except StateVectorLimitError:
+        pass
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # Each source has a bucket, and all share the global bucket, which only
+    # loses a token if the source's bucket admits.
+    admission = AdmissionControl(10.0, 2, 100.0, 5)
+    assert([admission.admit("a", 0.0) for i in range(3)] == [True, True, False])
+    assert([admission.admit("b", 0.0) for i in range(2)] == [True, True])
+    assert(admission.admit("c", 0.0) and not admission.admit(None, 0.0))
+    assert(admission.admit("a", 100.0))
+    assert(admission.getCounters() == { 'admitted': 6, 'shedBySource': 1,
+      'shedGlobally': 1, 'sources': 3 })
+    # The least recently seen source is evicted and starts again with a full
+    # bucket.
+    admission = AdmissionControl(1.0, 1, 0.0, 0, 2)
+    assert(admission.admit("a", 0.0) and not admission.admit("a", 0.0))
+    assert(admission.admit("b", 0.0) and admission.admit("c", 0.0))
+    assert(admission.admit("a", 0.0))
+    assert(admission.getCounters()['sources'] == 2)
+
+    # The decoders stop at the first entry over a limit, after returning the
+    # entries before it.
+    stateVector = dict(("/member/" + str(i), i) for i in range(10))
+    keys = sorted(stateVector)
+    for encoding, decode in [
+        (StateVectorSync2018.encodeStateVector(stateVector, keys),
+         StateVectorSync2018.iterateStateVector),
+        (StateVectorSync2018.encodeFrontCodedStateVector(stateVector, keys),
+         StateVectorSync2018.iterateFrontCodedStateVector)]:
+        assert(list(decode(encoding, None, 10, 9)) ==
+               [(key, stateVector[key]) for key in keys])
+        entries = []
+        try:
+            for entry in decode(encoding, None, 4):
+                entries.append(entry)
+            assert(False)
+        except StateVectorLimitError:
+            assert(entries == [(key, stateVector[key]) for key in keys[:4]])
+        expectLimitError(lambda: list(decode(encoding, None, None, 8)))
+    encoding = StateVectorSync2018.encodeStateVector(stateVector, keys)
+    expectLimitError(
+      lambda: StateVectorSync2018.decodeStateVector(encoding, None, 9))
+    encoding = StateVectorSync2018.encodeAliasedStateVector(
+      "/sender", [(i, "/member/" + str(i), i) for i in range(10)])
+    assert(len(StateVectorSync2018.decodeAliasedStateVector(
+      encoding, None, 10, 9)[1]) == 10)
+    expectLimitError(lambda: StateVectorSync2018.decodeAliasedStateVector(
+      encoding, None, 9))
+    expectLimitError(lambda: StateVectorSync2018.decodeAliasedStateVector(
+      encoding, None, None, 6))
+
+    # A received state vector is merged up to the decode limit.
+    network = LocalNetwork()
+    alice = makeSync(network, "/alice")
+    network.processEvents()
+    alice.setDecodeLimits(4, 100)
+    receive(alice, [makeNotification(stateVector)])
+    assert(len(alice.getProducerPrefixes()) == 4)
+    alice.setDecodeLimits(100, 100)
+    receive(alice, [makeNotification(stateVector)])
+    assert(len(alice.getProducerPrefixes()) == 10)
+    assert(alice.getAdmissionCounters()['limitedVectors'] == 1)
+
+    # The same with the inbound pipeline.
+    bob = makeSync(network, "/bob")
+    network.processEvents()
+    executor = ThreadPoolExecutor(2)
+    bob.setInboundPipeline(executor)
+    bob.setDecodeLimits(4, 100)
+    receive(bob, [makeNotification(stateVector)])
+    time.sleep(0.1)
+    network.advance(10.0)
+    assert(len(bob.getProducerPrefixes()) == 4)
+    assert(bob.getAdmissionCounters()['limitedVectors'] == 1)
+    bob.setInboundPipeline(None)
+    executor.shutdown()
+
+    # Notifications are shed by the source rate, identified by the incoming
+    # face ID, and by the global rate. Real time is too short to refill.
+    carol = makeSync(network, "/carol")
+    network.processEvents()
+    carol.setAdmissionControl(0.001, 2, 0.001, 5)
+    receive(carol, [makeNotification({ "/x": i }, 1) for i in range(4)])
+    assert(carol.getProducerSequenceNo("/x") == 1)
+    receive(carol, [makeNotification({ "/y": i }, 2) for i in range(2)])
+    receive(carol, [makeNotification({ "/z": i }) for i in range(3)])
+    assert(carol.getProducerSequenceNo("/y") == 1)
+    assert(carol.getProducerSequenceNo("/z") == 0)
+    counters = carol.getAdmissionCounters()
+    assert(counters['admitted'] == 5)
+    assert(counters['shedBySource'] == 2 and counters['shedGlobally'] == 2)
+
+    # With a getSourceId function.
+    carol.setAdmissionControl(0.001, 1, 0, 0, 0,
+      lambda interest: interest.getName().get(4).getValue().toBytes())
+    receive(carol, [makeNotification({ "/w": 0 }, None, [marker])
+                    for marker in [b"a", b"a", b"b"]])
+    assert(carol.getAdmissionCounters()['shedBySource'] == 1)
+
+    # When the queue is full, the oldest superseded notification is dropped.
+    # The application says that each face ID is one sender. Notifications are
+    # processed from a timer.
+    network = LocalNetwork()
+    dave = makeSync(network, "/dave")
+    network.processEvents()
+    dave.setAdmissionControl(0, 0, 0, 0, 3,
+      lambda interest: interest.getIncomingFaceId())
+    receive(dave, [makeNotification({ "/x": i }, 1) for i in range(5)])
+    assert(dave.getProducerSequenceNo("/x") == -1)
+    receive(dave, [makeNotification({ "/y": 0 }, 2)])
+    counters = dave.getAdmissionCounters()
+    assert(counters['superseded'] == 3 and counters['queueLength'] == 3)
+    network.advance(10.0)
+    assert(dave.getProducerSequenceNo("/x") == 4)
+    assert(dave.getProducerSequenceNo("/y") == 0)
+    # A delta notification is not superseded, so the oldest is dropped.
+    delta = StateVectorSync2018.encodeDeltaMarker("/x", 1, 1)
+    receive(dave, [makeNotification({ "/x": 5 + i }, 1, [delta])
+                   for i in range(4)])
+    counters = dave.getAdmissionCounters()
+    assert(counters['droppedOldest'] == 1 and counters['queued'] == 10)
+    # Disabling the queue processes the queued notifications.
+    dave.setAdmissionControl(0, 0, 0, 0)
+    assert(dave.getProducerSequenceNo("/x") == 8)
+    assert(dave.getAdmissionCounters()['maxQueueLength'] == 3)
+
+    # With the default source ID, two senders can share a face ID, so one
+    # doesn't supersede the other and the oldest is dropped.
+    network = LocalNetwork()
+    erin = makeSync(network, "/erin")
+    network.processEvents()
+    erin.setAdmissionControl(0, 0, 0, 0, 3)
+    receive(erin, [makeNotification({ "/z": 0 }, 2),
+                   makeNotification({ "/x": 0 }, 1),
+                   makeNotification({ "/y": 0 }, 1),
+                   makeNotification({ "/w": 0 }, 3)])
+    counters = erin.getAdmissionCounters()
+    assert(counters['superseded'] == 0 and counters['droppedOldest'] == 1)
+    network.advance(10.0)
+    assert(erin.getProducerSequenceNo("/z") == -1)
+    assert(erin.getProducerSequenceNo("/x") == 0)
+    assert(erin.getProducerSequenceNo("/y") == 0)
+    assert(erin.getProducerSequenceNo("/w") == 0)
+
+main()
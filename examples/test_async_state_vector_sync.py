@@ -0,0 +1,90 @@
+import asyncio
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import AsyncStateVectorSync
+from local_face import AsyncLocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+async def readUpdates(stream, received):
+    async for syncStates in stream:
+        for syncState in syncStates:
+            received[syncState.getDataPrefix()] = syncState.getSequenceNo()
+
+async def runGroup(loop):
+    network = AsyncLocalNetwork(loop)
+    syncs = []
+    for i in range(3):
+        syncs.append(AsyncStateVectorSync(
+          Name("/member" + str(i)), Name("/ndn/broadcast/test"),
+          LocalFace(network), None, None, HMAC_KEY, 5000.0, loop = loop))
+
+    # Each member reads its updates until its stream is closed.
+    received = [{} for sync in syncs]
+    readers = [loop.create_task(readUpdates(sync.updates(), received[i]))
+               for i, sync in enumerate(syncs)]
+
+    # publish() waits for the registration, and notifications are processed
+    # by the loop without calling processEvents.
+    for sync in syncs:
+        assert(await sync.publish() == 0)
+    assert(await syncs[0].publish() == 1)
+    await asyncio.sleep(0.05)
+
+    expected = { "/member0": 1, "/member1": 0, "/member2": 0 }
+    for i, sync in enumerate(syncs):
+        stateVector = dict(
+          (memberId, sync.getSync().getProducerSequenceNo(memberId))
+          for memberId in sync.getSync().getProducerPrefixes())
+        assert(stateVector == expected)
+        # The updates are the entries of the other members.
+        del stateVector["/member" + str(i)]
+        assert(received[i] == stateVector)
+
+    # Shutting down ends the update streams, and the member ignores later
+    # notifications.
+    syncs[2].shutdown()
+    await asyncio.wait_for(readers[2], 1.0)
+    await syncs[0].publish()
+    await asyncio.sleep(0.05)
+    assert(syncs[1].getSync().getProducerSequenceNo("/member0") == 2)
+    assert(syncs[2].getSync().getProducerSequenceNo("/member0") == 1)
+
+    # A closed stream stops reading.
+    stream = syncs[1].updates()
+    stream.close()
+    async for syncStates in stream:
+        assert(False)
+
+    for sync in syncs[:2]:
+        sync.shutdown()
+    await asyncio.wait_for(asyncio.gather(*readers), 1.0)
+
+    # Without the loop argument, the member uses the running loop.
+    sync = AsyncStateVectorSync(
+      Name("/member3"), Name("/ndn/broadcast/test"), LocalFace(network), None,
+      None, HMAC_KEY, 5000.0)
+    assert(sync._loop is loop)
+    assert(await sync.publish() == 0)
+    sync.shutdown()
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    # Without a running loop, the loop must be given.
+    try:
+        AsyncStateVectorSync(
+          Name("/member0"), Name("/ndn/broadcast/test"), None, None, None,
+          HMAC_KEY, 5000.0)
+        assert(False)
+    except RuntimeError:
+        pass
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(runGroup(loop))
+    finally:
+        loop.close()
+
+main()
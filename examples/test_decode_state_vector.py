@@ -0,0 +1,77 @@
+from pyndn.util import Blob
+from pyndn.encoding.tlv.tlv_decoder import TlvDecoder
+from svs.sync import StateVectorSync2018
+
+def decodeWithTlvDecoder(input):
+    # Decode with pyndn's TlvDecoder, for comparison.
+    decoder = TlvDecoder(input)
+    endOffset = decoder.readNestedTlvsStart(StateVectorSync2018.TLV_StateVector)
+    entries = []
+    while decoder.getOffset() < endOffset:
+        entryEndOffset = decoder.readNestedTlvsStart(
+          StateVectorSync2018.TLV_StateVectorEntry)
+        memberId = bytes(decoder.readBlobTlv(
+          StateVectorSync2018.TLV_StateVector_MemberId)).decode('utf-8')
+        sequenceNo = decoder.readNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_SequenceNumber)
+        decoder.finishNestedTlvs(entryEndOffset)
+        entries.append((memberId, sequenceNo))
+    decoder.finishNestedTlvs(endOffset)
+    return entries
+
+def expectValueError(decode):
+    try:
+        decode()
+        assert(False)
+    except ValueError:
+        pass
+
+def main():
+    # Member IDs with one-byte, three-byte and five-byte TLV lengths, so that
+    # the entry lengths are also longer than one byte, and sequence numbers
+    # with each integer size.
+    stateVector = {
+      "/a": 0, "/b/" + "x" * 250: 255, "/c/" + "y" * 251: 256,
+      "/d/" + "z" * 300: 65536, "/e/" + "w" * 70000: 2**32,
+      "/f/é中": 2**40 }
+    keys = sorted(stateVector)
+    encoding = StateVectorSync2018.encodeStateVector(stateVector, keys)
+    expected = decodeWithTlvDecoder(encoding.buf())
+    assert(expected == [(key, stateVector[key]) for key in keys])
+    for input in [encoding, encoding.toBytes(), bytearray(encoding.toBytes()),
+                  memoryview(bytearray(encoding.toBytes()))]:
+        assert(list(StateVectorSync2018.iterateStateVector(input)) == expected)
+        assert(StateVectorSync2018.decodeStateVector(input) == stateVector)
+
+    # A known member ID returns the same string object from the table, for a
+    # read-only input and for a bytearray input, which is looked up with a
+    # copy made by tobytes().
+    memberIds = dict((key.encode('utf-8'), key) for key in keys[:4])
+    for input in [encoding, encoding.toBytes(), bytearray(encoding.toBytes())]:
+        entries = list(StateVectorSync2018.iterateStateVector(input, memberIds))
+        assert(entries == expected)
+        for i in range(len(keys)):
+            if i < 4:
+                assert(entries[i][0] is keys[i])
+            else:
+                # Not in the table, so a new string.
+                assert(not entries[i][0] is keys[i])
+        # The table is not changed.
+        assert(len(memberIds) == 4)
+
+    # The bytearray is not kept by the decoded member IDs.
+    input = bytearray(encoding.toBytes())
+    entries = list(StateVectorSync2018.iterateStateVector(input))
+    input[4:8] = b"XXXX"
+    assert(entries == expected)
+
+    # Truncated or wrong encodings raise ValueError.
+    bytesEncoding = encoding.toBytes()
+    expectValueError(lambda: list(StateVectorSync2018.iterateStateVector(
+      bytesEncoding[:-1])))
+    expectValueError(lambda: list(StateVectorSync2018.iterateStateVector(
+      bytearray(bytesEncoding[:len(bytesEncoding) // 2]))))
+    expectValueError(lambda: list(StateVectorSync2018.iterateStateVector(
+      b"\x80" + bytesEncoding[1:])))
+
+main()
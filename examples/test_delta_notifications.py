@@ -0,0 +1,86 @@
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(face, memberPrefix):
+    sync = StateVectorSync2018(
+      lambda states: None, lambda: None, Name(memberPrefix),
+      Name("/ndn/broadcast/test"), face, None, None, HMAC_KEY, 5000.0, None)
+    sync.setDeltaNotifications(2, 3)
+    return sync
+
+def assertSynchronized(syncs):
+    for sync in syncs:
+        for other in syncs:
+            assert(other.getProducerSequenceNo(sync._applicationDataPrefixUri) ==
+                   sync.getSequenceNo())
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    network = LocalNetwork()
+    carolFace = LocalFace(network)
+    alice = makeSync(LocalFace(network), "/alice")
+    bob = makeSync(LocalFace(network), "/bob")
+    carol = makeSync(carolFace, "/carol")
+    syncs = [alice, bob, carol]
+    network.processEvents()
+
+    # Each member sends a delta with only the changed entries. A delta which is
+    # missing members does not cause a reply.
+    for sync in syncs:
+        sync.publishNextSequenceNo()
+        network.processEvents()
+    assertSynchronized(syncs)
+    assert(network.nSentInterests == 3)
+    assert(alice.getDeltaNotificationCounters()['deltaNotifications'] == 1)
+    assert(alice.getDeltaNotificationCounters()['receivedDeltas'] == 2)
+
+    # After fullVectorPeriod deltas, a publish sends the full state vector.
+    for i in range(3):
+        alice.publishNextSequenceNo()
+        network.processEvents()
+    counters = alice.getDeltaNotificationCounters()
+    assert(counters['deltaNotifications'] == 3)
+    assert(counters['fullNotifications'] == 1)
+    assertSynchronized(syncs)
+
+    # Carol misses more deltas than the span, so the next delta shows a gap.
+    network._faces.remove(carolFace)
+    for i in range(3):
+        bob.publishNextSequenceNo()
+        network.processEvents()
+    network._faces.append(carolFace)
+    assert(carol.getProducerSequenceNo("/bob") == 0)
+    bob.publishNextSequenceNo()
+    network.processEvents()
+    assert(carol.getDeltaNotificationCounters()['gaps'] == 1)
+    # Carol's full state vector makes the others reply with theirs.
+    assertSynchronized(syncs)
+
+    # Missing fewer deltas than the span is not a gap.
+    network._faces.remove(carolFace)
+    alice.publishNextSequenceNo()
+    network.processEvents()
+    network._faces.append(carolFace)
+    alice.publishNextSequenceNo()
+    network.processEvents()
+    assert(carol.getDeltaNotificationCounters()['gaps'] == 1)
+    assertSynchronized(syncs)
+
+    # An instance which only understands full vectors can verify a delta and
+    # decode its state vector component.
+    alice.publishNextSequenceNo()
+    (delta, ) = alice._makeDeltaNotificationInterests()
+    assert(KeyChain.verifyInterestWithHmacWithSha256(delta, HMAC_KEY))
+    assert(StateVectorSync2018.decodeStateVector(delta.getName().get(3).getValue())
+           == { "/alice": alice.getSequenceNo() })
+    assert(StateVectorSync2018.decodeDeltaMarker(delta.getName().get(4).getValue())
+           == ("/alice", alice._deltaNo, 2))
+
+main()
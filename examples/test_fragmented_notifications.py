@@ -0,0 +1,121 @@
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+MAX_PACKET_SIZE = 8800
+N_MEMBERS = 20000
+
+def makeSync(network, memberId, mode):
+    sync = StateVectorSync2018(
+      lambda states: None, lambda: None, Name(memberId),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+    if mode == "front coding":
+        sync.setFrontCoding(True)
+    elif mode == "aliases":
+        sync.setMemberIdAliases(3)
+    elif mode == "deltas":
+        sync.setDeltaNotifications(2, 0)
+    return sync
+
+def makeLargeStateVector():
+    stateVector = {}
+    for i in range(N_MEMBERS):
+        stateVector["/ndn/edu/ucla/remap/user" + str(i) + "/ndnchat"] = i % 300
+    return stateVector
+
+def getStateVector(sync):
+    return dict((memberId, sync.getProducerSequenceNo(memberId))
+                for memberId in sync.getProducerPrefixes())
+
+def syncLargeGroup(mode, maxNotificationSize):
+    """
+    Make alice with the state vector of a 20k-member group, plus bob and carol
+    which have only their own entries, on a network which drops packets larger
+    than MAX_PACKET_SIZE. Return the members after bob and carol publish.
+    """
+    network = LocalNetwork(MAX_PACKET_SIZE)
+    alice = makeSync(network, "/alice", mode)
+    bob = makeSync(network, "/bob", mode)
+    carol = makeSync(network, "/carol", mode)
+    for sync in [alice, bob, carol]:
+        sync.setMaxNotificationSize(maxNotificationSize)
+    network.processEvents()
+    alice._mergeStateVector(makeLargeStateVector())
+    alice.publishNextSequenceNo()
+    network.advance(1000.0)
+
+    # Alice replies to each notification with her full state vector.
+    bob.publishNextSequenceNo()
+    network.advance(1000.0)
+    carol.publishNextSequenceNo()
+    network.advance(1000.0)
+    return alice, bob, carol, network
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # The fragment marker gives a range of member IDs.
+    for memberIdRange in [("", "/b"), ("/a", "/b"), ("/b", None), ("", None),
+                          ("été", "/été/2")]:
+        assert(StateVectorSync2018.decodeFragmentMarker(
+          StateVectorSync2018.encodeFragmentMarker(*memberIdRange))
+          == memberIdRange)
+
+    # Without fragmentation, the notifications are dropped.
+    alice, bob, carol, network = syncLargeGroup("plain", 0)
+    assert(network.nDroppedPackets > 0)
+    assert(len(bob.getProducerPrefixes()) < N_MEMBERS)
+
+    for mode in ["plain", "front coding", "aliases", "deltas"]:
+        alice, bob, carol, network = syncLargeGroup(
+          mode, StateVectorSync2018.DEFAULT_MAX_NOTIFICATION_SIZE)
+        assert(network.nDroppedPackets == 0)
+        assert(len(alice.getProducerPrefixes()) == N_MEMBERS + 3)
+        assert(getStateVector(bob) == getStateVector(alice))
+        assert(getStateVector(carol) == getStateVector(alice))
+        counters = alice.getFragmentationCounters()
+        assert(counters['fragmentedNotifications'] > 0)
+        assert(counters['sentFragments'] > counters['fragmentedNotifications'])
+        assert(bob.getFragmentationCounters()['receivedFragments'] > 0)
+
+    # The fragments are signed, fit in the packet size and have ranges which
+    # cover all members in order. In delta mode, the fragment marker is after
+    # the delta marker.
+    fragments = alice._makeNotificationInterests()
+    assert(alice._makeNotificationInterests() is fragments)
+    ranges = []
+    memberIds = []
+    for fragment in fragments:
+        assert(fragment.wireEncode().size() <= MAX_PACKET_SIZE)
+        assert(KeyChain.verifyInterestWithHmacWithSha256(fragment, HMAC_KEY))
+        ranges.append(StateVectorSync2018.decodeFragmentMarker(
+          fragment.getName().get(5).getValue()))
+        entries = list(StateVectorSync2018.iterateStateVector(
+          fragment.getName().get(3).getValue()))
+        assert(len(entries) > 0)
+        start, end = ranges[-1]
+        for memberId, _ in entries:
+            assert(memberId >= start and (end == None or memberId < end))
+        memberIds.extend(memberId for memberId, _ in entries)
+    assert(memberIds == alice.getProducerPrefixes())
+    assert(ranges[0][0] == "" and ranges[-1][1] == None)
+    for i in range(1, len(ranges)):
+        assert(ranges[i][0] == ranges[i - 1][1])
+
+    # A fragment which is missing only members outside its range doesn't need
+    # a reply, but one which is missing a member in its range does.
+    member = makeSync(LocalNetwork(), "/member", "plain")
+    member._mergeStateVector({ "/a": 1, "/b": 1, "/c": 1 })
+    (_, needToReply) = member._mergeStateVector(
+      { "/b": 1 }, False, ("/b", "/c"))
+    assert(not needToReply)
+    (_, needToReply) = member._mergeStateVector({ "/b": 1 }, False, ("/b", None))
+    assert(needToReply)
+
+main()
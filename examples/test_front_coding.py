@@ -0,0 +1,117 @@
+import random
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+class NullFace(object):
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+def makeMemberId(rand):
+    """
+    Make a random member ID from a small set of components so that many member
+    IDs share prefixes, including non-ASCII characters.
+    """
+    components = ["ndn", "edu", "ucla", "remap", "alice", "al", "ndnchat",
+                  "0K4wChff2v", "123", "1234", "été", "é", "%00"]
+    return "/" + "/".join(
+      rand.choice(components) for i in range(rand.randint(1, 8)))
+
+def makeStateVector(rand, nMembers):
+    stateVector = {}
+    while len(stateVector) < nMembers:
+        stateVector[makeMemberId(rand)] = rand.choice(
+          [0, 1, 255, 256, 65535, 65536, 2**32, 2**63, rand.randint(0, 2**64 - 1)])
+    return stateVector
+
+def roundTrip(stateVector):
+    keys = sorted(stateVector.keys())
+    encoding = StateVectorSync2018.encodeFrontCodedStateVector(stateVector, keys)
+    decoded = list(StateVectorSync2018.iterateFrontCodedStateVector(encoding))
+    assert(decoded == [(key, stateVector[key]) for key in keys])
+    # Decode from a mutable buffer as for a received name component, with a
+    # table of known member IDs.
+    memberIds = dict((key.encode('utf-8'), key) for key in keys[::2])
+    decoded = dict(StateVectorSync2018.iterateFrontCodedStateVector(
+      Blob(bytearray(encoding.toBytes()), False), memberIds))
+    assert(decoded == stateVector)
+    for key in keys[::2]:
+        assert(key in decoded)
+    return encoding
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    rand = random.Random(0)
+
+    # Round trip random state vectors.
+    for i in range(300):
+        roundTrip(makeStateVector(rand, rand.randint(0, 40)))
+    # A member ID which is a prefix of the next, and a long member ID.
+    roundTrip({ "/a": 1, "/a/b": 2, "/a/b/c": 3, "/b": 4 })
+    roundTrip({ "/" + "x" * 300: 1, "/" + "x" * 300 + "/y": 2 })
+
+    # Invalid encodings and an unsupported version raise ValueError.
+    encoding = bytearray(roundTrip({ "/a": 1, "/a/b": 2 }).toBytes())
+    for invalid in [encoding[:-1], encoding[:3]]:
+        invalid[1] = len(invalid) - 2
+        try:
+            list(StateVectorSync2018.iterateFrontCodedStateVector(Blob(invalid)))
+            assert(False)
+        except ValueError:
+            pass
+    newVersion = bytearray(encoding)
+    newVersion[4] = StateVectorSync2018.FRONT_CODING_VERSION + 1
+    try:
+        list(StateVectorSync2018.iterateFrontCodedStateVector(Blob(newVersion)))
+        assert(False)
+    except ValueError:
+        pass
+
+    # The cached encoding of the sync matches the direct encoding while
+    # members are added and sequence numbers change.
+    sync = StateVectorSync2018(
+      lambda syncStates: None, None, Name("/ndn/edu/ucla/remap/alice"),
+      Name("/ndn/broadcast/test"), NullFace(), None, None, HMAC_KEY, 5000.0,
+      None)
+    sync.setFrontCoding(True)
+    for i in range(50):
+        sync._mergeStateVector(makeStateVector(rand, rand.randint(1, 5)), True)
+        sync.publishNextSequenceNo()
+        assert(sync._makeNotificationInterest().getName().get(3).getValue() ==
+               StateVectorSync2018.encodeFrontCodedStateVector(
+                 sync._stateVector, sorted(sync._stateVector.keys())))
+
+    # A group with front coding synchronizes.
+    network = LocalNetwork()
+    syncs = []
+    for memberPrefix in ["/ndn/edu/ucla/remap/alice", "/ndn/edu/ucla/remap/bob",
+                         "/ndn/edu/ucla/remap/carol"]:
+        syncs.append(StateVectorSync2018(
+          lambda states: None, lambda: None, Name(memberPrefix),
+          Name("/ndn/broadcast/test"), LocalFace(network), None, None,
+          HMAC_KEY, 5000.0, None))
+        syncs[-1].setFrontCoding(True)
+    network.processEvents()
+    for sync in syncs:
+        sync.publishNextSequenceNo()
+        network.processEvents()
+    for sync in syncs:
+        assert(sync._stateVector == syncs[0]._stateVector)
+    # A repeated notification matches the front-coded encoding without
+    # decoding, so there is no reply.
+    nSentInterests = network.nSentInterests
+    syncs[1]._onInterest(None, syncs[0]._makeNotificationInterest(), None, 0,
+      None)
+    network.processEvents()
+    assert(network.nSentInterests == nSentInterests)
+
+main()
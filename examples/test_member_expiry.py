@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import StateVectorStore
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberId, store = None):
+    return StateVectorSync2018(
+      lambda states: None, lambda: None, Name(memberId),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None, -1, None, store)
+
+def getStateVector(sync):
+    return dict((memberId, sync.getProducerSequenceNo(memberId))
+                for memberId in sync.getProducerPrefixes())
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # A member which stops publishing is removed from each state vector.
+    network = LocalNetwork()
+    alice = makeSync(network, "/alice")
+    bob = makeSync(network, "/bob")
+    carol = makeSync(network, "/carol")
+    network.processEvents()
+    for sync in [alice, bob]:
+        sync.setMemberExpiry(4000.0, 8000.0)
+    alice.publishNextSequenceNo()
+    for i in range(3):
+        carol.publishNextSequenceNo()
+    network.advance(100.0)
+    assert(getStateVector(alice) == { "/alice": 0, "/carol": 2 })
+    carol.shutdown()
+    for i in range(6):
+        alice.publishNextSequenceNo()
+        bob.publishNextSequenceNo()
+        network.advance(1000.0)
+    for sync in [alice, bob]:
+        assert(getStateVector(sync) == { "/alice": 6, "/bob": 5 })
+        assert(sync.getMemberExpiryCounters() == {
+          'expiredMembers': 1, 'ignoredEntries': 0, 'revivedMembers': 0,
+          'tombstones': 1 })
+
+    # An old state vector with the removed member doesn't add it back, but a
+    # higher sequence number does.
+    alice._mergeStateVector({ "/carol": 2, "/bob": 5, "/alice": 6 })
+    assert(not "/carol" in alice.getProducerPrefixes())
+    assert(alice.getMemberExpiryCounters()['ignoredEntries'] == 1)
+    alice._mergeStateVector({ "/carol": 3 })
+    assert(alice.getProducerSequenceNo("/carol") == 3)
+    counters = alice.getMemberExpiryCounters()
+    assert(counters['revivedMembers'] == 1 and counters['tombstones'] == 0)
+
+    # Our own member is never removed. The tombstone expires, after which the
+    # member can be added again.
+    network.advance(20000.0)
+    counters = bob.getMemberExpiryCounters()
+    assert(counters['tombstones'] == 0)
+    assert(getStateVector(bob) == { "/bob": 5 })
+    bob._mergeStateVector({ "/carol": 2 })
+    assert(bob.getProducerSequenceNo("/carol") == 2)
+
+    # The notification encodings leave out removed members, including after
+    # adding others.
+    for enable in [lambda sync: sync.setFrontCoding(True),
+                   lambda sync: sync.setMemberIdAliases(2)]:
+        network = LocalNetwork()
+        dave = makeSync(network, "/dave")
+        network.processEvents()
+        enable(dave)
+        dave.setMemberExpiry(1000.0)
+        dave._mergeStateVector(dict(("/m/" + str(i), i) for i in range(10)))
+        dave.publishNextSequenceNo()
+        network.advance(600.0)
+        dave._mergeStateVector({ "/m/3": 100, "/m/5": 100 })
+        network.advance(600.0)
+        dave._mergeStateVector({ "/m/a": 1 })
+        assert(getStateVector(dave) ==
+               { "/dave": 0, "/m/3": 100, "/m/5": 100, "/m/a": 1 })
+        encoding = dave._encodeNotificationStateVector()
+        erin = makeSync(LocalNetwork(), "/erin")
+        if dave._aliasEncodingCache != None:
+            (_, entries) = StateVectorSync2018.decodeAliasedStateVector(
+              encoding)
+            receivedStateVector = erin._resolveAliases("/dave", entries)[0]
+        else:
+            receivedStateVector = list(
+              StateVectorSync2018.iterateFrontCodedStateVector(encoding))
+        assert(dict(receivedStateVector) == getStateVector(dave))
+
+    # Removed members are not loaded from the store after a restart.
+    directory = tempfile.mkdtemp()
+    try:
+        network = LocalNetwork()
+        store = StateVectorStore(directory)
+        frank = makeSync(network, "/frank", store)
+        network.processEvents()
+        frank.setMemberExpiry(1000.0)
+        frank._mergeStateVector({ "/old": 7 })
+        network.advance(600.0)
+        frank._mergeStateVector({ "/new": 1 })
+        network.advance(600.0)
+        assert(getStateVector(frank) == { "/new": 1 })
+        frank.shutdown()
+        store.close()
+        store = StateVectorStore(directory)
+        assert(store.load()[1] == { "/new": 1 })
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+main()
@@ -0,0 +1,108 @@
+from pyndn import Name
+from pyndn import Interest
+from pyndn import Data
+from pyndn import HmacWithSha256Signature
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberPrefix):
+    return StateVectorSync2018(
+      lambda states: None, lambda: None, Name(memberPrefix),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+
+def assertSynchronized(syncs):
+    for sync in syncs:
+        for other in syncs:
+            assert(other.getProducerSequenceNo(sync._applicationDataPrefixUri) ==
+                   sync.getSequenceNo())
+
+def getAliasedEntries(sync):
+    (senderId, entries) = StateVectorSync2018.decodeAliasedStateVector(
+      sync._makeNotificationInterest().getName().get(3).getValue())
+    assert(senderId == sync._applicationDataPrefixUri)
+    return entries
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # Round trip.
+    entries = [(0, "/ndn/edu/ucla/remap/alice", 5), (1, None, 300),
+               (70000, "/bob", 0)]
+    encoding = StateVectorSync2018.encodeAliasedStateVector("/carol", entries)
+    assert(StateVectorSync2018.decodeAliasedStateVector(encoding) ==
+           ("/carol", entries))
+
+    network = LocalNetwork()
+    alice = makeSync(network, "/alice")
+    bob = makeSync(network, "/bob")
+    carol = makeSync(network, "/carol")
+    syncs = [alice, bob, carol]
+    for sync in syncs:
+        sync.setMemberIdAliases(2)
+    network.processEvents()
+
+    for i in range(3):
+        for sync in syncs:
+            sync.publishNextSequenceNo()
+            network.processEvents()
+    assertSynchronized(syncs)
+    # After the announcements, the entries only have the aliases.
+    entries = getAliasedEntries(alice)
+    assert(len(entries) == 3)
+    assert(all(memberId == None for _, memberId, _ in entries))
+    assert(alice.getMemberIdAliasCounters()['lookups'] == 0)
+
+    # A new member which does not send aliases looks up the unknown aliases.
+    dave = makeSync(network, "/dave")
+    network.processEvents()
+    syncs.append(dave)
+    servedData = []
+    putData = alice._face.putData
+    def capturePutData(data):
+        servedData.append(data)
+        putData(data)
+    alice._face.putData = capturePutData
+    alice.publishNextSequenceNo()
+    network.processEvents()
+    assert(dave.getMemberIdAliasCounters()['lookups'] == 1)
+    assert(alice.getMemberIdAliasCounters()['servedLookups'] == 1)
+    # The lookup reply has an HMAC signature with the same key name as a
+    # notification.
+    data = Data()
+    data.wireDecode(servedData[0].wireEncode())
+    assert(isinstance(data.getSignature(), HmacWithSha256Signature))
+    assert(data.getSignature().getKeyLocator().getKeyName().equals(Name("/A")))
+    assert(dave.getProducerSequenceNo("/bob") == bob.getSequenceNo())
+    dave.publishNextSequenceNo()
+    network.processEvents()
+    assertSynchronized(syncs)
+    # The others assign an alias to dave and announce it.
+    assert(getAliasedEntries(alice)[-1] == (3, "/dave", 0))
+
+    # An aliased notification is smaller than a full state vector.
+    aliasedSize = alice._makeNotificationInterest().wireEncode().size()
+    alice.setMemberIdAliases(0)
+    assert(alice._makeNotificationInterest().wireEncode().size() > aliasedSize)
+
+    # The size limit of a lookup reply counts the UTF-8 bytes of member IDs.
+    erin = makeSync(LocalNetwork(), "/erin")
+    erin.setMemberIdAliases(2)
+    for i in range(100):
+        erin._setSequenceNumber("/" + "成员" * 20 + "/" + str(i), i)
+    servedData = []
+    erin._face.putData = servedData.append
+    prefix = Name("/erin").append(StateVectorSync2018.ALIAS_LOOKUP_COMPONENT)
+    erin._onAliasInterest(
+      prefix, Interest(Name(prefix).appendNumber(0)), None, 0, None)
+    (senderId, entries) = StateVectorSync2018.decodeAliasedStateVector(
+      servedData[0].getContent())
+    assert(0 < len(entries) < 100)
+    assert(servedData[0].getContent().size() <=
+           StateVectorSync2018.MAX_ALIAS_LOOKUP_SIZE)
+
+main()
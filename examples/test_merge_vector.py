@@ -100,20 +100,82 @@ def main():
     assert(mergeStateVector(stateVector, receivedStateVector) == ([StateVectorSync2018.SyncState('/user2', 2), StateVectorSync2018.SyncState('/user3', 20)], True))
     assert(stateVector == {'/user1': 10, '/user2': 2, '/user3': 20})
 
-    # Merge receivedStateVector into stateVector.
+    # check the same encoding
+    sync = makeSync({"/user1": 10, "/user2": 1})
+    encoding = StateVectorSync2018.encodeStateVector(
+      {"/user1": 10, "/user2": 1}, ["/user1", "/user2"])
+    assert(sync._isCurrentStateVector(encoding))
+    sync._setSequenceNumber("/user2", 2)
+    assert(not sync._isCurrentStateVector(encoding))
+
+    # invalid encoding keeps the entries before the error
+    sync = makeSync({"/user1": 10})
+    entries = StateVectorSync2018.encodeStateVector(
+      {"/user2": 1}, ["/user2"]).toBytes()[2:]
+    # Append an empty TLV_StateVectorEntry.
+    entries += bytearray([StateVectorSync2018.TLV_StateVectorEntry, 0])
+    encoding = (bytearray([StateVectorSync2018.TLV_StateVector, len(entries)]) +
+      entries)
+    assert(sync._mergeStateVector(StateVectorSync2018.iterateStateVector(
+      encoding)) == ([StateVectorSync2018.SyncState('/user2', 1)], False))
+    assert(sync._stateVector == {'/user1': 10, '/user2': 1})
+
+    # a repeated entry is counted once, so the missing member needs a reply
+    sync = makeSync({"/user1": 10, "/user2": 1})
+    assert(sync._mergeStateVector([("/user1", 10), ("/user1", 10)]) ==
+      ([], True))
+    sync = makeSync({"/user1": 10})
+    assert(sync._mergeStateVector([("/user3", 5), ("/user3", 5)]) ==
+      ([StateVectorSync2018.SyncState('/user3', 5)], True))
+    # the same while decoding, and only the first entry is used
+    entries = StateVectorSync2018.encodeStateVector(
+      {"/user1": 11}, ["/user1"]).toBytes()[2:]
+    entries += StateVectorSync2018.encodeStateVector(
+      {"/user1": 9}, ["/user1"]).toBytes()[2:]
+    encoding = (bytearray([StateVectorSync2018.TLV_StateVector, len(entries)]) +
+      entries)
+    sync = makeSync({"/user1": 10, "/user2": 1})
+    assert(sync._mergeStateVector(StateVectorSync2018.iterateStateVector(
+      encoding)) == ([StateVectorSync2018.SyncState('/user1', 11)], True))
+    assert(sync._stateVector == {'/user1': 11, '/user2': 1})
+
+class NullFace(object):
+    """
+    A stand-in Face which ignores registration and outgoing interests.
+    """
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+def makeSync(stateVector):
+    sync = StateVectorSync2018(
+      None, None, Name("/local/member"), Name("/ndn/broadcast/test"), NullFace(),
+      None, None, Blob(bytearray(32)), 5000.0, None)
+    for k, v in stateVector.items():
+        sync._setSequenceNumber(k, v)
+    return sync
+
+# Merge receivedStateVector into stateVector with StateVectorSync2018. Check
+# that merging while decoding the encoded receivedStateVector gives the same
+# result.
 def mergeStateVector(myStateVector, receivedStateVector):
-    needToReply = False
-    result = []
-    if myStateVector == receivedStateVector:
-        return (result, needToReply)
-    for k, v in receivedStateVector.items():
-        if myStateVector.get(k) == None or myStateVector.get(k) < v:
-            result.append(StateVectorSync2018.SyncState(k,v))
-            myStateVector[k] = v
-    for k, v in myStateVector.items():
-        if receivedStateVector.get(k) == None or receivedStateVector.get(k) < v:
-            needToReply = True
-            break
-    return (result, needToReply)
+    sync = makeSync(myStateVector)
+    result = sync._mergeStateVector(receivedStateVector)
+
+    streamingSync = makeSync(myStateVector)
+    encoding = StateVectorSync2018.encodeStateVector(
+      receivedStateVector, sorted(receivedStateVector.keys()))
+    assert(streamingSync._mergeStateVector(
+      StateVectorSync2018.iterateStateVector(encoding)) == result)
+    assert(streamingSync._stateVector == sync._stateVector)
+    assert(streamingSync.getProducerPrefixes() ==
+      sorted(sync._stateVector.keys()))
+
+    myStateVector.clear()
+    myStateVector.update(sync._stateVector)
+    return result
 
 main()
@@ -0,0 +1,161 @@
+import os
+import shutil
+import socket
+import tempfile
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import MetricsRegistry
+from svs.sync import MetricsFileExporter
+from svs.sync import MetricsSocketExporter
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberId, hmacKey = HMAC_KEY):
+    return StateVectorSync2018(
+      lambda states: None, lambda: None, Name(memberId),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, hmacKey,
+      5000.0, None)
+
+def getSamples(text):
+    # Return a dictionary of the sample lines where the key is the name with
+    # labels and the value is the string value.
+    samples = {}
+    for line in text.split("\n"):
+        if line != "" and not line.startswith("#"):
+            (name, value) = line.rsplit(" ", 1)
+            samples[name] = value
+    return samples
+
+def readSocket(path):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    chunks = []
+    while True:
+        chunk = client.recv(4096)
+        if len(chunk) == 0:
+            break
+        chunks.append(chunk)
+    client.close()
+    return b"".join(chunks).decode('utf-8')
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # The text format has the help and type, labels in sorted order, and
+    # cumulative histogram buckets.
+    registry = MetricsRegistry()
+    registry.counter(
+      "requests_total", "Requests.", { "b": "2", "a": '"1"' }).inc(3)
+    registry.gauge("size", "Size.").set(7)
+    histogram = registry.histogram("seconds", "Seconds.", [0.1, 1.0])
+    for value in [0.05, 0.1, 0.5, 2.0]:
+        histogram.observe(value)
+    assert(registry.encodePrometheusText() == "\n".join([
+      "# HELP requests_total Requests.",
+      "# TYPE requests_total counter",
+      'requests_total{a="\\"1\\"",b="2"} 3',
+      "# HELP size Size.",
+      "# TYPE size gauge",
+      "size 7",
+      "# HELP seconds Seconds.",
+      "# TYPE seconds histogram",
+      'seconds_bucket{le="0.1"} 2',
+      'seconds_bucket{le="1.0"} 3',
+      'seconds_bucket{le="+Inf"} 4',
+      "seconds_sum 2.65",
+      "seconds_count 4",
+      ""]))
+    try:
+        registry.gauge("requests_total", "Requests.")
+        assert(False)
+    except ValueError:
+        pass
+
+    # Alice and bob exchange notifications. Carol has another key, so her
+    # notifications fail verification.
+    network = LocalNetwork()
+    alice = makeSync(network, "/alice")
+    bob = makeSync(network, "/bob")
+    carol = makeSync(network, "/carol", Blob(bytearray(32)))
+    network.processEvents()
+    registry = MetricsRegistry()
+    alice.setMetrics(registry, { "member": "alice" })
+    bob.setMetrics(registry, { "member": "bob" })
+    for i in range(3):
+        alice.publishNextSequenceNo()
+        network.advance(10.0)
+    samples = getSamples(registry.encodePrometheusText())
+    assert(samples['svs_notifications_sent_total{member="alice"}'] == "3")
+    assert(samples['svs_notifications_received_total{member="bob"}'] == "3")
+    assert(samples['svs_notification_sent_bytes_total{member="alice"}'] ==
+           samples['svs_notification_received_bytes_total{member="bob"}'])
+    assert(samples['svs_sequence_number{member="alice"}'] == "2")
+    assert(samples['svs_updates_per_notification_bucket{member="bob",le="1.0"}']
+           == "3")
+
+    bob.publishNextSequenceNo()
+    carol.publishNextSequenceNo()
+    network.advance(10.0)
+    samples = getSamples(registry.encodePrometheusText())
+    assert(samples['svs_notifications_received_total{member="alice"}'] == "2")
+    assert(samples['svs_verification_failures_total{member="alice"}'] == "1")
+    # Bob's state vector has two entries, but only one is an update for alice.
+    assert(samples['svs_updates_per_notification_bucket{member="alice",le="1.0"}']
+           == "1")
+    assert(samples['svs_state_vector_members{member="bob"}'] == "2")
+    assert(int(samples['svs_state_vector_encoded_bytes{member="bob"}']) > 0)
+    # The histograms of decoding and later count the verified notifications.
+    assert(samples['svs_verify_seconds_count{member="bob"}'] == "4")
+    for name in ["decode", "merge", "callback"]:
+        assert(samples['svs_' + name + '_seconds_count{member="bob"}'] == "3")
+
+    # Alice replies to the outdated state vector of dave.
+    dave = makeSync(network, "/dave")
+    network.processEvents()
+    dave.publishNextSequenceNo()
+    network.advance(10.0)
+    samples = getSamples(registry.encodePrometheusText())
+    assert(samples['svs_replies_total{member="alice"}'] == "1")
+
+    # Disabling removes the metrics of bob.
+    bob.setMetrics(None)
+    text = registry.encodePrometheusText()
+    assert(not 'member="bob"' in text and 'member="alice"' in text)
+
+    # The file exporter replaces the file on each scheduled export.
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "svs.prom")
+        exporter = MetricsFileExporter(path)
+        exporter.schedule(alice._face, registry, 1000.0)
+        with open(path) as metricsFile:
+            assert(metricsFile.read() == registry.encodePrometheusText())
+        alice.publishNextSequenceNo()
+        network.advance(1000.0)
+        with open(path) as metricsFile:
+            assert(getSamples(metricsFile.read())
+                   ['svs_sequence_number{member="alice"}'] == "3")
+        exporter.close()
+        alice.publishNextSequenceNo()
+        network.advance(1000.0)
+        with open(path) as metricsFile:
+            assert(getSamples(metricsFile.read())
+                   ['svs_sequence_number{member="alice"}'] == "3")
+
+        # The socket exporter sends the last export to each client.
+        path = os.path.join(directory, "svs.sock")
+        exporter = MetricsSocketExporter(path)
+        assert(readSocket(path) == "")
+        exporter.export(registry)
+        for i in range(2):
+            assert(readSocket(path) == registry.encodePrometheusText())
+        exporter.close()
+        assert(not os.path.exists(path))
+    finally:
+        shutil.rmtree(directory)
+
+main()
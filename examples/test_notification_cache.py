@@ -0,0 +1,142 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import RecentNotificationCache
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberPrefix):
+    return StateVectorSync2018(
+      lambda states: None, lambda: None, Name(memberPrefix),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+
+def makeNotification(stateVector, hmacKey = HMAC_KEY):
+    interest = Interest(Name("/ndn/broadcast/test").append(
+      StateVectorSync2018.encodeStateVector(
+        stateVector, sorted(stateVector.keys()))))
+    interest.setInterestLifetimeMilliseconds(5000.0)
+    KeyChain.signWithHmacWithSha256(interest, hmacKey, Name("/A"))
+    # Decode from the wire, as for a received interest.
+    received = Interest()
+    received.wireDecode(interest.wireEncode())
+    return received
+
+def receive(network, interest):
+    network.injectInterest(interest)
+    network.advance(10.0)
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # The digest is of the name, so it is the same for a re-encoded interest
+    # and different for another signature.
+    interest = makeNotification({ "/alice": 1 })
+    digest = RecentNotificationCache.getNameDigest(interest)
+    reencoded = Interest()
+    reencoded.wireDecode(Interest(interest).wireEncode())
+    assert(RecentNotificationCache.getNameDigest(reencoded) == digest)
+    changed = Interest(interest)
+    changed.setInterestLifetimeMilliseconds(1000.0)
+    assert(RecentNotificationCache.getNameDigest(changed) == digest)
+    assert(RecentNotificationCache.getNameDigest(
+      makeNotification({ "/alice": 1 }, Blob(bytearray(32)))) != digest)
+    assert(RecentNotificationCache.getNameDigest(
+      makeNotification({ "/alice": 2 })) != digest)
+
+    # The least recently seen name is evicted at maxEntries.
+    cache = RecentNotificationCache(3, 5000.0)
+    for key in [b"a", b"b", b"c"]:
+        cache.add(key, key.upper())
+    assert(cache.get(b"a") == b"A")
+    cache.add(b"d", b"D")
+    assert(len(cache) == 3)
+    assert(cache.get(b"b") == None)
+    assert(cache.contains(b"a") and cache.contains(b"c"))
+    assert(cache.get(b"d") == b"D")
+    # Adding a name again replaces the value without evicting.
+    cache.add(b"c")
+    assert(len(cache) == 3 and cache.get(b"c") == True)
+    assert(cache.getCounters() == { 'hits': 5, 'misses': 1, 'size': 3 })
+
+    # A name is forgotten after the TTL.
+    cache = RecentNotificationCache(10, 50.0)
+    cache.add(b"a")
+    assert(cache.contains(b"a"))
+    time.sleep(0.1)
+    cache.add(b"b")
+    assert(cache.getCounters()['size'] == 1)
+    assert(not cache.contains(b"a") and cache.contains(b"b"))
+    time.sleep(0.1)
+    assert(not cache.contains(b"b"))
+    assert(cache.getCounters() == { 'hits': 2, 'misses': 2, 'size': 0 })
+
+    # Through the sync object. Bob has a sequence number which alice's
+    # notification does not have, so bob replies.
+    network = LocalNetwork()
+    bob = makeSync(network, "/bob")
+    bob.setNotificationCache(100, 5000.0)
+    network.processEvents()
+    bob.publishNextSequenceNo()
+    network.advance(10.0)
+    stale = makeNotification({ "/alice": 1 })
+    receive(network, stale)
+    assert(bob.getProducerSequenceNo("/alice") == 1)
+    assert(bob.getReplySuppressionCounters()['sentReplies'] == 1)
+    assert(bob.getNotificationCacheCounters() ==
+           { 'hits': 0, 'misses': 1, 'size': 1 })
+
+    # Alice didn't get the reply and sends the same notification again. Bob
+    # skips verifying it but still replies.
+    nSentInterests = network.nSentInterests
+    receive(network, stale)
+    assert(bob.getNotificationCacheCounters()['hits'] == 1)
+    assert(bob.getReplySuppressionCounters()['sentReplies'] == 2)
+    assert(network.nSentInterests == nSentInterests + 1)
+
+    # After bob's state vector changes, the duplicate is merged again and
+    # still gets a reply.
+    bob.publishNextSequenceNo()
+    network.advance(10.0)
+    receive(network, stale)
+    assert(bob.getNotificationCacheCounters()['hits'] == 2)
+    assert(bob.getReplySuppressionCounters()['sentReplies'] == 3)
+
+    # A duplicate of a notification which is not outdated gets no reply.
+    current = makeNotification({ "/alice": 2, "/bob": 2 })
+    receive(network, current)
+    receive(network, current)
+    assert(bob.getProducerSequenceNo("/alice") == 2)
+    assert(bob.getNotificationCacheCounters()['hits'] == 3)
+    assert(bob.getReplySuppressionCounters()['sentReplies'] == 3)
+
+    # The same with the inbound pipeline, which adds the result to the cache
+    # when the worker has verified the notification.
+    network = LocalNetwork()
+    carol = makeSync(network, "/carol")
+    carol.setNotificationCache(100, 5000.0)
+    executor = ThreadPoolExecutor(2)
+    carol.setInboundPipeline(executor)
+    network.processEvents()
+    carol.publishNextSequenceNo()
+    network.advance(10.0)
+    stale = makeNotification({ "/alice": 1 })
+    network.injectInterest(stale)
+    network.processEvents()
+    # Wait for the worker before advancing the virtual time.
+    time.sleep(0.1)
+    network.advance(10.0)
+    assert(carol.getReplySuppressionCounters()['sentReplies'] == 1)
+    receive(network, stale)
+    assert(carol.getNotificationCacheCounters()['hits'] == 1)
+    assert(carol.getReplySuppressionCounters()['sentReplies'] == 2)
+    carol.setInboundPipeline(None)
+    executor.shutdown()
+
+main()
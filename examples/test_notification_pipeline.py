@@ -0,0 +1,100 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberPrefix, syncStates):
+    return StateVectorSync2018(
+      lambda states: syncStates.extend(states), lambda: None, Name(memberPrefix),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+
+def makeNotification(stateVector, hmacKey):
+    interest = Interest(Name("/ndn/broadcast/test").append(
+      StateVectorSync2018.encodeStateVector(
+        stateVector, sorted(stateVector.keys()))))
+    interest.setInterestLifetimeMilliseconds(5000.0)
+    KeyChain.signWithHmacWithSha256(interest, hmacKey, Name("/A"))
+    # Decode from the wire, as for a received interest.
+    received = Interest()
+    received.wireDecode(interest.wireEncode())
+    return received
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    network = LocalNetwork()
+    aliceStates = []
+    bobStates = []
+    alice = makeSync(network, "/alice", aliceStates)
+    bob = makeSync(network, "/bob", bobStates)
+    network.processEvents()
+
+    executor = ThreadPoolExecutor(2)
+    bob.setInboundPipeline(executor, 2)
+
+    # Timers don't fire in processEvents, so the queue fills and the later
+    # notifications wait for the oldest.
+    for i in range(5):
+        alice.publishNextSequenceNo()
+    network.processEvents()
+    counters = bob.getInboundPipelineCounters()
+    assert(counters['submitted'] == 5)
+    assert(counters['blockedSubmits'] == 3)
+    assert(counters['maxQueueLength'] == 2)
+
+    # The results are merged in arrival order. Virtual time passes instantly,
+    # so wait for the workers before advancing it.
+    time.sleep(0.1)
+    network.advance(100.0)
+    assert(bob.getInboundPipelineCounters()['queueLength'] == 0)
+    assert(bob.getProducerSequenceNo("/alice") == 4)
+    assert([state.getSequenceNo() for state in bobStates] == [0, 1, 2, 3, 4])
+    # Bob replied to alice's state vector which did not have bob.
+    assert(alice.getProducerSequenceNo("/bob") == -1)
+    bob.publishNextSequenceNo()
+    network.advance(100.0)
+    assert(alice.getProducerSequenceNo("/bob") == 0)
+
+    # A notification with a bad signature is dropped.
+    bob._onInterest(None, makeNotification(
+      { "/alice": 10, "/bob": 0 }, Blob(bytearray(32))), None, 0, None)
+    time.sleep(0.1)
+    network.advance(100.0)
+    assert(bob.getProducerSequenceNo("/alice") == 4)
+
+    # The entries before an invalid entry are merged, with no reply even though
+    # the received state vector is missing our entries.
+    interest = makeNotification({ "/carol": 0 }, HMAC_KEY)
+    encoding = bytearray(
+      interest.getName().get(3).getValue().toBytes()) + bytearray([131, 0])
+    encoding[1] += 2
+    interest = Interest(Name("/ndn/broadcast/test").append(Blob(encoding)))
+    KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+    nSentInterests = network.nSentInterests
+    bob._onInterest(None, interest, None, 0, None)
+    time.sleep(0.1)
+    network.advance(100.0)
+    assert(bob.getProducerSequenceNo("/carol") == 0)
+    assert(network.nSentInterests == nSentInterests)
+
+    # Disabling the pipeline merges the queued notifications.
+    alice.publishNextSequenceNo()
+    network.processEvents()
+    assert(bob.getInboundPipelineCounters()['queueLength'] == 1)
+    bob.setInboundPipeline(None)
+    assert(bob.getProducerSequenceNo("/alice") == 5)
+    executor.shutdown()
+
+    # Without the pipeline, notifications are merged when they arrive.
+    alice.publishNextSequenceNo()
+    network.processEvents()
+    assert(bob.getProducerSequenceNo("/alice") == 6)
+
+main()
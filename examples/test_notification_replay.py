@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import time
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.lp.lp_packet import LpPacket
+from pyndn.lp.incoming_face_id import IncomingFaceId
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import NotificationRecorder
+from svs.sync import NotificationReplayer
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberId):
+    return StateVectorSync2018(
+      lambda states: None, lambda: None, Name(memberId),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+
+def getStateVector(sync):
+    return dict((memberId, sync.getProducerSequenceNo(memberId))
+                for memberId in sync.getProducerPrefixes())
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    directory = tempfile.mkdtemp()
+    try:
+        # Record what bob receives while alice and carol publish.
+        path = os.path.join(directory, "notifications.capture")
+        network = LocalNetwork()
+        alice = makeSync(network, "/alice")
+        bob = makeSync(network, "/bob")
+        carol = makeSync(network, "/carol")
+        network.processEvents()
+        recorder = NotificationRecorder(path)
+        bob.setRecorder(recorder)
+        for i in range(5):
+            alice.publishNextSequenceNo()
+            carol.publishNextSequenceNo()
+            network.advance(10.0)
+        bob.setRecorder(None)
+        alice.publishNextSequenceNo()
+        network.advance(10.0)
+        nRecords = recorder.getRecordCount()
+        assert(nRecords >= 10)
+        recorder.close()
+
+        # Replaying to a new member gives the state vector which bob had when
+        # recording stopped.
+        records = NotificationRecorder.readCapture(path)
+        assert(len(records) == nRecords)
+        assert(all(records[i][0] <= records[i + 1][0]
+                   for i in range(len(records) - 1)))
+        replayer = NotificationReplayer(path)
+        assert(replayer.getInterestCount() == nRecords)
+        dave = makeSync(LocalNetwork(), "/dave")
+        result = replayer.replay(dave)
+        assert(result['interests'] == nRecords)
+        assert(result['bytes'] == sum(len(wire) for (_, _, wire) in records))
+        assert(result['interestsPerSecond'] > 0)
+        assert(result['stateVector'] == { "/alice": 4, "/carol": 4 })
+
+        # The time and incoming face ID are kept to the microsecond. A record
+        # cut short at the end is ignored.
+        interest = Interest(Name("/ndn/broadcast/test/x"))
+        KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+        field = IncomingFaceId()
+        field.setFaceId(300)
+        lpPacket = LpPacket()
+        lpPacket.addHeaderField(field)
+        interest.setLpPacket(lpPacket)
+        recorder = NotificationRecorder(path)
+        recorder.record(interest, 1500000000000.25)
+        recorder.record(interest, 1500000000100.5)
+        recorder.close()
+        with open(path, 'ab') as captureFile:
+            captureFile.write(b"\xa7\x40\xa9")
+        records = NotificationRecorder.readCapture(path)
+        assert([record[:2] for record in records] ==
+               [(1500000000000.25, 300), (1500000000100.5, 300)])
+        assert(records[0][2] == interest.wireEncode().toBytes())
+        replayer = NotificationReplayer(path)
+        assert(replayer.getCaptureMilliseconds() == 100.25)
+
+        # At the original timing, the replay takes the capture time, and
+        # processEvents is called while waiting.
+        nProcessEvents = [0]
+        def processEvents():
+            nProcessEvents[0] += 1
+        startTime = time.time()
+        result = replayer.replay(
+          makeSync(LocalNetwork(), "/erin"), 1.0, processEvents)
+        assert(time.time() - startTime >= 0.1)
+        assert(nProcessEvents[0] > 2)
+        startTime = time.time()
+        replayer.replay(makeSync(LocalNetwork(), "/frank"), 10.0)
+        assert(time.time() - startTime < 0.1)
+
+        # An unsupported version is an error.
+        with open(path, 'wb') as captureFile:
+            captureFile.write(b"\x95\x01\x02")
+        try:
+            NotificationReplayer(path)
+            assert(False)
+        except ValueError:
+            pass
+    finally:
+        shutil.rmtree(directory)
+
+main()
@@ -0,0 +1,53 @@
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import NotificationSigner
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+class NullFace(object):
+    def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess = None):
+        pass
+
+    def expressInterest(self, interest, onData, onTimeout = None):
+        pass
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # The signature is the same as from KeyChain.
+    signer = NotificationSigner(HMAC_KEY, Name("/A"))
+    interest = Interest(Name("/ndn/broadcast/test").append("vector"))
+    keyChainInterest = Interest(interest)
+    signer.sign(interest)
+    KeyChain.signWithHmacWithSha256(keyChainInterest, HMAC_KEY, Name("/A"))
+    assert(interest.getName().equals(keyChainInterest.getName()))
+
+    received = Interest()
+    received.wireDecode(interest.wireEncode())
+    assert(signer.verify(received))
+    assert(KeyChain.verifyInterestWithHmacWithSha256(received, HMAC_KEY))
+    assert(not NotificationSigner(Blob(bytearray(32)), Name("/A")).verify(
+      received))
+
+    # The signed notification is reused until the state vector changes.
+    sync = StateVectorSync2018(
+      lambda syncStates: None, None, Name("/alice"),
+      Name("/ndn/broadcast/test"), NullFace(), None, None, HMAC_KEY, 5000.0,
+      None)
+    sync.publishNextSequenceNo()
+    notification = sync._makeNotificationInterest()
+    assert(sync._makeNotificationInterest() is notification)
+    sync._mergeStateVector({ "/bob": 3 })
+    changedNotification = sync._makeNotificationInterest()
+    assert(changedNotification is not notification)
+    assert(KeyChain.verifyInterestWithHmacWithSha256(
+      changedNotification, HMAC_KEY))
+    assert(StateVectorSync2018.decodeStateVector(
+      changedNotification.getName().get(3).getValue()) ==
+      { "/alice": 0, "/bob": 3 })
+
+main()
@@ -0,0 +1,100 @@
+import os
+import pstats
+import shutil
+import tempfile
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import PhaseProfiler
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberId, onReceivedSyncState = lambda states: None):
+    return StateVectorSync2018(
+      onReceivedSyncState, lambda: None, Name(memberId),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # Percentiles use the nearest rank of the most recent times, and self
+    # times subtract the phases inside.
+    profiler = PhaseProfiler(100)
+    for i in range(1, 201):
+        profiler.record(("a",), i * 0.001)
+    profiler.record(("a", "b"), 5.0)
+    profiler.record(("a", "b", "c"), 1.0)
+    summary = profiler.getSummary([50, 99, 100])
+    assert(list(summary.keys()) == ["a", "a;b", "a;b;c"])
+    assert(summary["a"]['count'] == 200)
+    assert(abs(summary["a"]['totalSeconds'] - 20.1) < 1e-9)
+    assert(summary["a"]['p50'] == 0.15 and summary["a"]['p99'] == 0.199)
+    assert(summary["a"]['p100'] == summary["a"]['maxSeconds'] == 0.2)
+    assert(profiler.getCollapsedStacks() == "a 15100000\na;b 4000000\n" +
+           "a;b;c 1000000\n")
+    profiler.reset()
+    assert(profiler.getSummary() == {})
+
+    # Bob publishes in onReceivedSyncState, so his publish phases are inside
+    # the callback.
+    network = LocalNetwork()
+    alice = makeSync(network, "/alice")
+    bob = [None]
+    def onReceivedSyncState(syncStates):
+        if bob[0].getSequenceNo() < 0:
+            bob[0].publishNextSequenceNo()
+    bob[0] = makeSync(network, "/bob", onReceivedSyncState)
+    network.processEvents()
+    aliceProfiler = PhaseProfiler()
+    alice.setProfiler(aliceProfiler)
+    bobProfiler = PhaseProfiler()
+    bob[0].setProfiler(bobProfiler)
+    alice.publishNextSequenceNo()
+    network.advance(10.0)
+    # The size check also encodes and signs, so only check that each phase is
+    # there.
+    summary = aliceProfiler.getSummary()
+    for path in ["publishNextSequenceNo;broadcast;encode",
+                 "publishNextSequenceNo;broadcast;sign",
+                 "publishNextSequenceNo;broadcast;express",
+                 "onInterest;verify", "onInterest;decode", "onInterest;merge",
+                 "onInterest;callback"]:
+        assert(summary[path]['count'] >= 1)
+    assert(summary["onInterest"]['count'] == 1)
+    assert("onInterest;callback;publishNextSequenceNo;broadcast;sign" in
+           bobProfiler.getSummary())
+
+    # The reports can be read by flame graph and cProfile tools.
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "phases.folded")
+        bobProfiler.dumpCollapsedStacks(path)
+        with open(path) as stacksFile:
+            lines = stacksFile.read().split("\n")
+        assert(lines[-1] == "")
+        for line in lines[:-1]:
+            (stack, microseconds) = line.rsplit(" ", 1)
+            assert(int(microseconds) >= 0)
+        path = os.path.join(directory, "phases.prof")
+        bobProfiler.dumpStats(path)
+        stats = pstats.Stats(path).stats
+        (nCalls, _, _, totalSeconds, callers) = stats[("phase", 0, "sign")]
+        assert(nCalls >= 1 and totalSeconds > 0)
+        assert(list(callers.keys()) == [("phase", 0, "broadcast")])
+        assert(stats[("phase", 0, "onInterest")][0] == 1)
+    finally:
+        shutil.rmtree(directory)
+
+    # When disabled, nothing more is recorded.
+    alice.setProfiler(None)
+    aliceProfiler.reset()
+    alice.publishNextSequenceNo()
+    network.advance(10.0)
+    assert(aliceProfiler.getSummary() == {})
+    assert(alice._phaseStack == [])
+
+main()
@@ -0,0 +1,225 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pyndn import Name
+from pyndn import Interest
+from pyndn import Data
+from pyndn.security import KeyChain
+from pyndn.security import SigningInfo
+from pyndn.security.verification_helpers import VerificationHelpers
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import SequenceFetcher
+from svs.sync import PublicationStore
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberId, onReceivedSyncState = None):
+    return StateVectorSync2018(
+      onReceivedSyncState if onReceivedSyncState != None
+        else lambda syncStates: None,
+      lambda: None, Name(memberId), Name("/ndn/broadcast/test"),
+      LocalFace(network), None, None, HMAC_KEY, 5000.0, None)
+
+class CountingKeyChain(object):
+    """
+    CountingKeyChain signs with an in-memory KeyChain and counts the calls.
+    """
+    def __init__(self, identityName):
+        self._keyChain = KeyChain("pib-memory:", "tpm-memory:")
+        identity = self._keyChain.createIdentityV2(Name(identityName))
+        self.certificate = identity.getDefaultKey().getDefaultCertificate()
+        self.nSigned = 0
+
+    def sign(self, data, signingParams):
+        self.nSigned += 1
+        self._keyChain.sign(data, signingParams)
+
+class FailingKeyChain(object):
+    """
+    FailingKeyChain raises an error for each signature.
+    """
+    def sign(self, data, signingParams):
+        raise RuntimeError("FailingKeyChain.sign")
+
+def makeData(memberId, sequenceNo, size):
+    data = Data(SequenceFetcher.makeDefaultDataName(memberId, sequenceNo))
+    data.setContent(Blob(bytearray(size)))
+    return data
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # publish() stores the packet before the notification, so a fetcher gets
+    # every publication from the store.
+    network = LocalNetwork()
+    alice = makeSync(network, "/alice")
+    store = PublicationStore(alice, LocalFace(network), None, None, 10)
+    delivered = []
+    fetcher = SequenceFetcher(
+      LocalFace(network), lambda dataPrefix, sequenceNo, data: delivered.append(
+        (sequenceNo, data.getContent().toBytes())), None, 100.0)
+    bob = makeSync(network, "/bob", fetcher.onReceivedSyncState)
+    network.processEvents()
+    for i in range(5):
+        assert(store.publish(Blob(b"message" + str(i).encode())) == i)
+    assert(alice.getSequenceNo() == 4)
+    network.advance(1000.0)
+    assert(delivered == [(i, b"message" + str(i).encode()) for i in range(5)])
+    assert(store.getCounters()['hits'] == 5)
+    assert(len(store) == 5)
+
+    # Only the last maxCount packets are kept, and an interest for an evicted
+    # one or with another name is not answered.
+    for i in range(20):
+        store.publish(Blob(b"x"))
+    assert(len(store) == 10)
+    assert(store.get(14) == None)
+    assert(store.get(15).getName().equals(Name("/alice/15")))
+    assert(store.get(24) != None and store.get(25) == None)
+    assert(store.getCounters()['evictions'] == 15)
+    # The fetcher gives up on the evicted packets.
+    network.advance(10000.0)
+    assert([sequenceNo for sequenceNo, _ in delivered[5:]] == list(range(15, 25)))
+    nMisses = store.getCounters()['misses']
+    face = LocalFace(network)
+    answers = []
+    for name in ["/alice/3", "/alice/20", "/alice/20/x", "/alice/abc"]:
+        interest = Interest(Name(name))
+        interest.setInterestLifetimeMilliseconds(1000.0)
+        face.expressInterest(
+          interest, lambda interest, data: answers.append(
+            data.getName().toUri()))
+    network.advance(10000.0)
+    assert(answers == ["/alice/20"])
+    assert(store.getCounters()['misses'] == nMisses + 3)
+
+    # add() accepts the same or a higher sequence number.
+    store.add(24, makeData("/alice", 24, 5))
+    assert(store.get(24).getContent().size() == 5)
+    assert(len(store) == 10)
+    try:
+        store.add(23, makeData("/alice", 23, 5))
+        assert(False)
+    except ValueError:
+        pass
+
+    # Packets are evicted to keep the total size within maxBytes.
+    store.shutdown()
+    carol = makeSync(network, "/carol")
+    store = PublicationStore(
+      carol, LocalFace(network), None, None, 100, maxBytes = 1000)
+    for sequenceNo in range(10):
+        store.add(sequenceNo, makeData("/carol", sequenceNo, 200))
+    counters = store.getCounters()
+    assert(counters['bytes'] <= 1000)
+    assert(counters['items'] == 4)
+    assert(store.get(5) == None and store.get(6) != None)
+
+    # Packets older than maxAgeMilliseconds are not served and are evicted.
+    store.shutdown()
+    store = PublicationStore(
+      carol, LocalFace(network), None, None, 100, maxAgeMilliseconds = 50.0)
+    store.add(0, makeData("/carol", 0, 10))
+    store.add(1, makeData("/carol", 1, 10))
+    time.sleep(0.1)
+    assert(store.get(1) == None)
+    store.add(2, makeData("/carol", 2, 10))
+    assert(len(store) == 1 and store.get(2) != None)
+
+    # Each packet is signed once, even if many interests ask for it.
+    network = LocalNetwork()
+    keyChain = CountingKeyChain("/dave")
+    dave = makeSync(network, "/dave")
+    store = PublicationStore(
+      dave, LocalFace(network), keyChain, SigningInfo(), 100)
+    consumers = [LocalFace(network) for i in range(5)]
+    answers = []
+    def expressInterests(sequenceNo):
+        for face in consumers:
+            interest = Interest(Name("/dave/" + str(sequenceNo)))
+            interest.setInterestLifetimeMilliseconds(1000.0)
+            face.expressInterest(
+              interest, lambda interest, data: answers.append(data))
+    store.publish(Blob(b"inline"))
+    expressInterests(0)
+    network.advance(10.0)
+    assert(keyChain.nSigned == 1 and len(answers) == 5)
+
+    # With background signing, publish() doesn't wait for the signature and
+    # interests which arrive first wait for the signed packet.
+    executor = ThreadPoolExecutor(2)
+    store.setSigningExecutor(executor)
+    del answers[:]
+    for i in range(3):
+        store.publish(Blob(b"background" + str(i).encode()))
+    for sequenceNo in range(1, 4):
+        expressInterests(sequenceNo)
+    network.processEvents()
+    time.sleep(0.2)
+    network.advance(10.0)
+    assert(len(answers) == 15)
+    for data in answers:
+        assert(VerificationHelpers.verifyDataSignature(
+          data, keyChain.certificate))
+    assert(keyChain.nSigned == 4)
+    expressInterests(3)
+    network.advance(10.0)
+    assert(len(answers) == 20 and keyChain.nSigned == 4)
+    counters = store.getCounters()
+    assert(counters['signed'] == 4)
+    assert(counters['delayedInterests'] == 15)
+    assert(counters['hits'] == 25)
+
+    # Disabling waits for the packets which are being signed.
+    store.publish(Blob(b"last"))
+    store.setSigningExecutor(None)
+    assert(store.get(4) != None and keyChain.nSigned == 5)
+    executor.shutdown()
+
+    # If background signing fails, the waiting interests are counted as misses.
+    network = LocalNetwork()
+    erin = makeSync(network, "/erin")
+    store = PublicationStore(
+      erin, LocalFace(network), FailingKeyChain(), SigningInfo(), 100)
+    executor = ThreadPoolExecutor(1)
+    store.setSigningExecutor(executor)
+    store.publish(Blob(b"unsigned"))
+    consumer = LocalFace(network)
+    for i in range(2):
+        interest = Interest(Name("/erin/0"))
+        interest.setInterestLifetimeMilliseconds(1000.0)
+        consumer.expressInterest(interest, lambda interest, data: None)
+    network.processEvents()
+    # Don't print the expected exception.
+    logging.disable(logging.ERROR)
+    store.setSigningExecutor(None)
+    logging.disable(logging.NOTSET)
+    counters = store.getCounters()
+    assert(counters['delayedInterests'] == 2)
+    assert(counters['misses'] == 2 and counters['signed'] == 0)
+    assert(store.get(0) == None)
+    executor.shutdown()
+
+    # Member ID alias lookups are under the data prefix, but the store leaves
+    # them to the sync object.
+    network = LocalNetwork()
+    frank = makeSync(network, "/frank")
+    frank.setMemberIdAliases(2)
+    store = PublicationStore(
+      frank, LocalFace(network), CountingKeyChain("/frank"), SigningInfo(), 100)
+    network.processEvents()
+    answers = []
+    interest = Interest(Name("/frank").append(
+      StateVectorSync2018.ALIAS_LOOKUP_COMPONENT).appendNumber(0))
+    interest.setInterestLifetimeMilliseconds(1000.0)
+    LocalFace(network).expressInterest(
+      interest, lambda interest, data: answers.append(data))
+    network.advance(10.0)
+    assert(len(answers) == 1)
+    counters = store.getCounters()
+    assert(counters['hits'] == 0 and counters['misses'] == 0)
+
+main()
@@ -0,0 +1,79 @@
+import logging
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberPrefix, syncStates):
+    return StateVectorSync2018(
+      lambda states: syncStates.extend(states), lambda: None, Name(memberPrefix),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    network = LocalNetwork()
+    aliceStates = []
+    bobStates = []
+    alice = makeSync(network, "/alice", aliceStates)
+    bob = makeSync(network, "/bob", bobStates)
+    network.processEvents()
+
+    # Without coalescing, each publish sends a notification.
+    alice.publishNextSequenceNo()
+    network.processEvents()
+    assert(network.nSentInterests == 1)
+    assert(bob.getProducerSequenceNo("/alice") == 0)
+
+    # Batches end at maxBatchCount publishes or when the window ends.
+    alice.setPublishCoalescing(50.0, 10)
+    for i in range(25):
+        alice.publishNextSequenceNo()
+    network.processEvents()
+    assert(network.nSentInterests == 3)
+    assert(bob.getProducerSequenceNo("/alice") == 20)
+    network.advance(49.0)
+    assert(network.nSentInterests == 3)
+    network.advance(2.0)
+    assert(network.nSentInterests == 4)
+    assert(bob.getProducerSequenceNo("/alice") == 25)
+    # Bob's last callback has only the latest sequence number.
+    assert(bobStates[-1] == StateVectorSync2018.SyncState("/alice", 25))
+
+    # flushPublish sends the pending publishes now.
+    alice.publishNextSequenceNo()
+    alice.publishNextSequenceNo()
+    alice.flushPublish()
+    network.processEvents()
+    assert(network.nSentInterests == 5)
+    assert(bob.getProducerSequenceNo("/alice") == 27)
+    # The timer of the flushed batch does nothing.
+    network.advance(100.0)
+    assert(network.nSentInterests == 5)
+
+    # A reply to an outdated state vector also sends the pending publish.
+    alice.publishNextSequenceNo()
+    bob.publishNextSequenceNo()
+    network.processEvents()
+    assert(bob.getProducerSequenceNo("/alice") == 28)
+    network.advance(100.0)
+
+    counters = alice.getPublishCoalescingCounters()
+    assert(counters['publishes'] == 29)
+    assert(counters['notifications'] == 6)
+    assert(counters['savedNotifications'] == 23)
+    assert(counters['maxAddedLatencyMilliseconds'] >= 0)
+
+    # Disabling coalescing sends the pending publishes.
+    alice.publishNextSequenceNo()
+    nSentInterests = network.nSentInterests
+    alice.setPublishCoalescing(0)
+    network.processEvents()
+    assert(network.nSentInterests == nSentInterests + 1)
+    assert(bob.getProducerSequenceNo("/alice") == 29)
+
+main()
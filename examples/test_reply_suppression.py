@@ -0,0 +1,91 @@
+from pyndn import Name
+from pyndn import Interest
+from pyndn.security import KeyChain
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeGroup(network, nMembers, maxReplyBackoff):
+    syncs = []
+    for i in range(nMembers):
+        sync = StateVectorSync2018(
+          lambda states: None, lambda: None, Name("/member" + str(i)),
+          Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+          5000.0, None)
+        sync.setReplySuppression(maxReplyBackoff)
+        syncs.append(sync)
+    network.processEvents()
+
+    # Each member publishes once so that all have the full state vector.
+    for sync in syncs:
+        sync.publishNextSequenceNo()
+        network.advance(1000.0)
+    return syncs
+
+def countRepliesToJoiner(maxReplyBackoff):
+    """
+    Make a synchronized group of 20 members, then add a member which publishes
+    a state vector with only its own entry. Return the number of notifications
+    sent after the joiner's notification and the group.
+    """
+    nMembers = 20
+    network = LocalNetwork()
+    syncs = makeGroup(network, nMembers, maxReplyBackoff)
+    for sync in syncs:
+        assert(len(sync.getProducerPrefixes()) == nMembers)
+
+    joiner = StateVectorSync2018(
+      lambda states: None, lambda: None, Name("/joiner"),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+    joiner.setReplySuppression(maxReplyBackoff)
+    network.processEvents()
+    syncs.append(joiner)
+
+    nSentInterests = network.nSentInterests
+    joiner.publishNextSequenceNo()
+    network.advance(1000.0)
+    for sync in syncs:
+        assert(len(sync.getProducerPrefixes()) == nMembers + 1)
+    # Don't count the joiner's own notification.
+    return network.nSentInterests - nSentInterests - 1, syncs, network
+
+def makeNotification(stateVector):
+    interest = Interest(Name("/ndn/broadcast/test").append(
+      StateVectorSync2018.encodeStateVector(
+        stateVector, sorted(stateVector.keys()))))
+    interest.setInterestLifetimeMilliseconds(5000.0)
+    KeyChain.signWithHmacWithSha256(interest, HMAC_KEY, Name("/A"))
+    return interest
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # Without suppression, every member replies at once.
+    nReplies, _, _ = countRepliesToJoiner(0)
+    assert(nReplies == 20)
+
+    # With suppression, the first reply cancels the others.
+    nReplies, syncs, network = countRepliesToJoiner(200.0)
+    assert(nReplies == 1)
+    nCancelled = sum(
+      sync.getReplySuppressionCounters()['cancelledReplies'] for sync in syncs)
+    assert(nCancelled == 19)
+
+    # A member with a pending reply which receives the same state vector again
+    # within the notification lifetime does not send it again.
+    member = syncs[0]
+    stale = dict((memberId, member.getProducerSequenceNo(memberId))
+                 for memberId in member.getProducerPrefixes())
+    del stale["/joiner"]
+    member._onInterest(None, makeNotification(stale), None, 0, None)
+    assert(member.getReplySuppressionCounters()['scheduledReplies'] == 2)
+    nSentInterests = network.nSentInterests
+    network.advance(1000.0)
+    assert(network.nSentInterests == nSentInterests)
+    assert(member.getReplySuppressionCounters()['suppressedDuplicates'] == 1)
+
+main()
@@ -0,0 +1,128 @@
+from pyndn import Name
+from pyndn import Interest
+from pyndn import Data
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import SequenceFetcher
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+class Producer(object):
+    """
+    A Producer answers interests for dataPrefix/<sequenceNo> up to
+    maxSequenceNo, after delayMilliseconds. It ignores the first try of each
+    sequence number in dropOnce and every try of those in missing.
+    """
+    def __init__(self, network, dataPrefix, delayMilliseconds = 10.0):
+        self._face = LocalFace(network)
+        self._prefix = Name(dataPrefix)
+        self._delay = delayMilliseconds
+        self.maxSequenceNo = -1
+        self.dropOnce = set()
+        self.missing = set()
+        self.nInterests = 0
+        self._face.registerPrefix(self._prefix, self._onInterest, None)
+
+    def _onInterest(self, prefix, interest, face, interestFilterId, filter):
+        self.nInterests += 1
+        sequenceNo = int(interest.getName().get(-1).toEscapedString())
+        if sequenceNo in self.dropOnce:
+            self.dropOnce.remove(sequenceNo)
+            return
+        if sequenceNo > self.maxSequenceNo or sequenceNo in self.missing:
+            return
+        data = Data(interest.getName())
+        data.setContent(Blob(str(sequenceNo)))
+        self._face.callLater(self._delay, lambda: self._face.putData(data))
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # The fetcher gets every sequence number in the gap, in order, with
+    # retries for dropped interests.
+    network = LocalNetwork()
+    producer = Producer(network, "/producer")
+    producer.maxSequenceNo = 199
+    producer.dropOnce = set([3, 50, 51, 52, 120])
+    delivered = []
+    failed = []
+    fetcher = SequenceFetcher(
+      LocalFace(network),
+      lambda dataPrefix, sequenceNo, data: delivered.append(
+        (dataPrefix, sequenceNo, data.getContent().toBytes())),
+      lambda dataPrefix, sequenceNo: failed.append(sequenceNo),
+      interestLifetime = 100.0, initialWindow = 2, maxWindow = 16)
+    assert(not "/producer" in fetcher)
+    fetcher.fetch("/producer", 199)
+    assert("/producer" in fetcher)
+    assert(fetcher.getCounters()['inFlight'] == 2)
+    network.advance(10000.0)
+    assert(delivered == [("/producer", i, str(i).encode()) for i in range(200)])
+    assert(failed == [])
+    assert(fetcher.getDeliveredSequenceNo("/producer") == 199)
+    counters = fetcher.getCounters()
+    assert(counters['retransmissions'] == 5)
+    assert(counters['timeouts'] == 5)
+    assert(counters['delivered'] == 200)
+    assert(counters['inFlight'] == 0)
+    # The window grew, was halved for the losses and is at most maxWindow.
+    assert(1.0 <= fetcher.getWindow() <= 16.0)
+
+    # Fetching a lower sequence number does nothing. A higher one fetches
+    # only the new gap.
+    fetcher.fetch("/producer", 150)
+    network.advance(1000.0)
+    assert(len(delivered) == 200)
+    producer.maxSequenceNo = 209
+    fetcher.fetch("/producer", 209)
+    network.advance(1000.0)
+    assert([entry[1] for entry in delivered[200:]] == list(range(200, 210)))
+
+    # A sequence number which never arrives is given to onFailed in its place
+    # after the retries, and the later ones are still delivered.
+    producer.maxSequenceNo = 219
+    producer.missing = set([212])
+    del delivered[:]
+    fetcher.fetch("/producer", 219)
+    network.advance(10000.0)
+    assert(failed == [212])
+    assert([entry[1] for entry in delivered] ==
+           [i for i in range(210, 220) if i != 212])
+    assert(fetcher.getCounters()['failed'] == 1)
+
+    # setDeliveredSequenceNo skips history.
+    other = Producer(network, "/other")
+    other.maxSequenceNo = 999
+    del delivered[:]
+    fetcher.setDeliveredSequenceNo("/other", 994)
+    fetcher.fetch("/other", 999)
+    network.advance(1000.0)
+    assert([entry[1] for entry in delivered] == list(range(995, 1000)))
+
+    # With StateVectorSync2018, the onReceivedSyncState callback only gets the
+    # latest sequence number, but the fetcher gets each publication.
+    network = LocalNetwork()
+    bob = StateVectorSync2018(
+      lambda syncStates: None, lambda: None, Name("/bob"),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+    bobProducer = Producer(network, "/bob")
+    delivered = []
+    fetcher = SequenceFetcher(
+      LocalFace(network),
+      lambda dataPrefix, sequenceNo, data: delivered.append(sequenceNo))
+    alice = StateVectorSync2018(
+      fetcher.onReceivedSyncState, lambda: None, Name("/alice"),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+    network.processEvents()
+    bob.setPublishCoalescing(50.0)
+    for i in range(5):
+        bob.publishNextSequenceNo()
+    bobProducer.maxSequenceNo = bob.getSequenceNo()
+    network.advance(1000.0)
+    assert(delivered == [0, 1, 2, 3, 4])
+
+main()
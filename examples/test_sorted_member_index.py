@@ -0,0 +1,82 @@
+import random
+from svs.sync import SortedMemberIndex
+
+def main():
+    # Adding, removing and merging match sorted(set(...)).
+    random.seed(1)
+    index = SortedMemberIndex()
+    members = set()
+    for i in range(2000):
+        step = random.randrange(4)
+        if step == 0:
+            memberId = "/member/" + str(random.randrange(300))
+            assert(index.add(memberId) == (not memberId in members))
+            members.add(memberId)
+        elif step == 1:
+            newMembers = sorted(set(
+              "/member/" + str(random.randrange(300))
+              for j in range(random.randint(1, 5))) - members)
+            index.addSorted(newMembers)
+            members.update(newMembers)
+        elif step == 2:
+            # Include members which are not in the index.
+            removed = set(random.sample(
+              ["/member/" + str(j) for j in range(300)], random.randint(0, 5)))
+            index.removeMany(removed)
+            members.difference_update(removed)
+        else:
+            assert(index.getSortedMembers() == sorted(members))
+        assert(len(index) == len(members))
+        assert(all(memberId in index for memberId in members))
+    assert(list(index) == sorted(members))
+
+    # addSorted to an empty index uses a copy of the list as the sorted list.
+    index = SortedMemberIndex()
+    memberIds = ["/a", "/c", "/e"]
+    index.addSorted(memberIds)
+    memberIds.append("/z")
+    assert(index.getSortedMembers() == ["/a", "/c", "/e"])
+    assert(index._newMembers == [])
+
+    # New members are kept apart until the sorted order is requested, then
+    # merged with the existing sorted list.
+    assert(index.add("/d") and index.add("/b") and not index.add("/c"))
+    index.addSorted(["/f", "/g"])
+    assert(index._sortedMembers == ["/a", "/c", "/e"])
+    assert(index._newMembers == ["/d", "/b", "/f", "/g"])
+    assert("/d" in index and len(index) == 7)
+    assert(index.getSortedMembers() ==
+           ["/a", "/b", "/c", "/d", "/e", "/f", "/g"])
+    assert(index._newMembers == [])
+    # Removing a pending new member and a sorted member.
+    index.add("/bb")
+    index.removeMany(["/bb", "/e", "/missing"])
+    assert(index.getSortedMembers() == ["/a", "/b", "/c", "/d", "/f", "/g"])
+    # The list returned before removeMany is not changed.
+    sortedMembers = index.getSortedMembers()
+    index.removeMany(["/a"])
+    assert(sortedMembers[0] == "/a" and index.getSortedMembers()[0] == "/b")
+
+    # countInRange includes the start and excludes the end.
+    index = SortedMemberIndex()
+    index.addSorted(["/b", "/d", "/f"])
+    assert(index.countInRange("", None) == 3)
+    assert(index.countInRange("/b", "/f") == 2)
+    assert(index.countInRange("/b", "/b") == 0)
+    assert(index.countInRange("/c", "/d") == 0)
+    assert(index.countInRange("/c", "/d0") == 1)
+    assert(index.countInRange("/f", None) == 1)
+    assert(index.countInRange("/g", None) == 0)
+    assert(index.countInRange("", "/b") == 0)
+    assert(index.countInRange("/e", "/c") == 0)
+    # Pending new members are counted.
+    index.add("/a")
+    assert(index.countInRange("", "/b") == 1)
+    members = index.getSortedMembers()
+    for start in ["", "/a", "/b", "/c", "/z"]:
+        for end in ["/a", "/c", "/f", "/z", None]:
+            assert(index.countInRange(start, end) ==
+                   sum(1 for memberId in members
+                       if memberId >= start and (end == None or memberId < end)))
+
+main()
@@ -0,0 +1,135 @@
+import random
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import StateVectorEncodingCache
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeCache():
+    return StateVectorEncodingCache(
+      StateVectorSync2018.encodeStateVectorEntry,
+      StateVectorSync2018.TLV_StateVector)
+
+def checkEncoding(cache, stateVector):
+    keys = sorted(stateVector)
+    encoding = cache.encode(stateVector, keys)
+    expected = StateVectorSync2018.encodeStateVector(stateVector, keys)
+    assert(encoding.toBytes() == expected.toBytes())
+    assert(cache.getEncoding() is encoding)
+    assert(cache.isEncodingEqual(expected))
+
+def applyRandomStep(cache, stateVector, random, nextMemberNo):
+    """
+    Apply one random change to stateVector and tell the cache about it, as
+    _setSequenceNumber and _removeMembers do. Return the next member number.
+    """
+    step = random.randrange(4)
+    if step == 0 and len(stateVector) > 0:
+        # Update existing members.
+        memberIds = random.sample(sorted(stateVector),
+          random.randint(1, min(3, len(stateVector))))
+        for memberId in memberIds:
+            stateVector[memberId] += random.choice([1, 1, 300, 70000])
+            cache.invalidate(memberId)
+    elif step == 1 or len(stateVector) == 0:
+        # Add new members, which changes the key order.
+        for i in range(random.randint(1, 3)):
+            memberId = "/member/" + str(random.randrange(1000)) + "/" + str(
+              nextMemberNo)
+            nextMemberNo += 1
+            stateVector[memberId] = random.randrange(1000)
+            cache.invalidate(memberId)
+    elif step == 2:
+        # Remove members, maybe also adding one with an update pending.
+        memberIds = random.sample(sorted(stateVector),
+          random.randint(1, min(3, len(stateVector))))
+        for memberId in memberIds:
+            del stateVector[memberId]
+        cache.removeMany(memberIds)
+        if random.randrange(2) == 0:
+            memberId = "/member/new/" + str(nextMemberNo)
+            nextMemberNo += 1
+            stateVector[memberId] = 0
+            cache.invalidate(memberId)
+    else:
+        # Invalidate a mix of updated and unchanged members.
+        memberIds = random.sample(sorted(stateVector),
+          random.randint(1, min(5, len(stateVector))))
+        for memberId in memberIds[:len(memberIds) // 2]:
+            stateVector[memberId] += 1
+        cache.invalidateMany(memberIds)
+    return nextMemberNo
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+
+    # The cached encoding matches encodeStateVector after each random step.
+    random.seed(1)
+    cache = makeCache()
+    stateVector = {}
+    nextMemberNo = 0
+    checkEncoding(cache, stateVector)
+    for i in range(2000):
+        nextMemberNo = applyRandomStep(cache, stateVector, random, nextMemberNo)
+        checkEncoding(cache, stateVector)
+
+    # The same when several steps happen between encodes.
+    cache = makeCache()
+    stateVector = {}
+    for i in range(2000):
+        nextMemberNo = applyRandomStep(cache, stateVector, random, nextMemberNo)
+        if random.randrange(4) == 0:
+            checkEncoding(cache, stateVector)
+    checkEncoding(cache, stateVector)
+
+    # If nothing changed, encode returns the same Blob. encodeEntries uses the
+    # current sequence numbers, including for stale entries.
+    cache = makeCache()
+    stateVector = { "/a": 1, "/b": 2, "/c": 3 }
+    cache.invalidateMany(stateVector)
+    encoding = cache.encode(stateVector, sorted(stateVector))
+    assert(cache.encode(stateVector, sorted(stateVector)) is encoding)
+    stateVector["/b"] = 500
+    cache.invalidate("/b")
+    assert(cache.getEncoding() == None)
+    assert(cache.encodeEntries(stateVector, ["/b", "/c"]).toBytes() ==
+           StateVectorSync2018.encodeStateVector(
+             stateVector, ["/b", "/c"]).toBytes())
+    assert(not cache.isEncodingEqual(
+      StateVectorSync2018.encodeStateVector(stateVector, sorted(stateVector))))
+    # The entry of /c is replaced in place, which doesn't change the Blob from
+    # the previous encode.
+    encoding = cache.encode(stateVector, sorted(stateVector))
+    encodingBytes = encoding.toBytes()
+    stateVector["/c"] = 4
+    cache.invalidate("/c")
+    checkEncoding(cache, stateVector)
+    assert(encoding.toBytes() == encodingBytes)
+
+    # Through the sync object, which updates the cache in _setSequenceNumber
+    # and _removeMembers.
+    sync = StateVectorSync2018(
+      lambda states: None, lambda: None, Name("/local"),
+      Name("/ndn/broadcast/test"), LocalFace(LocalNetwork()), None, None,
+      HMAC_KEY, 5000.0, None)
+    for i in range(500):
+        step = random.randrange(5)
+        if step < 4 or len(sync._stateVector) < 3:
+            memberId = "/member/" + str(random.randrange(50))
+            sync._setSequenceNumber(
+              memberId, sync._stateVector.get(memberId, -1) + 1)
+        else:
+            sync._removeMembers(random.sample(
+              sorted(memberId for memberId in sync._stateVector
+                     if memberId != "/local"), 2))
+        keys = sync._memberIndex.getSortedMembers()
+        assert(keys == sorted(sync._stateVector))
+        assert(sync._encodingCache.encode(sync._stateVector, keys).toBytes() ==
+               StateVectorSync2018.encodeStateVector(
+                 sync._stateVector, keys).toBytes())
+
+main()
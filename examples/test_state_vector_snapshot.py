@@ -0,0 +1,92 @@
+import threading
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberId):
+    return StateVectorSync2018(
+      lambda states: None, lambda: None, Name(memberId),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None)
+
+def checkSnapshot(sync, snapshot):
+    assert(snapshot.getProducerPrefixes() == tuple(sync.getProducerPrefixes()))
+    assert(list(snapshot.items()) ==
+           [(memberId, sync.getProducerSequenceNo(memberId))
+            for memberId in sync.getProducerPrefixes()])
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    network = LocalNetwork()
+    alice = makeSync(network, "/alice")
+    bob = makeSync(network, "/bob")
+    network.processEvents()
+
+    # Snapshots are off by default.
+    assert(alice.getSnapshot() == None)
+    alice.setSnapshots(True)
+    empty = alice.getSnapshot()
+    assert(len(empty) == 0)
+
+    alice.publishNextSequenceNo()
+    network.processEvents()
+    first = alice.getSnapshot()
+    assert(first.getVersion() > empty.getVersion())
+    assert(first.getProducerSequenceNo("/alice") == 0)
+    assert(first.getProducerSequenceNo("/bob") == -1)
+    checkSnapshot(alice, first)
+
+    # A merge which adds a member makes a new snapshot, and the old one is
+    # unchanged.
+    bob.publishNextSequenceNo()
+    network.processEvents()
+    second = alice.getSnapshot()
+    assert(second.getVersion() > first.getVersion())
+    assert("/bob" in second and not "/bob" in first)
+    assert(first.getProducerPrefixes() == ("/alice",))
+    checkSnapshot(alice, second)
+
+    # A publish without a new member reuses the member ID tuple.
+    alice.publishNextSequenceNo()
+    third = alice.getSnapshot()
+    assert(third.getProducerPrefixes() is second.getProducerPrefixes())
+    assert(third.getProducerSequenceNo("/alice") == 1)
+    assert(second.getProducerSequenceNo("/alice") == 0)
+
+    # A notification with nothing new does not make a new snapshot.
+    network.processEvents()
+    bob._broadcastStateVector()
+    network.processEvents()
+    assert(alice.getSnapshot() is third)
+
+    # A reader thread sees consistent snapshots with increasing versions while
+    # the state vector changes.
+    errors = []
+    isDone = []
+    def read():
+        version = -1
+        while not isDone:
+            snapshot = alice.getSnapshot()
+            if snapshot.getVersion() < version:
+                errors.append("Version decreased")
+            version = snapshot.getVersion()
+            if len(list(snapshot.items())) != len(snapshot):
+                errors.append("Inconsistent snapshot")
+    thread = threading.Thread(target = read)
+    thread.start()
+    for i in range(2000):
+        alice._mergeStateVector({ "/member" + str(i % 100): i })
+    isDone.append(True)
+    thread.join()
+    assert(errors == [])
+    checkSnapshot(alice, alice.getSnapshot())
+
+    alice.setSnapshots(False)
+    assert(alice.getSnapshot() == None)
+
+main()
@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import StateVectorStore
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+
+def makeSync(network, memberId, store = None, previousSequenceNumber = -1):
+    return StateVectorSync2018(
+      lambda states: None, lambda: None, Name(memberId),
+      Name("/ndn/broadcast/test"), LocalFace(network), None, None, HMAC_KEY,
+      5000.0, None, previousSequenceNumber, None, store)
+
+def getStateVector(sync):
+    return dict((memberId, sync.getProducerSequenceNo(memberId))
+                for memberId in sync.getProducerPrefixes())
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    directory = tempfile.mkdtemp()
+    try:
+        # The snapshot encoding round trips, including non-ASCII member IDs.
+        stateVector = { "/a": 0, "/b/été": 2**40, "/c": 7 }
+        memberIds = sorted(stateVector)
+        assert(StateVectorStore.decodeSnapshot(StateVectorStore.encodeSnapshot(
+          stateVector, memberIds)) == (memberIds, stateVector))
+        assert(StateVectorStore.decodeSnapshot(StateVectorStore.encodeSnapshot(
+          {}, [])) == ([], {}))
+
+        # A new store is empty.
+        network = LocalNetwork()
+        store = StateVectorStore(directory)
+        alice = makeSync(network, "/alice", store)
+        bob = makeSync(network, "/bob")
+        network.processEvents()
+        assert(alice.getSequenceNo() == -1)
+        assert(len(alice.getProducerPrefixes()) == 0)
+
+        alice._mergeStateVector(
+          dict(("/member" + str(i), i) for i in range(100)))
+        for i in range(3):
+            alice.publishNextSequenceNo()
+        bob.publishNextSequenceNo()
+        bob.publishNextSequenceNo()
+        network.advance(1000.0)
+        expected = getStateVector(alice)
+        assert(expected["/bob"] == 1 and expected["/alice"] == 2)
+        # Publishes are synced right away and the merged entries are batched.
+        counters = store.getCounters()
+        assert(counters['records'] == 105)
+        assert(counters['fsyncs'] < counters['records'])
+        assert(counters['snapshots'] == 0)
+
+        # After a crash without close(), a new instance reloads the state
+        # vector from the log and continues our sequence numbers.
+        alice.shutdown()
+        network = LocalNetwork()
+        alice = makeSync(network, "/alice", StateVectorStore(directory))
+        assert(getStateVector(alice) == expected)
+        assert(alice.getProducerPrefixes() == sorted(expected))
+        assert(alice.getSequenceNo() == 2)
+        alice.publishNextSequenceNo()
+        assert(alice.getProducerSequenceNo("/alice") == 3)
+        expected["/alice"] = 3
+        # previousSequenceNumber is used if it is higher.
+        alice.shutdown()
+        alice._store.close()
+        alice = makeSync(network, "/alice", StateVectorStore(directory), 10)
+        assert(alice.getSequenceNo() == 10)
+        alice.shutdown()
+        alice._store.close()
+
+        # The reloaded state vector is encoded like a merged one, so a peer
+        # with the same entries doesn't need a reply.
+        network = LocalNetwork()
+        alice = makeSync(network, "/alice", StateVectorStore(directory))
+        (_, needToReply) = alice._mergeStateVector(expected)
+        assert(not needToReply)
+        assert(alice._isCurrentStateVector(
+          StateVectorSync2018.encodeStateVector(expected, sorted(expected))))
+        alice.shutdown()
+        alice._store.close()
+
+        # A record which is cut short at the end of the log is removed, and
+        # later records can still be read.
+        logPath = os.path.join(directory, "state-vector.log")
+        record = StateVectorSync2018.encodeStateVectorEntry("/carol", 5)
+        with open(logPath, 'ab') as logFile:
+            logFile.write(record[:len(record) - 2])
+        store = StateVectorStore(directory)
+        (_, loaded) = store.load()
+        assert(loaded == expected)
+        store.append("/carol", 6)
+        store.close()
+        (_, loaded) = StateVectorStore(directory).load()
+        assert(loaded["/carol"] == 6)
+        expected["/carol"] = 6
+
+        # When the log is long, the state vector is written to a snapshot and
+        # the log is emptied.
+        network = LocalNetwork()
+        store = StateVectorStore(directory, maxLogRecords = 50)
+        alice = makeSync(network, "/alice", store)
+        update = dict(("/member" + str(i), 1000 + i) for i in range(120))
+        alice._mergeStateVector(update)
+        expected.update(update)
+        assert(store.getCounters()['snapshots'] == 1)
+        assert(store.getCounters()['logRecords'] == 0)
+        assert(os.path.getsize(logPath) == 0)
+        alice.publishNextSequenceNo()
+        expected["/alice"] = 4
+        alice.shutdown()
+        store.close()
+        store = StateVectorStore(directory)
+        (memberIds, loaded) = store.load()
+        assert(loaded == expected and memberIds == sorted(expected))
+
+        # After a crash between writing the snapshot and emptying the log, an
+        # older record in the log doesn't go back.
+        store.append("/member0", 1)
+        store.close()
+        (_, loaded) = StateVectorStore(directory).load()
+        assert(loaded == expected)
+
+        # Records which are not synced are synced by the timer.
+        network = LocalNetwork()
+        store = StateVectorStore(
+          directory, fsyncIntervalMilliseconds = 100.0,
+          maxUnsyncedRecords = 1000)
+        alice = makeSync(network, "/alice", store)
+        fsyncs = store.getCounters()['fsyncs']
+        alice._mergeStateVector({ "/dave": 1 })
+        assert(store.getCounters()['fsyncs'] == fsyncs)
+        network.advance(200.0)
+        assert(store.getCounters()['fsyncs'] == fsyncs + 1)
+        alice.shutdown()
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+main()
@@ -35,6 +35,8 @@ from pyndn.security import SafeBag
 from pyndn.util import Blob
 from pyndn.security import SigningInfo
 from svs.sync import StateVectorSync2018
+from svs.sync import SequenceFetcher
+from svs.sync import PublicationStore
 
 # Define the Chat class here so that the demo is self-contained.
 class Chat(object):
@@ -46,9 +48,7 @@ class Chat(object):
         self._keyChain = keyChain
         self._certificateName = certificateName
 
-        self._messageCache = [] # of CachedMessage
         self._roster = [] # of str
-        self._maxMessageCacheLength = 100
         self._isRecoverySyncState = False
         self._syncLifetime = 5000.0 # milliseconds
 
@@ -62,19 +62,29 @@ class Chat(object):
           16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31
         ]))
 
+        self._makeDataName = lambda dataPrefix, sequenceNo: Name(
+          dataPrefix).append(str(session)).append(str(sequenceNo))
+        # Fetch each message in order, not only the latest sequence number.
+        self._fetcher = SequenceFetcher(
+          face, lambda dataPrefix, sequenceNo, data: self._onData(None, data),
+          None, self._syncLifetime, 1, makeDataName = self._makeDataName)
         self._sync = StateVectorSync2018(
            self._sendInterest, self._initial, self._chatPrefix,
            Name("/ndn/broadcast/SvsChat").append(self._chatRoom),
            face, keyChain, SigningInfo(), hmacKey, self._syncLifetime,
            onRegisterFailed)
 
-        face.registerPrefix(self._chatPrefix, self._onInterest, onRegisterFailed)
+        # Keep the last 100 messages and answer interests for them.
+        self._publications = PublicationStore(
+          self._sync, face, keyChain, certificateName, 100,
+          makeDataName = self._makeDataName,
+          onRegisterFailed = onRegisterFailed)
 
     def sendMessage(self, chatMessage):
         """
         Send a chat message.
         """
-        if len(self._messageCache) == 0:
+        if len(self._publications) == 0:
             self._messageCacheAppend(chatbuf_pb2.ChatMessage.JOIN, "xxx")
 
         # Ignore an empty message.
@@ -129,75 +139,19 @@ class Chat(object):
         from another member. Send a Chat Interest to fetch chat messages after
         the user gets the Sync data packet back but will not send interest.
         """
-        sendList = []       # of str
-        sessionNoList = []  # of int
-        sequenceNoList = [] # of int
-        for j in range(len(syncStates)):
-            syncState = syncStates[j]
+        for syncState in syncStates:
             nameComponents = Name(syncState.getDataPrefix())
             tempName = nameComponents.get(-1).toEscapedString()
-            sessionNo = 10000000000
-            if not tempName == self._screenName:
-                index = -1
-                for k in range(len(sendList)):
-                    if sendList[k] == syncState.getDataPrefix():
-                        index = k
-                        break
-
-                if index != -1:
-                    sessionNoList[index] = sessionNo
-                    sequenceNoList[index] = syncState.getSequenceNo()
-                else:
-                    sendList.append(syncState.getDataPrefix())
-                    sessionNoList.append(sessionNo)
-                    sequenceNoList.append(syncState.getSequenceNo())
-
-        for i in range(len(sendList)):
-            uri = (sendList[i] + "/" + str(sessionNoList[i]) + "/" +
-              str(sequenceNoList[i]))
-            interest = Interest(Name(uri))
-            interest.setInterestLifetimeMilliseconds(self._syncLifetime)
-            self._face.expressInterest(interest, self._onData, self._chatTimeout)
-
-    def _onInterest(self, prefix, interest, face, interestFilterId, filter):
-        """
-        Send back a Chat Data Packet which contains the user's message.
-        """
-        content = chatbuf_pb2.ChatMessage()
-        sequenceNo = int(
-          interest.getName().get(self._chatPrefix.size() + 1).toEscapedString())
-        gotContent = False
-        for i in range(len(self._messageCache) - 1, -1, -1):
-            message = self._messageCache[i]
-            if message.sequenceNo == sequenceNo:
-                if message.messageType != chatbuf_pb2.ChatMessage.CHAT:
-                    # Use setattr because "from" is a reserved keyword.
-                    setattr(content, "from", self._screenName)
-                    content.to = self._chatRoom
-                    content.type = message.messageType
-                    content.timestamp = int(round(message.time / 1000.0))
-                else:
-                    setattr(content, "from", self._screenName)
-                    content.to = self._chatRoom
-                    content.type = message.messageType
-                    content.data = message.message
-                    content.timestamp = int(round(message.time / 1000.0))
+            if tempName == self._screenName:
+                continue
 
-                gotContent = True
-                break
-
-        if gotContent:
-            # TODO: Check if this works in Python 3.
-            array = content.SerializeToString()
-            data = Data(interest.getName())
-            data.setContent(Blob(array))
-            self._keyChain.sign(data, self._certificateName)
-            try:
-                face.putData(data)
-            except Exception as ex:
-                logging.getLogger(__name__).error(
-                  "Error in transport.send: %s", str(ex))
-                return
+            if not syncState.getDataPrefix() in self._fetcher:
+                # Only the recent messages are cached, so don't fetch the
+                # history of a member we haven't seen.
+                self._fetcher.setDeliveredSequenceNo(
+                  syncState.getDataPrefix(), syncState.getSequenceNo() - 1)
+            self._fetcher.fetch(
+              syncState.getDataPrefix(), syncState.getSequenceNo())
 
     def _onData(self, interest, data):
         """
@@ -271,7 +225,7 @@ class Chat(object):
         (chat message type HELLO). This method has an "interest" argument
         because we use it as the onTimeout for Face.expressInterest.
         """
-        if len(self._messageCache) == 0:
+        if len(self._publications) == 0:
             self._messageCacheAppend(chatbuf_pb2.ChatMessage.JOIN, "xxx")
 
         self._sync.publishNextSequenceNo()
@@ -314,16 +268,24 @@ class Chat(object):
 
     def _messageCacheAppend(self, messageType, message):
         """
-        Append a new CachedMessage to messageCache_, using given messageType and
-        message, the sequence number from _sync.getSequenceNo() and the current
-        time. Also remove elements from the front of the cache as needed to keep
-        the size to _maxMessageCacheLength.
+        Make a chat data packet with the given messageType and message, the
+        sequence number from _sync.getSequenceNo() and the current time, and
+        add it to _publications.
         """
-        self._messageCache.append(self._CachedMessage(
-          self._sync.getSequenceNo(), messageType, message,
-          self.getNowMilliseconds()))
-        while len(self._messageCache) > self._maxMessageCacheLength:
-          self._messageCache.pop(0)
+        content = chatbuf_pb2.ChatMessage()
+        # Use setattr because "from" is a reserved keyword.
+        setattr(content, "from", self._screenName)
+        content.to = self._chatRoom
+        content.type = messageType
+        if messageType == chatbuf_pb2.ChatMessage.CHAT:
+            content.data = message
+        content.timestamp = int(round(self.getNowMilliseconds() / 1000.0))
+
+        sequenceNo = self._sync.getSequenceNo()
+        data = Data(self._makeDataName(self._chatPrefix.toUri(), sequenceNo))
+        data.setContent(Blob(content.SerializeToString()))
+        self._keyChain.sign(data, self._certificateName)
+        self._publications.add(sequenceNo, data)
 
     @staticmethod
     def _getRandomString():
@@ -347,14 +309,6 @@ class Chat(object):
         """
         pass
 
-    class _CachedMessage(object):
-        def __init__(self, sequenceNo, messageType, message, time):
-            self.sequenceNo = sequenceNo
-            self.messageType = messageType
-            self.message = message
-            self.time = time
-
-
 DEFAULT_RSA_PUBLIC_KEY_DER = bytearray([
     0x30, 0x82, 0x01, 0x22, 0x30, 0x0d, 0x06, 0x09, 0x2a, 0x86, 0x48, 0x86, 0xf7, 0x0d, 0x01, 0x01,
     0x01, 0x05, 0x00, 0x03, 0x82, 0x01, 0x0f, 0x00, 0x30, 0x82, 0x01, 0x0a, 0x02, 0x82, 0x01, 0x01,
@@ -0,0 +1,120 @@
+from pyndn import Name
+from pyndn import Interest
+from pyndn.util import Blob
+from svs.sync import StateVectorSync2018
+from svs.sync import SyncGroupManager
+from local_face import LocalNetwork
+from local_face import LocalFace
+
+HMAC_KEY = Blob(bytearray(range(32)))
+PARENT_PREFIX = Name("/ndn/broadcast/rooms")
+N_GROUPS = 50
+
+def getStateVector(sync):
+    return dict((memberId, sync.getProducerSequenceNo(memberId))
+                for memberId in sync.getProducerPrefixes())
+
+def addGroups(manager, memberId, failures):
+    groups = []
+    for i in range(N_GROUPS):
+        groups.append(manager.addGroup(
+          "room" + str(i), lambda states: None, lambda: None,
+          Name(memberId + "/room" + str(i)), HMAC_KEY, 5000.0,
+          lambda prefix: failures.append(prefix)))
+    return groups
+
+def main():
+    Interest.setDefaultCanBePrefix(False)
+    network = LocalNetwork()
+    aliceFace = LocalFace(network)
+    bobFace = LocalFace(network)
+    aliceManager = SyncGroupManager(aliceFace, PARENT_PREFIX)
+    bobManager = SyncGroupManager(bobFace, PARENT_PREFIX)
+    failures = []
+    aliceGroups = addGroups(aliceManager, "/alice", failures)
+    bobGroups = addGroups(bobManager, "/bob", failures)
+    # A standalone member of room 0 uses the same broadcast prefix.
+    carol = StateVectorSync2018(
+      lambda states: None, lambda: None, Name("/carol/room0"),
+      Name(PARENT_PREFIX).append("room0"), LocalFace(network), None, None,
+      HMAC_KEY, 5000.0, None)
+    network.processEvents()
+
+    # Each manager registers one prefix for all of its groups, and the groups
+    # share one signer.
+    assert(len(aliceFace._filters) == 1)
+    assert(aliceManager.getCounters()['groups'] == N_GROUPS)
+    assert(aliceGroups[0]._signer is aliceGroups[1]._signer)
+
+    # Notifications are routed to the group with the same name.
+    for i in range(N_GROUPS):
+        aliceGroups[i].publishNextSequenceNo()
+        if i % 2 == 0:
+            bobGroups[i].publishNextSequenceNo()
+    network.processEvents()
+    carol.publishNextSequenceNo()
+    network.processEvents()
+    for i in range(N_GROUPS):
+        expected = { "/alice/room" + str(i): 0 }
+        if i % 2 == 0:
+            expected["/bob/room" + str(i)] = 0
+        if i == 0:
+            expected["/carol/room0"] = 0
+        assert(getStateVector(aliceGroups[i]) == expected)
+        assert(getStateVector(bobGroups[i]) == expected)
+    assert(getStateVector(carol) == getStateVector(aliceGroups[0]))
+    assert(aliceManager.getCounters()['dispatchedNotifications'] > 0)
+
+    # Group timers are kept by the manager, with one face timer for the
+    # earliest.
+    nFaceTimers = len(network._timers)
+    for i in range(N_GROUPS):
+        aliceGroups[i].setPublishCoalescing(100.0)
+        aliceGroups[i].publishNextSequenceNo()
+    assert(aliceManager.getCounters()['pendingTimers'] == N_GROUPS)
+    assert(len(network._timers) == nFaceTimers + 1)
+    network.advance(50.0)
+    assert(getStateVector(bobGroups[1])["/alice/room1"] == 0)
+    network.advance(100.0)
+    assert(aliceManager.getCounters()['pendingTimers'] == 0)
+    for i in range(N_GROUPS):
+        assert(getStateVector(bobGroups[i])["/alice/room" + str(i)] == 1)
+
+    # A timer added by a timer callback waits for its own delay.
+    calls = []
+    aliceManager._groupFace.callLater(100.0, lambda: (calls.append(1),
+      aliceManager._groupFace.callLater(100.0, lambda: calls.append(2))))
+    network.advance(150.0)
+    assert(calls == [1])
+    network.advance(100.0)
+    assert(calls == [1, 2])
+
+    # A timer earlier than the pending face timers sets another face timer.
+    # A face timer with nothing due doesn't set one.
+    calls = []
+    nFaceTimers = len(network._timers)
+    for delay in [300.0, 200.0, 100.0, 250.0]:
+        aliceManager._groupFace.callLater(
+          delay, lambda delay=delay: calls.append(delay))
+    assert(len(network._timers) == nFaceTimers + 3)
+    network.advance(350.0)
+    assert(calls == [100.0, 200.0, 250.0, 300.0])
+    assert(aliceManager._faceTimerCallTimes == [])
+    assert(aliceManager.getCounters()['pendingTimers'] == 0)
+
+    # A group name can only be added once.
+    aliceManager.addGroup(
+      "room0", lambda states: None, lambda: None, Name("/alice/again"),
+      HMAC_KEY, 5000.0, lambda prefix: failures.append(prefix))
+    network.advance(1.0)
+    assert(failures == [Name(PARENT_PREFIX).append("room0")])
+
+    # A group which is shut down no longer receives notifications.
+    aliceGroups[1].shutdown()
+    assert(aliceManager.getCounters()['groups'] == N_GROUPS - 1)
+    bobGroups[1].publishNextSequenceNo()
+    network.processEvents()
+    assert(aliceManager.getCounters()['unknownGroupNotifications'] == 1)
+    assert(getStateVector(aliceGroups[1]) == { "/alice/room1": 1 })
+
+main()
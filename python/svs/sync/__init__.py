@@ -17,13 +17,53 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 # A copy of the GNU Lesser General Public License is in the file COPYING.
 
+from svs.sync import admission_control
+from svs.sync import async_state_vector_sync
+from svs.sync import metrics_exporter
+from svs.sync import metrics_registry
+from svs.sync import notification_pipeline
+from svs.sync import notification_recorder
+from svs.sync import notification_replayer
+from svs.sync import notification_signer
+from svs.sync import phase_profiler
+from svs.sync import publication_store
+from svs.sync import recent_notification_cache
+from svs.sync import sequence_fetcher
+from svs.sync import sorted_member_index
+from svs.sync import state_vector_encoding_cache
+from svs.sync import state_vector_snapshot
+from svs.sync import state_vector_store
 from svs.sync import state_vector_sync2018
-__all__ = ['state_vector_sync2018']
+from svs.sync import sync_group_manager
+__all__ = ['admission_control', 'async_state_vector_sync',
+  'metrics_exporter', 'metrics_registry', 'notification_pipeline',
+  'notification_recorder', 'notification_replayer', 'notification_signer',
+  'phase_profiler', 'publication_store', 'recent_notification_cache',
+  'sequence_fetcher', 'sorted_member_index', 'state_vector_encoding_cache',
+  'state_vector_snapshot', 'state_vector_store', 'state_vector_sync2018',
+  'sync_group_manager']
 
 import sys as _sys
 
 try:
+    from svs.sync.admission_control import *
+    from svs.sync.async_state_vector_sync import *
+    from svs.sync.metrics_exporter import *
+    from svs.sync.metrics_registry import *
+    from svs.sync.notification_pipeline import *
+    from svs.sync.notification_recorder import *
+    from svs.sync.notification_replayer import *
+    from svs.sync.notification_signer import *
+    from svs.sync.phase_profiler import *
+    from svs.sync.publication_store import *
+    from svs.sync.recent_notification_cache import *
+    from svs.sync.sequence_fetcher import *
+    from svs.sync.sorted_member_index import *
+    from svs.sync.state_vector_encoding_cache import *
+    from svs.sync.state_vector_snapshot import *
+    from svs.sync.state_vector_store import *
     from svs.sync.state_vector_sync2018 import *
+    from svs.sync.sync_group_manager import *
 except ImportError:
     del _sys.modules[__name__]
     raise
@@ -0,0 +1,128 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+from collections import OrderedDict
+from pyndn.util.common import Common
+
+class AdmissionControl(object):
+    """
+    An AdmissionControl limits the rate of received notifications with token
+    buckets, one for each source and one for all sources together. A bucket
+    holds up to a burst of tokens and gains tokens at a rate per second.
+    Admitting a notification takes a token from the bucket of its source and
+    from the global bucket, and the notification is shed if either is empty.
+    The buckets of at most maxSources sources are kept, evicting the least
+    recently seen, so a source which returns after being evicted starts with a
+    full bucket.
+
+    :param float sourceRate: The number of notifications per second admitted
+      from each source. If 0, don't limit each source.
+    :param float sourceBurst: The number of notifications which a source can
+      send at once after being idle.
+    :param float globalRate: The number of notifications per second admitted
+      from all sources together. If 0, don't limit all sources together.
+    :param float globalBurst: The number of notifications which all sources
+      together can send at once after being idle.
+    :param int maxSources: (optional) The maximum number of sources whose
+      bucket is kept. If omitted, use 1024.
+    """
+    def __init__(self, sourceRate, sourceBurst, globalRate, globalBurst,
+          maxSources = 1024):
+        self._sourceRate = sourceRate
+        self._sourceBurst = max(1.0, sourceBurst)
+        self._globalRate = globalRate
+        self._globalBurst = max(1.0, globalBurst)
+        self._maxSources = max(1, maxSources)
+        # The dictionary key is the source ID. The value is the list
+        # [tokens, time] of the bucket and the time in milliseconds when its
+        # tokens were counted. The least recently seen is first.
+        self._sourceBuckets = OrderedDict()
+        self._globalBucket = [self._globalBurst, None]
+        self._counters = { 'admitted': 0, 'shedBySource': 0, 'shedGlobally': 0 }
+
+    def admit(self, sourceId, nowMilliseconds = None):
+        """
+        Check if a notification from sourceId is admitted, and if so take a
+        token from its bucket and from the global bucket.
+
+        :param sourceId: The hashable ID of the source, or None if the source is
+          not known, in which case only the global rate applies.
+        :param float nowMilliseconds: (optional) The current time in
+          milliseconds. If omitted, use Common.getNowMilliseconds().
+        :return: True if the notification is admitted, False to shed it.
+        :rtype: bool
+        """
+        if nowMilliseconds == None:
+            nowMilliseconds = Common.getNowMilliseconds()
+
+        sourceBucket = None
+        if self._sourceRate > 0 and sourceId != None:
+            sourceBucket = self._sourceBuckets.get(sourceId)
+            if sourceBucket == None:
+                sourceBucket = [self._sourceBurst, nowMilliseconds]
+                self._sourceBuckets[sourceId] = sourceBucket
+                if len(self._sourceBuckets) > self._maxSources:
+                    self._sourceBuckets.popitem(False)
+            else:
+                self._sourceBuckets.move_to_end(sourceId)
+            AdmissionControl._refill(
+              sourceBucket, self._sourceRate, self._sourceBurst,
+              nowMilliseconds)
+            if sourceBucket[0] < 1.0:
+                self._counters['shedBySource'] += 1
+                return False
+
+        if self._globalRate > 0:
+            AdmissionControl._refill(
+              self._globalBucket, self._globalRate, self._globalBurst,
+              nowMilliseconds)
+            if self._globalBucket[0] < 1.0:
+                self._counters['shedGlobally'] += 1
+                return False
+            self._globalBucket[0] -= 1.0
+
+        # Only take from the source bucket if the global bucket admitted it.
+        if sourceBucket != None:
+            sourceBucket[0] -= 1.0
+        self._counters['admitted'] += 1
+        return True
+
+    def getCounters(self):
+        """
+        Get the admission counters. The dictionary keys are 'admitted' (the
+        number of admitted notifications), 'shedBySource' (the number shed
+        because the bucket of their source was empty), 'shedGlobally' (the
+        number shed because the global bucket was empty) and 'sources' (the
+        number of sources whose bucket is kept).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        counters = dict(self._counters)
+        counters['sources'] = len(self._sourceBuckets)
+        return counters
+
+    @staticmethod
+    def _refill(bucket, rate, burst, nowMilliseconds):
+        """
+        Add the tokens gained by the bucket since its time, up to burst.
+        """
+        if bucket[1] != None:
+            bucket[0] = min(
+              burst, bucket[0] + (nowMilliseconds - bucket[1]) * rate / 1000.0)
+        bucket[1] = nowMilliseconds
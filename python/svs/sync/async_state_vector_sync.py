@@ -0,0 +1,162 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import asyncio
+from svs.sync.state_vector_sync2018 import StateVectorSync2018
+
+class AsyncStateVectorSync(object):
+    """
+    An AsyncStateVectorSync runs a StateVectorSync2018 from an asyncio event
+    loop. The face must call its callbacks from the loop, like a pyndn
+    ThreadsafeFace with an async transport such as AsyncTcpTransport, so that
+    received notifications are processed as soon as they arrive and the
+    application does not call processEvents. Instead of the
+    onReceivedSyncState callback, the application reads the received sync
+    states with:
+
+        async for syncStates in sync.updates():
+
+    All methods must be called on the thread of the loop.
+
+    :param Name applicationDataPrefix: The prefix for this member, as for
+      StateVectorSync2018.
+    :param Name applicationBroadcastPrefix: The broadcast name prefix.
+    :param Face face: The Face which calls its callbacks from the loop.
+    :param KeyChain keyChain: To sign a data packet containing a sync state
+      message, this calls keyChain.sign(data, signingParams).
+    :param signingParams: The signing parameters, as for StateVectorSync2018.
+    :param Blob hmacKey: The shared key for signing notification interests.
+    :param float notificationInterestLifetime: The interest lifetime in
+      milliseconds for notification interests.
+    :param int previousSequenceNumber: (optional) The previously published
+      sequence number, as for StateVectorSync2018. If omitted, use -1.
+    :param loop: (optional) The asyncio event loop. If omitted, use
+      asyncio.get_running_loop(), so the AsyncStateVectorSync must be made in
+      a coroutine or callback running on the loop.
+    :raises RuntimeError: If loop is omitted and no event loop is running.
+    """
+    def __init__(self, applicationDataPrefix, applicationBroadcastPrefix, face,
+          keyChain, signingParams, hmacKey, notificationInterestLifetime,
+          previousSequenceNumber = -1, loop = None):
+        self._loop = loop if loop != None else asyncio.get_running_loop()
+        self._initialized = self._loop.create_future()
+        self._updateStreams = []
+        self._sync = StateVectorSync2018(
+          self._onReceivedSyncState, self._onInitialized, applicationDataPrefix,
+          applicationBroadcastPrefix, face, keyChain, signingParams, hmacKey,
+          notificationInterestLifetime, self._onRegisterFailed,
+          previousSequenceNumber)
+
+    class UpdateStream(object):
+        """
+        An UpdateStream is an asynchronous iterator over the lists of new
+        StateVectorSync2018.SyncState received after it was made by updates().
+        Each list is what StateVectorSync2018 would pass to the
+        onReceivedSyncState callback. Lists are queued until they are read, so
+        the application should keep reading or call close().
+        """
+        def __init__(self, owner):
+            self._owner = owner
+            self._queue = asyncio.Queue()
+            owner._updateStreams.append(self)
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            syncStates = await self._queue.get()
+            if syncStates == None:
+                # close() was called.
+                raise StopAsyncIteration
+            return syncStates
+
+        def close(self):
+            """
+            Stop receiving sync states. An iteration which is waiting ends.
+            """
+            if self in self._owner._updateStreams:
+                self._owner._updateStreams.remove(self)
+                self._queue.put_nowait(None)
+
+    async def waitForInitialized(self):
+        """
+        Wait until the broadcast prefix is registered.
+
+        :raises RuntimeError: If registering the broadcast prefix failed.
+        """
+        await asyncio.shield(self._initialized)
+
+    async def publish(self):
+        """
+        Wait until the broadcast prefix is registered, then increment the
+        sequence number and send the notification with
+        StateVectorSync2018.publishNextSequenceNo().
+
+        :return: The new sequence number.
+        :rtype: int
+        :raises RuntimeError: If registering the broadcast prefix failed.
+        """
+        await self.waitForInitialized()
+        self._sync.publishNextSequenceNo()
+        return self._sync.getSequenceNo()
+
+    def updates(self):
+        """
+        Make a new UpdateStream to read the sync states received from now on,
+        as in:
+
+            async for syncStates in sync.updates():
+
+        :return: The new UpdateStream.
+        :rtype: AsyncStateVectorSync.UpdateStream
+        """
+        return AsyncStateVectorSync.UpdateStream(self)
+
+    def getSync(self):
+        """
+        Get the StateVectorSync2018, to get the state vector or to enable
+        features such as setReplySuppression. Its methods must be called on
+        the thread of the loop.
+
+        :return: The StateVectorSync2018.
+        :rtype: StateVectorSync2018
+        """
+        return self._sync
+
+    def shutdown(self):
+        """
+        Shut down the StateVectorSync2018 and close each UpdateStream.
+        """
+        self._sync.shutdown()
+        for stream in self._updateStreams[:]:
+            stream.close()
+        if not self._initialized.done():
+            self._initialized.cancel()
+
+    def _onReceivedSyncState(self, syncStates):
+        for stream in self._updateStreams:
+            stream._queue.put_nowait(syncStates)
+
+    def _onInitialized(self):
+        if not self._initialized.done():
+            self._initialized.set_result(None)
+
+    def _onRegisterFailed(self, prefix):
+        if not self._initialized.done():
+            self._initialized.set_exception(RuntimeError(
+              "Register failed for prefix " + prefix.toUri()))
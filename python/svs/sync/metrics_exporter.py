@@ -0,0 +1,153 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import logging
+import os
+import socket
+import threading
+
+class MetricsExporter(object):
+    """
+    A MetricsExporter is the base class of exporters which make the Prometheus
+    text of a MetricsRegistry available locally. Call export() on the thread
+    which updates the registry, either directly or every interval with
+    schedule(). A subclass implements _write(text).
+    """
+    def __init__(self):
+        # Incremented by schedule() and close(), so that the timer for an
+        # earlier schedule is ignored.
+        self._scheduleNo = 0
+
+    def export(self, registry):
+        """
+        Encode the registry and export the text.
+
+        :param MetricsRegistry registry: The registry to export.
+        """
+        self._write(registry.encodePrometheusText())
+
+    def schedule(self, face, registry, intervalMilliseconds):
+        """
+        Export the registry now and then every intervalMilliseconds from a
+        face.callLater timer, until close() is called. Because the timer runs
+        on the thread which calls processEvents, that thread should be the one
+        which updates the registry.
+
+        :param Face face: The Face for calling callLater.
+        :param MetricsRegistry registry: The registry to export.
+        :param float intervalMilliseconds: The time between exports.
+        """
+        self._scheduleNo += 1
+        scheduleNo = self._scheduleNo
+        def onTimeout():
+            if scheduleNo != self._scheduleNo:
+                return
+            try:
+                self.export(registry)
+            except Exception:
+                logging.exception("Error exporting metrics")
+            face.callLater(intervalMilliseconds, onTimeout)
+        onTimeout()
+
+    def close(self):
+        """
+        Stop the scheduled exports.
+        """
+        self._scheduleNo += 1
+
+    def _write(self, text):
+        raise NotImplementedError("_write is not implemented")
+
+class MetricsFileExporter(MetricsExporter):
+    """
+    A MetricsFileExporter writes the Prometheus text to a file, replacing it
+    atomically so that a reader never sees a partial file. This is the format
+    of the node_exporter textfile collector, whose file name ends in ".prom".
+
+    :param str path: The path of the file.
+    """
+    def __init__(self, path):
+        super(MetricsFileExporter, self).__init__()
+        self._path = path
+
+    def _write(self, text):
+        temporaryPath = self._path + ".tmp"
+        with open(temporaryPath, 'w') as metricsFile:
+            metricsFile.write(text)
+        os.replace(temporaryPath, self._path)
+
+class MetricsSocketExporter(MetricsExporter):
+    """
+    A MetricsSocketExporter listens on a Unix domain socket and sends the text
+    of the last export() to each client which connects, then closes the
+    connection. A thread accepts the connections, so a client never waits for
+    the processEvents thread. For example, read it with
+    "socat - UNIX-CONNECT:<path>".
+
+    :param str path: The path of the socket. An existing file at the path is
+      removed.
+    """
+    def __init__(self, path):
+        super(MetricsSocketExporter, self).__init__()
+        self._path = path
+        # The bytes of the last export. Assigning the reference is atomic.
+        self._text = b""
+        if os.path.exists(path):
+            os.remove(path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(path)
+        self._socket.listen(8)
+        self._isClosed = False
+        self._thread = threading.Thread(target = self._serve)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def close(self):
+        """
+        Stop the scheduled exports, stop listening and remove the socket file.
+        """
+        super(MetricsSocketExporter, self).close()
+        if self._isClosed:
+            return
+        self._isClosed = True
+        try:
+            # Wake up accept() in the thread.
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        self._thread.join()
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+    def _write(self, text):
+        self._text = text.encode('utf-8')
+
+    def _serve(self):
+        while not self._isClosed:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                # The socket was closed.
+                return
+            try:
+                connection.sendall(self._text)
+            except OSError:
+                pass
+            finally:
+                connection.close()
@@ -0,0 +1,242 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import bisect
+from collections import OrderedDict
+
+class MetricsRegistry(object):
+    """
+    A MetricsRegistry holds named counters, gauges and histograms and encodes
+    them in the Prometheus text exposition format. Several metrics can have the
+    same name with different labels, for example one for each sync group. The
+    metrics are updated without locks, so they should be updated and encoded
+    in the same thread, such as the thread which calls processEvents.
+    """
+    def __init__(self):
+        # The dictionary key is the metric name. The value is the list
+        # [type, help, metrics] where metrics is an OrderedDict whose key is
+        # the encoded labels string and whose value is the metric object.
+        self._families = OrderedDict()
+
+    def counter(self, name, help, labels = None):
+        """
+        Get the MetricsCounter with the name and labels, adding it if needed.
+
+        :param str name: The metric name, such as "svs_notifications_sent_total".
+        :param str help: The help text for the metric name.
+        :param dict<str,str> labels: (optional) The label names and values. If
+          omitted or None, the metric has no labels.
+        :return: The MetricsCounter.
+        :rtype: MetricsCounter
+        """
+        return self._getMetric(
+          name, "counter", help, labels, lambda: MetricsCounter())
+
+    def gauge(self, name, help, labels = None, function = None):
+        """
+        Get the MetricsGauge with the name and labels, adding it if needed.
+
+        :param str name: The metric name.
+        :param str help: The help text for the metric name.
+        :param dict<str,str> labels: (optional) The label names and values. If
+          omitted or None, the metric has no labels.
+        :param function: (optional) If not None, the gauge value is
+          function() when it is encoded, so that the value is not updated on
+          every change. Otherwise the value is set with set().
+        :type function: function object
+        :return: The MetricsGauge.
+        :rtype: MetricsGauge
+        """
+        return self._getMetric(
+          name, "gauge", help, labels, lambda: MetricsGauge(function))
+
+    def histogram(self, name, help, buckets, labels = None):
+        """
+        Get the MetricsHistogram with the name and labels, adding it if needed.
+
+        :param str name: The metric name, such as "svs_verify_seconds".
+        :param str help: The help text for the metric name.
+        :param list<float> buckets: The increasing upper bounds of the buckets,
+          not including +Inf.
+        :param dict<str,str> labels: (optional) The label names and values. If
+          omitted or None, the metric has no labels.
+        :return: The MetricsHistogram.
+        :rtype: MetricsHistogram
+        """
+        return self._getMetric(
+          name, "histogram", help, labels, lambda: MetricsHistogram(buckets))
+
+    def remove(self, name, labels = None):
+        """
+        Remove the metric with the name and labels, for example when its sync
+        group is removed.
+
+        :param str name: The metric name.
+        :param dict<str,str> labels: (optional) The label names and values. If
+          omitted or None, remove the metric without labels.
+        """
+        family = self._families.get(name)
+        if family == None:
+            return
+        family[2].pop(MetricsRegistry._encodeLabels(labels), None)
+        if len(family[2]) == 0:
+            del self._families[name]
+
+    def encodePrometheusText(self):
+        """
+        Encode the current values of all the metrics in the Prometheus text
+        exposition format, version 0.0.4.
+
+        :return: The encoded text.
+        :rtype: str
+        """
+        lines = []
+        for name, (type, help, metrics) in self._families.items():
+            lines.append("# HELP " + name + " " +
+                         help.replace("\\", "\\\\").replace("\n", "\\n"))
+            lines.append("# TYPE " + name + " " + type)
+            for labels, metric in metrics.items():
+                metric._encode(name, labels, lines)
+        lines.append("")
+        return "\n".join(lines)
+
+    def _getMetric(self, name, type, help, labels, makeMetric):
+        family = self._families.get(name)
+        if family == None:
+            family = [type, help, OrderedDict()]
+            self._families[name] = family
+        elif family[0] != type:
+            raise ValueError(
+              "The metric " + name + " already has the type " + family[0])
+
+        labelsString = MetricsRegistry._encodeLabels(labels)
+        metric = family[2].get(labelsString)
+        if metric == None:
+            metric = makeMetric()
+            family[2][labelsString] = metric
+        return metric
+
+    @staticmethod
+    def _encodeLabels(labels):
+        """
+        Encode the labels as name="value" pairs separated by commas, in sorted
+        order of name, without the braces.
+        """
+        if labels == None or len(labels) == 0:
+            return ""
+        return ",".join(
+          name + '="' + str(labels[name]).replace("\\", "\\\\").replace(
+            '"', '\\"').replace("\n", "\\n") + '"'
+          for name in sorted(labels))
+
+def _formatSample(name, labels, value):
+    """
+    Return the sample line for the metric name with the encoded labels string.
+    """
+    if labels == "":
+        return name + " " + _formatValue(value)
+    else:
+        return name + "{" + labels + "} " + _formatValue(value)
+
+def _formatValue(value):
+    if isinstance(value, float):
+        if value == float('inf'):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+class MetricsCounter(object):
+    """
+    A MetricsCounter is a count which only increases. Create it with
+    MetricsRegistry.counter().
+    """
+    __slots__ = ['value']
+
+    def __init__(self):
+        # Public so that a hot path can add to it without a method call.
+        self.value = 0
+
+    def inc(self, amount = 1):
+        self.value += amount
+
+    def _encode(self, name, labels, lines):
+        lines.append(_formatSample(name, labels, self.value))
+
+class MetricsGauge(object):
+    """
+    A MetricsGauge is a value which can go up and down, either set with set()
+    or read from a function when encoded. Create it with
+    MetricsRegistry.gauge().
+    """
+    __slots__ = ['value', '_function']
+
+    def __init__(self, function = None):
+        self.value = 0
+        self._function = function
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self._function() if self._function != None else self.value
+
+    def _encode(self, name, labels, lines):
+        lines.append(_formatSample(name, labels, self.get()))
+
+class MetricsHistogram(object):
+    """
+    A MetricsHistogram counts observed values in buckets with upper bounds and
+    keeps their sum. Create it with MetricsRegistry.histogram().
+    """
+    __slots__ = ['_bounds', '_counts', '_sum']
+
+    def __init__(self, buckets):
+        self._bounds = list(buckets)
+        # The count for each bound, then for +Inf. These are not cumulative.
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._sum = 0.0
+
+    def observe(self, value):
+        """
+        Count the value in the first bucket whose upper bound is at least the
+        value.
+
+        :param float value: The observed value.
+        """
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self._sum += value
+
+    def getCount(self):
+        return sum(self._counts)
+
+    def getSum(self):
+        return self._sum
+
+    def _encode(self, name, labels, lines):
+        separator = "," if labels != "" else ""
+        count = 0
+        for i in range(len(self._bounds)):
+            count += self._counts[i]
+            lines.append(_formatSample(
+              name + "_bucket", labels + separator + 'le="' +
+              _formatValue(float(self._bounds[i])) + '"', count))
+        count += self._counts[-1]
+        lines.append(_formatSample(
+          name + "_bucket", labels + separator + 'le="+Inf"', count))
+        lines.append(_formatSample(name + "_sum", labels, self._sum))
+        lines.append(_formatSample(name + "_count", labels, count))
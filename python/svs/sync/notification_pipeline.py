@@ -0,0 +1,158 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import logging
+from collections import deque
+
+class NotificationPipeline(object):
+    """
+    A NotificationPipeline runs the verification and decoding of received
+    notification interests on the workers of an executor such as a
+    concurrent.futures ThreadPoolExecutor or ProcessPoolExecutor, and hands
+    the results back to the thread which calls processEvents in the order that
+    the interests arrived.
+
+    Results are applied from a face.callLater callback, so they are applied on
+    the processEvents thread. At most maxPendingNotifications interests are
+    queued. The backpressure policy is to block: if the queue is full when an
+    interest arrives, the caller waits for the oldest queued interest and
+    applies it before submitting the new one. This slows the processEvents
+    thread instead of dropping notifications.
+
+    :param executor: The executor with a submit(function, *args) method which
+      returns a future. The application owns the executor and should shut it
+      down after disabling the pipeline.
+    :param Face face: The Face for calling callLater.
+    :param verifyAndDecode: The function to run on a worker, called as
+      verifyAndDecode(interestEncoding, *workerArgs) where interestEncoding is
+      the bytes of the interest wire encoding. If the executor is a process
+      pool, this and workerArgs must be picklable.
+    :type verifyAndDecode: function object
+    :param tuple workerArgs: The remaining arguments for verifyAndDecode.
+    :param apply: This calls apply(interest, result, context) on the
+      processEvents thread for each interest in arrival order, where result is
+      the return value of verifyAndDecode and context is the value given to
+      submit().
+    :type apply: function object
+    :param int maxPendingNotifications: The maximum number of interests which
+      are queued before submit() blocks.
+    :param float pollMilliseconds: The delay for callLater to check again if
+      the oldest queued interest is not finished.
+    """
+    def __init__(self, executor, face, verifyAndDecode, workerArgs, apply,
+          maxPendingNotifications, pollMilliseconds):
+        self._executor = executor
+        self._face = face
+        self._verifyAndDecode = verifyAndDecode
+        self._workerArgs = workerArgs
+        self._apply = apply
+        self._maxPendingNotifications = max(1, maxPendingNotifications)
+        self._pollMilliseconds = pollMilliseconds
+        # Each item is (future, interest, context) in arrival order.
+        self._pending = deque()
+        self._isDrainScheduled = False
+        self._counters = {
+          'submitted': 0, 'applied': 0, 'blockedSubmits': 0,
+          'maxQueueLength': 0 }
+
+    def submit(self, interest, context = None):
+        """
+        Submit the interest to be verified and decoded by a worker. If the
+        queue is full, first wait for the oldest queued interest and apply it.
+
+        :param Interest interest: The received notification interest.
+        :param context: (optional) A value which is passed to apply.
+        """
+        if len(self._pending) >= self._maxPendingNotifications:
+            self._counters['blockedSubmits'] += 1
+            while len(self._pending) >= self._maxPendingNotifications:
+                self._applyOldest()
+
+        future = self._executor.submit(
+          self._verifyAndDecode, interest.wireEncode().toBytes(),
+          *self._workerArgs)
+        self._pending.append((future, interest, context))
+        self._counters['submitted'] += 1
+        self._counters['maxQueueLength'] = max(
+          self._counters['maxQueueLength'], len(self._pending))
+        self._scheduleDrain(0)
+
+    def drain(self, wait = False):
+        """
+        Apply the results of the queued interests which are finished, in
+        arrival order, stopping at the first one which is not finished.
+
+        :param bool wait: (optional) If True, wait for and apply all queued
+          interests. If omitted or False, don't wait.
+        :return: The number of interests still queued.
+        :rtype: int
+        """
+        while len(self._pending) > 0 and (wait or self._pending[0][0].done()):
+            self._applyOldest()
+        return len(self._pending)
+
+    def setWorkerArgs(self, workerArgs):
+        """
+        Set the remaining arguments for verifyAndDecode for the interests
+        submitted after this.
+
+        :param tuple workerArgs: The remaining arguments for verifyAndDecode.
+        """
+        self._workerArgs = workerArgs
+
+    def getCounters(self):
+        """
+        Get the pipeline counters. The dictionary keys are 'submitted' (the
+        number of interests given to the executor), 'applied' (the number of
+        results applied), 'blockedSubmits' (the number of calls to submit()
+        which waited because the queue was full), 'maxQueueLength' (the most
+        interests queued at once) and 'queueLength' (the number queued now).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        counters = dict(self._counters)
+        counters['queueLength'] = len(self._pending)
+        return counters
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _applyOldest(self):
+        """
+        Wait for the oldest queued interest, remove it and apply its result.
+        """
+        future, interest, context = self._pending.popleft()
+        try:
+            result = future.result()
+        except Exception:
+            logging.exception("Error verifying and decoding a notification")
+            result = None
+        self._counters['applied'] += 1
+        self._apply(interest, result, context)
+
+    def _scheduleDrain(self, delayMilliseconds):
+        if not self._isDrainScheduled:
+            self._isDrainScheduled = True
+            self._face.callLater(delayMilliseconds, self._onDrainTimeout)
+
+    def _onDrainTimeout(self):
+        self._isDrainScheduled = False
+        if self.drain() > 0:
+            # The oldest is not finished. Check again later.
+            self._scheduleDrain(self._pollMilliseconds)
@@ -0,0 +1,148 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+from pyndn.util.common import Common
+from pyndn.encoding.tlv.tlv import Tlv
+from pyndn.encoding.tlv.tlv_encoder import TlvEncoder
+from pyndn.encoding.tlv.tlv_decoder import TlvDecoder
+from svs.sync.state_vector_sync2018 import StateVectorSync2018
+
+class NotificationRecorder(object):
+    """
+    A NotificationRecorder writes received notification interests to a
+    capture file, for example for NotificationReplayer. Enable it with
+    StateVectorSync2018.setRecorder(). The file starts with a
+    TLV_StateVector_FormatVersion, followed by a TLV_CapturedNotification
+    for each interest with the microseconds since the previous interest (or
+    since the epoch for the first), the incoming face ID if known, and the
+    wire encoding of the interest. Records are buffered, so call close() (or
+    flush()) to write them.
+
+    :param str path: The path of the capture file, which is replaced.
+    """
+    def __init__(self, path):
+        self._file = open(path, 'wb')
+        self._previousTime = 0
+        self._nRecords = 0
+        versionEncoder = TlvEncoder(8)
+        versionEncoder.writeNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_FormatVersion,
+          NotificationRecorder.CAPTURE_VERSION)
+        self._file.write(versionEncoder.getOutput().tobytes())
+
+    def record(self, interest, nowMilliseconds = None):
+        """
+        Append the record for the received interest.
+
+        :param Interest interest: The received notification interest.
+        :param float nowMilliseconds: (optional) The time when the interest was
+          received in milliseconds since the epoch. If omitted, use
+          Common.getNowMilliseconds().
+        """
+        if nowMilliseconds == None:
+            nowMilliseconds = Common.getNowMilliseconds()
+        time = int(round(nowMilliseconds * 1000))
+        # Don't let a clock adjustment make a negative delta.
+        timeDelta = max(0, time - self._previousTime)
+        self._previousTime += timeDelta
+
+        wireEncoding = interest.wireEncode().buf()
+        encoder = TlvEncoder(len(wireEncoding) + 32)
+        saveLength = len(encoder)
+        encoder.writeBuffer(wireEncoding)
+        incomingFaceId = interest.getIncomingFaceId()
+        if incomingFaceId != None:
+            encoder.writeNonNegativeIntegerTlv(
+              StateVectorSync2018.TLV_CapturedNotification_IncomingFaceId,
+              incomingFaceId)
+        encoder.writeNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_CapturedNotification_TimeDelta, timeDelta)
+        encoder.writeTypeAndLength(
+          StateVectorSync2018.TLV_CapturedNotification,
+          len(encoder) - saveLength)
+        self._file.write(encoder.getOutput().tobytes())
+        self._nRecords += 1
+
+    def getRecordCount(self):
+        """
+        Get the number of interests recorded.
+
+        :rtype: int
+        """
+        return self._nRecords
+
+    def flush(self):
+        """
+        Write the buffered records to the file.
+        """
+        self._file.flush()
+
+    def close(self):
+        """
+        Write the buffered records and close the file.
+        """
+        self._file.close()
+
+    @staticmethod
+    def readCapture(path):
+        """
+        Read the records of a capture file, stopping at a record which is cut
+        short, for example if the recorder was not closed.
+
+        :param str path: The path of the capture file.
+        :return: The list of (timeMilliseconds, incomingFaceId, wireEncoding)
+          for each record where timeMilliseconds is since the epoch,
+          incomingFaceId is None if not known, and wireEncoding is the bytes of
+          the interest.
+        :rtype: list<(float, int, bytes)>
+        :raises ValueError: If the file does not start with a supported
+          version.
+        """
+        with open(path, 'rb') as captureFile:
+            input = captureFile.read()
+        decoder = TlvDecoder(memoryview(input))
+        version = decoder.readNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_FormatVersion)
+        if version != NotificationRecorder.CAPTURE_VERSION:
+            raise ValueError(
+              "Unsupported notification capture version " + str(version))
+
+        records = []
+        time = 0
+        while decoder.getOffset() < len(input):
+            try:
+                endOffset = decoder.readNestedTlvsStart(
+                  StateVectorSync2018.TLV_CapturedNotification)
+                timeDelta = decoder.readNonNegativeIntegerTlv(
+                  StateVectorSync2018.TLV_CapturedNotification_TimeDelta)
+                incomingFaceId = decoder.readOptionalNonNegativeIntegerTlv(
+                  StateVectorSync2018.TLV_CapturedNotification_IncomingFaceId,
+                  endOffset)
+                interestOffset = decoder.getOffset()
+                interestEndOffset = decoder.readNestedTlvsStart(Tlv.Interest)
+                decoder.seek(interestEndOffset)
+                decoder.finishNestedTlvs(endOffset)
+            except ValueError:
+                break
+            time += timeDelta
+            records.append((time / 1000.0, incomingFaceId,
+                            input[interestOffset:interestEndOffset]))
+
+        return records
+
+    CAPTURE_VERSION = 1
@@ -0,0 +1,123 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import time
+from pyndn.interest import Interest
+from pyndn.lp.lp_packet import LpPacket
+from pyndn.lp.incoming_face_id import IncomingFaceId
+from pyndn.util.blob import Blob
+from svs.sync.notification_recorder import NotificationRecorder
+
+class NotificationReplayer(object):
+    """
+    A NotificationReplayer feeds the interests of a capture file from
+    NotificationRecorder to a StateVectorSync2018 as if they were received,
+    either at the original timing or as fast as possible. The interests are
+    read and decoded when this is created, so that replay() only measures
+    processing them.
+
+    :param str path: The path of the capture file.
+    :raises ValueError: If the file does not start with a supported version,
+      or a recorded interest is not a valid encoding.
+    """
+    def __init__(self, path):
+        # The list of (timeMilliseconds, interest).
+        self._interests = []
+        self._nBytes = 0
+        for timeMilliseconds, incomingFaceId, wireEncoding in (
+              NotificationRecorder.readCapture(path)):
+            interest = Interest()
+            interest.wireDecode(Blob(wireEncoding, False))
+            if incomingFaceId != None:
+                field = IncomingFaceId()
+                field.setFaceId(incomingFaceId)
+                lpPacket = LpPacket()
+                lpPacket.addHeaderField(field)
+                interest.setLpPacket(lpPacket)
+            self._interests.append((timeMilliseconds, interest))
+            self._nBytes += len(wireEncoding)
+
+    def getInterestCount(self):
+        """
+        Get the number of interests in the capture.
+
+        :rtype: int
+        """
+        return len(self._interests)
+
+    def getCaptureMilliseconds(self):
+        """
+        Get the time from the first to the last interest in the capture.
+
+        :rtype: float
+        """
+        if len(self._interests) == 0:
+            return 0.0
+        return self._interests[-1][0] - self._interests[0][0]
+
+    def replay(self, sync, speed = 0.0, processEvents = None):
+        """
+        Call sync._onInterest for each interest in the capture, in order.
+
+        :param StateVectorSync2018 sync: The sync object which receives the
+          interests. Its face can be a real Face or one which sends nothing.
+        :param float speed: (optional) If 0 or omitted, replay as fast as
+          possible. Otherwise, wait until the time of each interest from the
+          start of the capture divided by speed, so that 1.0 is the original
+          timing and 2.0 is twice as fast.
+        :param processEvents: (optional) If not None, call processEvents() after
+          each interest and while waiting for the next, for example
+          face.processEvents so that the timers of sync run.
+        :type processEvents: function object
+        :return: A dictionary with the keys 'interests' (the number of
+          interests replayed), 'bytes' (their total wire encoding size),
+          'seconds' (the elapsed time of the replay), 'interestsPerSecond'
+          and 'stateVector' (the final state vector of sync as a dictionary of
+          member ID to sequence number).
+        :rtype: dict
+        """
+        startTime = time.perf_counter()
+        if len(self._interests) > 0:
+            firstTime = self._interests[0][0]
+        for timeMilliseconds, interest in self._interests:
+            if speed > 0:
+                dueTime = (startTime +
+                           (timeMilliseconds - firstTime) / 1000.0 / speed)
+                while True:
+                    delay = dueTime - time.perf_counter()
+                    if delay <= 0:
+                        break
+                    if processEvents != None:
+                        processEvents()
+                        # Keep calling processEvents, as an application does.
+                        delay = min(delay, 0.01)
+                    time.sleep(delay)
+
+            sync._onInterest(None, interest, None, 0, None)
+            if processEvents != None:
+                processEvents()
+        seconds = time.perf_counter() - startTime
+
+        return {
+          'interests': len(self._interests), 'bytes': self._nBytes,
+          'seconds': seconds,
+          'interestsPerSecond':
+            len(self._interests) / seconds if seconds > 0 else 0.0,
+          'stateVector': dict(
+            (memberId, sync.getProducerSequenceNo(memberId))
+            for memberId in sync.getProducerPrefixes()) }
@@ -0,0 +1,90 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import hashlib
+import hmac
+from pyndn.name import Name
+from pyndn.hmac_with_sha256_signature import HmacWithSha256Signature
+from pyndn.key_locator import KeyLocatorType
+from pyndn.encoding.wire_format import WireFormat
+from pyndn.encoding.tlv.tlv import Tlv
+from pyndn.util.blob import Blob
+
+class NotificationSigner(object):
+    """
+    A NotificationSigner signs and verifies notification interests with
+    HmacWithSha256, giving the same result as KeyChain.signWithHmacWithSha256
+    and KeyChain.verifyInterestWithHmacWithSha256. The keyed HMAC state and the
+    encoded SignatureInfo name component are computed once in the constructor,
+    and each signature starts from a copy of the HMAC state.
+
+    :param Blob hmacKey: The shared key for the HmacWithSha256.
+    :param Name keyName: The name of the key for the KeyLocator in the
+      SignatureInfo.
+    """
+    def __init__(self, hmacKey, keyName):
+        self._hmac = hmac.new(hmacKey.toBytes(), digestmod = hashlib.sha256)
+
+        signature = HmacWithSha256Signature()
+        signature.getKeyLocator().setType(KeyLocatorType.KEYNAME)
+        signature.getKeyLocator().setKeyName(keyName)
+        self._signatureInfo = Name.Component(
+          WireFormat.getDefaultWireFormat().encodeSignatureInfo(signature))
+
+    def sign(self, interest):
+        """
+        Append the SignatureInfo and SignatureValue name components to the
+        interest name, like KeyChain.signWithHmacWithSha256.
+
+        :param Interest interest: The interest to sign. This modifies its name.
+        """
+        name = interest.getName()
+        name.append(self._signatureInfo)
+        # Append an empty signature so that the "signedPortion" is correct.
+        name.append(Name.Component())
+
+        # Encode once to get the signed portion and sign.
+        signer = self._hmac.copy()
+        signer.update(interest.wireEncode().signedBuf())
+        digest = signer.digest()
+
+        # Remove the empty signature and append the SignatureValue TLV. The
+        # digest length is 32, so the type and length are each one byte.
+        interest.setName(name.getPrefix(-1).append(Blob(
+          bytearray([Tlv.SignatureValue, len(digest)]) + digest, False)))
+
+    def verify(self, interest):
+        """
+        Compute the HmacWithSha256 for all but the final name component of the
+        interest and verify it against the signature value in the final name
+        component.
+
+        :param Interest interest: The interest to verify.
+        :return: True if the signature verifies, otherwise False.
+        :rtype: bool
+        :raises ValueError: If the final name components can't be decoded.
+        """
+        name = interest.getName()
+        signature = WireFormat.getDefaultWireFormat().decodeSignatureInfoAndValue(
+          name.get(-2).getValue().buf(), name.get(-1).getValue().buf())
+
+        # wireEncode returns the cached encoding if available.
+        signer = self._hmac.copy()
+        signer.update(interest.wireEncode().signedBuf())
+        return hmac.compare_digest(
+          signer.digest(), signature.getSignature().toBytes())
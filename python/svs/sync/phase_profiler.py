@@ -0,0 +1,178 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import marshal
+from collections import deque
+from collections import OrderedDict
+
+class PhaseProfiler(object):
+    """
+    A PhaseProfiler aggregates the times of nested phases, such as the phases
+    of StateVectorSync2018 when enabled with setProfiler(). Each phase is
+    identified by its path, the tuple of the names of the enclosing phases
+    and its own name, for example ("onInterest", "merge"). For each path, this
+    keeps the count, the total seconds and the most recent times for
+    percentiles. The report can be written as collapsed stacks for flame
+    graph tools or as a pstats file for cProfile tools. The methods are not
+    thread safe, so use the profiler in the thread which records the phases.
+
+    :param int maxSamples: (optional) The number of most recent times kept
+      for each path to compute percentiles. If omitted, use 10000.
+    """
+    def __init__(self, maxSamples = 10000):
+        self._maxSamples = maxSamples
+        # The dictionary key is the path tuple. The value is the list
+        # [count, totalSeconds, samples] where samples is a deque of seconds.
+        self._phases = OrderedDict()
+
+    def record(self, path, seconds):
+        """
+        Record the time of one run of the phase with the path.
+
+        :param tuple<str> path: The names of the enclosing phases and the
+          phase.
+        :param float seconds: The time of the phase in seconds.
+        """
+        phase = self._phases.get(path)
+        if phase == None:
+            phase = [0, 0.0, deque(maxlen = self._maxSamples)]
+            self._phases[path] = phase
+        phase[0] += 1
+        phase[1] += seconds
+        phase[2].append(seconds)
+
+    def reset(self):
+        """
+        Remove all the recorded times.
+        """
+        self._phases.clear()
+
+    def getSummary(self, percentiles = [50, 90, 99]):
+        """
+        Get the summary of each phase path.
+
+        :param list<float> percentiles: (optional) The percentiles to compute
+          from the most recent times. If omitted, use [50, 90, 99].
+        :return: A new dictionary where the key is the path joined with ";",
+          such as "onInterest;merge", and the value is a dictionary with the
+          keys 'count', 'totalSeconds', 'maxSeconds' and "p" plus each
+          percentile, such as 'p99', in seconds. 'maxSeconds' is of the most
+          recent times.
+        :rtype: dict<str,dict>
+        """
+        summary = OrderedDict()
+        for path, (count, totalSeconds, samples) in self._phases.items():
+            sortedSamples = sorted(samples)
+            phaseSummary = { 'count': count, 'totalSeconds': totalSeconds,
+                             'maxSeconds': sortedSamples[-1] }
+            for percentile in percentiles:
+                # Use the nearest rank.
+                index = max(0, -(-len(sortedSamples) * percentile // 100) - 1)
+                phaseSummary['p' + str(percentile)] = sortedSamples[int(index)]
+            summary[";".join(path)] = phaseSummary
+        return summary
+
+    def getCollapsedStacks(self):
+        """
+        Get the report in the collapsed stack format of flamegraph.pl, which is
+        also read by speedscope and inferno. Each line is the path joined with
+        ";" and the self time in microseconds, which is the total time of the
+        path minus the total time of the phases inside it.
+
+        :return: The report text.
+        :rtype: str
+        """
+        lines = []
+        for path, selfSeconds in self._getSelfSeconds().items():
+            lines.append(";".join(path) + " " +
+                         str(int(round(selfSeconds * 1000000))))
+        lines.append("")
+        return "\n".join(lines)
+
+    def dumpCollapsedStacks(self, filePath):
+        """
+        Write getCollapsedStacks() to a file, for example for
+        "flamegraph.pl <filePath> > phases.svg".
+
+        :param str filePath: The path of the file.
+        """
+        with open(filePath, 'w') as stacksFile:
+            stacksFile.write(self.getCollapsedStacks())
+
+    def dumpStats(self, filePath):
+        """
+        Write the report in the format of cProfile.Profile.dump_stats, so that
+        pstats.Stats, snakeviz or gprof2dot can read it. Each phase name is a
+        function in the file "phase" which is called by its enclosing phase.
+        The times of a phase name under different enclosing phases are added
+        together.
+
+        :param str filePath: The path of the file.
+        """
+        selfSeconds = self._getSelfSeconds()
+        # The dictionary key is the function tuple (file, line, name). The
+        # value is the list [count, selfSeconds, totalSeconds, callers] where
+        # callers is a dictionary from the caller function tuple to the list
+        # [count, count, selfSeconds, totalSeconds].
+        stats = {}
+        for path, (count, totalSeconds, samples) in self._phases.items():
+            function = PhaseProfiler._makeFunction(path[-1])
+            functionStats = stats.get(function)
+            if functionStats == None:
+                functionStats = [0, 0.0, 0.0, {}]
+                stats[function] = functionStats
+            functionStats[0] += count
+            functionStats[1] += selfSeconds[path]
+            # A phase name inside itself is counted once in the total time.
+            if not path[-1] in path[:-1]:
+                functionStats[2] += totalSeconds
+            if len(path) > 1:
+                caller = PhaseProfiler._makeFunction(path[-2])
+                callerStats = functionStats[3].setdefault(
+                  caller, [0, 0, 0.0, 0.0])
+                callerStats[0] += count
+                callerStats[1] += count
+                callerStats[2] += selfSeconds[path]
+                callerStats[3] += totalSeconds
+
+        with open(filePath, 'wb') as statsFile:
+            marshal.dump(dict(
+              (function, (count, count, selfTime, totalTime,
+                          dict((caller, tuple(callerStats))
+                               for caller, callerStats in callers.items())))
+              for function, (count, selfTime, totalTime, callers)
+                in stats.items()), statsFile)
+
+    def _getSelfSeconds(self):
+        """
+        Return an OrderedDict where the key is each path and the value is its
+        total seconds minus the total seconds of the paths directly inside it.
+        """
+        selfSeconds = OrderedDict(
+          (path, phase[1]) for path, phase in self._phases.items())
+        for path, phase in self._phases.items():
+            parent = path[:-1]
+            if parent in selfSeconds:
+                selfSeconds[parent] -= phase[1]
+        for path in selfSeconds:
+            selfSeconds[path] = max(0.0, selfSeconds[path])
+        return selfSeconds
+
+    @staticmethod
+    def _makeFunction(name):
+        return ("phase", 0, name)
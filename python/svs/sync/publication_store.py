@@ -0,0 +1,366 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import logging
+from collections import deque
+from pyndn.name import Name
+from pyndn.data import Data
+from pyndn.util.common import Common
+from svs.sync.sequence_fetcher import SequenceFetcher
+from svs.sync.state_vector_sync2018 import StateVectorSync2018
+
+class PublicationStore(object):
+    """
+    A PublicationStore keeps the recent data packets published by a
+    StateVectorSync2018 member and answers interests for them. It registers
+    the member's application data prefix and replies to an interest whose last
+    name component is a stored sequence number, leaving the member ID alias
+    lookups under the same prefix to the sync object. The packets are kept in a
+    ring buffer where the slot is the sequence number modulo maxCount, so a
+    lookup is one index and a new packet replaces the one maxCount sequence
+    numbers before it. The oldest packets are also evicted to keep the total encoding
+    size within maxBytes and to drop packets older than maxAgeMilliseconds.
+    Each packet is signed once when it is published, and its wire encoding is
+    kept with it so that every interest for it is answered without signing or
+    encoding again. To keep the signing time out of publish(), use
+    setSigningExecutor.
+    All methods must be called in the same thread as processEvents.
+
+    :param StateVectorSync2018 sync: The StateVectorSync2018 whose sequence
+      numbers are published.
+    :param Face face: The Face for registering the prefix and putting data.
+    :param KeyChain keyChain: The key chain for publish() to sign a data
+      packet with keyChain.sign(data, signingParams). If None, publish()
+      doesn't sign.
+    :param signingParams: The signing parameters for keyChain.sign, such as a
+      SigningInfo or a certificate name.
+    :param int maxCount: (optional) The maximum number of packets to keep. If
+      omitted, use 1000.
+    :param int maxBytes: (optional) The maximum total size of the packet
+      encodings. If omitted or 0, don't limit the size.
+    :param float maxAgeMilliseconds: (optional) The time after adding a packet
+      to evict it. If omitted or 0, don't limit the age.
+    :param makeDataName: (optional) This calls
+      makeDataName(dataPrefix, sequenceNo) to get the Name of a data packet,
+      whose last component must be the sequence number as a decimal string.
+      If omitted or None, use SequenceFetcher.makeDefaultDataName.
+    :type makeDataName: function object
+    :param onRegisterFailed: (optional) If failed to register the application
+      data prefix, this calls onRegisterFailed(prefix). If omitted or None,
+      log it.
+    :type onRegisterFailed: function object
+    """
+    def __init__(self, sync, face, keyChain, signingParams, maxCount = 1000,
+          maxBytes = 0, maxAgeMilliseconds = 0.0, makeDataName = None,
+          onRegisterFailed = None):
+        self._sync = sync
+        self._face = face
+        self._keyChain = keyChain
+        self._signingParams = signingParams
+        self._maxCount = max(1, maxCount)
+        self._maxBytes = maxBytes
+        self._maxAgeMilliseconds = maxAgeMilliseconds
+        self._makeDataName = (makeDataName if makeDataName != None
+                              else SequenceFetcher.makeDefaultDataName)
+        self._dataPrefixUri = sync.getApplicationDataPrefix()
+        # The sync object answers member ID alias lookups under the data
+        # prefix, so they are not counted as misses.
+        self._aliasLookupPrefix = Name(self._dataPrefixUri).append(
+          StateVectorSync2018.ALIAS_LOOKUP_COMPONENT)
+
+        # Each slot is None or (sequenceNo, data, size, addTime).
+        self._slots = [None] * self._maxCount
+        # No stored sequence number is less than _oldestSequenceNo.
+        self._oldestSequenceNo = 0
+        self._newestSequenceNo = -1
+        self._nItems = 0
+        self._nBytes = 0
+        self._counters = {
+          'hits': 0, 'misses': 0, 'evictions': 0, 'signed': 0,
+          'delayedInterests': 0 }
+
+        # Background signing is off until setSigningExecutor is called.
+        self._signingExecutor = None
+        self._pollMilliseconds = 1.0
+        # Each item is (future, sequenceNo) in publish order.
+        self._pendingSignatures = deque()
+        # The dictionary key is the sequence number of a packet which is being
+        # signed. The value is the list of (face, interest) waiting for it.
+        self._waitingInterests = {}
+        self._isDrainScheduled = False
+
+        self._registeredPrefixId = self._face.registerPrefix(
+          Name(self._dataPrefixUri), self._onInterest,
+          onRegisterFailed if onRegisterFailed != None
+            else PublicationStore._onRegisterFailed)
+
+    def publish(self, content, freshnessPeriod = None):
+        """
+        Make a data packet with the content for the next sequence number, sign
+        it and add it, then call publishNextSequenceNo() of the
+        StateVectorSync2018 so that the packet is stored before the
+        notification is sent. If setSigningExecutor enabled background
+        signing, the packet is signed on a worker and added when it is done,
+        and an interest which arrives before then waits for it.
+
+        :param content: The content of the data packet.
+        :type content: Blob or an array which can be converted to a Blob
+        :param float freshnessPeriod: (optional) The freshness period of the
+          data packet in milliseconds. If omitted or None, don't set it.
+        :return: The new sequence number.
+        :rtype: int
+        """
+        sequenceNo = self._sync.getSequenceNo() + 1
+        data = Data(self._makeDataName(self._dataPrefixUri, sequenceNo))
+        data.setContent(content)
+        if freshnessPeriod != None:
+            data.getMetaInfo().setFreshnessPeriod(freshnessPeriod)
+        if self._keyChain == None:
+            self.add(sequenceNo, data)
+        elif self._signingExecutor != None:
+            self._pendingSignatures.append((self._signingExecutor.submit(
+              self._signAndEncode, data), sequenceNo))
+            self._waitingInterests[sequenceNo] = []
+            self._scheduleDrain(0)
+        else:
+            self.add(sequenceNo, self._signAndEncode(data))
+            self._counters['signed'] += 1
+
+        self._sync.publishNextSequenceNo()
+        return sequenceNo
+
+    def setSigningExecutor(self, executor, pollMilliseconds = 1.0):
+        """
+        Enable or disable background signing. When enabled, publish() signs
+        and encodes each packet on a worker of the executor instead of
+        waiting for the signature. The KeyChain is used by the workers, so the
+        executor must be a thread pool such as a concurrent.futures
+        ThreadPoolExecutor. The signed packets are added on the processEvents
+        thread from a face.callLater callback. The application owns the
+        executor and should shut it down after disabling background signing.
+
+        :param executor: The executor with a submit(function, *args) method
+          which returns a future, or None to disable background signing. When
+          disabling, this first waits for the packets which are being signed.
+        :param float pollMilliseconds: (optional) The delay for callLater to
+          check again if the oldest packet is not signed yet. If omitted, use
+          1.
+        """
+        if self._signingExecutor != None:
+            self._drain(True)
+        self._signingExecutor = executor
+        self._pollMilliseconds = pollMilliseconds
+
+    def add(self, sequenceNo, data):
+        """
+        Add the signed data packet for the sequence number, evicting packets as
+        needed. Use this instead of publish() if the application makes the
+        packet and calls publishNextSequenceNo() itself.
+
+        :param int sequenceNo: The sequence number, which must not be less than
+          the last one added. If it is the same, replace the packet.
+        :param Data data: The data packet. Its name must be what makeDataName
+          returns for the sequence number.
+        :raises ValueError: If sequenceNo is less than the last one added.
+        """
+        if sequenceNo < self._newestSequenceNo:
+            raise ValueError(
+              "PublicationStore.add: The sequence number " + str(sequenceNo) +
+              " is less than the last one added")
+
+        index = sequenceNo % self._maxCount
+        if self._slots[index] != None:
+            self._evict(index, self._slots[index][0] != sequenceNo)
+
+        size = data.wireEncode().size()
+        self._slots[index] = (sequenceNo, data, size, Common.getNowMilliseconds())
+        self._nItems += 1
+        self._nBytes += size
+        self._newestSequenceNo = sequenceNo
+        self._evictOldest()
+
+    def get(self, sequenceNo):
+        """
+        Get the stored data packet for the sequence number.
+
+        :param int sequenceNo: The sequence number.
+        :return: The data packet, or None if it is not stored or has expired.
+        :rtype: Data
+        """
+        entry = self._slots[sequenceNo % self._maxCount]
+        if entry == None or entry[0] != sequenceNo:
+            return None
+        if (self._maxAgeMilliseconds > 0 and
+            Common.getNowMilliseconds() - entry[3] > self._maxAgeMilliseconds):
+            return None
+        return entry[1]
+
+    def getCounters(self):
+        """
+        Get the store counters. The dictionary keys are 'items' (the number of
+        stored packets), 'bytes' (their total encoding size), 'hits' (the
+        number of interests answered), 'misses' (the number of interests for a
+        packet which is not stored), 'evictions' (the number of packets
+        evicted), 'signed' (the number of packets signed) and
+        'delayedInterests' (the number of interests which waited for a packet
+        to be signed).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        counters = dict(self._counters)
+        counters['items'] = self._nItems
+        counters['bytes'] = self._nBytes
+        return counters
+
+    def shutdown(self):
+        """
+        Remove the registered prefix so that this does not answer interests
+        anymore.
+        """
+        self._face.removeRegisteredPrefix(self._registeredPrefixId)
+
+    def __len__(self):
+        return self._nItems
+
+    def _evict(self, index, isEviction = True):
+        """
+        Remove the packet in the slot at index.
+        """
+        self._nItems -= 1
+        self._nBytes -= self._slots[index][2]
+        self._slots[index] = None
+        if isEviction:
+            self._counters['evictions'] += 1
+
+    def _evictOldest(self):
+        """
+        Evict the oldest packets while the total size is more than maxBytes or
+        the oldest is older than maxAgeMilliseconds.
+        """
+        if self._maxBytes <= 0 and self._maxAgeMilliseconds <= 0:
+            return
+
+        now = Common.getNowMilliseconds()
+        # Sequence numbers before this were replaced in their slot.
+        self._oldestSequenceNo = max(
+          self._oldestSequenceNo, self._newestSequenceNo - self._maxCount + 1)
+        while self._nItems > 0:
+            index = self._oldestSequenceNo % self._maxCount
+            entry = self._slots[index]
+            if entry == None or entry[0] != self._oldestSequenceNo:
+                self._oldestSequenceNo += 1
+                continue
+
+            if not ((self._maxBytes > 0 and self._nBytes > self._maxBytes) or
+                    (self._maxAgeMilliseconds > 0 and
+                     now - entry[3] > self._maxAgeMilliseconds)):
+                break
+            self._evict(index)
+            self._oldestSequenceNo += 1
+
+    def _signAndEncode(self, data):
+        """
+        Sign the data packet and encode it so that the wire encoding is cached.
+        This runs on a worker if background signing is enabled.
+
+        :return: The data packet.
+        :rtype: Data
+        """
+        self._keyChain.sign(data, self._signingParams)
+        data.wireEncode()
+        return data
+
+    def _scheduleDrain(self, delayMilliseconds):
+        if not self._isDrainScheduled:
+            self._isDrainScheduled = True
+            self._face.callLater(delayMilliseconds, self._onDrainTimeout)
+
+    def _onDrainTimeout(self):
+        self._isDrainScheduled = False
+        if self._drain() > 0:
+            # The oldest is not signed yet. Check again later.
+            self._scheduleDrain(self._pollMilliseconds)
+
+    def _drain(self, wait = False):
+        """
+        Add the signed packets in publish order and answer the interests
+        waiting for them, stopping at the first one which is not signed.
+
+        :param bool wait: (optional) If True, wait for all packets.
+        :return: The number of packets still being signed.
+        :rtype: int
+        """
+        while (len(self._pendingSignatures) > 0 and
+               (wait or self._pendingSignatures[0][0].done())):
+            future, sequenceNo = self._pendingSignatures.popleft()
+            waitingInterests = self._waitingInterests.pop(sequenceNo)
+            try:
+                data = future.result()
+            except Exception:
+                logging.exception(
+                  "Error signing the data packet for sequence number %s",
+                  sequenceNo)
+                # The packet is not stored, so the waiting interests are misses.
+                for face, interest in waitingInterests:
+                    self._putData(face, interest, None)
+                continue
+
+            self._counters['signed'] += 1
+            self.add(sequenceNo, data)
+            for face, interest in waitingInterests:
+                self._putData(face, interest, data)
+        return len(self._pendingSignatures)
+
+    def _onInterest(self, prefix, interest, face, interestFilterId, filter):
+        name = interest.getName()
+        if self._aliasLookupPrefix.isPrefixOf(name):
+            return
+
+        data = None
+        if name.size() > 0:
+            try:
+                sequenceNo = int(name.get(-1).toEscapedString())
+            except ValueError:
+                sequenceNo = -1
+            if sequenceNo >= 0:
+                waitingInterests = self._waitingInterests.get(sequenceNo)
+                if waitingInterests != None:
+                    self._counters['delayedInterests'] += 1
+                    waitingInterests.append((face, interest))
+                    return
+                data = self.get(sequenceNo)
+        self._putData(face, interest, data)
+
+    def _putData(self, face, interest, data):
+        """
+        Send the data packet if it matches the interest name, and count a hit
+        or a miss.
+        """
+        name = interest.getName()
+        if data is None or not data.getName().equals(name):
+            self._counters['misses'] += 1
+            return
+
+        self._counters['hits'] += 1
+        face.putData(data)
+
+    @staticmethod
+    def _onRegisterFailed(prefix):
+        logging.getLogger(__name__).info(
+          "Register failed for the application data prefix %s", prefix.toUri())
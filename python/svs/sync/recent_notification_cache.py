@@ -0,0 +1,135 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import hashlib
+from collections import OrderedDict
+from pyndn.util.common import Common
+from pyndn.encoding.tlv.tlv import Tlv
+from pyndn.encoding.tlv.tlv_decoder import TlvDecoder
+
+class RecentNotificationCache(object):
+    """
+    A RecentNotificationCache remembers the names of recently processed
+    notification interests so that a duplicate does not need to be verified
+    and decoded again. Each name has a value such as the result of processing
+    the notification. The cache holds at most maxEntries names, evicting the
+    least recently seen, and forgets a name ttlMilliseconds after it was
+    added.
+
+    :param int maxEntries: The maximum number of names to remember.
+    :param float ttlMilliseconds: The time in milliseconds to remember a name.
+    """
+    def __init__(self, maxEntries, ttlMilliseconds):
+        self._maxEntries = maxEntries
+        self._ttlMilliseconds = ttlMilliseconds
+        # The key is the digest of the name. The value is the tuple of
+        # (expirationTime, value). The order is from least to most recently
+        # seen.
+        self._entries = OrderedDict()
+        self._nHits = 0
+        self._nMisses = 0
+
+    @staticmethod
+    def getNameDigest(interest):
+        """
+        Get the key for a notification interest. This is a SHA-256 digest of
+        the encoding of the full name, including the signature, so that a name
+        with a changed component does not match. To avoid encoding the name
+        again, this takes the name from the wire encoding of the interest,
+        which is already stored when the interest was received.
+
+        :param Interest interest: The notification interest.
+        :return: The digest.
+        :rtype: bytes
+        """
+        encoding = interest.wireEncode().buf()
+        decoder = TlvDecoder(encoding)
+        decoder.readNestedTlvsStart(Tlv.Interest)
+        nameOffset = decoder.getOffset()
+        nameEndOffset = decoder.readNestedTlvsStart(Tlv.Name)
+        return hashlib.sha256(encoding[nameOffset:nameEndOffset]).digest()
+
+    def get(self, nameDigest):
+        """
+        Get the value for the name with nameDigest if it was added and has not
+        expired or been evicted. Count a hit or a miss, and if it is a hit,
+        mark it as most recently seen.
+
+        :param bytes nameDigest: The digest from getNameDigest().
+        :return: The value given to add(), or None if the name is not in the
+          cache.
+        """
+        entry = self._entries.get(nameDigest)
+        if entry != None:
+            if entry[0] > Common.getNowMilliseconds():
+                self._nHits += 1
+                self._entries.move_to_end(nameDigest)
+                return entry[1]
+            del self._entries[nameDigest]
+
+        self._nMisses += 1
+        return None
+
+    def contains(self, nameDigest):
+        """
+        Check if the name with nameDigest was added and has not expired or been
+        evicted. This counts a hit or a miss the same as get().
+
+        :param bytes nameDigest: The digest from getNameDigest().
+        :return: True if the name is in the cache.
+        :rtype: bool
+        """
+        return self.get(nameDigest) != None
+
+    def add(self, nameDigest, value = True):
+        """
+        Add the name with nameDigest, then remove expired names from the least
+        recently seen end and evict names over maxEntries. If the name is
+        already in the cache, replace its value and expiration time.
+
+        :param bytes nameDigest: The digest from getNameDigest().
+        :param value: (optional) The value to return from get(), which must
+          not be None. If omitted, use True.
+        """
+        now = Common.getNowMilliseconds()
+        self._entries[nameDigest] = (now + self._ttlMilliseconds, value)
+        self._entries.move_to_end(nameDigest)
+
+        while len(self._entries) > 0:
+            oldestDigest = next(iter(self._entries))
+            if (len(self._entries) <= self._maxEntries and
+                self._entries[oldestDigest][0] > now):
+                break
+            del self._entries[oldestDigest]
+
+    def getCounters(self):
+        """
+        Get the hit and miss counters. The dictionary keys are 'hits' (the
+        number of calls to get() or contains() which found the name), 'misses'
+        (the number which did not) and 'size' (the number of names in the
+        cache).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        return {
+          'hits': self._nHits, 'misses': self._nMisses,
+          'size': len(self._entries) }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,337 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import logging
+from collections import deque
+from pyndn.name import Name
+from pyndn.interest import Interest
+
+class SequenceFetcher(object):
+    """
+    A SequenceFetcher fetches the data for every sequence number of each member
+    up to the latest one reported by StateVectorSync2018, instead of only the
+    latest. For each member, it remembers the last sequence number delivered to
+    the application, and when a higher sequence number is reported it
+    expresses an interest for each one in the gap. The number of interests in
+    flight for all members is limited by a window which grows by one for each
+    received data packet (up to a slow start threshold, then by 1/window) and
+    is halved on a timeout, as in TCP congestion control. An interest which
+    times out or is nacked is retried up to maxRetries times. The data is
+    delivered to the application in order of sequence number for each member.
+    All methods must be called in the same thread as processEvents.
+
+    To use it, pass onReceivedSyncState as the onReceivedSyncState callback to
+    StateVectorSync2018, or call it from that callback.
+
+    :param Face face: The Face for calling expressInterest.
+    :param onData: For each fetched sequence number in order, this calls
+      onData(dataPrefix, sequenceNo, data) where dataPrefix is the member's
+      data prefix URI string and data is the Data packet.
+      NOTE: The library will log any exceptions raised by this callback, but
+      for better error handling the callback should catch and properly
+      handle any exceptions.
+    :type onData: function object
+    :param onFailed: (optional) If all tries for a sequence number time out,
+      this calls onFailed(dataPrefix, sequenceNo) in its place in the order,
+      and the following sequence numbers are still delivered. If omitted or
+      None, skip it.
+    :type onFailed: function object
+    :param float interestLifetime: (optional) The interest lifetime in
+      milliseconds. If omitted, use 4000.
+    :param int maxRetries: (optional) The number of times to retry an interest
+      after the first one times out. If omitted, use 3.
+    :param float initialWindow: (optional) The initial number of interests in
+      flight. If omitted, use 4.
+    :param float maxWindow: (optional) The maximum number of interests in
+      flight. If omitted, use 64.
+    :param makeDataName: (optional) This calls
+      makeDataName(dataPrefix, sequenceNo) to get the Name of the data packet.
+      If omitted or None, use makeDefaultDataName.
+    :type makeDataName: function object
+    """
+    def __init__(self, face, onData, onFailed = None, interestLifetime = 4000.0,
+          maxRetries = 3, initialWindow = 4.0, maxWindow = 64.0,
+          makeDataName = None):
+        self._face = face
+        self._onData = onData
+        self._onFailed = onFailed
+        self._interestLifetime = interestLifetime
+        self._maxRetries = maxRetries
+        self._maxWindow = float(maxWindow)
+        self._window = min(float(initialWindow), self._maxWindow)
+        self._slowStartThreshold = self._maxWindow
+        self._makeDataName = (makeDataName if makeDataName != None
+                              else SequenceFetcher.makeDefaultDataName)
+
+        # The dictionary key is the member's data prefix URI. The value is the
+        # SequenceFetcher._Member.
+        self._members = {}
+        # The members which have sequence numbers to request, in round-robin
+        # order.
+        self._queuedMembers = deque()
+        # The timed out interests to express again before new ones. Each item
+        # is (member, sequenceNo, nRetries).
+        self._retries = deque()
+        self._nInFlight = 0
+        # Incremented for each interest expressed. The window is halved only
+        # for a timed out interest which was expressed after the last
+        # decrease, so that timeouts of interests in flight at the same time
+        # count as one loss.
+        self._nExpressed = 0
+        self._recoveryExpressNo = 0
+        self._counters = {
+          'interests': 0, 'retransmissions': 0, 'data': 0, 'timeouts': 0,
+          'delivered': 0, 'failed': 0 }
+
+    class _Member(object):
+        """
+        A _Member holds the fetch state of one member.
+        """
+        __slots__ = ['dataPrefix', 'deliveredSequenceNo', 'nextSequenceNo',
+                     'targetSequenceNo', 'received', 'isQueued']
+
+        def __init__(self, dataPrefix):
+            self.dataPrefix = dataPrefix
+            # The last sequence number given to onData or onFailed.
+            self.deliveredSequenceNo = -1
+            # The next sequence number to request for the first time.
+            self.nextSequenceNo = 0
+            # The highest sequence number to fetch.
+            self.targetSequenceNo = -1
+            # The dictionary key is a sequence number after
+            # deliveredSequenceNo. The value is the received Data, or None if
+            # fetching failed.
+            self.received = {}
+            self.isQueued = False
+
+    def onReceivedSyncState(self, syncStates):
+        """
+        Call fetch for each sync state. This can be the onReceivedSyncState
+        callback of StateVectorSync2018.
+
+        :param list<StateVectorSync2018.SyncState> syncStates: The sync states.
+        """
+        for syncState in syncStates:
+            self.fetch(syncState.getDataPrefix(), syncState.getSequenceNo())
+
+    def fetch(self, dataPrefix, sequenceNo):
+        """
+        Fetch each sequence number of the member after the ones already
+        requested, up to sequenceNo.
+
+        :param str dataPrefix: The member's data prefix URI string (its member
+          ID).
+        :param int sequenceNo: The latest sequence number of the member.
+        """
+        member = self._getMember(dataPrefix)
+        if sequenceNo <= member.targetSequenceNo:
+            return
+
+        member.targetSequenceNo = sequenceNo
+        if not member.isQueued and member.nextSequenceNo <= sequenceNo:
+            member.isQueued = True
+            self._queuedMembers.append(member)
+        self._fillWindow()
+
+    def setDeliveredSequenceNo(self, dataPrefix, sequenceNo):
+        """
+        Skip the sequence numbers of the member up to sequenceNo, for example to
+        not fetch the history of a member when joining a group. Received data
+        after sequenceNo is delivered. This does nothing if sequenceNo is not
+        higher than the last delivered sequence number.
+
+        :param str dataPrefix: The member's data prefix URI string.
+        :param int sequenceNo: The sequence number to treat as delivered.
+        """
+        member = self._getMember(dataPrefix)
+        if sequenceNo <= member.deliveredSequenceNo:
+            return
+
+        member.deliveredSequenceNo = sequenceNo
+        member.nextSequenceNo = max(member.nextSequenceNo, sequenceNo + 1)
+        member.targetSequenceNo = max(member.targetSequenceNo, sequenceNo)
+        for receivedSequenceNo in list(member.received):
+            if receivedSequenceNo <= sequenceNo:
+                del member.received[receivedSequenceNo]
+        self._deliver(member)
+
+    def getDeliveredSequenceNo(self, dataPrefix):
+        """
+        Get the last sequence number of the member which was delivered to
+        onData or onFailed, or skipped by setDeliveredSequenceNo.
+
+        :param str dataPrefix: The member's data prefix URI string.
+        :return: The sequence number, or -1 if none.
+        :rtype: int
+        """
+        member = self._members.get(dataPrefix)
+        return member.deliveredSequenceNo if member != None else -1
+
+    def getWindow(self):
+        """
+        Get the current window, which is the number of interests allowed in
+        flight.
+
+        :return: The window.
+        :rtype: float
+        """
+        return self._window
+
+    def getCounters(self):
+        """
+        Get the fetch counters. The dictionary keys are 'interests' (the number
+        of interests expressed), 'retransmissions' (the number of those which
+        were retries), 'data' (the number of data packets received), 'timeouts'
+        (the number of interests which timed out or were nacked), 'delivered'
+        (the number of data packets given to onData), 'failed' (the number of
+        sequence numbers given to onFailed) and 'inFlight' (the number of
+        interests waiting for data now).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        counters = dict(self._counters)
+        counters['inFlight'] = self._nInFlight
+        return counters
+
+    def __contains__(self, dataPrefix):
+        return dataPrefix in self._members
+
+    @staticmethod
+    def makeDefaultDataName(dataPrefix, sequenceNo):
+        """
+        Get the data packet name as the dataPrefix plus a component with the
+        sequence number as a decimal string.
+
+        :param str dataPrefix: The member's data prefix URI string.
+        :param int sequenceNo: The sequence number.
+        :return: The data packet name.
+        :rtype: Name
+        """
+        return Name(dataPrefix).append(str(sequenceNo))
+
+    def _getMember(self, dataPrefix):
+        member = self._members.get(dataPrefix)
+        if member == None:
+            member = SequenceFetcher._Member(dataPrefix)
+            self._members[dataPrefix] = member
+        return member
+
+    def _fillWindow(self):
+        """
+        Express interests for retries, then for the queued members in turn,
+        while the window allows.
+        """
+        while self._nInFlight < int(self._window):
+            if len(self._retries) > 0:
+                (member, sequenceNo, nRetries) = self._retries.popleft()
+                if sequenceNo <= member.deliveredSequenceNo:
+                    # Skipped by setDeliveredSequenceNo.
+                    continue
+            elif len(self._queuedMembers) > 0:
+                member = self._queuedMembers.popleft()
+                if member.nextSequenceNo > member.targetSequenceNo:
+                    # Skipped by setDeliveredSequenceNo.
+                    member.isQueued = False
+                    continue
+                sequenceNo = member.nextSequenceNo
+                member.nextSequenceNo += 1
+                if member.nextSequenceNo <= member.targetSequenceNo:
+                    self._queuedMembers.append(member)
+                else:
+                    member.isQueued = False
+                nRetries = 0
+            else:
+                break
+
+            self._express(member, sequenceNo, nRetries)
+
+    def _express(self, member, sequenceNo, nRetries):
+        interest = Interest(self._makeDataName(member.dataPrefix, sequenceNo))
+        interest.setCanBePrefix(False)
+        interest.setInterestLifetimeMilliseconds(self._interestLifetime)
+        self._nExpressed += 1
+        expressNo = self._nExpressed
+        self._nInFlight += 1
+        self._counters['interests'] += 1
+        if nRetries > 0:
+            self._counters['retransmissions'] += 1
+
+        self._face.expressInterest(
+          interest,
+          lambda interest, data: self._onDataReceived(member, sequenceNo, data),
+          lambda interest: self._onTimeout(
+            member, sequenceNo, nRetries, expressNo),
+          lambda interest, networkNack: self._onTimeout(
+            member, sequenceNo, nRetries, expressNo))
+
+    def _onDataReceived(self, member, sequenceNo, data):
+        self._nInFlight -= 1
+        self._counters['data'] += 1
+        if self._window < self._slowStartThreshold:
+            self._window += 1.0
+        else:
+            self._window += 1.0 / self._window
+        self._window = min(self._window, self._maxWindow)
+
+        if sequenceNo > member.deliveredSequenceNo:
+            member.received[sequenceNo] = data
+            self._deliver(member)
+        self._fillWindow()
+
+    def _onTimeout(self, member, sequenceNo, nRetries, expressNo):
+        self._nInFlight -= 1
+        self._counters['timeouts'] += 1
+        if expressNo > self._recoveryExpressNo:
+            self._slowStartThreshold = max(self._window / 2.0, 1.0)
+            self._window = self._slowStartThreshold
+            self._recoveryExpressNo = self._nExpressed
+
+        if sequenceNo > member.deliveredSequenceNo:
+            if nRetries < self._maxRetries:
+                self._retries.append((member, sequenceNo, nRetries + 1))
+            else:
+                logging.getLogger(__name__).info(
+                  "Failed to fetch %s sequence %d", member.dataPrefix,
+                  sequenceNo)
+                member.received[sequenceNo] = None
+                self._deliver(member)
+        self._fillWindow()
+
+    def _deliver(self, member):
+        """
+        Call onData or onFailed for each received sequence number which follows
+        the last delivered one.
+        """
+        while member.deliveredSequenceNo + 1 in member.received:
+            sequenceNo = member.deliveredSequenceNo + 1
+            data = member.received.pop(sequenceNo)
+            member.deliveredSequenceNo = sequenceNo
+            if data is not None:
+                self._counters['delivered'] += 1
+                try:
+                    self._onData(member.dataPrefix, sequenceNo, data)
+                except:
+                    logging.exception("Error in onData")
+            else:
+                self._counters['failed'] += 1
+                if self._onFailed != None:
+                    try:
+                        self._onFailed(member.dataPrefix, sequenceNo)
+                    except:
+                        logging.exception("Error in onFailed")
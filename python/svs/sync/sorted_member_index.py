@@ -0,0 +1,135 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import bisect
+
+class SortedMemberIndex(object):
+    """
+    A SortedMemberIndex holds a set of member ID strings and gives them in
+    sorted order. Checking membership and adding a member are O(1). New members
+    are kept in a separate list and are merged into the sorted list only when
+    the sorted order is requested, so that adding many members at once (for
+    example when joining a large group) does not shift the sorted list for
+    each one.
+    """
+    def __init__(self):
+        self._members = set()
+        # The members in sorted order, not including _newMembers.
+        self._sortedMembers = []
+        # The members added since the last merge, in insertion order.
+        self._newMembers = []
+
+    def add(self, memberId):
+        """
+        Add the memberId if it is not already in the index.
+
+        :param str memberId: The member ID string.
+        :return: True if the memberId was added, False if it was already in the
+          index.
+        :rtype: bool
+        """
+        if memberId in self._members:
+            return False
+
+        self._members.add(memberId)
+        self._newMembers.append(memberId)
+        return True
+
+    def addSorted(self, memberIds):
+        """
+        Add the member IDs, which must be in sorted order with no repeats and
+        not already in the index. If the index is empty, the list is used as
+        the sorted list without sorting.
+
+        :param list<str> memberIds: The sorted list of member ID strings. This
+          is copied.
+        """
+        if len(self._members) == 0:
+            self._members = set(memberIds)
+            self._sortedMembers = list(memberIds)
+        else:
+            self._members.update(memberIds)
+            self._newMembers.extend(memberIds)
+
+    def removeMany(self, memberIds):
+        """
+        Remove the member IDs which are in the index. This makes a new sorted
+        list in one pass, so remove expired members together instead of one
+        at a time.
+
+        :param memberIds: The member ID strings.
+        :type memberIds: iterable of str
+        """
+        memberIds = self._members.intersection(memberIds)
+        if len(memberIds) == 0:
+            return
+
+        self._members.difference_update(memberIds)
+        # Don't modify the list which getSortedMembers() returned.
+        self._sortedMembers = [memberId for memberId in self._sortedMembers
+                               if not memberId in memberIds]
+        self._newMembers = [memberId for memberId in self._newMembers
+                            if not memberId in memberIds]
+
+    def getSortedMembers(self):
+        """
+        Get the member IDs in sorted order. The returned list is owned by this
+        object, so you must not modify it and should make a copy if you keep it
+        after another call to add().
+
+        :return: The sorted list of member ID strings.
+        :rtype: list<str>
+        """
+        if len(self._newMembers) > 0:
+            self._newMembers.sort()
+            if len(self._sortedMembers) == 0:
+                self._sortedMembers = self._newMembers
+            else:
+                # The sort detects the two sorted runs and merges them in
+                # linear time.
+                self._sortedMembers.extend(self._newMembers)
+                self._sortedMembers.sort()
+            self._newMembers = []
+
+        return self._sortedMembers
+
+    def countInRange(self, startMemberId, endMemberId):
+        """
+        Count the member IDs which are at least startMemberId and less than
+        endMemberId in sorted order.
+
+        :param str startMemberId: The start of the range. Use "" to start at
+          the first member.
+        :param str endMemberId: The end of the range, which is not included, or
+          None to end after the last member.
+        :return: The number of member IDs in the range.
+        :rtype: int
+        """
+        sortedMembers = self.getSortedMembers()
+        endIndex = (len(sortedMembers) if endMemberId == None else
+                    bisect.bisect_left(sortedMembers, endMemberId))
+        return max(0, endIndex - bisect.bisect_left(sortedMembers, startMemberId))
+
+    def __contains__(self, memberId):
+        return memberId in self._members
+
+    def __len__(self):
+        return len(self._members)
+
+    def __iter__(self):
+        return iter(self.getSortedMembers())
@@ -0,0 +1,206 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+from itertools import accumulate
+from itertools import chain
+from pyndn.util.blob import Blob
+from pyndn.encoding.tlv.tlv_encoder import TlvEncoder
+
+class StateVectorEncodingCache(object):
+    """
+    A StateVectorEncodingCache keeps the encoded bytes of each state vector
+    entry so that encoding the state vector after a change only re-encodes the
+    entries whose sequence number changed. The entry encodings are kept in key
+    order in one buffer with the offset of each member's entry, so that a
+    changed entry with the same length is written over the old one and only
+    the outer TLV header is remade. A new member, a removed member or an entry
+    whose length changed (when the sequence number needs another byte) remakes
+    the buffer.
+
+    :param encodeEntry: This calls encodeEntry(memberId, sequenceNo) to get the
+      bytes of the full TLV encoding of one state vector entry.
+    :type encodeEntry: function object
+    :param int stateVectorType: The TLV type of the outer state vector.
+    :param bytes headerValue: (optional) The bytes to put in the outer TLV
+      before the entries. If omitted, the outer TLV has only the entries.
+    """
+    def __init__(self, encodeEntry, stateVectorType, headerValue = b""):
+        self._encodeEntry = encodeEntry
+        self._stateVectorType = stateVectorType
+        self._headerValue = headerValue
+
+        # The dictionary key is the member ID string. The value is the bytes of
+        # the encoded entry.
+        self._entries = {}
+        # The bytearray of the header value and the encoded entries in the key
+        # order of the last encode(), so that a changed entry can be replaced
+        # in place.
+        self._buffer = bytearray(headerValue)
+        # The dictionary key is the member ID string. The value is the offset
+        # of its entry in _buffer.
+        self._offsets = {}
+        # The member IDs whose entry encoding must be refreshed.
+        self._staleMemberIds = set()
+        # The Blob of the last full encoding, or None if it must be remade.
+        self._encoding = None
+        # The bytes of _encoding, for fast comparison.
+        self._encodingBytes = b""
+
+    def invalidate(self, memberId):
+        """
+        Mark the entry for memberId as changed so that the next call to
+        encode() re-encodes it.
+
+        :param str memberId: The member ID string.
+        """
+        self._staleMemberIds.add(memberId)
+        self._encoding = None
+
+    def invalidateMany(self, memberIds):
+        """
+        Mark the entry for each of memberIds as changed, as for invalidate().
+
+        :param memberIds: The member ID strings.
+        :type memberIds: iterable of str
+        """
+        self._staleMemberIds.update(memberIds)
+        self._encoding = None
+
+    def removeMany(self, memberIds):
+        """
+        Discard the cached entry for each of memberIds, which were removed from
+        the state vector, so that the next call to encode() leaves them out.
+
+        :param memberIds: The member ID strings.
+        :type memberIds: iterable of str
+        """
+        for memberId in memberIds:
+            self._entries.pop(memberId, None)
+            self._staleMemberIds.discard(memberId)
+        # Members may be added before the next encode(), so the number of keys
+        # doesn't show that the key order changed. Force a reorder.
+        self._buffer = bytearray(self._headerValue)
+        self._offsets = {}
+        self._encoding = None
+
+    def getEncoding(self):
+        """
+        Get the last full encoding if it is still current.
+
+        :return: The Blob from the last call to encode(), or None if an entry
+          has changed since then.
+        :rtype: Blob
+        """
+        return self._encoding
+
+    def encode(self, stateVector, stateVectorKeys):
+        """
+        Encode the stateVector as TLV, re-encoding only the entries which were
+        passed to invalidate() since the last call. If nothing changed, this
+        returns the same Blob as the last call.
+
+        :param dict<str,int> stateVector: The state vector dictionary where
+          the key is the member ID string and the value is the sequence number.
+        :param list<str> stateVectorKeys: The key strings of stateVector in
+          the order to be encoded. If the order changes, a member must also be
+          added or removed.
+        :return: A Blob containing the encoding.
+        :rtype: Blob
+        """
+        if self._encoding is not None:
+            return self._encoding
+
+        reorder = len(stateVectorKeys) != len(self._offsets)
+        for memberId in self._staleMemberIds:
+            entry = self._encodeEntry(memberId, stateVector[memberId])
+            if not reorder:
+                offset = self._offsets.get(memberId)
+                if offset == None or len(entry) != len(self._entries[memberId]):
+                    # A new member changes the key order, and a longer entry
+                    # moves the entries after it.
+                    reorder = True
+                else:
+                    # Only the sequence number changed, so replace the entry in
+                    # place.
+                    self._buffer[offset:offset + len(entry)] = entry
+            self._entries[memberId] = entry
+        self._staleMemberIds.clear()
+
+        if reorder:
+            orderedEntries = list(map(self._entries.__getitem__, stateVectorKeys))
+            self._offsets = dict(zip(stateVectorKeys, accumulate(chain(
+              (len(self._headerValue),), map(len, orderedEntries)))))
+            self._buffer = bytearray(self._headerValue)
+            self._buffer += b"".join(orderedEntries)
+
+        header = TlvEncoder(8)
+        header.writeTypeAndLength(self._stateVectorType, len(self._buffer))
+        # This copies the buffer so that the returned Blob is not changed by
+        # the next encode().
+        self._encodingBytes = header.getOutput().tobytes() + self._buffer
+        self._encoding = Blob(self._encodingBytes, False)
+        return self._encoding
+
+    def encodeEntries(self, stateVector, memberIds):
+        """
+        Encode only the entries of stateVector for memberIds as TLV with the
+        same outer type as encode(), using the cached entry encodings which are
+        current. This does not change the cache.
+
+        :param dict<str,int> stateVector: The state vector dictionary where
+          the key is the member ID string and the value is the sequence number.
+        :param list<str> memberIds: The member ID strings of the entries to
+          encode, in the order to be encoded.
+        :return: A Blob containing the encoding.
+        :rtype: Blob
+        """
+        entries = []
+        for memberId in memberIds:
+            entry = self._entries.get(memberId)
+            if entry == None or memberId in self._staleMemberIds:
+                entry = self._encodeEntry(memberId, stateVector[memberId])
+            entries.append(entry)
+
+        return Blob(self._makeEncoding(entries), False)
+
+    def isEncodingEqual(self, input):
+        """
+        Check if input has the same bytes as the last encoding from encode().
+        This compares the bytes directly without decoding.
+
+        :param input: The bytes to compare.
+        :type input: Blob or an object with the buffer protocol
+        :return: True if input is the same as the last encoding.
+        :rtype: bool
+        """
+        buffer = input.toBuffer() if isinstance(input, Blob) else input
+        return (len(buffer) == len(self._encodingBytes) and
+                self._encodingBytes.startswith(buffer))
+
+    def _makeEncoding(self, entries):
+        """
+        Join the header value and the entry encodings in the outer TLV.
+
+        :param list<bytes> entries: The entry encodings.
+        :return: The bytes of the outer TLV.
+        :rtype: bytes
+        """
+        header = TlvEncoder(8)
+        body = self._headerValue + b"".join(entries)
+        header.writeTypeAndLength(self._stateVectorType, len(body))
+        return header.getOutput().tobytes() + body
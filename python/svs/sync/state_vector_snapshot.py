@@ -0,0 +1,88 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+class StateVectorSnapshot(object):
+    """
+    A StateVectorSnapshot is an immutable copy of a state vector with its
+    version. StateVectorSync2018 makes a new snapshot after the state vector
+    changes and replaces its reference to the current one, so another thread
+    can read a snapshot without a lock and without seeing a partial update.
+    Two snapshots from the same StateVectorSync2018 with the same version have
+    the same entries.
+
+    :param int version: The version of the state vector.
+    :param tuple memberIds: The member ID strings in sorted order. This is not
+      copied, so the caller must not modify it.
+    :param dict sequenceNos: The dictionary where the key is the member ID
+      string and the value is the sequence number. This is not copied, so the
+      caller must not modify it.
+    """
+    __slots__ = ['_version', '_memberIds', '_sequenceNos']
+
+    def __init__(self, version, memberIds, sequenceNos):
+        self._version = version
+        self._memberIds = memberIds
+        self._sequenceNos = sequenceNos
+
+    def getVersion(self):
+        """
+        Get the version of the state vector, which increases each time the
+        state vector changes.
+
+        :return: The version.
+        :rtype: int
+        """
+        return self._version
+
+    def getProducerPrefixes(self):
+        """
+        Get the Name URI for each producer data prefix (which is their member
+        ID) in sorted order. This is shared, not copied.
+
+        :return: The tuple of each producer data prefix.
+        :rtype: tuple of str
+        """
+        return self._memberIds
+
+    def getProducerSequenceNo(self, producerDataPrefix):
+        """
+        Get the sequence number for the given producerDataPrefix.
+
+        :param str producerDataPrefix: The producer's application data prefix as
+          a Name URI string (also the member ID).
+        :return: The sequence number for the member, or -1 if the
+          producerDataPrefix is not in the state vector.
+        :rtype: int
+        """
+        return self._sequenceNos.get(producerDataPrefix, -1)
+
+    def items(self):
+        """
+        Get an iterator over the entries in sorted order of member ID.
+
+        :return: An iterator of (memberId, sequenceNo).
+        :rtype: iterator of (str, int)
+        """
+        sequenceNos = self._sequenceNos
+        return ((memberId, sequenceNos[memberId]) for memberId in self._memberIds)
+
+    def __len__(self):
+        return len(self._memberIds)
+
+    def __contains__(self, memberId):
+        return memberId in self._sequenceNos
@@ -0,0 +1,353 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import os
+import sys
+import itertools
+from array import array
+from pyndn.util.common import Common
+from pyndn.encoding.tlv.tlv_encoder import TlvEncoder
+from pyndn.encoding.tlv.tlv_decoder import TlvDecoder
+from svs.sync.state_vector_sync2018 import StateVectorSync2018
+
+class StateVectorStore(object):
+    """
+    A StateVectorStore keeps a state vector in a directory so that a
+    StateVectorSync2018 can reload it after a restart. Each changed entry is
+    appended to a log file as a TLV_StateVectorEntry. When the log has
+    maxLogRecords records, the whole state vector is written to a snapshot
+    file (by writing a temporary file and renaming it) and the log is
+    emptied. To reload quickly, the snapshot has the member IDs as one UTF-8
+    string with an array of their lengths, and an array of the sequence
+    numbers, so that decoding does not loop over TLV entries.
+
+    Appended records are written to the log file by commit(), which calls
+    fsync if maxUnsyncedRecords records are not synced yet or
+    fsyncIntervalMilliseconds has passed since the last fsync. Otherwise, the
+    owner calls sync() later. A record which was not synced may be lost in a
+    crash, in which case the member's entry is learned again from the group.
+
+    :param str directory: The directory for the files, which must exist.
+    :param float fsyncIntervalMilliseconds: (optional) The maximum time that a
+      written record waits for fsync. If omitted, use 100.
+    :param int maxUnsyncedRecords: (optional) The number of written records
+      which causes an fsync. If omitted, use 1000.
+    :param int maxLogRecords: (optional) The number of log records which causes
+      a new snapshot. If omitted, use 100000.
+    :param bool syncPublishes: (optional) If True or omitted, commit() calls
+      fsync for a publish so that our own sequence number is durable before
+      its notification is sent. If False, treat it like other records.
+    """
+    def __init__(self, directory, fsyncIntervalMilliseconds = 100.0,
+          maxUnsyncedRecords = 1000, maxLogRecords = 100000,
+          syncPublishes = True):
+        self._snapshotPath = os.path.join(directory, "state-vector.snapshot")
+        self._logPath = os.path.join(directory, "state-vector.log")
+        self._directory = directory
+        self._fsyncIntervalMilliseconds = fsyncIntervalMilliseconds
+        self._maxUnsyncedRecords = max(1, maxUnsyncedRecords)
+        self._maxLogRecords = max(1, maxLogRecords)
+        self._syncPublishes = syncPublishes
+
+        self._log = None
+        # The encoded records appended since the last commit.
+        self._pendingRecords = []
+        self._nUnsyncedRecords = 0
+        self._nLogRecords = 0
+        self._lastSyncTime = Common.getNowMilliseconds()
+        self._counters = { 'records': 0, 'fsyncs': 0, 'snapshots': 0 }
+
+    def load(self):
+        """
+        Read the snapshot and the log, and open the log to append. A record
+        which was cut short by a crash is removed from the end of the log.
+        This must be called once before append().
+
+        :return: A tuple of (memberIds, stateVector) where memberIds is the
+          sorted list of member IDs and stateVector is the dictionary of
+          member ID to sequence number. These are empty if there are no files.
+        :rtype: (list<str>, dict<str,int>)
+        :raises ValueError: If the snapshot is not a valid encoding.
+        """
+        memberIds = []
+        stateVector = {}
+        if os.path.exists(self._snapshotPath):
+            with open(self._snapshotPath, 'rb') as snapshotFile:
+                (memberIds, stateVector) = StateVectorStore.decodeSnapshot(
+                  snapshotFile.read())
+
+        logLength = 0
+        if os.path.exists(self._logPath):
+            with open(self._logPath, 'rb') as logFile:
+                log = logFile.read()
+            (records, logLength) = StateVectorStore._decodeLog(log)
+            self._nLogRecords = len(records)
+            nMembers = len(stateVector)
+            for memberId, sequenceNo in records:
+                # After a crash while making a snapshot, the log can have
+                # records which are older than the snapshot.
+                if sequenceNo > stateVector.get(memberId, -1):
+                    stateVector[memberId] = sequenceNo
+            if len(stateVector) != nMembers:
+                memberIds = sorted(stateVector)
+
+        self._log = open(self._logPath, 'ab')
+        if self._log.tell() != logLength:
+            # Remove a partial record.
+            self._log.truncate(logLength)
+            self._log.seek(logLength)
+        return (memberIds, stateVector)
+
+    def append(self, memberId, sequenceNo):
+        """
+        Append a record for the entry to be written by the next commit().
+
+        :param str memberId: The member ID string.
+        :param int sequenceNo: The sequence number for the member.
+        """
+        self._pendingRecords.append(
+          StateVectorSync2018.encodeStateVectorEntry(memberId, sequenceNo))
+
+    def commit(self, stateVector, memberIds, isPublish = False):
+        """
+        Write the appended records to the log. Call fsync if needed as
+        described above, and if the log has maxLogRecords records, write a new
+        snapshot of stateVector.
+
+        :param dict<str,int> stateVector: The current state vector.
+        :param memberIds: The keys of stateVector in sorted order.
+        :type memberIds: list<str> or SortedMemberIndex
+        :param bool isPublish: (optional) True if the records include a new
+          sequence number for ourself.
+        :return: True if some written records are not synced yet, so that the
+          owner should call sync() within getFsyncIntervalMilliseconds().
+        :rtype: bool
+        """
+        if len(self._pendingRecords) > 0:
+            self._log.write(b"".join(self._pendingRecords))
+            # Give the records to the OS so that they survive if the process
+            # exits, even before they are synced.
+            self._log.flush()
+            self._nUnsyncedRecords += len(self._pendingRecords)
+            self._nLogRecords += len(self._pendingRecords)
+            self._counters['records'] += len(self._pendingRecords)
+            self._pendingRecords = []
+
+        if self._nLogRecords >= self._maxLogRecords:
+            self.writeSnapshot(stateVector, memberIds)
+        elif self._nUnsyncedRecords > 0 and (
+              (isPublish and self._syncPublishes) or
+              self._nUnsyncedRecords >= self._maxUnsyncedRecords or
+              Common.getNowMilliseconds() - self._lastSyncTime >=
+                self._fsyncIntervalMilliseconds):
+            self.sync()
+        return self._nUnsyncedRecords > 0
+
+    def sync(self):
+        """
+        Flush the written records and call fsync on the log.
+        """
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._nUnsyncedRecords = 0
+        self._lastSyncTime = Common.getNowMilliseconds()
+        self._counters['fsyncs'] += 1
+
+    def writeSnapshot(self, stateVector, memberIds):
+        """
+        Write stateVector to the snapshot file, replacing it atomically, and
+        empty the log.
+
+        :param dict<str,int> stateVector: The current state vector, including
+          the records which were appended.
+        :param memberIds: The keys of stateVector in sorted order.
+        :type memberIds: list<str> or SortedMemberIndex
+        """
+        memberIds = list(memberIds)
+        temporaryPath = self._snapshotPath + ".tmp"
+        with open(temporaryPath, 'wb') as snapshotFile:
+            snapshotFile.write(
+              StateVectorStore.encodeSnapshot(stateVector, memberIds))
+            snapshotFile.flush()
+            os.fsync(snapshotFile.fileno())
+        os.replace(temporaryPath, self._snapshotPath)
+        self._syncDirectory()
+
+        self._log.truncate(0)
+        self._log.seek(0)
+        self.sync()
+        self._nLogRecords = 0
+        self._counters['snapshots'] += 1
+
+    def getFsyncIntervalMilliseconds(self):
+        return self._fsyncIntervalMilliseconds
+
+    def getCounters(self):
+        """
+        Get the store counters. The dictionary keys are 'records' (the number
+        of records written to the log), 'fsyncs' (the number of calls to fsync
+        on the log), 'snapshots' (the number of snapshots written) and
+        'logRecords' (the number of records in the log now).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        counters = dict(self._counters)
+        counters['logRecords'] = self._nLogRecords
+        return counters
+
+    def close(self):
+        """
+        Write and sync the appended records and close the log. The snapshot is
+        not written, so the next load() replays the log.
+        """
+        if self._log == None:
+            return
+        if len(self._pendingRecords) > 0:
+            self._log.write(b"".join(self._pendingRecords))
+            self._pendingRecords = []
+        self.sync()
+        self._log.close()
+        self._log = None
+
+    @staticmethod
+    def encodeSnapshot(stateVector, memberIds):
+        """
+        Encode the state vector as a TLV_StoredStateVector.
+
+        :param dict<str,int> stateVector: The state vector.
+        :param list<str> memberIds: The keys of stateVector in sorted order.
+        :return: The encoding.
+        :rtype: bytes
+        """
+        lengths = array('I', map(len, memberIds))
+        sequenceNos = array('Q', map(stateVector.__getitem__, memberIds))
+        if sys.byteorder != 'little':
+            lengths.byteswap()
+            sequenceNos.byteswap()
+
+        versionEncoder = TlvEncoder(8)
+        versionEncoder.writeNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_FormatVersion,
+          StateVectorStore.SNAPSHOT_VERSION)
+        value = b"".join([
+          versionEncoder.getOutput().tobytes(),
+          _encodeTlv(StateVectorSync2018.TLV_StoredStateVector_MemberIdLengths,
+                     lengths.tobytes()),
+          _encodeTlv(StateVectorSync2018.TLV_StoredStateVector_MemberIds,
+                     "".join(memberIds).encode('utf-8')),
+          _encodeTlv(StateVectorSync2018.TLV_StoredStateVector_SequenceNumbers,
+                     sequenceNos.tobytes())])
+        return _encodeTlv(StateVectorSync2018.TLV_StoredStateVector, value)
+
+    @staticmethod
+    def decodeSnapshot(input):
+        """
+        Decode the input as a TLV_StoredStateVector.
+
+        :param input: The bytes to decode.
+        :type input: An object with the buffer protocol
+        :return: A tuple of (memberIds, stateVector) where memberIds is the
+          sorted list of member IDs.
+        :rtype: (list<str>, dict<str,int>)
+        :raises ValueError: For invalid encoding or an unsupported version.
+        """
+        decoder = TlvDecoder(memoryview(input))
+        endOffset = decoder.readNestedTlvsStart(
+          StateVectorSync2018.TLV_StoredStateVector)
+        version = decoder.readNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_FormatVersion)
+        if version != StateVectorStore.SNAPSHOT_VERSION:
+            raise ValueError("Unsupported state vector snapshot version " +
+              str(version))
+        lengths = array('I')
+        lengths.frombytes(decoder.readBlobTlv(
+          StateVectorSync2018.TLV_StoredStateVector_MemberIdLengths))
+        memberIdsString = bytes(decoder.readBlobTlv(
+          StateVectorSync2018.TLV_StoredStateVector_MemberIds)).decode('utf-8')
+        sequenceNos = array('Q')
+        sequenceNos.frombytes(decoder.readBlobTlv(
+          StateVectorSync2018.TLV_StoredStateVector_SequenceNumbers))
+        decoder.finishNestedTlvs(endOffset)
+        if sys.byteorder != 'little':
+            lengths.byteswap()
+            sequenceNos.byteswap()
+        if (len(lengths) != len(sequenceNos) or
+            sum(lengths) != len(memberIdsString)):
+            raise ValueError("The state vector snapshot arrays don't match")
+
+        ends = list(itertools.accumulate(lengths))
+        memberIds = list(map(memberIdsString.__getitem__,
+          map(slice, itertools.chain([0], ends), ends)))
+        return (memberIds, dict(zip(memberIds, sequenceNos)))
+
+    @staticmethod
+    def _decodeLog(input):
+        """
+        Decode the TLV_StateVectorEntry records in the log, stopping at a
+        record which is cut short.
+
+        :return: A tuple of (records, length) where records is the list of
+          (memberId, sequenceNo) and length is the number of bytes of the
+          records.
+        :rtype: (list<(str, int)>, int)
+        """
+        decoder = TlvDecoder(memoryview(input))
+        records = []
+        length = 0
+        while length < len(input):
+            try:
+                endOffset = decoder.readNestedTlvsStart(
+                  StateVectorSync2018.TLV_StateVectorEntry)
+                memberId = bytes(decoder.readBlobTlv(
+                  StateVectorSync2018.TLV_StateVector_MemberId)).decode('utf-8')
+                sequenceNo = decoder.readNonNegativeIntegerTlv(
+                  StateVectorSync2018.TLV_StateVector_SequenceNumber)
+                decoder.finishNestedTlvs(endOffset)
+            except ValueError:
+                break
+            records.append((memberId, sequenceNo))
+            length = decoder.getOffset()
+
+        return (records, length)
+
+    SNAPSHOT_VERSION = 1
+
+    def _syncDirectory(self):
+        """
+        Call fsync on the directory so that a rename is durable, if the
+        platform supports it.
+        """
+        try:
+            directoryFd = os.open(self._directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(directoryFd)
+        except OSError:
+            pass
+        finally:
+            os.close(directoryFd)
+
+def _encodeTlv(type, value):
+    """
+    Return the bytes of the TLV with the type and the value bytes.
+    """
+    encoder = TlvEncoder(16)
+    encoder.writeTypeAndLength(type, len(value))
+    return encoder.getOutput().tobytes() + value
@@ -18,14 +18,36 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 # A copy of the GNU Lesser General Public License is in the file COPYING.
 
-import bisect
 import logging
+import random
+import time
+from collections import deque
+from collections import OrderedDict
 from pyndn.name import Name
 from pyndn.interest import Interest
+from pyndn.data import Data
+from pyndn.hmac_with_sha256_signature import HmacWithSha256Signature
+from pyndn.key_locator import KeyLocatorType
 from pyndn.security import KeyChain
 from pyndn.util.blob import Blob
+from pyndn.util.common import Common
 from pyndn.encoding.tlv.tlv_encoder import TlvEncoder
 from pyndn.encoding.tlv.tlv_decoder import TlvDecoder
+from svs.sync.admission_control import AdmissionControl
+from svs.sync.notification_pipeline import NotificationPipeline
+from svs.sync.notification_signer import NotificationSigner
+from svs.sync.recent_notification_cache import RecentNotificationCache
+from svs.sync.sorted_member_index import SortedMemberIndex
+from svs.sync.state_vector_snapshot import StateVectorSnapshot
+from svs.sync.state_vector_encoding_cache import StateVectorEncodingCache
+
+class StateVectorLimitError(ValueError):
+    """
+    A StateVectorLimitError is raised when decoding a state vector which has
+    more entries or a longer member ID than the limits given to the decoding
+    method. It is a ValueError, so it is handled like an invalid encoding.
+    """
+    pass
 
 class StateVectorSync2018(object):
     """
@@ -85,11 +107,21 @@ class StateVectorSync2018(object):
       applicationDataPrefix does not already include a unique session number, this
       can be used by the application to restore the state from a previous use.
       If omitted, this uses -1 so that the next published sequence number is 0.
+    :param NotificationSigner notificationSigner: (optional) The
+      NotificationSigner for the hmacKey with key name /A, to share with other
+      instances which use the same hmacKey. If omitted or None, make one.
+    :param StateVectorStore store: (optional) The StateVectorStore to keep the
+      state vector across a restart. The constructor calls store.load() and
+      starts with the loaded state vector, and the sequence number is the
+      maximum of previousSequenceNumber and our loaded entry. After that,
+      each change is appended to the store. The application should call
+      store.close() after shutdown(). If omitted or None, don't store the
+      state vector.
     """
     def __init__(self, onReceivedSyncState, onInitialized,
       applicationDataPrefix, applicationBroadcastPrefix, face, keyChain,
       signingParams, hmacKey, notificationInterestLifetime, onRegisterFailed,
-      previousSequenceNumber = -1):
+      previousSequenceNumber = -1, notificationSigner = None, store = None):
         self._onReceivedSyncState = onReceivedSyncState
         self._onInitialized = onInitialized
         self._applicationDataPrefixUri = applicationDataPrefix.toUri()
@@ -98,20 +130,213 @@ class StateVectorSync2018(object):
         self._keyChain = keyChain
         self._signingParams = signingParams
         self._hmacKey = hmacKey
+        # TODO: Should we just use key name /A ?
+        self._signer = (notificationSigner if notificationSigner != None
+                        else NotificationSigner(hmacKey, Name("/A")))
         self._notificationInterestLifetime = notificationInterestLifetime
 
         # The dictionary key is member ID string. The value is the sequence number.
         self._stateVector = {}
         # The keys of _stateVector in sorted order, kept in sync with _stateVector.
         # (We don't use OrderedDict because it doesn't sort keys on insert.)
-        self._sortedStateVectorKeys = []
+        self._memberIndex = SortedMemberIndex()
+        # The cached entry encodings of _stateVector, kept in sync by
+        # _setSequenceNumber.
+        self._encodingCache = StateVectorEncodingCache(
+          StateVectorSync2018.encodeStateVectorEntry,
+          StateVectorSync2018.TLV_StateVector)
+        # The dictionary key is the UTF-8 encoding of a member ID. The value is
+        # the member ID string which is the key in _stateVector, so that
+        # decoding a received state vector reuses the string.
+        self._memberIds = {}
+        # Incremented by _setSequenceNumber when _stateVector changes.
+        self._stateVectorVersion = 0
+        # Incremented by _setSequenceNumber when a member is added.
+        self._membershipVersion = 0
+        # The StateVectorSnapshot, or None if setSnapshots has not enabled it,
+        # and the _membershipVersion when its member IDs were copied.
+        self._snapshot = None
+        self._snapshotMembershipVersion = -1
+        # The last notification interest from _makeNotificationInterest and the
+        # _stateVectorVersion when it was made.
+        self._signedNotification = None
+        self._signedNotificationVersion = -1
+        self._signedNotificationDeltaNo = -1
+        # The fragments from _makeNotificationInterests if the state vector did
+        # not fit in one notification, and the _stateVectorVersion and _deltaNo
+        # when they were made.
+        self._signedFragments = None
+        self._signedFragmentsVersion = -1
+        self._signedFragmentsDeltaNo = -1
+        self._maxNotificationSize = (
+          StateVectorSync2018.DEFAULT_MAX_NOTIFICATION_SIZE)
+        self._fragmentCounters = {
+          'fragmentedNotifications': 0, 'sentFragments': 0,
+          'receivedFragments': 0 }
         self._sequenceNo = previousSequenceNumber
         self._enabled = True
 
+        # Publish coalescing is off until setPublishCoalescing is called.
+        self._publishCoalescingWindow = 0.0
+        self._maxCoalescedPublishes = 1
+        # The number of publishes waiting for the next notification, and the
+        # time of the first one and the sum of their times in milliseconds.
+        self._nPendingPublishes = 0
+        self._firstPendingPublishTime = 0.0
+        self._pendingPublishTimeSum = 0.0
+        # Incremented when a batch of pending publishes is sent, so that the
+        # timer for an earlier batch is ignored.
+        self._publishBatchNo = 0
+        self._publishCoalescingCounters = {
+          'publishes': 0, 'notifications': 0, 'savedNotifications': 0,
+          'totalAddedLatencyMilliseconds': 0.0,
+          'maxAddedLatencyMilliseconds': 0.0 }
+
+        # Reply suppression is off until setReplySuppression is called.
+        self._maxReplyBackoff = 0.0
+        self._isReplyPending = False
+        # Incremented when a pending reply is sent or cancelled, so that the
+        # timer for an earlier reply is ignored.
+        self._replyNo = 0
+        # The encoding Blob of the last notification sent or received with the
+        # same state vector as ours, and the time it was sent or received.
+        self._lastNotificationEncoding = None
+        self._lastNotificationTime = 0.0
+        self._replySuppressionCounters = {
+          'scheduledReplies': 0, 'sentReplies': 0, 'cancelledReplies': 0,
+          'suppressedDuplicates': 0 }
+
+        # Delta notifications are off until setDeltaNotifications is called.
+        self._deltaSpan = 0
+        self._fullVectorPeriod = 0
+        # The number of the last delta notification sent, and the number of
+        # deltas sent since the last full vector.
+        self._deltaNo = 0
+        self._nDeltasSinceFullVector = 0
+        # The member IDs changed since the last delta notification, and a set
+        # for each of the previous _deltaSpan - 1 delta notifications.
+        self._changedMemberIds = set()
+        self._deltaHistory = deque()
+        # The dictionary key is the member ID of a sender of delta
+        # notifications. The value is the highest delta number received.
+        self._receivedDeltaNos = {}
+        self._deltaCounters = {
+          'deltaNotifications': 0, 'fullNotifications': 0,
+          'receivedDeltas': 0, 'gaps': 0 }
+
+        # Member ID aliases are off until setMemberIdAliases is called. The
+        # StateVectorEncodingCache of the aliased state vector, or None.
+        self._aliasEncodingCache = None
+        self._aliasAnnounceCount = 0
+        # The dictionary key is a member ID string. The value is the alias
+        # which we assigned to it, which is its index in _aliasMemberIds. An
+        # alias is not reused, so the member ID of a removed member is None.
+        self._aliases = {}
+        self._aliasMemberIds = []
+        # The member IDs in _aliases in the order of their alias.
+        self._aliasKeys = []
+        # The dictionary key is a member ID whose entry still has the member ID
+        # with the alias. The value is the number of notifications left.
+        self._aliasAnnouncements = {}
+        self._isAliasPrefixRegistered = False
+        # The dictionary key is the member ID of a sender of aliased state
+        # vectors. The value is a dictionary of its alias to member ID.
+        self._peerAliases = {}
+        # The senders of aliased state vectors with a pending alias lookup.
+        self._aliasLookups = set()
+        self._aliasCounters = {
+          'lookups': 0, 'failedLookups': 0, 'servedLookups': 0,
+          'unknownAliases': 0 }
+
+        # Front coding is off until setFrontCoding is called. The
+        # StateVectorEncodingCache of the front-coded state vector, or None.
+        self._frontCodedEncodingCache = None
+        # The dictionary key is a member ID string. The value is the length of
+        # the prefix of its UTF-8 encoding which it shares with the previous
+        # member ID in sorted order.
+        self._sharedPrefixLengths = {}
+        # The number of members when _sharedPrefixLengths was computed, or -1
+        # if members were removed.
+        self._nFrontCodedMembers = 0
+
+        # Member expiry is off until setMemberExpiry is called. The time in
+        # milliseconds counts the expiry sweeps, so that it follows the
+        # face's timers.
+        self._memberExpiryMilliseconds = 0.0
+        self._tombstoneMilliseconds = 0.0
+        self._expiryTime = 0.0
+        # Incremented when member expiry is set, so that the timer for an
+        # earlier setting is ignored.
+        self._memberExpiryNo = 0
+        # The dictionary key is a member ID string. The value is the
+        # _expiryTime of its last update. The least recently updated is first.
+        self._lastUpdateTimes = OrderedDict()
+        # The dictionary key is the member ID string of an expired member. The
+        # value is the tuple (sequenceNo, expiryTime) of its last sequence
+        # number and when it expired. The oldest is first.
+        self._tombstones = OrderedDict()
+        self._memberExpiryCounters = {
+          'expiredMembers': 0, 'ignoredEntries': 0, 'revivedMembers': 0,
+          'tombstones': 0 }
+
+        # The RecentNotificationCache, or None if setNotificationCache has not
+        # enabled it.
+        self._notificationCache = None
+        # The NotificationPipeline, or None if setInboundPipeline has not
+        # enabled it.
+        self._notificationPipeline = None
+
+        # Admission control is off until setAdmissionControl is called. The
+        # AdmissionControl, or None if there is no rate limit.
+        self._admissionControl = None
+        self._getSourceId = StateVectorSync2018.getNotificationSourceId
+        # True if the application supplied _getSourceId so that a source ID
+        # identifies a single sender. Otherwise a queued interest is not
+        # superseded since several senders can share an incoming face ID.
+        self._isSourceIdSender = False
+        # The inbound queue is off if _maxInboundQueueLength is 0. Each item is
+        # (interest, nameDigest, supersedeKey) in arrival order.
+        self._maxInboundQueueLength = 0
+        self._inboundQueue = deque()
+        # The dictionary key is a supersedeKey. The value is the number of
+        # queued interests with the key.
+        self._nQueuedBySupersedeKey = {}
+        self._isInboundDrainScheduled = False
+        # The limits for decoding a received state vector, or None.
+        self._maxReceivedEntries = None
+        self._maxReceivedMemberIdLength = None
+        self._admissionCounters = {
+          'queued': 0, 'superseded': 0, 'droppedOldest': 0,
+          'maxQueueLength': 0, 'limitedVectors': 0 }
+
+        # The _SyncMetrics, or None if setMetrics has not enabled metrics.
+        self._metrics = None
+        # The PhaseProfiler, or None if setProfiler has not enabled it.
+        self._profiler = None
+        # The NotificationRecorder, or None if setRecorder has not enabled it.
+        self._recorder = None
+        # True if the phases are timed for the metrics or the profiler.
+        self._isTimingPhases = False
+        # The list of (phase, startTime) of the phases being timed, innermost
+        # last.
+        self._phaseStack = []
+
+        # The IDs from registerPrefix, to remove in shutdown().
+        self._registeredPrefixIds = []
+
+        # The StateVectorStore, or None. _isStoreSyncPending is True if there
+        # is a timer to sync the store.
+        self._store = store
+        self._isStoreSyncPending = False
+        if store != None:
+            self._loadStateVector(*store.load())
+            self._sequenceNo = max(self._sequenceNo, self._stateVector.get(
+              self._applicationDataPrefixUri, -1))
+
         # Register to receive broadcast interests.
-        self._face.registerPrefix(
+        self._registeredPrefixIds.append(self._face.registerPrefix(
           self._applicationBroadcastPrefix, self._onInterest, onRegisterFailed,
-          self._onRegisterSuccess)
+          self._onRegisterSuccess))
 
     class SyncState(object):
         """
@@ -119,6 +344,8 @@ class StateVectorSync2018(object):
         passed to the onReceivedSyncState callback which was given to the
         StateVectorSync2018 constructor.
         """
+        __slots__ = ['_dataPrefixUri', '_sequenceNo']
+
         def __init__(self, dataPrefixUri, sequenceNo):
             self._dataPrefixUri = dataPrefixUri
             self._sequenceNo = sequenceNo
@@ -156,6 +383,15 @@ class StateVectorSync2018(object):
         def __ne__(self, other):
             return not self == other
 
+    def getApplicationDataPrefix(self):
+        """
+        Get the applicationDataPrefix given to the constructor.
+
+        :return: The Name URI of the prefix, which is our member ID.
+        :rtype: str
+        """
+        return self._applicationDataPrefixUri
+
     def getProducerPrefixes(self):
         """
         Get a copy of the current list of the Name URI for each producer data
@@ -165,8 +401,8 @@ class StateVectorSync2018(object):
         :return: A copy of the list of each producer data prefix.
         :rtype: array of str
         """
-        # Just return a copy of the keys of the state vector dictionary.
-        return self._sortedStateVectorKeys[:]
+        # Just return a copy of the sorted keys of the state vector dictionary.
+        return self._memberIndex.getSortedMembers()[:]
 
     def getProducerSequenceNo(self, producerDataPrefix):
         """
@@ -189,7 +425,9 @@ class StateVectorSync2018(object):
         Increment the sequence number and send a new notification interest where
         the name is the applicationBroadcastPrefix + the encoding of the new
         state vector. Use the hmacKey given to the constructor to sign with
-        HmacWithSha256.
+        HmacWithSha256. If publish coalescing is enabled with
+        setPublishCoalescing(), the notification may be delayed so that it is
+        shared with later publishes.
         After this, your application should publish the content for the new
         sequence number. You can get the new sequence number with getSequenceNo().
         Note: Your application must call processEvents. Since processEvents
@@ -197,13 +435,676 @@ class StateVectorSync2018(object):
         make sure that it calls processEvents in the same thread as
         publishNextSequenceNo() (which also modifies the data structures).
         """
+        if self._isTimingPhases:
+            self._startPhase("publishNextSequenceNo")
+            self._publishNextSequenceNo()
+            self._endPhase("publishNextSequenceNo")
+        else:
+            self._publishNextSequenceNo()
+
+    def _publishNextSequenceNo(self):
+        """
+        Do the work of publishNextSequenceNo().
+        """
         self._sequenceNo += 1
         self._setSequenceNumber(self._applicationDataPrefixUri, self._sequenceNo)
+        self._updateSnapshot()
+        self._commitStore(True)
+        self._publishCoalescingCounters['publishes'] += 1
 
-        logging.getLogger(__name__).info(
-          "Broadcast new seq # %s. State vector %s", str(self._sequenceNo),
-          str(self._stateVector))
-        self._broadcastStateVector()
+        if self._publishCoalescingWindow <= 0:
+            logging.getLogger(__name__).info(
+              "Broadcast new seq # %s. State vector of %s members",
+              self._sequenceNo, len(self._stateVector))
+            self._logStateVector()
+            self._publishCoalescingCounters['notifications'] += 1
+            self._broadcastStateVector(True)
+            return
+
+        now = Common.getNowMilliseconds()
+        if self._nPendingPublishes == 0:
+            self._firstPendingPublishTime = now
+            batchNo = self._publishBatchNo
+            self._face.callLater(
+              self._publishCoalescingWindow,
+              lambda: self._onPublishCoalescingTimeout(batchNo))
+        self._nPendingPublishes += 1
+        self._pendingPublishTimeSum += now
+
+        if self._nPendingPublishes >= self._maxCoalescedPublishes:
+            self.flushPublish()
+        else:
+            logging.getLogger(__name__).info(
+              "Delay broadcast of new seq # %s", self._sequenceNo)
+
+    def setPublishCoalescing(self, windowMilliseconds, maxBatchCount = 0):
+        """
+        Enable or disable publish coalescing. When enabled, each call to
+        publishNextSequenceNo() increments the sequence number immediately, but
+        the notification interest is sent windowMilliseconds after the first
+        publish of a batch, or when the batch has maxBatchCount publishes,
+        whichever comes first. One notification carrying the latest state vector
+        is sent for the whole batch. A notification which is sent for another
+        reason, such as a reply to an outdated state vector, also ends the
+        batch. This method should be called in the same thread as
+        processEvents.
+
+        :param float windowMilliseconds: The maximum time in milliseconds to
+          delay the notification for a publish. If 0, disable coalescing and
+          send a notification for each publish, which is the default.
+        :param int maxBatchCount: (optional) The maximum number of publishes to
+          share one notification. If omitted or 0, there is no limit besides
+          the window.
+        """
+        self._publishCoalescingWindow = windowMilliseconds
+        self._maxCoalescedPublishes = (maxBatchCount if maxBatchCount > 0
+                                       else float('inf'))
+        if windowMilliseconds <= 0:
+            self.flushPublish()
+
+    def flushPublish(self):
+        """
+        If there are publishes waiting for a coalesced notification, send the
+        notification now. A latency-sensitive application can call this right
+        after publishNextSequenceNo(). This method should be called in the same
+        thread as processEvents.
+        """
+        if self._nPendingPublishes > 0:
+            logging.getLogger(__name__).info(
+              "Broadcast new seq # %s for %s publishes. State vector of %s members",
+              self._sequenceNo, self._nPendingPublishes, len(self._stateVector))
+            self._logStateVector()
+            self._broadcastStateVector(True)
+
+    def getPublishCoalescingCounters(self):
+        """
+        Get a copy of the publish coalescing counters. The dictionary keys are:
+        'publishes' (the number of calls to publishNextSequenceNo),
+        'notifications' (the number of notifications sent for publishes),
+        'savedNotifications' (the number of publishes which shared the
+        notification of another publish), 'totalAddedLatencyMilliseconds'
+        (the sum over publishes of the time their notification was delayed) and
+        'maxAddedLatencyMilliseconds' (the longest delay of a notification).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,number>
+        """
+        return dict(self._publishCoalescingCounters)
+
+    def setDeltaNotifications(self, span, fullVectorPeriod):
+        """
+        Enable or disable delta notifications. When enabled, the notification
+        for a publish carries only the entries of the state vector which
+        changed since the last span delta notifications, plus a
+        TLV_StateVectorDelta name component with our member ID, the delta
+        number and the span. Every fullVectorPeriod-th notification for a
+        publish, and every reply to an outdated state vector, carries the full
+        state vector. A receiver which missed more than span delta
+        notifications from a sender replies with its full state vector so that
+        members with newer entries reply in turn. (This is scheduled like other
+        replies, so it is subject to setReplySuppression.) Receiving delta
+        notifications is always supported. Instances which only understand
+        full vectors decode a delta as a full vector which is missing members,
+        so they reply with their full vector. This method should be called in
+        the same thread as processEvents.
+
+        :param int span: The number of recent delta notifications whose changes
+          are repeated in each delta. If 0, disable delta notifications and
+          send the full state vector each time, which is the default.
+        :param int fullVectorPeriod: Send a full state vector after this many
+          delta notifications. If 0, only send a full state vector to reply.
+        """
+        self._deltaSpan = max(0, span)
+        self._fullVectorPeriod = fullVectorPeriod
+        self._nDeltasSinceFullVector = 0
+        self._changedMemberIds = set()
+        self._deltaHistory = deque()
+        # Full notifications in delta mode have the delta marker.
+        self._signedNotification = None
+        self._signedFragments = None
+
+    def getDeltaNotificationCounters(self):
+        """
+        Get a copy of the delta notification counters. The dictionary keys are:
+        'deltaNotifications' (the number of delta notifications sent),
+        'fullNotifications' (the number of full state vectors sent while delta
+        notifications are enabled), 'receivedDeltas' (the number of delta
+        notifications received) and 'gaps' (the number of received deltas
+        which showed that we missed earlier deltas from the sender).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        return dict(self._deltaCounters)
+
+    def setMemberIdAliases(self, announceCount):
+        """
+        Enable or disable member ID aliases. When enabled, this assigns each
+        member ID in the state vector a small number as an alias, and sends
+        notifications with a TLV_AliasedStateVector which has our member ID
+        followed by entries of (alias, sequence number). The entry also has
+        the member ID in the first announceCount notifications after the alias
+        is assigned, so that receivers learn it. A receiver which gets an
+        alias that it does not know sends an interest for
+        <member ID>/svs-aliases/<alias> to the sender, which replies with the
+        entries starting at that alias including the member IDs. This
+        registers that prefix with the face the first time it is enabled.
+        Receiving aliased state vectors is always supported, but instances
+        which only understand the TLV_StateVector can't decode them, so this
+        should only be enabled if all members of the sync group support it.
+        This method should be called in the same thread as processEvents.
+
+        :param int announceCount: The number of notifications which have the
+          member ID with a new alias. If 0, disable aliases and send the
+          member IDs in each notification, which is the default.
+        """
+        self._aliasAnnounceCount = announceCount
+        # The notification encoding changes.
+        self._signedNotification = None
+        self._signedFragments = None
+        if announceCount <= 0:
+            self._aliasEncodingCache = None
+            return
+
+        if self._aliasEncodingCache == None:
+            encoder = TlvEncoder(64)
+            encoder.writeBlobTlv(StateVectorSync2018.TLV_StateVector_MemberId,
+              Blob(self._applicationDataPrefixUri).buf())
+            self._aliasEncodingCache = StateVectorEncodingCache(
+              self._encodeAliasedEntry,
+              StateVectorSync2018.TLV_AliasedStateVector,
+              encoder.getOutput().tobytes())
+            for memberId in self._memberIndex.getSortedMembers():
+                if not memberId in self._aliases:
+                    self._addAlias(memberId)
+                self._aliasEncodingCache.invalidate(memberId)
+
+        if not self._isAliasPrefixRegistered:
+            self._isAliasPrefixRegistered = True
+            self._registeredPrefixIds.append(self._face.registerPrefix(
+              Name(self._applicationDataPrefixUri).append(
+                StateVectorSync2018.ALIAS_LOOKUP_COMPONENT),
+              self._onAliasInterest, StateVectorSync2018._onAliasRegisterFailed))
+
+    def getMemberIdAliasCounters(self):
+        """
+        Get a copy of the member ID alias counters. The dictionary keys are:
+        'lookups' (the number of interests sent to look up unknown aliases),
+        'failedLookups' (the number of lookups which timed out or failed
+        verification), 'servedLookups' (the number of lookups answered for
+        other members) and 'unknownAliases' (the number of received entries
+        with an alias which we did not know).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        return dict(self._aliasCounters)
+
+    def setFrontCoding(self, enabled):
+        """
+        Enable or disable front coding of the state vector. When enabled,
+        notifications have a TLV_FrontCodedStateVector with a format version,
+        where each member ID (in sorted order) is encoded as the length of the
+        prefix it shares with the previous member ID plus the remaining suffix.
+        Receiving the front-coded format is always supported, but a receiver
+        drops a version which it does not support, and instances which only
+        understand the TLV_StateVector can't decode it, so this should be
+        enabled for the sync group as a whole. If member ID aliases are also
+        enabled, notifications use the aliases instead. This method should be
+        called in the same thread as processEvents.
+
+        :param bool enabled: True to send front-coded state vectors, False to
+          send the TLV_StateVector, which is the default.
+        """
+        # The notification encoding changes.
+        self._signedNotification = None
+        self._signedFragments = None
+        if not enabled:
+            self._frontCodedEncodingCache = None
+            return
+
+        if self._frontCodedEncodingCache == None:
+            encoder = TlvEncoder(8)
+            encoder.writeNonNegativeIntegerTlv(
+              StateVectorSync2018.TLV_StateVector_FormatVersion,
+              StateVectorSync2018.FRONT_CODING_VERSION)
+            self._frontCodedEncodingCache = StateVectorEncodingCache(
+              self._encodeFrontCodedEntry,
+              StateVectorSync2018.TLV_FrontCodedStateVector,
+              encoder.getOutput().tobytes())
+            self._sharedPrefixLengths = {}
+            self._nFrontCodedMembers = 0
+
+    def setMaxNotificationSize(self, maxBytes):
+        """
+        Set the maximum size of the wire encoding of a notification interest.
+        If a notification with the whole state vector (or the whole delta)
+        would be larger, the entries in sorted order of member ID are split
+        into several notification interests, each signed and with a
+        TLV_StateVectorFragment name component giving the range of member IDs
+        which it covers. A receiver merges each fragment on its own, which is
+        safe because the merge keeps the larger sequence number for each
+        member, and only counts a member as missing if it is in the range of
+        the fragment. A reply to a fragment is scheduled like a suppressed
+        reply (with no backoff if setReplySuppression is not enabled) so that
+        the other fragments are merged first. Instances which don't understand
+        fragments decode one as a full vector which is missing members, so
+        they reply with their full vector. This method should be called in the
+        same thread as processEvents.
+
+        :param int maxBytes: The maximum size in bytes. If 0, always send one
+          notification interest. The default is DEFAULT_MAX_NOTIFICATION_SIZE,
+          the usual maximum NDN packet size.
+        """
+        self._maxNotificationSize = max(0, maxBytes)
+        self._signedFragments = None
+
+    def getFragmentationCounters(self):
+        """
+        Get a copy of the fragmentation counters. The dictionary keys are:
+        'fragmentedNotifications' (the number of notifications which were
+        split), 'sentFragments' (the number of notification interests sent for
+        them) and 'receivedFragments' (the number of fragments received).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        return dict(self._fragmentCounters)
+
+    def setReplySuppression(self, maxBackoffMilliseconds):
+        """
+        Enable or disable suppression of replies to outdated state vectors.
+        When enabled, a received state vector which is missing newer entries
+        that this member has does not cause an immediate broadcast. Instead,
+        the reply is sent after a random backoff up to maxBackoffMilliseconds,
+        and is cancelled if a notification with all of our entries arrives
+        first, for example the reply of another member. Also, a reply is not
+        sent if a notification with the same state vector was sent or received
+        within the notification interest lifetime. This method should be called
+        in the same thread as processEvents.
+
+        :param float maxBackoffMilliseconds: The maximum random delay in
+          milliseconds before sending a reply. If 0, reply immediately to each
+          outdated state vector, which is the default.
+        """
+        self._maxReplyBackoff = maxBackoffMilliseconds
+        if maxBackoffMilliseconds <= 0 and self._isReplyPending:
+            self._sendPendingReply(self._replyNo)
+
+    def getReplySuppressionCounters(self):
+        """
+        Get a copy of the reply suppression counters. The dictionary keys are:
+        'scheduledReplies' (the number of replies scheduled after a backoff),
+        'sentReplies' (the number of replies sent, with or without a backoff),
+        'cancelledReplies' (the number of scheduled replies cancelled by a
+        notification from another member or by our own notification) and
+        'suppressedDuplicates' (the number of scheduled replies not sent
+        because the same state vector was sent or received within the
+        notification interest lifetime).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        return dict(self._replySuppressionCounters)
+
+    def setNotificationCache(self, maxEntries, ttlMilliseconds):
+        """
+        Enable or disable the cache of recently processed notification
+        interests. When enabled, a received notification interest with the same
+        name (including the signature) as one which was verified within
+        ttlMilliseconds is not verified or decoded again. If our state vector
+        has not changed since, the result of processing it is reused, so we
+        still reply if the sender was outdated. This is common when several
+        forwarders deliver the same notification, or when a member which has
+        not received our reply sends the same notification again.
+        This method should be called in the same thread as processEvents.
+
+        :param int maxEntries: The maximum number of names to remember, evicting
+          the least recently seen. If 0, disable the cache, which is the
+          default.
+        :param float ttlMilliseconds: The time in milliseconds to remember a
+          name.
+        """
+        if maxEntries > 0:
+            self._notificationCache = RecentNotificationCache(
+              maxEntries, ttlMilliseconds)
+        else:
+            self._notificationCache = None
+
+    def getNotificationCacheCounters(self):
+        """
+        Get the counters of the notification cache. The dictionary keys are
+        'hits' (the number of received notifications which were skipped),
+        'misses' (the number which were processed) and 'size' (the number of
+        names in the cache). If the cache is not enabled, all are 0.
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        if self._notificationCache == None:
+            return { 'hits': 0, 'misses': 0, 'size': 0 }
+        return self._notificationCache.getCounters()
+
+    def setInboundPipeline(self, executor, maxPendingNotifications = 64):
+        """
+        Enable or disable the inbound pipeline. When enabled, the HMAC
+        verification and decoding of received notification interests run on
+        the workers of the executor instead of the processEvents thread. The
+        decoded state vectors are merged on the processEvents thread in the
+        order that the interests arrived, from a face.callLater callback, so
+        the onReceivedSyncState callback is still called on that thread. The
+        workers do not share the table of member ID strings, so decoding makes
+        a new string for each member ID. If maxPendingNotifications interests
+        are waiting for a worker when another arrives, the processEvents thread
+        blocks until the oldest is finished and merged. When disabling the
+        pipeline or changing the executor, this first waits for and merges the
+        queued interests. This method should be called in the same thread as
+        processEvents.
+
+        :param executor: The executor such as a concurrent.futures
+          ThreadPoolExecutor or ProcessPoolExecutor. (A process pool avoids
+          the interpreter lock but adds the cost of sending each interest to
+          the worker process.) The application owns the executor and should
+          shut it down after disabling the pipeline. If None, disable the
+          pipeline and process each interest when it arrives, which is the
+          default.
+        :param int maxPendingNotifications: (optional) The maximum number of
+          interests waiting for a worker before blocking. If omitted, use 64.
+        """
+        if self._notificationPipeline != None:
+            self._notificationPipeline.drain(True)
+            self._notificationPipeline = None
+
+        if executor != None:
+            self._notificationPipeline = NotificationPipeline(
+              executor, self._face,
+              StateVectorSync2018.verifyAndDecodeNotification,
+              self._makePipelineWorkerArgs(), self._onVerifiedNotification,
+              maxPendingNotifications, 1.0)
+
+    def getInboundPipelineCounters(self):
+        """
+        Get the counters of the inbound pipeline, as described in
+        NotificationPipeline.getCounters(). If the pipeline is not enabled, all
+        are 0.
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        if self._notificationPipeline == None:
+            return { 'submitted': 0, 'applied': 0, 'blockedSubmits': 0,
+                     'maxQueueLength': 0, 'queueLength': 0 }
+        return self._notificationPipeline.getCounters()
+
+    def setAdmissionControl(self, sourceRate, sourceBurst, globalRate,
+          globalBurst, maxQueueLength = 0, getSourceId = None):
+        """
+        Enable or disable admission control of received notification
+        interests, so that a peer which sends notifications too often can't
+        take all the time of the processEvents thread. An interest is first
+        checked against the token buckets of an AdmissionControl, one for its
+        source and one for all sources, before verifying its signature, and is
+        shed if either is empty. If maxQueueLength is more than 0, an admitted
+        interest is queued and processed from a face.callLater callback. If the
+        queue is full when an interest arrives, this drops the oldest queued
+        interest which is superseded by a later queued interest, which is a
+        full state vector (not a delta) from the same source with the same
+        fragment range. A later state vector from a member has its earlier
+        entries at the same or higher sequence numbers. An interest is only
+        superseded if getSourceId is supplied, since the incoming face ID of
+        the default source ID can be shared by several senders. If no queued
+        interest is superseded, this drops the oldest. Use
+        getAdmissionCounters() to see
+        what was shed. This method should be called in the same thread as
+        processEvents.
+
+        :param float sourceRate: The number of notifications per second
+          admitted from each source. If 0, don't limit each source.
+        :param float sourceBurst: The number of notifications which a source can
+          send at once after being idle.
+        :param float globalRate: The number of notifications per second admitted
+          from all sources together. If 0, don't limit all sources together.
+          If sourceRate and globalRate are 0, disable the rate limits, which is
+          the default.
+        :param float globalBurst: The number of notifications which all sources
+          together can send at once after being idle.
+        :param int maxQueueLength: (optional) The maximum number of queued
+          interests. If omitted or 0, process each interest when it arrives,
+          which is the default. When disabling the queue, the queued interests
+          are processed first.
+        :param getSourceId: (optional) This calls getSourceId(interest) to get
+          the hashable source ID of a received interest, or None if not known,
+          in which case only the global rate applies. The source ID must
+          identify a single sender, such as the member ID from the
+          application's transport, so that its queued interests can be
+          superseded. If omitted or None, use getNotificationSourceId() and
+          don't supersede queued interests.
+        :type getSourceId: function object
+        """
+        if sourceRate > 0 or globalRate > 0:
+            self._admissionControl = AdmissionControl(
+              sourceRate, sourceBurst, globalRate, globalBurst)
+        else:
+            self._admissionControl = None
+        self._getSourceId = (getSourceId if getSourceId != None
+                             else StateVectorSync2018.getNotificationSourceId)
+        self._isSourceIdSender = getSourceId != None
+
+        self._maxInboundQueueLength = max(0, maxQueueLength)
+        if self._maxInboundQueueLength == 0:
+            self._drainInboundQueue()
+
+    def setDecodeLimits(self, maxEntries, maxMemberIdLength):
+        """
+        Set the limits for decoding the state vector of a received
+        notification or alias lookup. Decoding stops at the first entry over a
+        limit as for an invalid encoding, so the entries before it are merged
+        and we don't reply. Members of the sync group should use limits above
+        the size of the group. This method should be called in the same thread
+        as processEvents.
+
+        :param int maxEntries: The maximum number of entries in a received
+          state vector, or None for no limit, which is the default.
+        :param int maxMemberIdLength: The maximum length in bytes of the UTF-8
+          encoding of a received member ID, or None for no limit, which is the
+          default.
+        """
+        self._maxReceivedEntries = maxEntries
+        self._maxReceivedMemberIdLength = maxMemberIdLength
+        if self._notificationPipeline != None:
+            self._notificationPipeline.setWorkerArgs(
+              self._makePipelineWorkerArgs())
+
+    def getAdmissionCounters(self):
+        """
+        Get a copy of the admission counters. The dictionary keys are:
+        'admitted', 'shedBySource' and 'shedGlobally' (as described in
+        AdmissionControl.getCounters(), or 0 if there is no rate limit),
+        'queued' (the number of interests put in the inbound queue),
+        'superseded' (the number of queued interests dropped because a later
+        one from the same sender superseded them, which is 0 without a
+        getSourceId for setAdmissionControl), 'droppedOldest' (the number of queued interests
+        dropped because none was superseded), 'maxQueueLength' (the most
+        interests queued at once), 'queueLength' (the number queued now) and
+        'limitedVectors' (the number of received state vectors where decoding
+        stopped at a limit from setDecodeLimits).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        counters = dict(self._admissionCounters)
+        counters['queueLength'] = len(self._inboundQueue)
+        if self._admissionControl != None:
+            admissionCounters = self._admissionControl.getCounters()
+            for key in ['admitted', 'shedBySource', 'shedGlobally']:
+                counters[key] = admissionCounters[key]
+        else:
+            counters.update({ 'admitted': 0, 'shedBySource': 0,
+                              'shedGlobally': 0 })
+        return counters
+
+    def setMetrics(self, registry, labels = None):
+        """
+        Enable or disable the metrics of this sync object in a MetricsRegistry,
+        which an exporter such as MetricsFileExporter makes available in the
+        Prometheus text format. The metrics are counters of sent and received
+        notifications and bytes, verification failures and replies to outdated
+        state vectors, gauges of the state vector size, our sequence number and
+        the encoded size of the last notification, and histograms of the
+        updates per received notification and the seconds to verify, decode,
+        merge and call onReceivedSyncState. Received state vectors are decoded
+        fully before merging so that decoding and merging are timed separately.
+        This method should be called in the same thread as processEvents.
+
+        :param MetricsRegistry registry: The registry for the metrics, or None
+          to disable the metrics and remove them from the previous registry.
+        :param dict<str,str> labels: (optional) The labels of the metrics, for
+          example { "group": "chat" } to tell apart several sync objects in one
+          registry. If omitted, the metrics have no labels.
+        """
+        if self._metrics != None:
+            self._metrics.remove()
+            self._metrics = None
+        if registry != None:
+            self._metrics = _SyncMetrics(self, registry, labels)
+        self._isTimingPhases = (self._metrics != None or
+                                self._profiler != None)
+
+    def setProfiler(self, profiler):
+        """
+        Enable or disable timing the phases of processing received
+        notifications and publishing. The phases are "onInterest" (processing
+        a received notification interest, or a queued one from the inbound
+        queue) containing "verify", "decode", "merge" and "callback" (calling
+        onReceivedSyncState), and "publishNextSequenceNo". Both can contain
+        "broadcast" (sending our state vector) containing "encode", "sign" and
+        "express". A phase inside another, such as a publish in
+        onReceivedSyncState, has both in its path. When disabled, which is the
+        default, each phase only checks a flag. This method should be called in
+        the same thread as processEvents.
+
+        :param PhaseProfiler profiler: The PhaseProfiler to record the times,
+          or None to disable the profiler.
+        """
+        self._profiler = profiler
+        self._isTimingPhases = (self._metrics != None or
+                                self._profiler != None)
+
+    def setRecorder(self, recorder):
+        """
+        Enable or disable recording every received notification interest,
+        before checking the notification cache, admission control or the
+        signature, so that NotificationReplayer can feed the same stream to
+        another sync object offline. This method should be called in the same
+        thread as processEvents.
+
+        :param NotificationRecorder recorder: The NotificationRecorder to
+          record the interests, or None to stop recording. This does not close
+          the previous recorder.
+        """
+        self._recorder = recorder
+
+    @staticmethod
+    def getNotificationSourceId(interest):
+        """
+        Get the source ID of a received notification interest for admission
+        control, which is the incoming face ID from the packet header. A
+        forwarder only gives this to a face which enables it. Peers which
+        share a multicast face have the same incoming face ID.
+
+        :param Interest interest: The received notification interest.
+        :return: The incoming face ID, or None if not known.
+        :rtype: int
+        """
+        return interest.getIncomingFaceId()
+
+    def setMemberExpiry(self, expiryMilliseconds, tombstoneMilliseconds = None):
+        """
+        Enable or disable member expiry. When enabled, a member whose sequence
+        number has not changed for expiryMilliseconds is removed from the state
+        vector, so that member IDs of old sessions don't stay in every
+        notification. (Our own member is never removed.) The time is checked
+        by a face.callLater timer every quarter of expiryMilliseconds, so a
+        member is removed up to that much later. An expired member leaves a
+        tombstone with its last sequence number for tombstoneMilliseconds, and
+        a received entry for the member is ignored unless its sequence number
+        is higher, so that a peer which has not yet removed the member does not
+        add it back. A higher sequence number means that the member is active
+        again, so it is added back. All members of the sync group should use
+        about the same expiry. When enabling, the time of the last update of
+        each member is the current time. This method should be called in the
+        same thread as processEvents.
+
+        :param float expiryMilliseconds: The time in milliseconds after the
+          last update of a member when it is removed. If 0, disable member
+          expiry and keep members forever, which is the default.
+        :param float tombstoneMilliseconds: (optional) The time in milliseconds
+          to keep the tombstone of a removed member. This should be longer than
+          the time for the other members to remove it. If omitted or None, use
+          expiryMilliseconds.
+        """
+        self._memberExpiryNo += 1
+        self._lastUpdateTimes = OrderedDict()
+        self._tombstones = OrderedDict()
+        self._memberExpiryMilliseconds = expiryMilliseconds
+        if expiryMilliseconds <= 0:
+            self._memberExpiryMilliseconds = 0.0
+            return
+
+        self._tombstoneMilliseconds = (
+          tombstoneMilliseconds if tombstoneMilliseconds != None
+          else expiryMilliseconds)
+        for memberId in self._memberIndex.getSortedMembers():
+            self._lastUpdateTimes[memberId] = self._expiryTime
+        memberExpiryNo = self._memberExpiryNo
+        self._face.callLater(
+          expiryMilliseconds / 4.0,
+          lambda: self._onMemberExpiryTimeout(memberExpiryNo))
+
+    def getMemberExpiryCounters(self):
+        """
+        Get a copy of the member expiry counters. The dictionary keys are:
+        'expiredMembers' (the number of members removed from the state
+        vector), 'ignoredEntries' (the number of received entries ignored
+        because of a tombstone), 'revivedMembers' (the number of removed
+        members added back with a higher sequence number) and 'tombstones'
+        (the current number of tombstones).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        counters = dict(self._memberExpiryCounters)
+        counters['tombstones'] = len(self._tombstones)
+        return counters
+
+    def setSnapshots(self, enabled):
+        """
+        Enable or disable state vector snapshots. When enabled, after each
+        publish and each merge which changes the state vector, this makes a new
+        immutable StateVectorSnapshot and replaces the one returned by
+        getSnapshot(). The member ID tuple of the previous snapshot is reused
+        if no member was added. This method should be called in the same
+        thread as processEvents.
+
+        :param bool enabled: True to make snapshots, False to stop, which is the
+          default.
+        """
+        self._snapshot = None
+        if enabled:
+            self._updateSnapshot(True)
+
+    def getSnapshot(self):
+        """
+        Get the StateVectorSnapshot of the current state vector. Unlike the
+        other methods, this can be called from any thread, since a snapshot is
+        never modified. To check if the state vector changed, compare the
+        snapshot version with that of an earlier snapshot.
+
+        :return: The current StateVectorSnapshot, or None if setSnapshots has
+          not enabled snapshots.
+        :rtype: StateVectorSnapshot
+        """
+        return self._snapshot
 
     def getSequenceNo(self):
         """
@@ -227,7 +1128,9 @@ class StateVectorSync2018(object):
         shutdown() (which also modifies the data structures).
         """
         self._enabled = False
-        self._contentCache.unregisterAll()
+        for registeredPrefixId in self._registeredPrefixIds:
+            self._face.removeRegisteredPrefix(registeredPrefixId)
+        self._registeredPrefixIds = []
 
     @staticmethod
     def encodeStateVector(stateVector, stateVectorKeys):
@@ -262,167 +1165,2362 @@ class StateVectorSync2018(object):
         return Blob(encoder.getOutput(), False)
 
     @staticmethod
-    def decodeStateVector(input):
+    def encodeStateVectorEntry(memberId, sequenceNo):
+        """
+        Encode one state vector entry as TLV. The result can be joined with
+        other entry encodings to make the value of a TLV_StateVector.
+
+        :param str memberId: The member ID string.
+        :param int sequenceNo: The sequence number for the member.
+        :return: The bytes of the TLV_StateVectorEntry encoding.
+        :rtype: bytes
+        """
+        encoder = TlvEncoder(64)
+
+        encoder.writeNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_SequenceNumber, sequenceNo)
+        encoder.writeBlobTlv(StateVectorSync2018.TLV_StateVector_MemberId,
+          Blob(memberId).buf())
+        encoder.writeTypeAndLength(StateVectorSync2018.TLV_StateVectorEntry,
+          len(encoder))
+
+        return encoder.getOutput().tobytes()
+
+    @staticmethod
+    def decodeStateVector(input, memberIds = None, maxEntries = None,
+          maxMemberIdLength = None):
         """
         Decode the input as a TLV state vector.
 
         :param input: The array with the bytes to decode.
         :type input: An array type with int elements
+        :param dict<bytes,str> memberIds: (optional) A table of known member
+          IDs as described in iterateStateVector(). If omitted, make a new
+          string for each member ID.
+        :param int maxEntries: (optional) The maximum number of entries, as
+          described in iterateStateVector().
+        :param int maxMemberIdLength: (optional) The maximum length of a member
+          ID, as described in iterateStateVector().
         :return: A new dictionary where the key is the member ID string and the
           value is the sequence number. If the input encoding has repeated
           entries with the same member ID, this uses only the last entry.
         :rtype: dict<str,int>
-        :raises ValueError: For invalid encoding.
+        :raises ValueError: For invalid encoding, or StateVectorLimitError if a
+          limit is exceeded.
         """
-        stateVector = {}
-
-        # If input is a blob, get its buf().
-        decodeBuffer = input.buf() if isinstance(input, Blob) else input
-        decoder = TlvDecoder(decodeBuffer)
-
-        endOffset = decoder.readNestedTlvsStart(StateVectorSync2018.TLV_StateVector)
+        return dict(StateVectorSync2018.iterateStateVector(
+          input, memberIds, maxEntries, maxMemberIdLength))
 
-        while decoder.getOffset() < endOffset:
-            entryEndOffset = decoder.readNestedTlvsStart(
-              StateVectorSync2018.TLV_StateVectorEntry)
+    @staticmethod
+    def encodeAliasedStateVectorEntry(alias, memberId, sequenceNo):
+        """
+        Encode one entry of a TLV_AliasedStateVector. The result can be joined
+        with other entry encodings after the sender member ID.
 
-            memberIdBlob = Blob(decoder.readBlobTlv(
-              StateVectorSync2018.TLV_StateVector_MemberId), False)
-            stateVector[str(memberIdBlob)] = decoder.readNonNegativeIntegerTlv(
-              StateVectorSync2018.TLV_StateVector_SequenceNumber)
-            decoder.finishNestedTlvs(entryEndOffset)
+        :param int alias: The alias of the member ID.
+        :param str memberId: The member ID string, or None to only encode the
+          alias.
+        :param int sequenceNo: The sequence number for the member.
+        :return: The bytes of the TLV_StateVectorEntry encoding.
+        :rtype: bytes
+        """
+        encoder = TlvEncoder(64)
 
-        decoder.finishNestedTlvs(endOffset)
+        encoder.writeNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_SequenceNumber, sequenceNo)
+        if memberId != None:
+            encoder.writeBlobTlv(StateVectorSync2018.TLV_StateVector_MemberId,
+              Blob(memberId).buf())
+        encoder.writeNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_Alias, alias)
+        encoder.writeTypeAndLength(StateVectorSync2018.TLV_StateVectorEntry,
+          len(encoder))
 
-        return stateVector
+        return encoder.getOutput().tobytes()
 
-    def _makeNotificationInterest(self):
+    @staticmethod
+    def encodeAliasedStateVector(senderId, entries):
         """
-        Make and return a new Interest where the name is
-        _applicationBroadcastPrefix plus the encoding of _stateVector. Also
-        use _hmacKey to sign it with HmacWithSha256.
+        Encode a TLV_AliasedStateVector.
 
-        :return: The new signed notification interest.
-        :rtype: Interest
+        :param str senderId: The member ID of the sender which assigned the
+          aliases.
+        :param entries: The entries to encode in order, where memberId is None
+          to only encode the alias.
+        :type entries: list of (alias, memberId, sequenceNo)
+        :return: A Blob containing the encoding.
+        :rtype: Blob
         """
-        interest = Interest(self._applicationBroadcastPrefix)
-        interest.setInterestLifetimeMilliseconds(self._notificationInterestLifetime)
-        interest.getName().append(StateVectorSync2018.encodeStateVector
-          (self._stateVector, self._sortedStateVectorKeys))
-
-        # TODO: Should we just use key name /A ?
-        KeyChain.signWithHmacWithSha256(interest, self._hmacKey, Name("/A"))
+        encoder = TlvEncoder(64)
+        encoder.writeBlobTlv(StateVectorSync2018.TLV_StateVector_MemberId,
+          Blob(senderId).buf())
+        body = encoder.getOutput().tobytes() + b"".join(
+          StateVectorSync2018.encodeAliasedStateVectorEntry(
+            alias, memberId, sequenceNo)
+          for alias, memberId, sequenceNo in entries)
 
-        return interest
+        header = TlvEncoder(8)
+        header.writeTypeAndLength(
+          StateVectorSync2018.TLV_AliasedStateVector, len(body))
+        return Blob(header.getOutput().tobytes() + body, False)
 
-    def _broadcastStateVector(self):
-        """
-        Call _makeNotificationInterest() and then expressInterest to broadcast
-        the notification interest.
+    @staticmethod
+    def decodeAliasedStateVector(input, memberIds = None, maxEntries = None,
+          maxMemberIdLength = None):
         """
-        interest = self._makeNotificationInterest()
-        # A response is not required, so ignore the timeout and Data packet.
-        self._face.expressInterest(interest, StateVectorSync2018._dummyOnData)
+        Decode the input as a TLV_AliasedStateVector. This reads the input
+        through a memoryview like iterateStateVector().
 
-    def _setSequenceNumber(self, memberId, sequenceNumber):
+        :param input: The array with the bytes to decode.
+        :type input: An array type with int elements
+        :param dict<bytes,str> memberIds: (optional) A table of known member
+          IDs as described in iterateStateVector(). If omitted, make a new
+          string for each member ID.
+        :param int maxEntries: (optional) The maximum number of entries, as
+          described in iterateStateVector().
+        :param int maxMemberIdLength: (optional) The maximum length of a member
+          ID, including the sender's, as described in iterateStateVector().
+        :return: A tuple of (senderId, entries) where senderId is the member ID
+          of the sender which assigned the aliases and entries is the list of
+          (alias, memberId, sequenceNo) where memberId is None if the entry has
+          only the alias.
+        :rtype: (str, list of (int, str, int))
+        :raises ValueError: For invalid encoding, or StateVectorLimitError if a
+          limit is exceeded.
         """
-        An internal method to update the _stateVector by setting memberId to
-        sequenceNumber. This is needed because we also have to update
-        _sortedStateVectorKeys.
+        # If input is a blob, get its buf().
+        view = memoryview(input.buf() if isinstance(input, Blob) else input)
+        hashable = view.readonly
+        if memberIds == None:
+            memberIds = {}
+        if maxEntries == None:
+            maxEntries = float('inf')
+        if maxMemberIdLength == None:
+            maxMemberIdLength = float('inf')
 
-        :param str memberId: The member ID string.
-        :param int sequenceNumber: The sequence number for the member.
-        """
-        if not memberId in self._sortedStateVectorKeys:
-            # We need to keep _sortedStateVectorKeys synced with _stateVector.
-            bisect.insort(self._sortedStateVectorKeys, memberId)
+        type, offset = _readVarNumber(view, 0)
+        if type != StateVectorSync2018.TLV_AliasedStateVector:
+            raise ValueError("Did not get the expected TLV type")
+        length, offset = _readVarNumber(view, offset)
+        endOffset = offset + length
+        if endOffset > len(view):
+            raise ValueError("TLV length exceeds the buffer length")
 
-        self._stateVector[memberId] = sequenceNumber
+        type, offset = _readVarNumber(view, offset)
+        if type != StateVectorSync2018.TLV_StateVector_MemberId:
+            raise ValueError("Did not get the expected TLV type")
+        length, offset = _readVarNumber(view, offset)
+        if offset + length > endOffset:
+            raise ValueError("TLV length exceeds the buffer length")
+        if length > maxMemberIdLength:
+            raise StateVectorLimitError(_makeMemberIdLimitMessage(
+              maxMemberIdLength))
+        senderId = bytes(view[offset:offset + length]).decode('utf-8')
+        offset += length
 
-    def _onInterest(self, prefix, interest, face, interestFilterId, filter):
-        """
-        Process a received broadcast interest.
-        """
-        # Verify the HMAC signature.
-        verified = False
+        # As in iterateStateVector(), inline the one-byte types and lengths.
+        entries = []
         try:
-            verified = KeyChain.verifyInterestWithHmacWithSha256(
-              interest, self._hmacKey)
-        except:
-            # Treat a decoding failure as verification failure.
-            pass
-        if not verified:
-            # Signature verification failure.
-            logging.getLogger(__name__).info("Dropping Interest with failed signature: %s",
-              interest.getName().toUri())
-            return
+            while offset < endOffset:
+                if len(entries) >= maxEntries:
+                    raise StateVectorLimitError(_makeEntryLimitMessage(
+                      maxEntries))
+                if view[offset] != StateVectorSync2018.TLV_StateVectorEntry:
+                    raise ValueError("Did not get the expected TLV type")
+                length = view[offset + 1]
+                if length < 253:
+                    offset += 2
+                else:
+                    length, offset = _readVarNumber(view, offset + 1)
+                entryEndOffset = offset + length
+                if entryEndOffset > endOffset:
+                    raise ValueError("TLV length exceeds the buffer length")
 
-        encoding = interest.getName().get(
-          self._applicationBroadcastPrefix.size()).getValue()
-        receivedStateVector = StateVectorSync2018.decodeStateVector(encoding)
-        logging.getLogger(__name__).info("Received broadcast state vector %s",
-          str(receivedStateVector))
+                if view[offset] != StateVectorSync2018.TLV_StateVector_Alias:
+                    raise ValueError("Did not get the expected TLV type")
+                length = view[offset + 1]
+                offset += 2
+                if not (length == 1 or length == 2 or length == 4 or length == 8):
+                    raise ValueError("Invalid length for a TLV nonNegativeInteger")
+                alias = 0
+                for i in range(offset, offset + length):
+                    alias = (alias << 8) | view[i]
+                offset += length
 
-        (syncStates, needToReply) = self._mergeStateVector(receivedStateVector)
-        if len(syncStates) > 0:
-            # Inform the application up new sync states.
-            try:
-                self._onReceivedSyncState(syncStates)
-            except:
-                logging.exception("Error in onReceivedSyncState")
+                memberId = None
+                if (offset < entryEndOffset and
+                    view[offset] == StateVectorSync2018.TLV_StateVector_MemberId):
+                    length, offset = _readVarNumber(view, offset + 1)
+                    if offset + length > entryEndOffset:
+                        raise ValueError("TLV length exceeds the buffer length")
+                    if length > maxMemberIdLength:
+                        raise StateVectorLimitError(_makeMemberIdLimitMessage(
+                          maxMemberIdLength))
+                    memberIdBuffer = view[offset:offset + length]
+                    if not hashable:
+                        memberIdBuffer = memberIdBuffer.tobytes()
+                    offset += length
+                    memberId = memberIds.get(memberIdBuffer)
+                    if memberId == None:
+                        memberId = bytes(memberIdBuffer).decode('utf-8')
 
-        if needToReply:
-            # Inform other members who may need to be updated.
-            logging.getLogger(__name__).info(
-              "Received state vector was outdated. Broadcast state vector %s",
-              str(self._stateVector))
-            self._broadcastStateVector()
+                if (offset + 1 >= entryEndOffset or view[offset] !=
+                    StateVectorSync2018.TLV_StateVector_SequenceNumber):
+                    raise ValueError("Did not get the expected TLV type")
+                length = view[offset + 1]
+                offset += 2
+                if not (length == 1 or length == 2 or length == 4 or length == 8):
+                    raise ValueError("Invalid length for a TLV nonNegativeInteger")
+                sequenceNo = 0
+                for i in range(offset, offset + length):
+                    sequenceNo = (sequenceNo << 8) | view[i]
+                offset += length
+
+                if offset != entryEndOffset:
+                    raise ValueError(
+                      "TLV length does not equal the total length of the nested TLVs")
+                entries.append((alias, memberId, sequenceNo))
+        except IndexError:
+            raise ValueError("Read past the end of the input")
+
+        if offset != endOffset:
+            raise ValueError(
+              "TLV length does not equal the total length of the nested TLVs")
+        return (senderId, entries)
 
-    def _mergeStateVector(self, receivedStateVector):
+    @staticmethod
+    def encodeFrontCodedStateVectorEntry(sharedPrefixLength, suffix, sequenceNo):
         """
-        Merge receivedStateVector into self._stateVector and return the
-        updated entries.
+        Encode one entry of a TLV_FrontCodedStateVector. The result can be
+        joined with the other entry encodings in sorted order after the format
+        version.
 
-        :param dict<str,int> receivedStateVector: The received state vector
-          dictionary where the key is the member ID string and the value is
-          the sequence number.
-        :return: A tuple of (syncStates, needToReply) where syncStates is the
-          list of new StateVectorSync2018.SyncState giving the entries in
-          self._stateVector that were updated, and needToReply is True if
-          receivedStateVector is lacking more current information which was in
-          self._stateVector.
-        :rtype: (list<StateVectorSync2018.SyncState>, bool)
+        :param int sharedPrefixLength: The number of bytes at the start of the
+          UTF-8 encoding of the member ID which are the same as the previous
+          member ID.
+        :param bytes suffix: The rest of the UTF-8 encoding of the member ID.
+        :param int sequenceNo: The sequence number for the member.
+        :return: The bytes of the TLV_StateVectorEntry encoding.
+        :rtype: bytes
         """
-        needToReply = False
-        result = []
-        if self._stateVector == receivedStateVector:
-            return (result, needToReply)
-        for k, v in receivedStateVector.items():
-            if self._stateVector.get(k) == None or self._stateVector.get(k) < v:
-                result.append(StateVectorSync2018.SyncState(k,v))
-                self._setSequenceNumber(k, v)
-        for k, v in self._stateVector.items():
-            if receivedStateVector.get(k) == None or receivedStateVector.get(k) < v:
-                needToReply = True
-                break
-        return (result, needToReply)
+        encoder = TlvEncoder(64)
 
-    def _onRegisterSuccess(self, prefix, registeredPrefixId):
-        try:
-            self._onInitialized()
-        except:
-            logging.exception("Error in onInitialized")
+        encoder.writeNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_SequenceNumber, sequenceNo)
+        encoder.writeBlobTlv(StateVectorSync2018.TLV_StateVector_MemberId, suffix)
+        encoder.writeNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_SharedPrefixLength,
+          sharedPrefixLength)
+        encoder.writeTypeAndLength(StateVectorSync2018.TLV_StateVectorEntry,
+          len(encoder))
+
+        return encoder.getOutput().tobytes()
 
     @staticmethod
-    def _dummyOnData(interest, data):
-        """
-        This is a do-nothing onData for using expressInterest when we don't
-        expect a response Data packet.
+    def encodeFrontCodedStateVector(stateVector, stateVectorKeys):
         """
-        pass
+        Encode the stateVector as a TLV_FrontCodedStateVector.
 
-    # Assign TLV types as crtitical values for application use.
+        :param dict<str,int> stateVector: The state vector dictionary where
+          the key is the member ID string and the value is the sequence number.
+        :param list<str> stateVectorKeys: The key strings of stateVector,
+          sorted in the order to be encoded.
+        :return: A Blob containing the encoding.
+        :rtype: Blob
+        """
+        encoder = TlvEncoder(8)
+        encoder.writeNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVector_FormatVersion,
+          StateVectorSync2018.FRONT_CODING_VERSION)
+        entries = [encoder.getOutput().tobytes()]
+
+        previous = b""
+        for memberId in stateVectorKeys:
+            memberIdBytes = memberId.encode('utf-8')
+            sharedPrefixLength = _getSharedPrefixLength(previous, memberIdBytes)
+            entries.append(StateVectorSync2018.encodeFrontCodedStateVectorEntry(
+              sharedPrefixLength, memberIdBytes[sharedPrefixLength:],
+              stateVector[memberId]))
+            previous = memberIdBytes
+
+        body = b"".join(entries)
+        header = TlvEncoder(8)
+        header.writeTypeAndLength(
+          StateVectorSync2018.TLV_FrontCodedStateVector, len(body))
+        return Blob(header.getOutput().tobytes() + body, False)
+
+    @staticmethod
+    def iterateFrontCodedStateVector(input, memberIds = None, maxEntries = None,
+          maxMemberIdLength = None):
+        """
+        Decode the input as a TLV_FrontCodedStateVector and return an iterator
+        over the entries like iterateStateVector(), rebuilding each member ID
+        from the previous one.
+
+        :param input: The array with the bytes to decode.
+        :type input: An array type with int elements
+        :param dict<bytes,str> memberIds: (optional) A table of known member
+          IDs as described in iterateStateVector(). If omitted, make a new
+          string for each member ID.
+        :param int maxEntries: (optional) The maximum number of entries, as
+          described in iterateStateVector().
+        :param int maxMemberIdLength: (optional) The maximum length of a
+          rebuilt member ID, as described in iterateStateVector().
+        :return: An iterator of (memberId, sequenceNo) in the order of the
+          entries in the encoding.
+        :rtype: iterator of (str, int)
+        :raises ValueError: For invalid encoding or an unsupported format
+          version, or StateVectorLimitError if a limit is exceeded. This is
+          raised while iterating, so entries before the invalid one have
+          already been returned.
+        """
+        # If input is a blob, get its buf().
+        view = memoryview(input.buf() if isinstance(input, Blob) else input)
+        if memberIds == None:
+            memberIds = {}
+        if maxEntries == None:
+            maxEntries = float('inf')
+        if maxMemberIdLength == None:
+            maxMemberIdLength = float('inf')
+        nEntries = 0
+
+        type, offset = _readVarNumber(view, 0)
+        if type != StateVectorSync2018.TLV_FrontCodedStateVector:
+            raise ValueError("Did not get the expected TLV type")
+        length, offset = _readVarNumber(view, offset)
+        endOffset = offset + length
+        if endOffset > len(view):
+            raise ValueError("TLV length exceeds the buffer length")
+
+        # As in iterateStateVector(), inline the one-byte types and lengths.
+        previous = b""
+        try:
+            if view[offset] != StateVectorSync2018.TLV_StateVector_FormatVersion:
+                raise ValueError("Did not get the expected TLV type")
+            length = view[offset + 1]
+            offset += 2
+            if not (length == 1 or length == 2 or length == 4 or length == 8):
+                raise ValueError("Invalid length for a TLV nonNegativeInteger")
+            version = 0
+            for i in range(offset, offset + length):
+                version = (version << 8) | view[i]
+            offset += length
+            if version != StateVectorSync2018.FRONT_CODING_VERSION:
+                raise ValueError(
+                  "Unsupported front-coded state vector version " + str(version))
+
+            while offset < endOffset:
+                if nEntries >= maxEntries:
+                    raise StateVectorLimitError(_makeEntryLimitMessage(
+                      maxEntries))
+                nEntries += 1
+                if view[offset] != StateVectorSync2018.TLV_StateVectorEntry:
+                    raise ValueError("Did not get the expected TLV type")
+                length = view[offset + 1]
+                if length < 253:
+                    offset += 2
+                else:
+                    length, offset = _readVarNumber(view, offset + 1)
+                entryEndOffset = offset + length
+                if entryEndOffset > endOffset:
+                    raise ValueError("TLV length exceeds the buffer length")
+
+                if (view[offset] !=
+                    StateVectorSync2018.TLV_StateVector_SharedPrefixLength):
+                    raise ValueError("Did not get the expected TLV type")
+                length = view[offset + 1]
+                offset += 2
+                if not (length == 1 or length == 2 or length == 4 or length == 8):
+                    raise ValueError("Invalid length for a TLV nonNegativeInteger")
+                sharedPrefixLength = 0
+                for i in range(offset, offset + length):
+                    sharedPrefixLength = (sharedPrefixLength << 8) | view[i]
+                offset += length
+                if sharedPrefixLength > len(previous):
+                    raise ValueError(
+                      "The shared prefix is longer than the previous member ID")
+
+                if view[offset] != StateVectorSync2018.TLV_StateVector_MemberId:
+                    raise ValueError("Did not get the expected TLV type")
+                length = view[offset + 1]
+                if length < 253:
+                    offset += 2
+                else:
+                    length, offset = _readVarNumber(view, offset + 1)
+                if offset + length > entryEndOffset:
+                    raise ValueError("TLV length exceeds the buffer length")
+                if sharedPrefixLength + length > maxMemberIdLength:
+                    raise StateVectorLimitError(_makeMemberIdLimitMessage(
+                      maxMemberIdLength))
+                memberIdBytes = (previous[:sharedPrefixLength] +
+                                 view[offset:offset + length].tobytes())
+                offset += length
+                previous = memberIdBytes
+                memberId = memberIds.get(memberIdBytes)
+                if memberId == None:
+                    memberId = memberIdBytes.decode('utf-8')
+
+                if (offset + 1 >= entryEndOffset or view[offset] !=
+                    StateVectorSync2018.TLV_StateVector_SequenceNumber):
+                    raise ValueError("Did not get the expected TLV type")
+                length = view[offset + 1]
+                offset += 2
+                if not (length == 1 or length == 2 or length == 4 or length == 8):
+                    raise ValueError("Invalid length for a TLV nonNegativeInteger")
+                if offset + length > entryEndOffset:
+                    raise ValueError("TLV length exceeds the buffer length")
+                sequenceNo = 0
+                for i in range(offset, offset + length):
+                    sequenceNo = (sequenceNo << 8) | view[i]
+                offset += length
+
+                if offset != entryEndOffset:
+                    raise ValueError(
+                      "TLV length does not equal the total length of the nested TLVs")
+                yield memberId, sequenceNo
+        except IndexError:
+            raise ValueError("Read past the end of the input")
+        except UnicodeDecodeError:
+            raise ValueError("The member ID is not valid UTF-8")
+
+        if offset != endOffset:
+            raise ValueError(
+              "TLV length does not equal the total length of the nested TLVs")
+
+    @staticmethod
+    def encodeDeltaMarker(memberId, deltaNo, span):
+        """
+        Encode the TLV_StateVectorDelta name component of a notification.
+
+        :param str memberId: The member ID of the sender.
+        :param int deltaNo: The number of the sender's last delta notification.
+        :param int span: The number of recent delta notifications whose changes
+          are in the state vector, or 0 if it is the full state vector.
+        :return: A Blob containing the encoding.
+        :rtype: Blob
+        """
+        encoder = TlvEncoder(64)
+        saveLength = len(encoder)
+
+        # Encode backwards.
+        encoder.writeNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVectorDelta_Span, span)
+        encoder.writeNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVectorDelta_DeltaNumber, deltaNo)
+        encoder.writeBlobTlv(StateVectorSync2018.TLV_StateVector_MemberId,
+          Blob(memberId).buf())
+        encoder.writeTypeAndLength(StateVectorSync2018.TLV_StateVectorDelta,
+          len(encoder) - saveLength)
+
+        return Blob(encoder.getOutput(), False)
+
+    @staticmethod
+    def decodeDeltaMarker(input):
+        """
+        Decode the input as a TLV_StateVectorDelta name component.
+
+        :param input: The array with the bytes to decode.
+        :type input: An array type with int elements
+        :return: A tuple of (memberId, deltaNo, span) as described in
+          encodeDeltaMarker().
+        :rtype: (str, int, int)
+        :raises ValueError: For invalid encoding.
+        """
+        # If input is a blob, get its buf().
+        decodeBuffer = input.buf() if isinstance(input, Blob) else input
+        decoder = TlvDecoder(decodeBuffer)
+
+        endOffset = decoder.readNestedTlvsStart(
+          StateVectorSync2018.TLV_StateVectorDelta)
+        memberId = bytes(decoder.readBlobTlv(
+          StateVectorSync2018.TLV_StateVector_MemberId)).decode('utf-8')
+        deltaNo = decoder.readNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVectorDelta_DeltaNumber)
+        span = decoder.readNonNegativeIntegerTlv(
+          StateVectorSync2018.TLV_StateVectorDelta_Span)
+        decoder.finishNestedTlvs(endOffset)
+
+        return (memberId, deltaNo, span)
+
+    @staticmethod
+    def encodeFragmentMarker(startMemberId, endMemberId):
+        """
+        Encode the TLV_StateVectorFragment name component of a notification
+        which has the entries for the member IDs from startMemberId up to but
+        not including endMemberId in sorted order.
+
+        :param str startMemberId: The start of the range, or "" if the range
+          starts before the first member.
+        :param str endMemberId: The end of the range, which is not included, or
+          None if the range ends after the last member.
+        :return: A Blob containing the encoding.
+        :rtype: Blob
+        """
+        encoder = TlvEncoder(256)
+        saveLength = len(encoder)
+
+        # Encode backwards.
+        if endMemberId != None:
+            encoder.writeBlobTlv(StateVectorSync2018.TLV_StateVectorFragment_End,
+              Blob(endMemberId).buf())
+        encoder.writeBlobTlv(StateVectorSync2018.TLV_StateVectorFragment_Start,
+          Blob(startMemberId).buf())
+        encoder.writeTypeAndLength(StateVectorSync2018.TLV_StateVectorFragment,
+          len(encoder) - saveLength)
+
+        return Blob(encoder.getOutput(), False)
+
+    @staticmethod
+    def decodeFragmentMarker(input):
+        """
+        Decode the input as a TLV_StateVectorFragment name component.
+
+        :param input: The array with the bytes to decode.
+        :type input: An array type with int elements
+        :return: A tuple of (startMemberId, endMemberId) as described in
+          encodeFragmentMarker().
+        :rtype: (str, str)
+        :raises ValueError: For invalid encoding.
+        """
+        # If input is a blob, get its buf().
+        decodeBuffer = input.buf() if isinstance(input, Blob) else input
+        decoder = TlvDecoder(decodeBuffer)
+
+        endOffset = decoder.readNestedTlvsStart(
+          StateVectorSync2018.TLV_StateVectorFragment)
+        startMemberId = bytes(decoder.readBlobTlv(
+          StateVectorSync2018.TLV_StateVectorFragment_Start)).decode('utf-8')
+        endMemberId = decoder.readOptionalBlobTlv(
+          StateVectorSync2018.TLV_StateVectorFragment_End, endOffset)
+        if endMemberId != None:
+            endMemberId = bytes(endMemberId).decode('utf-8')
+        decoder.finishNestedTlvs(endOffset)
+
+        return (startMemberId, endMemberId)
+
+    @staticmethod
+    def iterateStateVector(input, memberIds = None, maxEntries = None,
+          maxMemberIdLength = None):
+        """
+        Decode the input as a TLV state vector and return an iterator over the
+        entries, so that the caller can process each entry while decoding. This
+        reads the input through a memoryview without copying each member ID.
+        If a member ID is in memberIds, this returns the existing string from
+        the table instead of making a new one.
+
+        :param input: The array with the bytes to decode.
+        :type input: An array type with int elements
+        :param dict<bytes,str> memberIds: (optional) A table where the key is
+          the UTF-8 encoding of a member ID and the value is the member ID
+          string. This is only read. If omitted, make a new string for each
+          member ID.
+        :param int maxEntries: (optional) The maximum number of entries. If the
+          encoding has more, raise StateVectorLimitError before decoding the
+          next entry. If omitted or None, there is no limit.
+        :param int maxMemberIdLength: (optional) The maximum length in bytes of
+          the UTF-8 encoding of a member ID. If an entry has a longer one,
+          raise StateVectorLimitError before copying it. If omitted or None,
+          there is no limit.
+        :return: An iterator of (memberId, sequenceNo) in the order of the
+          entries in the encoding.
+        :rtype: iterator of (str, int)
+        :raises ValueError: For invalid encoding, or StateVectorLimitError if a
+          limit is exceeded. This is raised while iterating, so entries before
+          the invalid one have already been returned.
+        """
+        # If input is a blob, get its buf().
+        view = memoryview(input.buf() if isinstance(input, Blob) else input)
+        # A slice of a read-only memoryview can be hashed to look up memberIds.
+        # Otherwise, look up with a copy of only the member ID bytes.
+        hashable = view.readonly
+        if memberIds == None:
+            memberIds = {}
+        if maxEntries == None:
+            maxEntries = float('inf')
+        if maxMemberIdLength == None:
+            maxMemberIdLength = float('inf')
+        nEntries = 0
+
+        type, offset = _readVarNumber(view, 0)
+        if type != StateVectorSync2018.TLV_StateVector:
+            raise ValueError("Did not get the expected TLV type")
+        length, offset = _readVarNumber(view, offset)
+        endOffset = offset + length
+        if endOffset > len(view):
+            raise ValueError("TLV length exceeds the buffer length")
+
+        # The entry TLV types are less than 253, so each is encoded in one
+        # byte. Most lengths are also one byte, so only call _readVarNumber for
+        # a longer length.
+        try:
+            while offset < endOffset:
+                if nEntries >= maxEntries:
+                    raise StateVectorLimitError(_makeEntryLimitMessage(
+                      maxEntries))
+                nEntries += 1
+                if view[offset] != StateVectorSync2018.TLV_StateVectorEntry:
+                    raise ValueError("Did not get the expected TLV type")
+                length = view[offset + 1]
+                if length < 253:
+                    offset += 2
+                else:
+                    length, offset = _readVarNumber(view, offset + 1)
+                entryEndOffset = offset + length
+                if entryEndOffset > endOffset:
+                    raise ValueError("TLV length exceeds the buffer length")
+
+                if view[offset] != StateVectorSync2018.TLV_StateVector_MemberId:
+                    raise ValueError("Did not get the expected TLV type")
+                length = view[offset + 1]
+                if length < 253:
+                    offset += 2
+                else:
+                    length, offset = _readVarNumber(view, offset + 1)
+                if offset + length > entryEndOffset:
+                    raise ValueError("TLV length exceeds the buffer length")
+                if length > maxMemberIdLength:
+                    raise StateVectorLimitError(_makeMemberIdLimitMessage(
+                      maxMemberIdLength))
+                memberIdBuffer = view[offset:offset + length]
+                if not hashable:
+                    memberIdBuffer = memberIdBuffer.tobytes()
+                offset += length
+                memberId = memberIds.get(memberIdBuffer)
+                if memberId == None:
+                    memberId = bytes(memberIdBuffer).decode('utf-8')
+
+                if (offset + 1 >= entryEndOffset or view[offset] !=
+                    StateVectorSync2018.TLV_StateVector_SequenceNumber):
+                    raise ValueError("Did not get the expected TLV type")
+                length = view[offset + 1]
+                offset += 2
+                if not (length == 1 or length == 2 or length == 4 or length == 8):
+                    raise ValueError("Invalid length for a TLV nonNegativeInteger")
+                if offset + length > entryEndOffset:
+                    raise ValueError("TLV length exceeds the buffer length")
+                sequenceNo = 0
+                for i in range(offset, offset + length):
+                    sequenceNo = (sequenceNo << 8) | view[i]
+                offset += length
+
+                if offset != entryEndOffset:
+                    raise ValueError(
+                      "TLV length does not equal the total length of the nested TLVs")
+                yield memberId, sequenceNo
+        except IndexError:
+            raise ValueError("Read past the end of the input")
+
+        if offset != endOffset:
+            raise ValueError(
+              "TLV length does not equal the total length of the nested TLVs")
+
+    @staticmethod
+    def verifyAndDecodeNotification(interestEncoding, hmacKey, prefixSize,
+          maxEntries = None, maxMemberIdLength = None):
+        """
+        Decode the notification interest, verify its HmacWithSha256 signature
+        and decode the state vector in its name. This only uses its arguments,
+        so it can run on a worker thread or in a worker process for
+        setInboundPipeline().
+
+        :param bytes interestEncoding: The wire encoding of the interest.
+        :param bytes hmacKey: The shared key for the HMAC.
+        :param int prefixSize: The number of components in the broadcast
+          prefix, which are before the state vector component.
+        :param int maxEntries: (optional) The maximum number of entries, as
+          described in iterateStateVector().
+        :param int maxMemberIdLength: (optional) The maximum length of a member
+          ID, as described in iterateStateVector().
+        :return: None if the interest cannot be decoded or the signature does
+          not verify. Otherwise, a tuple of (entries, error) where entries is
+          the list of (memberId, sequenceNo) and error is None, or if the state
+          vector encoding is invalid or exceeds a limit, entries has the
+          entries before the invalid one and error is the ValueError from
+          decoding. If the state vector is a TLV_AliasedStateVector, entries
+          and error are None because the aliases must be resolved by the
+          receiving StateVectorSync2018.
+        :rtype: (list<(str, int)>, ValueError)
+        """
+        interest = Interest()
+        try:
+            interest.wireDecode(Blob(interestEncoding, False))
+            if not KeyChain.verifyInterestWithHmacWithSha256(
+                interest, Blob(hmacKey, False)):
+                return None
+        except:
+            # Treat a decoding failure as verification failure.
+            return None
+
+        entries = []
+        try:
+            encoding = interest.getName().get(prefixSize).getValue()
+            if (encoding.size() > 0 and encoding.buf()[0] ==
+                StateVectorSync2018.TLV_AliasedStateVector):
+                return (None, None)
+            for entry in StateVectorSync2018._iterateReceivedStateVector(
+                encoding, None, maxEntries, maxMemberIdLength):
+                entries.append(entry)
+        except ValueError as ex:
+            return (entries, ex)
+        return (entries, None)
+
+    def _makeNotificationInterest(self):
+        """
+        Return an Interest where the name is _applicationBroadcastPrefix plus
+        the encoding of _stateVector, signed with HmacWithSha256 using
+        _hmacKey. If delta notifications are enabled, the name also has the
+        delta marker with span 0. The encoding comes from the encoding cache
+        so that only changed entries are re-encoded. The signature is
+        deterministic, so if _stateVector and _deltaNo have not changed since
+        the last call, this returns the same signed Interest again. This does
+        not check the size. See _makeNotificationInterests().
+
+        :return: The signed notification interest. This is shared with later
+          calls, so you must not modify it. (Face.expressInterest makes a copy.)
+        :rtype: Interest
+        """
+        if (self._signedNotification != None and
+            self._signedNotificationVersion == self._stateVectorVersion and
+            self._signedNotificationDeltaNo == self._deltaNo):
+            return self._signedNotification
+
+        interest = self._signNotification(
+          self._encodeNotificationStateVector(), self._makeFullVectorMarkers())
+
+        self._signedNotification = interest
+        self._signedNotificationVersion = self._stateVectorVersion
+        self._signedNotificationDeltaNo = self._deltaNo
+        return interest
+
+    def _makeNotificationInterests(self):
+        """
+        Return the list with the Interest from _makeNotificationInterest(), or
+        if it would be larger than _maxNotificationSize, return the signed
+        fragments from _makeFragments(). Like _makeNotificationInterest(), the
+        fragments are reused until _stateVector or _deltaNo changes.
+
+        :return: The list of signed notification interests. This is shared with
+          later calls, so you must not modify it or the interests.
+        :rtype: list<Interest>
+        """
+        if (self._signedFragments != None and
+            self._signedFragmentsVersion == self._stateVectorVersion and
+            self._signedFragmentsDeltaNo == self._deltaNo):
+            return self._signedFragments
+
+        markers = self._makeFullVectorMarkers()
+        if not self._isTooLarge(self._encodeNotificationStateVector(), markers):
+            return [self._makeNotificationInterest()]
+
+        self._signedFragments = self._makeFragments(
+          self._memberIndex.getSortedMembers(), markers)
+        self._signedFragmentsVersion = self._stateVectorVersion
+        self._signedFragmentsDeltaNo = self._deltaNo
+        return self._signedFragments
+
+    def _makeDeltaNotificationInterests(self):
+        """
+        Increment _deltaNo and return a new Interest where the name is
+        _applicationBroadcastPrefix plus the encoding of the entries of
+        _stateVector which changed since the last _deltaSpan delta
+        notifications, plus the delta marker, signed with HmacWithSha256 using
+        _hmacKey. If it would be larger than _maxNotificationSize, return the
+        signed fragments from _makeFragments() instead.
+
+        :return: The list of new signed delta notification interests.
+        :rtype: list<Interest>
+        """
+        memberIds = set(self._changedMemberIds)
+        for changedMemberIds in self._deltaHistory:
+            memberIds.update(changedMemberIds)
+        self._deltaHistory.append(self._changedMemberIds)
+        while len(self._deltaHistory) > self._deltaSpan - 1:
+            self._deltaHistory.popleft()
+        self._changedMemberIds = set()
+        self._deltaNo += 1
+
+        memberIds = sorted(memberIds)
+        markers = [StateVectorSync2018.encodeDeltaMarker(
+          self._applicationDataPrefixUri, self._deltaNo, self._deltaSpan)]
+        encoding = self._encodeNotificationEntries(memberIds)
+        if self._isTooLarge(encoding, markers):
+            interests = self._makeFragments(memberIds, markers)
+        else:
+            interests = [self._signNotification(encoding, markers)]
+        if self._aliasEncodingCache != None:
+            self._countAliasAnnouncements(memberIds)
+
+        return interests
+
+    def _makeFullVectorMarkers(self):
+        """
+        Return the list of marker name components for a notification with the
+        full state vector, which is the delta marker with span 0 if delta
+        notifications are enabled.
+        """
+        if self._deltaSpan > 0:
+            return [StateVectorSync2018.encodeDeltaMarker(
+              self._applicationDataPrefixUri, self._deltaNo, 0)]
+        else:
+            return []
+
+    def _encodeNotificationStateVector(self):
+        """
+        Return the encoding of _stateVector for a notification from the
+        encoding cache for the enabled format: aliased, front-coded or
+        TLV_StateVector.
+
+        :return: A Blob containing the encoding.
+        :rtype: Blob
+        """
+        isTimingPhases = self._isTimingPhases
+        if isTimingPhases:
+            self._startPhase("encode")
+        if self._aliasEncodingCache != None:
+            encoding = self._aliasEncodingCache.encode(
+              self._stateVector, self._aliasKeys)
+        elif self._frontCodedEncodingCache != None:
+            encoding = self._encodeFrontCoded()
+        else:
+            encoding = self._encodingCache.encode(
+              self._stateVector, self._memberIndex.getSortedMembers())
+        if isTimingPhases:
+            self._endPhase("encode")
+        return encoding
+
+    def _encodeNotificationEntries(self, memberIds):
+        """
+        Return the encoding of the entries of _stateVector for memberIds in
+        the enabled format, like _encodeNotificationStateVector().
+
+        :param list<str> memberIds: The member IDs in sorted order.
+        :return: A Blob containing the encoding.
+        :rtype: Blob
+        """
+        isTimingPhases = self._isTimingPhases
+        if isTimingPhases:
+            self._startPhase("encode")
+        if self._aliasEncodingCache != None:
+            encoding = self._aliasEncodingCache.encodeEntries(self._stateVector,
+              sorted(memberIds, key = self._aliases.__getitem__))
+        elif self._frontCodedEncodingCache != None:
+            # The shared prefixes of a subset differ, so encode it directly.
+            encoding = StateVectorSync2018.encodeFrontCodedStateVector(
+              self._stateVector, memberIds)
+        else:
+            encoding = self._encodingCache.encodeEntries(
+              self._stateVector, memberIds)
+        if isTimingPhases:
+            self._endPhase("encode")
+        return encoding
+
+    def _signNotification(self, encoding, markers):
+        """
+        Return a new Interest where the name is _applicationBroadcastPrefix
+        plus the state vector encoding and the markers, signed with
+        HmacWithSha256 using _hmacKey.
+
+        :param Blob encoding: The encoding of the state vector.
+        :param list<Blob> markers: The marker name components.
+        :rtype: Interest
+        """
+        interest = Interest(self._applicationBroadcastPrefix)
+        interest.setInterestLifetimeMilliseconds(self._notificationInterestLifetime)
+        interest.getName().append(encoding)
+        for marker in markers:
+            interest.getName().append(marker)
+        if self._isTimingPhases:
+            self._startPhase("sign")
+            self._signer.sign(interest)
+            self._endPhase("sign")
+        else:
+            self._signer.sign(interest)
+        return interest
+
+    def _getNotificationOverhead(self, markers):
+        """
+        Return the size of the wire encoding of a signed notification interest
+        with the markers and an empty state vector component, plus a few bytes
+        for the longer TLV lengths when the state vector is added.
+        """
+        return self._signNotification(Blob(), markers).wireEncode().size() + 8
+
+    def _isTooLarge(self, encoding, markers):
+        """
+        Check if a notification interest with the state vector encoding and
+        the markers would be larger than _maxNotificationSize.
+        """
+        return (self._maxNotificationSize > 0 and
+                self._getNotificationOverhead(markers) + encoding.size() >
+                  self._maxNotificationSize)
+
+    def _makeFragments(self, memberIds, markers):
+        """
+        Split memberIds into ranges whose notification interest fits in
+        _maxNotificationSize and return the signed notification interest for
+        each range, with the markers and a fragment marker. The ranges cover
+        all member IDs, starting from "" and ending with None, so that a
+        receiver can count its own members which are missing from a fragment.
+
+        :param list<str> memberIds: The member IDs in sorted order.
+        :param list<Blob> markers: The other marker name components.
+        :return: The list of new signed notification interests.
+        :rtype: list<Interest>
+        """
+        # Estimate the size of each entry as its TLV_StateVector entry with
+        # the largest sequence number. _makeFragment splits a range whose
+        # notification is still too large.
+        budget = self._maxNotificationSize - self._getNotificationOverhead(
+          markers) - StateVectorSync2018.MAX_FRAGMENT_MARKER_OVERHEAD
+        memberIdSizes = [len(memberId.encode('utf-8')) + 16
+                         for memberId in memberIds]
+        fragments = []
+        start = 0
+        while start < len(memberIds):
+            # The fragment marker has the start and end member IDs.
+            size = 0 if start == 0 else memberIdSizes[start]
+            end = start
+            while end < len(memberIds):
+                endSize = memberIdSizes[end + 1] if end + 1 < len(memberIds) else 0
+                if end > start and size + memberIdSizes[end] + endSize > budget:
+                    break
+                size += memberIdSizes[end]
+                end += 1
+
+            fragments.extend(self._makeFragment(memberIds, start, end, markers))
+            start = end
+
+        return fragments
+
+    def _makeFragment(self, memberIds, start, end, markers):
+        """
+        Return a list with the signed notification interest for memberIds from
+        index start up to end, or if it is larger than _maxNotificationSize,
+        split the range in half and return the fragments for each half.
+        """
+        interest = self._signNotification(
+          self._encodeNotificationEntries(memberIds[start:end]),
+          markers + [StateVectorSync2018.encodeFragmentMarker(
+            "" if start == 0 else memberIds[start],
+            None if end == len(memberIds) else memberIds[end])])
+        if (end - start > 1 and
+            interest.wireEncode().size() > self._maxNotificationSize):
+            middle = (start + end) // 2
+            return (self._makeFragment(memberIds, start, middle, markers) +
+                    self._makeFragment(memberIds, middle, end, markers))
+
+        return [interest]
+
+    def _expressNotifications(self, interests):
+        """
+        Call expressInterest for each of the notification interests and count
+        the fragments.
+        """
+        if len(interests) > 1:
+            self._fragmentCounters['fragmentedNotifications'] += 1
+            self._fragmentCounters['sentFragments'] += len(interests)
+        isTimingPhases = self._isTimingPhases
+        if isTimingPhases:
+            self._startPhase("express")
+        for interest in interests:
+            # A response is not required, so ignore the timeout and Data packet.
+            self._face.expressInterest(interest, StateVectorSync2018._dummyOnData)
+        if isTimingPhases:
+            self._endPhase("express")
+        if self._metrics != None:
+            self._metrics.sent.value += len(interests)
+            for interest in interests:
+                self._metrics.sentBytes.value += interest.wireEncode().size()
+
+    def _broadcastStateVector(self, allowDelta = False):
+        """
+        Call _makeNotificationInterests() and then expressInterest to broadcast
+        the notification interests. The notification has the latest state
+        vector, so this also ends the batch of pending coalesced publishes and
+        cancels a pending reply. However, if allowDelta is True and delta
+        notifications are enabled, this may call
+        _makeDeltaNotificationInterests() instead, which does not cancel a
+        pending reply.
+
+        :param bool allowDelta: (optional) True if this is for a publish so
+          that a delta notification may be sent. If omitted, send the full
+          state vector.
+        """
+        if self._isTimingPhases:
+            self._startPhase("broadcast")
+            self._sendStateVector(allowDelta)
+            self._endPhase("broadcast")
+        else:
+            self._sendStateVector(allowDelta)
+
+    def _sendStateVector(self, allowDelta):
+        """
+        Do the work of _broadcastStateVector().
+        """
+        if self._nPendingPublishes > 0:
+            self._endPublishBatch()
+
+        if allowDelta and self._deltaSpan > 0 and (self._fullVectorPeriod <= 0
+            or self._nDeltasSinceFullVector < self._fullVectorPeriod):
+            self._nDeltasSinceFullVector += 1
+            self._deltaCounters['deltaNotifications'] += 1
+            interests = self._makeDeltaNotificationInterests()
+            self._lastNotificationEncoding = None
+            self._expressNotifications(interests)
+            return
+
+        if self._isReplyPending:
+            self._cancelPendingReply()
+        if self._deltaSpan > 0:
+            self._nDeltasSinceFullVector = 0
+            self._deltaCounters['fullNotifications'] += 1
+        interests = self._makeNotificationInterests()
+        if self._aliasEncodingCache != None:
+            self._countAliasAnnouncements(list(self._aliasAnnouncements))
+        # Reply suppression compares the encoding of our full state vector.
+        self._lastNotificationEncoding = self._encodingCache.encode(
+          self._stateVector, self._memberIndex.getSortedMembers())
+        self._lastNotificationTime = Common.getNowMilliseconds()
+        self._expressNotifications(interests)
+
+    def _encodeFrontCoded(self):
+        """
+        Update _sharedPrefixLengths if members were added, and return the
+        front-coded encoding of _stateVector from _frontCodedEncodingCache.
+
+        :return: A Blob containing the encoding.
+        :rtype: Blob
+        """
+        sortedMembers = self._memberIndex.getSortedMembers()
+        if self._nFrontCodedMembers != len(sortedMembers):
+            # A new member changes the shared prefix of the next member.
+            previous = b""
+            for memberId in sortedMembers:
+                memberIdBytes = memberId.encode('utf-8')
+                sharedPrefixLength = _getSharedPrefixLength(
+                  previous, memberIdBytes)
+                if self._sharedPrefixLengths.get(memberId) != sharedPrefixLength:
+                    self._sharedPrefixLengths[memberId] = sharedPrefixLength
+                    self._frontCodedEncodingCache.invalidate(memberId)
+                previous = memberIdBytes
+            self._nFrontCodedMembers = len(sortedMembers)
+
+        return self._frontCodedEncodingCache.encode(
+          self._stateVector, sortedMembers)
+
+    def _encodeFrontCodedEntry(self, memberId, sequenceNo):
+        """
+        Encode the entry for memberId in the front-coded state vector. This is
+        the encodeEntry function of _frontCodedEncodingCache.
+        """
+        sharedPrefixLength = self._sharedPrefixLengths[memberId]
+        return StateVectorSync2018.encodeFrontCodedStateVectorEntry(
+          sharedPrefixLength, memberId.encode('utf-8')[sharedPrefixLength:],
+          sequenceNo)
+
+    def _addAlias(self, memberId):
+        """
+        Assign the next alias to memberId and announce it with the member ID
+        in the next _aliasAnnounceCount notifications.
+
+        :param str memberId: The member ID string.
+        """
+        self._aliases[memberId] = len(self._aliasMemberIds)
+        self._aliasMemberIds.append(memberId)
+        self._aliasKeys.append(memberId)
+        self._aliasAnnouncements[memberId] = self._aliasAnnounceCount
+
+    def _encodeAliasedEntry(self, memberId, sequenceNo):
+        """
+        Encode the entry for memberId in the aliased state vector, including
+        the member ID if it is still announced. This is the encodeEntry
+        function of _aliasEncodingCache.
+        """
+        return StateVectorSync2018.encodeAliasedStateVectorEntry(
+          self._aliases[memberId],
+          memberId if memberId in self._aliasAnnouncements else None,
+          sequenceNo)
+
+    def _countAliasAnnouncements(self, memberIds):
+        """
+        Count a sent notification for each of memberIds whose member ID is
+        announced with its alias. When the announcements for a member ID are
+        done, re-encode its entry with only the alias.
+
+        :param memberIds: The member IDs with an entry in the notification.
+        :type memberIds: iterable of str
+        """
+        for memberId in memberIds:
+            nAnnouncements = self._aliasAnnouncements.get(memberId)
+            if nAnnouncements == None:
+                continue
+            if nAnnouncements > 1:
+                self._aliasAnnouncements[memberId] = nAnnouncements - 1
+            else:
+                del self._aliasAnnouncements[memberId]
+                self._aliasEncodingCache.invalidate(memberId)
+                self._signedNotification = None
+                self._signedFragments = None
+
+    def _resolveAliases(self, senderId, entries):
+        """
+        Learn the aliases of senderId from the entries which have the member
+        ID, and replace each alias with its member ID. If an alias is unknown,
+        skip the entry and look up the aliases from the sender.
+
+        :param str senderId: The member ID of the sender of the aliases.
+        :param entries: The entries from decodeAliasedStateVector().
+        :type entries: list of (int, str, int)
+        :return: A tuple of (receivedStateVector, isComplete) where
+          receivedStateVector is the list of (memberId, sequenceNo) and
+          isComplete is False if an entry was skipped.
+        :rtype: (list of (str, int), bool)
+        """
+        aliases = self._peerAliases.get(senderId)
+        if aliases == None:
+            aliases = {}
+            self._peerAliases[senderId] = aliases
+
+        receivedStateVector = []
+        firstUnknownAlias = None
+        for alias, memberId, sequenceNo in entries:
+            if memberId != None:
+                aliases[alias] = memberId
+            else:
+                memberId = aliases.get(alias)
+                if memberId == None:
+                    self._aliasCounters['unknownAliases'] += 1
+                    if firstUnknownAlias == None or alias < firstUnknownAlias:
+                        firstUnknownAlias = alias
+                    continue
+            receivedStateVector.append((memberId, sequenceNo))
+
+        if firstUnknownAlias != None:
+            self._lookUpAliases(senderId, firstUnknownAlias)
+        return (receivedStateVector, firstUnknownAlias == None)
+
+    def _lookUpAliases(self, senderId, alias):
+        """
+        Unless a lookup is pending for senderId, send an interest to senderId
+        for its entries starting at alias.
+        """
+        if senderId in self._aliasLookups:
+            return
+        self._aliasLookups.add(senderId)
+        self._aliasCounters['lookups'] += 1
+
+        interest = Interest(Name(senderId).append(
+          StateVectorSync2018.ALIAS_LOOKUP_COMPONENT).appendNumber(alias))
+        interest.setMustBeFresh(True)
+        interest.setInterestLifetimeMilliseconds(
+          self._notificationInterestLifetime)
+        self._face.expressInterest(
+          interest, lambda interest, data: self._onAliasData(senderId, data),
+          lambda interest: self._onAliasTimeout(senderId))
+
+    def _onAliasData(self, senderId, data):
+        """
+        Process the reply to an alias lookup: learn the aliases and merge the
+        entries.
+        """
+        self._aliasLookups.discard(senderId)
+        if not self._enabled:
+            return
+        if not KeyChain.verifyDataWithHmacWithSha256(data, self._hmacKey):
+            logging.getLogger(__name__).info(
+              "Dropping alias Data with failed signature: %s",
+              data.getName().toUri())
+            self._aliasCounters['failedLookups'] += 1
+            return
+        try:
+            (_, entries) = StateVectorSync2018.decodeAliasedStateVector(
+              data.getContent(), self._memberIds, self._maxReceivedEntries,
+              self._maxReceivedMemberIdLength)
+        except ValueError as ex:
+            self._countLimitedVector(ex)
+            logging.getLogger(__name__).info(
+              "Dropping alias Data with invalid state vector: %s",
+              data.getName().toUri())
+            self._aliasCounters['failedLookups'] += 1
+            return
+
+        (receivedStateVector, _) = self._resolveAliases(senderId, entries)
+        (syncStates, needToReply) = self._mergeStateVector(
+          receivedStateVector, True)
+        if len(syncStates) > 0:
+            # Inform the application up new sync states.
+            try:
+                self._onReceivedSyncState(syncStates)
+            except:
+                logging.exception("Error in onReceivedSyncState")
+        if needToReply:
+            self._reply()
+
+    def _onAliasTimeout(self, senderId):
+        """
+        The alias lookup timed out. A later notification will look up again.
+        """
+        self._aliasLookups.discard(senderId)
+        self._aliasCounters['failedLookups'] += 1
+
+    def _onAliasInterest(self, prefix, interest, face, interestFilterId,
+          filter):
+        """
+        Reply to an alias lookup with a Data packet whose content is a
+        TLV_AliasedStateVector of our entries starting at the requested alias,
+        including the member IDs, up to about MAX_ALIAS_LOOKUP_SIZE bytes.
+        """
+        try:
+            startAlias = interest.getName().get(prefix.size()).toNumber()
+        except:
+            return
+
+        entries = []
+        size = 0
+        for alias in range(startAlias, len(self._aliasMemberIds)):
+            memberId = self._aliasMemberIds[alias]
+            if memberId == None:
+                # The member was removed.
+                continue
+            # Allow for the entry, alias and sequence number TLVs. The member ID
+            # is encoded as UTF-8.
+            size += len(memberId.encode('utf-8')) + 20
+            if size > StateVectorSync2018.MAX_ALIAS_LOOKUP_SIZE and len(entries) > 0:
+                break
+            entries.append((alias, memberId, self._stateVector[memberId]))
+
+        data = Data(interest.getName())
+        data.setContent(StateVectorSync2018.encodeAliasedStateVector(
+          self._applicationDataPrefixUri, entries))
+        data.getMetaInfo().setFreshnessPeriod(1000.0)
+        # Use the same key name as for notifications.
+        signature = HmacWithSha256Signature()
+        signature.getKeyLocator().setType(KeyLocatorType.KEYNAME)
+        signature.getKeyLocator().setKeyName(Name("/A"))
+        data.setSignature(signature)
+        KeyChain.signWithHmacWithSha256(data, self._hmacKey)
+        self._aliasCounters['servedLookups'] += 1
+        self._face.putData(data)
+
+    @staticmethod
+    def _onAliasRegisterFailed(prefix):
+        logging.getLogger(__name__).error(
+          "Failed to register the alias lookup prefix %s", prefix.toUri())
+
+    def _endPublishBatch(self):
+        """
+        Clear the pending coalesced publishes because a notification is sent
+        for them, and update the counters.
+        """
+        now = Common.getNowMilliseconds()
+        counters = self._publishCoalescingCounters
+        counters['notifications'] += 1
+        counters['savedNotifications'] += self._nPendingPublishes - 1
+        counters['totalAddedLatencyMilliseconds'] += (
+          self._nPendingPublishes * now - self._pendingPublishTimeSum)
+        counters['maxAddedLatencyMilliseconds'] = max(
+          counters['maxAddedLatencyMilliseconds'],
+          now - self._firstPendingPublishTime)
+
+        self._nPendingPublishes = 0
+        self._pendingPublishTimeSum = 0.0
+        self._publishBatchNo += 1
+
+    def _onPublishCoalescingTimeout(self, batchNo):
+        """
+        This is called after the coalescing window of the batch with batchNo.
+        If the batch was not already sent, send it now.
+        """
+        if self._enabled and batchNo == self._publishBatchNo:
+            self.flushPublish()
+
+    def _setSequenceNumber(self, memberId, sequenceNumber):
+        """
+        An internal method to update the _stateVector by setting memberId to
+        sequenceNumber. This is needed because we also have to update
+        _memberIndex, _memberIds, _encodingCache, _stateVectorVersion,
+        _changedMemberIds, the member ID aliases, the last update times and
+        the store.
+
+        :param str memberId: The member ID string.
+        :param int sequenceNumber: The sequence number for the member.
+        """
+        # We need to keep _memberIndex synced with _stateVector.
+        if self._memberIndex.add(memberId):
+            self._memberIds[Blob(memberId).toBytes()] = memberId
+            self._membershipVersion += 1
+            if self._aliasEncodingCache != None and not memberId in self._aliases:
+                self._addAlias(memberId)
+
+        self._stateVector[memberId] = sequenceNumber
+        self._encodingCache.invalidate(memberId)
+        if self._frontCodedEncodingCache != None:
+            self._frontCodedEncodingCache.invalidate(memberId)
+        if self._aliasEncodingCache != None:
+            self._aliasEncodingCache.invalidate(memberId)
+        self._stateVectorVersion += 1
+        if self._deltaSpan > 0:
+            self._changedMemberIds.add(memberId)
+        if self._memberExpiryMilliseconds > 0:
+            self._lastUpdateTimes[memberId] = self._expiryTime
+            self._lastUpdateTimes.move_to_end(memberId)
+        if self._store != None:
+            self._store.append(memberId, sequenceNumber)
+
+    def _loadStateVector(self, memberIds, stateVector):
+        """
+        Start with the state vector loaded from the store, before anything else
+        is added. This sets _stateVector and the other structures in bulk
+        instead of calling _setSequenceNumber for each entry.
+
+        :param list<str> memberIds: The keys of stateVector in sorted order.
+        :param dict<str,int> stateVector: The loaded state vector, which is
+          kept, not copied.
+        """
+        if len(memberIds) == 0:
+            return
+
+        self._stateVector = stateVector
+        self._memberIndex.addSorted(memberIds)
+        self._memberIds = dict(zip(
+          [memberId.encode('utf-8') for memberId in memberIds], memberIds))
+        self._encodingCache.invalidateMany(memberIds)
+        self._stateVectorVersion += 1
+        self._membershipVersion += 1
+
+    def _commitStore(self, isPublish = False):
+        """
+        If there is a store, commit the entries appended by _setSequenceNumber.
+        If some are not synced, make sure there is a timer to sync them.
+
+        :param bool isPublish: (optional) True if our own sequence number
+          changed.
+        """
+        if self._store == None:
+            return
+        if (self._store.commit(self._stateVector, self._memberIndex, isPublish)
+            and not self._isStoreSyncPending):
+            self._isStoreSyncPending = True
+            self._face.callLater(
+              self._store.getFsyncIntervalMilliseconds(),
+              self._onStoreSyncTimeout)
+
+    def _onStoreSyncTimeout(self):
+        self._isStoreSyncPending = False
+        # After shutdown, the application closes the store which syncs it.
+        if self._enabled:
+            self._store.sync()
+
+    def _onMemberExpiryTimeout(self, memberExpiryNo):
+        """
+        Advance _expiryTime, remove the expired members and tombstones, and
+        schedule the next sweep, unless member expiry was changed since this
+        timer was set.
+        """
+        if not self._enabled or memberExpiryNo != self._memberExpiryNo:
+            return
+
+        sweepMilliseconds = self._memberExpiryMilliseconds / 4.0
+        self._expiryTime += sweepMilliseconds
+        while len(self._tombstones) > 0:
+            memberId, (_, expiryTime) = next(iter(self._tombstones.items()))
+            if self._expiryTime - expiryTime < self._tombstoneMilliseconds:
+                break
+            del self._tombstones[memberId]
+
+        expiredMemberIds = []
+        for memberId, lastUpdateTime in self._lastUpdateTimes.items():
+            if self._expiryTime - lastUpdateTime < self._memberExpiryMilliseconds:
+                # The rest were updated later.
+                break
+            expiredMemberIds.append(memberId)
+        if self._applicationDataPrefixUri in expiredMemberIds:
+            # Our own member doesn't expire, so treat it as updated now.
+            expiredMemberIds.remove(self._applicationDataPrefixUri)
+            self._lastUpdateTimes[self._applicationDataPrefixUri] = (
+              self._expiryTime)
+            self._lastUpdateTimes.move_to_end(self._applicationDataPrefixUri)
+        if len(expiredMemberIds) > 0:
+            self._removeMembers(expiredMemberIds)
+
+        self._face.callLater(
+          sweepMilliseconds,
+          lambda: self._onMemberExpiryTimeout(memberExpiryNo))
+
+    def _removeMembers(self, memberIds):
+        """
+        Remove the expired memberIds from _stateVector and all the structures
+        kept in sync with it by _setSequenceNumber, and leave a tombstone for
+        each. If there is a store, write a snapshot so that the removed members
+        are not loaded from the log.
+
+        :param list<str> memberIds: The member ID strings to remove.
+        """
+        removedMemberIds = set(memberIds)
+        for memberId in memberIds:
+            self._tombstones[memberId] = (
+              self._stateVector.pop(memberId), self._expiryTime)
+            del self._memberIds[memberId.encode('utf-8')]
+            self._lastUpdateTimes.pop(memberId, None)
+            self._changedMemberIds.discard(memberId)
+            self._receivedDeltaNos.pop(memberId, None)
+            self._peerAliases.pop(memberId, None)
+            self._sharedPrefixLengths.pop(memberId, None)
+            self._aliasAnnouncements.pop(memberId, None)
+            alias = self._aliases.pop(memberId, None)
+            if alias != None:
+                self._aliasMemberIds[alias] = None
+        self._memberIndex.removeMany(removedMemberIds)
+        for changedMemberIds in self._deltaHistory:
+            changedMemberIds.difference_update(removedMemberIds)
+
+        self._encodingCache.removeMany(memberIds)
+        if self._frontCodedEncodingCache != None:
+            self._frontCodedEncodingCache.removeMany(memberIds)
+            # The next member after a removed one has a new shared prefix.
+            self._nFrontCodedMembers = -1
+        if len(self._aliasKeys) > 0:
+            self._aliasKeys = [memberId for memberId in self._aliasKeys
+                               if not memberId in removedMemberIds]
+            if self._aliasEncodingCache != None:
+                self._aliasEncodingCache.removeMany(memberIds)
+        for aliases in self._peerAliases.values():
+            for alias in [alias for alias, memberId in aliases.items()
+                          if memberId in removedMemberIds]:
+                del aliases[alias]
+
+        self._stateVectorVersion += 1
+        self._membershipVersion += 1
+        self._signedNotification = None
+        self._signedFragments = None
+        self._memberExpiryCounters['expiredMembers'] += len(memberIds)
+        self._updateSnapshot()
+        if self._store != None:
+            self._commitStore()
+            self._store.writeSnapshot(self._stateVector, self._memberIndex)
+
+    def _reviveMember(self, memberId, sequenceNo):
+        """
+        Check a received entry for memberId which has a tombstone. If
+        sequenceNo is higher than in the tombstone, remove the tombstone so
+        that the member is added again.
+
+        :param str memberId: The member ID string.
+        :param int sequenceNo: The received sequence number.
+        :return: True if the member should be added, False to ignore the entry.
+        :rtype: bool
+        """
+        if sequenceNo <= self._tombstones[memberId][0]:
+            self._memberExpiryCounters['ignoredEntries'] += 1
+            return False
+
+        del self._tombstones[memberId]
+        self._memberExpiryCounters['revivedMembers'] += 1
+        return True
+
+    def _updateSnapshot(self, force = False):
+        """
+        If snapshots are enabled and _stateVector changed since the current
+        StateVectorSnapshot, replace it with a new one.
+
+        :param bool force: (optional) If True, make the first snapshot when
+          enabling snapshots. If omitted, do nothing if there is no snapshot.
+        """
+        snapshot = self._snapshot
+        if snapshot == None:
+            if not force:
+                return
+        elif snapshot.getVersion() == self._stateVectorVersion:
+            return
+
+        if (snapshot != None and
+            self._snapshotMembershipVersion == self._membershipVersion):
+            memberIds = snapshot.getProducerPrefixes()
+        else:
+            memberIds = tuple(self._memberIndex.getSortedMembers())
+            self._snapshotMembershipVersion = self._membershipVersion
+        # Assigning the reference is atomic, so a reader gets the old or the
+        # new snapshot.
+        self._snapshot = StateVectorSnapshot(
+          self._stateVectorVersion, memberIds, dict(self._stateVector))
+
+    def _onInterest(self, prefix, interest, face, interestFilterId, filter):
+        """
+        Process a received broadcast interest.
+        """
+        if not self._enabled:
+            return
+        if self._recorder != None:
+            self._recorder.record(interest)
+        metrics = self._metrics
+        if metrics != None:
+            metrics.received.value += 1
+            metrics.receivedBytes.value += interest.wireEncode().size()
+
+        nameDigest = None
+        if self._notificationCache != None:
+            nameDigest = RecentNotificationCache.getNameDigest(interest)
+            cachedResult = self._notificationCache.get(nameDigest)
+            if cachedResult != None:
+                # We already verified and processed the same notification.
+                self._processDuplicateNotification(
+                  interest, nameDigest, cachedResult)
+                return
+
+        if self._admissionControl != None or self._maxInboundQueueLength > 0:
+            sourceId = self._getSourceId(interest)
+            if (self._admissionControl != None and
+                not self._admissionControl.admit(sourceId)):
+                return
+            if self._maxInboundQueueLength > 0:
+                self._queueNotification(interest, nameDigest, sourceId)
+                return
+
+        if self._isTimingPhases:
+            self._startPhase("onInterest")
+            self._processNotification(interest, nameDigest)
+            self._endPhase("onInterest")
+        else:
+            self._processNotification(interest, nameDigest)
+
+    def _processNotification(self, interest, nameDigest):
+        """
+        Verify and process an admitted notification interest, or submit it to
+        the inbound pipeline.
+
+        :param Interest interest: The received notification interest.
+        :param bytes nameDigest: The digest from
+          RecentNotificationCache.getNameDigest, or None if there is no
+          notification cache.
+        """
+        if self._notificationPipeline != None:
+            # Verify and decode on a worker. This calls _onVerifiedNotification.
+            self._notificationPipeline.submit(interest, nameDigest)
+            return
+
+        # Verify the HMAC signature.
+        isTimingPhases = self._isTimingPhases
+        if isTimingPhases:
+            self._startPhase("verify")
+        verified = False
+        try:
+            verified = self._signer.verify(interest)
+        except:
+            # Treat a decoding failure as verification failure.
+            pass
+        if isTimingPhases:
+            self._endPhase("verify")
+        if not verified:
+            # Signature verification failure.
+            logging.getLogger(__name__).info("Dropping Interest with failed signature: %s",
+              interest.getName().toUri())
+            if self._metrics != None:
+                self._metrics.verificationFailures.value += 1
+            return
+
+        self._processVerifiedNotification(interest, nameDigest, None)
+
+    def _processDuplicateNotification(self, interest, nameDigest, cachedResult):
+        """
+        Process a notification interest which is in the notification cache,
+        without verifying it again. If our state vector has not changed since
+        the interest was processed, then only reply again if the sender was
+        outdated. Otherwise, process the state vector again since the sender
+        may now be outdated.
+
+        :param Interest interest: The received notification interest.
+        :param bytes nameDigest: The digest from
+          RecentNotificationCache.getNameDigest.
+        :param tuple cachedResult: The (stateVectorVersion, replyIsFragment)
+          from the notification cache.
+        """
+        (stateVectorVersion, replyIsFragment) = cachedResult
+        if stateVectorVersion == self._stateVectorVersion:
+            if replyIsFragment != None:
+                # The sender has not received our reply.
+                self._reply(replyIsFragment)
+            return
+
+        if self._isTimingPhases:
+            self._startPhase("onInterest")
+            self._processVerifiedNotification(interest, nameDigest, None)
+            self._endPhase("onInterest")
+        else:
+            self._processVerifiedNotification(interest, nameDigest, None)
+
+    def _processVerifiedNotification(
+          self, interest, nameDigest, receivedStateVector):
+        """
+        Process the state vector of a verified notification interest and, if
+        nameDigest is not None, add the result to the notification cache.
+
+        :param Interest interest: The verified notification interest.
+        :param bytes nameDigest: The digest from
+          RecentNotificationCache.getNameDigest, or None to not add it to the
+          notification cache.
+        :param receivedStateVector: The received entries, or None to decode
+          them, as given to _processStateVector.
+        """
+        encoding = interest.getName().get(
+          self._applicationBroadcastPrefix.size()).getValue()
+        replyIsFragment = self._processStateVector(
+          interest, encoding, receivedStateVector)
+        if nameDigest != None and self._notificationCache != None:
+            # Remember if the sender was outdated so that a duplicate also gets
+            # a reply.
+            self._notificationCache.add(
+              nameDigest, (self._stateVectorVersion, replyIsFragment))
+
+    def _queueNotification(self, interest, nameDigest, sourceId):
+        """
+        Put the admitted interest in the inbound queue, first dropping a queued
+        interest if the queue is full, and make sure that there is a timer to
+        process it.
+        """
+        if len(self._inboundQueue) >= self._maxInboundQueueLength:
+            self._dropQueuedNotification()
+
+        supersedeKey = self._getSupersedeKey(interest, sourceId)
+        self._inboundQueue.append((interest, nameDigest, supersedeKey))
+        if supersedeKey != None:
+            self._nQueuedBySupersedeKey[supersedeKey] = (
+              self._nQueuedBySupersedeKey.get(supersedeKey, 0) + 1)
+        self._admissionCounters['queued'] += 1
+        self._admissionCounters['maxQueueLength'] = max(
+          self._admissionCounters['maxQueueLength'], len(self._inboundQueue))
+        if not self._isInboundDrainScheduled:
+            self._isInboundDrainScheduled = True
+            self._face.callLater(0, self._onInboundDrainTimeout)
+
+    def _dropQueuedNotification(self):
+        """
+        Drop the oldest queued interest which is superseded by a later one, or
+        the oldest if none is superseded.
+        """
+        for i in range(len(self._inboundQueue)):
+            supersedeKey = self._inboundQueue[i][2]
+            if (supersedeKey != None and
+                self._nQueuedBySupersedeKey[supersedeKey] > 1):
+                del self._inboundQueue[i]
+                self._nQueuedBySupersedeKey[supersedeKey] -= 1
+                self._admissionCounters['superseded'] += 1
+                return
+
+        self._popQueuedNotification()
+        self._admissionCounters['droppedOldest'] += 1
+
+    def _popQueuedNotification(self):
+        """
+        Remove the oldest queued interest and return (interest, nameDigest).
+        """
+        (interest, nameDigest, supersedeKey) = self._inboundQueue.popleft()
+        if supersedeKey != None:
+            nQueued = self._nQueuedBySupersedeKey[supersedeKey]
+            if nQueued > 1:
+                self._nQueuedBySupersedeKey[supersedeKey] = nQueued - 1
+            else:
+                del self._nQueuedBySupersedeKey[supersedeKey]
+        return (interest, nameDigest)
+
+    def _onInboundDrainTimeout(self):
+        self._isInboundDrainScheduled = False
+        self._drainInboundQueue()
+
+    def _drainInboundQueue(self):
+        """
+        Process the queued interests in arrival order.
+        """
+        while len(self._inboundQueue) > 0:
+            (interest, nameDigest) = self._popQueuedNotification()
+            if self._enabled:
+                if self._isTimingPhases:
+                    self._startPhase("onInterest")
+                    self._processNotification(interest, nameDigest)
+                    self._endPhase("onInterest")
+                else:
+                    self._processNotification(interest, nameDigest)
+
+    def _getSupersedeKey(self, interest, sourceId):
+        """
+        Get the key of a received interest for the inbound queue, where a
+        later interest with the same key supersedes an earlier one. This checks
+        the marker name components without verifying the signature.
+
+        :return: The tuple (sourceId, fragment marker bytes or None), or None
+          if the source ID does not identify a single sender or the interest
+          is a delta notification.
+        :rtype: tuple
+        """
+        if sourceId == None or not self._isSourceIdSender:
+            return None
+
+        fragmentMarker = None
+        name = interest.getName()
+        for i in range(self._applicationBroadcastPrefix.size() + 1,
+                       name.size() - 2):
+            value = name.get(i).getValue()
+            if value.size() == 0:
+                continue
+            if value.buf()[0] == StateVectorSync2018.TLV_StateVectorFragment:
+                fragmentMarker = value.toBytes()
+            elif value.buf()[0] == StateVectorSync2018.TLV_StateVectorDelta:
+                try:
+                    if StateVectorSync2018.decodeDeltaMarker(value)[2] > 0:
+                        # A delta has only some entries.
+                        return None
+                except ValueError:
+                    return None
+        return (sourceId, fragmentMarker)
+
+    def _makePipelineWorkerArgs(self):
+        """
+        Return the workerArgs for verifyAndDecodeNotification in the
+        NotificationPipeline.
+        """
+        return (self._hmacKey.toBytes(), self._applicationBroadcastPrefix.size(),
+                self._maxReceivedEntries, self._maxReceivedMemberIdLength)
+
+    def _countLimitedVector(self, error):
+        """
+        If the ValueError from decoding a received state vector is a
+        StateVectorLimitError, count it.
+        """
+        if isinstance(error, StateVectorLimitError):
+            self._admissionCounters['limitedVectors'] += 1
+
+    def _onVerifiedNotification(self, interest, result, nameDigest):
+        """
+        This is called by the NotificationPipeline in arrival order with the
+        result of verifyAndDecodeNotification for the interest.
+        """
+        if not self._enabled:
+            return
+        if result == None:
+            # Signature verification failure.
+            logging.getLogger(__name__).info("Dropping Interest with failed signature: %s",
+              interest.getName().toUri())
+            if self._metrics != None:
+                self._metrics.verificationFailures.value += 1
+            return
+
+        (entries, error) = result
+        # If entries is None, _processStateVector decodes the aliased vector.
+        receivedStateVector = entries
+        if error != None:
+            receivedStateVector = StateVectorSync2018._replayInvalidStateVector(
+              entries, error)
+        if self._isTimingPhases:
+            # The worker verified, so the phases start with decode.
+            self._startPhase("onInterest")
+            self._processVerifiedNotification(
+              interest, nameDigest, receivedStateVector)
+            self._endPhase("onInterest")
+        else:
+            self._processVerifiedNotification(
+              interest, nameDigest, receivedStateVector)
+
+    def _processStateVector(self, interest, encoding, receivedStateVector):
+        """
+        Process the state vector of a verified notification interest: merge it,
+        inform the application and reply if needed.
+
+        :param Interest interest: The notification interest, for logging.
+        :param Blob encoding: The encoding of the received state vector.
+        :param receivedStateVector: The received entries, as accepted by
+          _mergeStateVector, or None to decode the encoding. This is not used if
+          the encoding is the same as our state vector.
+        :return: If this replied, the isFragment value given to _reply,
+          otherwise None.
+        :rtype: bool
+        """
+        # Check for delta and fragment markers before the signature components.
+        isDelta = False
+        isGap = False
+        # The (startMemberId, endMemberId) of a fragment, or None.
+        memberIdRange = None
+        name = interest.getName()
+        for i in range(self._applicationBroadcastPrefix.size() + 1,
+                       name.size() - 2):
+            value = name.get(i).getValue()
+            if value.size() == 0:
+                continue
+            if value.buf()[0] == StateVectorSync2018.TLV_StateVectorFragment:
+                try:
+                    memberIdRange = StateVectorSync2018.decodeFragmentMarker(
+                      value)
+                    self._fragmentCounters['receivedFragments'] += 1
+                except ValueError:
+                    pass
+                continue
+            if value.buf()[0] != StateVectorSync2018.TLV_StateVectorDelta:
+                continue
+            try:
+                (senderId, deltaNo, span) = StateVectorSync2018.decodeDeltaMarker(
+                  value)
+            except ValueError:
+                continue
+
+            lastDeltaNo = self._receivedDeltaNos.get(senderId, 0)
+            if span > 0:
+                isDelta = True
+                self._deltaCounters['receivedDeltas'] += 1
+                # We missed a delta if it is older than the ones which this
+                # delta repeats.
+                isGap = (senderId != self._applicationDataPrefixUri and
+                         lastDeltaNo < deltaNo - span)
+            if deltaNo > lastDeltaNo:
+                self._receivedDeltaNos[senderId] = deltaNo
+
+        # A fragment has only part of the state vector, so it is not compared.
+        if memberIdRange == None and self._isCurrentStateVector(encoding):
+            # There is nothing to merge and nothing newer to reply with. Another
+            # member has sent our state vector, so a pending reply is not needed.
+            self._lastNotificationEncoding = self._encodingCache.encode(
+              self._stateVector, self._memberIndex.getSortedMembers())
+            self._lastNotificationTime = Common.getNowMilliseconds()
+            if self._isReplyPending:
+                self._cancelPendingReply()
+            return
+
+        logger = logging.getLogger(__name__)
+        isPartial = isDelta
+        if receivedStateVector == None:
+            if (encoding.size() > 0 and encoding.buf()[0] ==
+                StateVectorSync2018.TLV_AliasedStateVector):
+                try:
+                    (senderId, entries) = (
+                      StateVectorSync2018.decodeAliasedStateVector(
+                        encoding, self._memberIds, self._maxReceivedEntries,
+                        self._maxReceivedMemberIdLength))
+                except ValueError as ex:
+                    self._countLimitedVector(ex)
+                    logger.info("Dropping Interest with invalid state vector: %s",
+                      interest.getName().toUri())
+                    return
+                (receivedStateVector, isComplete) = self._resolveAliases(
+                  senderId, entries)
+                # Don't reply for members with an unknown alias.
+                isPartial = isPartial or not isComplete
+            else:
+                # Merge while decoding.
+                receivedStateVector = (
+                  StateVectorSync2018._iterateReceivedStateVector(
+                    encoding, self._memberIds, self._maxReceivedEntries,
+                    self._maxReceivedMemberIdLength))
+
+        isTimingPhases = self._isTimingPhases
+        if isTimingPhases:
+            # Decode all the entries first so that decoding and merging are
+            # timed separately.
+            self._startPhase("decode")
+            (entries, error) = StateVectorSync2018._decodeEntries(
+              receivedStateVector)
+            self._endPhase("decode")
+            if error == None:
+                receivedStateVector = entries
+            else:
+                # Merge the valid entries, then raise the error as usual.
+                receivedStateVector = (
+                  StateVectorSync2018._replayInvalidStateVector(entries, error))
+
+        if logger.isEnabledFor(logging.DEBUG):
+            # Only make the dictionary if it is logged.
+            try:
+                receivedStateVector = dict(receivedStateVector)
+            except ValueError as ex:
+                self._countLimitedVector(ex)
+                logger.info("Dropping Interest with invalid state vector: %s",
+                  interest.getName().toUri())
+                return
+            logger.debug("Received broadcast state vector %s",
+              receivedStateVector)
+
+        if isTimingPhases:
+            self._startPhase("merge")
+        (syncStates, needToReply) = self._mergeStateVector(
+          receivedStateVector, isPartial, memberIdRange)
+        if isTimingPhases:
+            self._endPhase("merge")
+        if self._metrics != None:
+            self._metrics.updatesPerNotification.observe(len(syncStates))
+        if len(syncStates) > 0:
+            # Inform the application up new sync states.
+            if isTimingPhases:
+                self._startPhase("callback")
+            try:
+                self._onReceivedSyncState(syncStates)
+            except:
+                logging.exception("Error in onReceivedSyncState")
+            if isTimingPhases:
+                self._endPhase("callback")
+
+        if isGap:
+            # Send our full state vector so that members with newer entries
+            # reply with theirs.
+            logger.info("Missed delta notifications. Broadcast state vector")
+            self._deltaCounters['gaps'] += 1
+            needToReply = True
+
+        if needToReply:
+            # Inform other members who may need to be updated. Wait to reply to
+            # a fragment until the other fragments are merged.
+            isFragment = memberIdRange != None
+            self._reply(isFragment)
+            return isFragment
+        elif self._isReplyPending and not isDelta and memberIdRange == None:
+            # The received state vector has all of our entries, so another
+            # member has already sent them.
+            self._cancelPendingReply()
+        return None
+
+    @staticmethod
+    def _iterateReceivedStateVector(encoding, memberIds, maxEntries = None,
+          maxMemberIdLength = None):
+        """
+        Return iterateFrontCodedStateVector() if the encoding is a
+        TLV_FrontCodedStateVector, otherwise iterateStateVector().
+        """
+        if (encoding.size() > 0 and encoding.buf()[0] ==
+            StateVectorSync2018.TLV_FrontCodedStateVector):
+            return StateVectorSync2018.iterateFrontCodedStateVector(
+              encoding, memberIds, maxEntries, maxMemberIdLength)
+        else:
+            return StateVectorSync2018.iterateStateVector(
+              encoding, memberIds, maxEntries, maxMemberIdLength)
+
+    @staticmethod
+    def _decodeEntries(receivedStateVector):
+        """
+        Decode all of receivedStateVector into a list of (memberId, sequenceNo).
+
+        :return: A tuple of (entries, error) where entries is the list of
+          entries decoded before an invalid entry, and error is the ValueError
+          for the invalid entry, or None if all entries are valid.
+        :rtype: (list<(str, int)>, ValueError)
+        """
+        if isinstance(receivedStateVector, dict):
+            return (list(receivedStateVector.items()), None)
+
+        entries = []
+        try:
+            for entry in receivedStateVector:
+                entries.append(entry)
+        except ValueError as ex:
+            return (entries, ex)
+        return (entries, None)
+
+    @staticmethod
+    def _replayInvalidStateVector(entries, error):
+        """
+        Return the entries decoded before an invalid entry and then raise the
+        ValueError error, like iterateStateVector() for the same encoding.
+        """
+        for entry in entries:
+            yield entry
+        raise error
+
+    def _reply(self, isFragment = False):
+        """
+        Broadcast the state vector as a reply to an outdated state vector. If
+        reply suppression is enabled, schedule the reply after a random backoff
+        unless one is already pending.
+
+        :param bool isFragment: (optional) True if the outdated state vector is
+          a fragment, so that the reply is scheduled even if reply suppression
+          is not enabled. If omitted, it is a full state vector.
+        """
+        if self._metrics != None:
+            self._metrics.replies.value += 1
+        if self._maxReplyBackoff <= 0 and not isFragment:
+            logging.getLogger(__name__).info(
+              "Received state vector was outdated. Broadcast state vector of %s members",
+              len(self._stateVector))
+            self._logStateVector()
+            self._replySuppressionCounters['sentReplies'] += 1
+            self._broadcastStateVector()
+            return
+
+        if self._isReplyPending:
+            return
+        self._isReplyPending = True
+        self._replySuppressionCounters['scheduledReplies'] += 1
+        replyNo = self._replyNo
+        self._face.callLater(
+          random.uniform(0, self._maxReplyBackoff),
+          lambda: self._sendPendingReply(replyNo))
+
+    def _sendPendingReply(self, replyNo):
+        """
+        This is called after the backoff of the reply with replyNo. If the reply
+        is still pending, broadcast the state vector unless the same state
+        vector was sent or received within the notification interest lifetime.
+        """
+        if (not self._enabled or not self._isReplyPending or
+            replyNo != self._replyNo):
+            return
+        self._isReplyPending = False
+        self._replyNo += 1
+
+        encoding = self._encodingCache.encode(
+          self._stateVector, self._memberIndex.getSortedMembers())
+        if (encoding is self._lastNotificationEncoding and
+            Common.getNowMilliseconds() - self._lastNotificationTime <
+              self._notificationInterestLifetime):
+            logging.getLogger(__name__).info(
+              "Suppress reply with a state vector sent within the lifetime")
+            self._replySuppressionCounters['suppressedDuplicates'] += 1
+            return
+
+        logging.getLogger(__name__).info(
+          "Received state vector was outdated. Broadcast state vector of %s members",
+          len(self._stateVector))
+        self._logStateVector()
+        self._replySuppressionCounters['sentReplies'] += 1
+        self._broadcastStateVector()
+
+    def _startPhase(self, phase):
+        """
+        Start timing the phase inside the phases being timed. Only call this if
+        _isTimingPhases.
+        """
+        self._phaseStack.append((phase, time.perf_counter()))
+
+    def _endPhase(self, phase):
+        """
+        End timing the phase from _startPhase and give the time to the metrics
+        and profiler. If an exception skipped ending phases inside it, they are
+        discarded.
+        """
+        endTime = time.perf_counter()
+        while len(self._phaseStack) > 0:
+            (startedPhase, startTime) = self._phaseStack.pop()
+            if startedPhase == phase:
+                break
+        else:
+            # The phase was started before the phases were timed.
+            return
+
+        seconds = endTime - startTime
+        if self._metrics != None:
+            self._metrics.observePhase(phase, seconds)
+        if self._profiler != None:
+            self._profiler.record(
+              tuple(startedPhase for (startedPhase, _) in self._phaseStack) +
+                (phase,), seconds)
+
+    def _logStateVector(self):
+        """
+        Log the full state vector at the DEBUG level, since formatting it for a
+        large group is expensive.
+        """
+        logger = logging.getLogger(__name__)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("State vector %s", self._stateVector)
+
+    def _cancelPendingReply(self):
+        """
+        Cancel the pending reply because a notification with our entries was
+        sent.
+        """
+        self._isReplyPending = False
+        self._replyNo += 1
+        self._replySuppressionCounters['cancelledReplies'] += 1
+
+    def _mergeStateVector(self, receivedStateVector, isDelta = False,
+          memberIdRange = None):
+        """
+        Merge receivedStateVector into self._stateVector and return the
+        updated entries. This makes one pass over receivedStateVector, so it
+        can be an iterator from iterateStateVector() which decodes while
+        merging. If decoding fails part way, this keeps the entries merged so
+        far, returns them and does not ask to reply.
+
+        :param receivedStateVector: The received state vector dictionary where
+          the key is the member ID string and the value is the sequence number,
+          or an iterable of (memberId, sequenceNo). If a member ID is repeated,
+          only its first entry is used.
+        :type receivedStateVector: dict<str,int> or iterable of (str, int)
+        :param bool isDelta: (optional) True if receivedStateVector is from a
+          delta notification, so that missing members don't need a reply. If
+          omitted, receivedStateVector is a full state vector.
+        :param tuple memberIdRange: (optional) The (startMemberId, endMemberId)
+          from decodeFragmentMarker() if receivedStateVector is a fragment, so
+          that only missing members in the range need a reply. If omitted or
+          None, receivedStateVector is not a fragment.
+        :return: A tuple of (syncStates, needToReply) where syncStates is the
+          list of new StateVectorSync2018.SyncState giving the entries in
+          self._stateVector that were updated, and needToReply is True if
+          receivedStateVector is lacking more current information which was in
+          self._stateVector.
+        :rtype: (list<StateVectorSync2018.SyncState>, bool)
+        """
+        if isinstance(receivedStateVector, dict):
+            receivedStateVector = receivedStateVector.items()
+
+        stateVector = self._stateVector
+        if memberIdRange == None:
+            nLocalEntries = len(stateVector)
+        else:
+            nLocalEntries = self._memberIndex.countInRange(*memberIdRange)
+        # The number of received entries for members which were already in
+        # stateVector. If this is less than nLocalEntries, the received state
+        # vector is missing some members.
+        nKnownEntries = 0
+        # The received member IDs, so that a repeated entry is not counted
+        # again.
+        receivedMemberIds = set()
+        needToReply = False
+        result = []
+        try:
+            for memberId, sequenceNo in receivedStateVector:
+                if memberId in receivedMemberIds:
+                    continue
+                receivedMemberIds.add(memberId)
+
+                localSequenceNo = stateVector.get(memberId)
+                if localSequenceNo == None:
+                    if (memberId in self._tombstones and
+                        not self._reviveMember(memberId, sequenceNo)):
+                        # An old state vector still has the expired member.
+                        continue
+                    result.append(StateVectorSync2018.SyncState(
+                      memberId, sequenceNo))
+                    self._setSequenceNumber(memberId, sequenceNo)
+                    continue
+
+                nKnownEntries += 1
+                if localSequenceNo < sequenceNo:
+                    result.append(StateVectorSync2018.SyncState(
+                      memberId, sequenceNo))
+                    self._setSequenceNumber(memberId, sequenceNo)
+                elif localSequenceNo > sequenceNo:
+                    needToReply = True
+        except ValueError as ex:
+            self._countLimitedVector(ex)
+            logging.getLogger(__name__).info(
+              "Stopped merging an invalid state vector after %d updates",
+              len(result))
+            self._updateSnapshot()
+            self._commitStore()
+            return (result, False)
+
+        self._updateSnapshot()
+        self._commitStore()
+        if nKnownEntries < nLocalEntries and not isDelta:
+            needToReply = True
+        return (result, needToReply)
+
+    def _isCurrentStateVector(self, encoding):
+        """
+        Check if the encoding of a received state vector is the same as the
+        encoding of self._stateVector. Members encode entries in sorted order,
+        so equal state vectors have equal encodings. This compares the bytes
+        of the encoding from _encodingCache, which only re-encodes changed
+        entries, with the received bytes. This is linear in the encoding size
+        but avoids decoding the received vector.
+
+        :param Blob encoding: The encoding of the received state vector.
+        :return: True if the encoding is the same as for self._stateVector.
+        :rtype: bool
+        """
+        if (self._frontCodedEncodingCache != None and encoding.size() > 0 and
+            encoding.buf()[0] == StateVectorSync2018.TLV_FrontCodedStateVector):
+            self._encodeFrontCoded()
+            return self._frontCodedEncodingCache.isEncodingEqual(encoding)
+
+        self._encodingCache.encode(
+          self._stateVector, self._memberIndex.getSortedMembers())
+        return self._encodingCache.isEncodingEqual(encoding)
+
+    def _onRegisterSuccess(self, prefix, registeredPrefixId):
+        try:
+            self._onInitialized()
+        except:
+            logging.exception("Error in onInitialized")
+
+    @staticmethod
+    def _dummyOnData(interest, data):
+        """
+        This is a do-nothing onData for using expressInterest when we don't
+        expect a response Data packet.
+        """
+        pass
+
+    # Assign TLV types as crtitical values for application use.
     TLV_StateVector = 129
     TLV_StateVectorEntry = 131
     TLV_StateVector_MemberId = 133
     TLV_StateVector_SequenceNumber = 135
+    TLV_StateVectorDelta = 137
+    TLV_StateVectorDelta_DeltaNumber = 139
+    TLV_StateVectorDelta_Span = 141
+    TLV_StateVector_Alias = 143
+    TLV_AliasedStateVector = 145
+
+    TLV_FrontCodedStateVector = 147
+    TLV_StateVector_FormatVersion = 149
+    TLV_StateVector_SharedPrefixLength = 151
+    TLV_StateVectorFragment = 153
+    TLV_StateVectorFragment_Start = 155
+    TLV_StateVectorFragment_End = 157
+    TLV_StoredStateVector = 159
+    TLV_StoredStateVector_MemberIdLengths = 161
+    TLV_StoredStateVector_MemberIds = 163
+    TLV_StoredStateVector_SequenceNumbers = 165
+    TLV_CapturedNotification = 167
+    TLV_CapturedNotification_TimeDelta = 169
+    TLV_CapturedNotification_IncomingFaceId = 171
+
+    FRONT_CODING_VERSION = 1
+    ALIAS_LOOKUP_COMPONENT = "svs-aliases"
+    MAX_ALIAS_LOOKUP_SIZE = 4000
+    DEFAULT_MAX_NOTIFICATION_SIZE = 8800
+    # The fragment marker type and length plus the start and end type and
+    # length, not including the member IDs.
+    MAX_FRAGMENT_MARKER_OVERHEAD = 12
+
+class _SyncMetrics(object):
+    """
+    A _SyncMetrics holds the metrics of a StateVectorSync2018 in a
+    MetricsRegistry, as described in StateVectorSync2018.setMetrics().
+    """
+    UPDATE_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+    SECONDS_BUCKETS = [
+      0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+      0.005, 0.01, 0.025, 0.05, 0.1]
+
+    def __init__(self, sync, registry, labels):
+        self._registry = registry
+        self._labels = labels
+        self._names = []
+
+        self.sent = self._counter(
+          "svs_notifications_sent_total", "Notification interests sent.")
+        self.sentBytes = self._counter(
+          "svs_notification_sent_bytes_total",
+          "Wire encoded bytes of notification interests sent.")
+        self.received = self._counter(
+          "svs_notifications_received_total",
+          "Notification interests received.")
+        self.receivedBytes = self._counter(
+          "svs_notification_received_bytes_total",
+          "Wire encoded bytes of notification interests received.")
+        self.verificationFailures = self._counter(
+          "svs_verification_failures_total",
+          "Received notification interests with a failed signature.")
+        self.replies = self._counter(
+          "svs_replies_total",
+          "Replies to a received state vector which was outdated.")
+
+        self._gauge("svs_state_vector_members",
+          "Members in the state vector.", lambda: len(sync._stateVector))
+        self._gauge("svs_sequence_number", "Our sequence number.",
+          lambda: sync._sequenceNo)
+        self._gauge("svs_state_vector_encoded_bytes",
+          "Encoded bytes of the state vector in the last notification.",
+          lambda: sync._lastNotificationEncoding.size()
+                  if sync._lastNotificationEncoding != None else 0)
+
+        self.updatesPerNotification = self._histogram(
+          "svs_updates_per_notification",
+          "Sequence number updates merged from a received notification.",
+          _SyncMetrics.UPDATE_BUCKETS)
+        # The dictionary key is the phase from StateVectorSync2018._endPhase.
+        self._phaseSeconds = {
+          "verify": self._histogram(
+            "svs_verify_seconds", "Seconds to verify a notification.",
+            _SyncMetrics.SECONDS_BUCKETS),
+          "decode": self._histogram(
+            "svs_decode_seconds", "Seconds to decode a received state vector.",
+            _SyncMetrics.SECONDS_BUCKETS),
+          "merge": self._histogram(
+            "svs_merge_seconds", "Seconds to merge a received state vector.",
+            _SyncMetrics.SECONDS_BUCKETS),
+          "callback": self._histogram(
+            "svs_callback_seconds", "Seconds in onReceivedSyncState.",
+            _SyncMetrics.SECONDS_BUCKETS) }
+
+    def observePhase(self, phase, seconds):
+        """
+        Observe the seconds of the phase in its histogram, if it has one.
+        """
+        histogram = self._phaseSeconds.get(phase)
+        if histogram != None:
+            histogram.observe(seconds)
+
+    def remove(self):
+        """
+        Remove the metrics from the registry.
+        """
+        for name in self._names:
+            self._registry.remove(name, self._labels)
+
+    def _counter(self, name, help):
+        self._names.append(name)
+        return self._registry.counter(name, help, self._labels)
+
+    def _gauge(self, name, help, function):
+        self._names.append(name)
+        return self._registry.gauge(name, help, self._labels, function)
+
+    def _histogram(self, name, help, buckets):
+        self._names.append(name)
+        return self._registry.histogram(name, help, buckets, self._labels)
+
+def _getSharedPrefixLength(a, b):
+    """
+    Get the length of the common prefix of a and b. This compares slices,
+    which is faster than comparing each byte in Python.
+
+    :param bytes a: The first bytes.
+    :param bytes b: The second bytes.
+    :return: The number of bytes at the start which are the same.
+    :rtype: int
+    """
+    low = 0
+    high = min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+def _makeEntryLimitMessage(maxEntries):
+    return "The state vector has more than " + str(maxEntries) + " entries"
+
+def _makeMemberIdLimitMessage(maxMemberIdLength):
+    return ("A member ID in the state vector is longer than " +
+            str(maxMemberIdLength) + " bytes")
+
+def _readVarNumber(view, offset):
+    """
+    Decode a VAR-NUMBER in NDN-TLV from the view starting at offset.
+
+    :param memoryview view: The input to decode.
+    :param int offset: The offset in view of the VAR-NUMBER.
+    :return: A tuple of (varNumber, offset) where offset is just past the
+      VAR-NUMBER.
+    :rtype: (int, int)
+    :raises ValueError: If the VAR-NUMBER goes past the end of the input.
+    """
+    try:
+        firstOctet = view[offset]
+        if firstOctet < 253:
+            return firstOctet, offset + 1
+        elif firstOctet == 253:
+            return (view[offset + 1] << 8) + view[offset + 2], offset + 3
+        elif firstOctet == 254:
+            nBytes = 4
+        else:
+            nBytes = 8
+
+        if offset + nBytes >= len(view):
+            raise IndexError
+        result = 0
+        for i in range(offset + 1, offset + 1 + nBytes):
+            result = (result << 8) | view[i]
+        return result, offset + 1 + nBytes
+    except IndexError:
+        raise ValueError("Read past the end of the input")
@@ -0,0 +1,277 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2018 Regents of the University of California.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# A copy of the GNU Lesser General Public License is in the file COPYING.
+
+import heapq
+import logging
+from pyndn.name import Name
+from pyndn.util.common import Common
+from svs.sync.notification_signer import NotificationSigner
+from svs.sync.state_vector_sync2018 import StateVectorSync2018
+
+class SyncGroupManager(object):
+    """
+    A SyncGroupManager hosts many sync groups on one face. It registers one
+    parent broadcast prefix, and the broadcast prefix of each group is the
+    parent prefix plus one name component for the group. A received
+    notification is routed to its group by a dictionary lookup of that name
+    component, instead of the face matching it against one interest filter
+    per group. Groups made with addGroup share a NotificationSigner for each
+    HMAC key, and their timers are kept in one heap with one pending face
+    timer for the earliest. The groups use a proxy face, so their other
+    prefix registrations, interests and data go to the face as usual.
+    All methods must be called in the same thread as processEvents.
+
+    :param Face face: The Face for registering the parent broadcast prefix and
+      sending the packets of the groups.
+    :param Name parentBroadcastPrefix: The parent of the group broadcast
+      prefixes. This makes a copy of the name.
+    """
+    def __init__(self, face, parentBroadcastPrefix):
+        self._face = face
+        self._parentBroadcastPrefix = Name(parentBroadcastPrefix)
+        self._groupFace = SyncGroupManager._GroupFace(self)
+        # The dictionary key is the bytes of the group name component. The
+        # value is the onInterest of the group.
+        self._groups = {}
+        # The dictionary key is a registered prefix ID given to a group. The
+        # value is the bytes of the group name component, or the
+        # registered prefix ID from the face as an int.
+        self._registrations = {}
+        self._nRegistrations = 0
+        # The registrations waiting for the parent broadcast prefix. Each item
+        # is (prefix, registeredPrefixId, onRegisterFailed, onRegisterSuccess).
+        self._pendingRegistrations = []
+        self._isRegistered = False
+        self._isRegisterFailed = False
+        # The dictionary key is the bytes of an HMAC key. The value is the
+        # shared NotificationSigner.
+        self._signers = {}
+
+        # A heap of (callTime, timerNo, callback) for the groups.
+        self._timers = []
+        self._nTimers = 0
+        # A heap of the call times of the face timers which have not fired, so
+        # that the earliest is first.
+        self._faceTimerCallTimes = []
+        # The call time of the last face timer which fired. If the face uses
+        # virtual time, this is ahead of Common.getNowMilliseconds().
+        self._lastCallTime = 0.0
+
+        self._counters = {
+          'dispatchedNotifications': 0, 'unknownGroupNotifications': 0 }
+
+        self._face.registerPrefix(
+          self._parentBroadcastPrefix, self._onInterest, self._onRegisterFailed,
+          self._onRegisterSuccess)
+
+    def addGroup(self, groupName, onReceivedSyncState, onInitialized,
+          applicationDataPrefix, hmacKey, notificationInterestLifetime,
+          onRegisterFailed, keyChain = None, signingParams = None,
+          previousSequenceNumber = -1):
+        """
+        Make a StateVectorSync2018 for a group whose broadcast prefix is the
+        parent broadcast prefix plus groupName. The arguments are as for the
+        StateVectorSync2018 constructor. To remove the group, call its
+        shutdown().
+
+        :param groupName: The name component for the group.
+        :type groupName: Name.Component or value for the Name.Component
+          constructor
+        :return: The new StateVectorSync2018.
+        :rtype: StateVectorSync2018
+        """
+        signer = self._signers.get(hmacKey.toBytes())
+        if signer == None:
+            signer = NotificationSigner(hmacKey, Name("/A"))
+            self._signers[hmacKey.toBytes()] = signer
+
+        return StateVectorSync2018(
+          onReceivedSyncState, onInitialized, applicationDataPrefix,
+          Name(self._parentBroadcastPrefix).append(groupName), self._groupFace,
+          keyChain, signingParams, hmacKey, notificationInterestLifetime,
+          onRegisterFailed, previousSequenceNumber, signer)
+
+    def getCounters(self):
+        """
+        Get the dispatch counters. The dictionary keys are 'groups' (the number
+        of groups), 'dispatchedNotifications' (the number of received
+        interests routed to a group), 'unknownGroupNotifications' (the number
+        received for no group) and 'pendingTimers' (the number of group timers
+        which have not fired).
+
+        :return: A new dictionary of the counter values.
+        :rtype: dict<str,int>
+        """
+        counters = dict(self._counters)
+        counters['groups'] = len(self._groups)
+        counters['pendingTimers'] = len(self._timers)
+        return counters
+
+    class _GroupFace(object):
+        """
+        The _GroupFace is the face for the groups. It has the methods of Face
+        which StateVectorSync2018 uses.
+        """
+        def __init__(self, manager):
+            self._manager = manager
+            self._face = manager._face
+
+        def registerPrefix(self, prefix, onInterest, onRegisterFailed,
+              onRegisterSuccess = None):
+            return self._manager._registerPrefix(
+              prefix, onInterest, onRegisterFailed, onRegisterSuccess)
+
+        def removeRegisteredPrefix(self, registeredPrefixId):
+            self._manager._removeRegisteredPrefix(registeredPrefixId)
+
+        def expressInterest(self, interestOrName, *args):
+            return self._face.expressInterest(interestOrName, *args)
+
+        def putData(self, data):
+            self._face.putData(data)
+
+        def callLater(self, delayMilliseconds, callback):
+            self._manager._callLater(delayMilliseconds, callback)
+
+    def _registerPrefix(self, prefix, onInterest, onRegisterFailed,
+          onRegisterSuccess):
+        """
+        Register a group broadcast prefix in _groups, or pass another prefix to
+        the face. Return the registered prefix ID for _removeRegisteredPrefix.
+        """
+        self._nRegistrations += 1
+        registeredPrefixId = self._nRegistrations
+        if not (prefix.size() == self._parentBroadcastPrefix.size() + 1 and
+                self._parentBroadcastPrefix.match(prefix)):
+            self._registrations[registeredPrefixId] = self._face.registerPrefix(
+              prefix, onInterest, onRegisterFailed, onRegisterSuccess)
+            return registeredPrefixId
+
+        groupKey = prefix.get(-1).getValue().toBytes()
+        if groupKey in self._groups or self._isRegisterFailed:
+            # Report the failure after returning, like the face.
+            self._callLater(0, lambda: onRegisterFailed(prefix))
+            return registeredPrefixId
+
+        self._groups[groupKey] = onInterest
+        self._registrations[registeredPrefixId] = groupKey
+        if self._isRegistered:
+            if onRegisterSuccess != None:
+                self._callLater(
+                  0, lambda: onRegisterSuccess(prefix, registeredPrefixId))
+        else:
+            self._pendingRegistrations.append(
+              (prefix, registeredPrefixId, onRegisterFailed, onRegisterSuccess))
+        return registeredPrefixId
+
+    def _removeRegisteredPrefix(self, registeredPrefixId):
+        registration = self._registrations.pop(registeredPrefixId, None)
+        if type(registration) is bytes:
+            self._groups.pop(registration, None)
+        elif registration != None:
+            self._face.removeRegisteredPrefix(registration)
+
+    def _onInterest(self, prefix, interest, face, interestFilterId, filter):
+        name = interest.getName()
+        onInterest = None
+        if name.size() > self._parentBroadcastPrefix.size():
+            onInterest = self._groups.get(
+              name.get(self._parentBroadcastPrefix.size()).getValue().toBytes())
+        if onInterest == None:
+            self._counters['unknownGroupNotifications'] += 1
+            return
+
+        self._counters['dispatchedNotifications'] += 1
+        onInterest(prefix, interest, face, interestFilterId, filter)
+
+    def _onRegisterSuccess(self, prefix, registeredPrefixId):
+        self._isRegistered = True
+        pendingRegistrations = self._pendingRegistrations
+        self._pendingRegistrations = []
+        for (groupPrefix, groupRegisteredPrefixId, onRegisterFailed,
+             onRegisterSuccess) in pendingRegistrations:
+            if (onRegisterSuccess != None and
+                groupRegisteredPrefixId in self._registrations):
+                try:
+                    onRegisterSuccess(groupPrefix, groupRegisteredPrefixId)
+                except:
+                    logging.exception("Error in onRegisterSuccess")
+
+    def _onRegisterFailed(self, prefix):
+        logging.getLogger(__name__).info(
+          "Register failed for parent broadcast prefix %s", prefix.toUri())
+        self._isRegisterFailed = True
+        pendingRegistrations = self._pendingRegistrations
+        self._pendingRegistrations = []
+        for (groupPrefix, groupRegisteredPrefixId, onRegisterFailed,
+             onRegisterSuccess) in pendingRegistrations:
+            self._removeRegisteredPrefix(groupRegisteredPrefixId)
+            try:
+                onRegisterFailed(groupPrefix)
+            except:
+                logging.exception("Error in onRegisterFailed")
+
+    def _callLater(self, delayMilliseconds, callback):
+        """
+        Add the callback to the heap of group timers. If it is the earliest,
+        call face.callLater for it.
+        """
+        callTime = max(self._lastCallTime, Common.getNowMilliseconds()) + (
+          delayMilliseconds)
+        self._nTimers += 1
+        heapq.heappush(self._timers, (callTime, self._nTimers, callback))
+        if (len(self._faceTimerCallTimes) == 0 or
+            callTime < self._faceTimerCallTimes[0]):
+            self._setFaceTimer(callTime, delayMilliseconds)
+
+    def _setFaceTimer(self, callTime, delayMilliseconds):
+        heapq.heappush(self._faceTimerCallTimes, callTime)
+        self._face.callLater(
+          delayMilliseconds, lambda: self._onFaceTimer(callTime))
+
+    def _onFaceTimer(self, callTime):
+        """
+        Call each group timer which is due at callTime, then set a face timer
+        for the next one if there is not one pending for it. A timer which is
+        added by a callback is called by a later face timer.
+        """
+        faceTimerCallTimes = self._faceTimerCallTimes
+        if len(faceTimerCallTimes) > 0 and faceTimerCallTimes[0] == callTime:
+            heapq.heappop(faceTimerCallTimes)
+        elif callTime in faceTimerCallTimes:
+            # The face called a later timer first.
+            faceTimerCallTimes.remove(callTime)
+            heapq.heapify(faceTimerCallTimes)
+        self._lastCallTime = max(
+          self._lastCallTime, callTime, Common.getNowMilliseconds())
+        dueCallbacks = []
+        while (len(self._timers) > 0 and
+               self._timers[0][0] <= self._lastCallTime):
+            dueCallbacks.append(heapq.heappop(self._timers)[2])
+        for callback in dueCallbacks:
+            try:
+                callback()
+            except:
+                logging.exception("Error in a group timer callback")
+
+        if len(self._timers) > 0:
+            nextCallTime = self._timers[0][0]
+            if (len(faceTimerCallTimes) == 0 or
+                nextCallTime < faceTimerCallTimes[0]):
+                self._setFaceTimer(
+                  nextCallTime, max(0.0, nextCallTime - self._lastCallTime))